@@ -0,0 +1,3 @@
+from .access_index import PROJECT_ROLES, AccessIndex
+
+__all__ = ["AccessIndex", "PROJECT_ROLES"]
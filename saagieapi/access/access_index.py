@@ -0,0 +1,268 @@
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from ..utils.concurrency import DEFAULT_MAX_WORKERS, run_concurrently
+
+# project roles, from the lowest to the highest
+PROJECT_ROLES = ("ROLE_PROJECT_VIEWER", "ROLE_PROJECT_EDITOR", "ROLE_PROJECT_MANAGER")
+# rank stored in the matrix for each role, 0 meaning no access
+_RANKS = {role: rank for rank, role in enumerate(PROJECT_ROLES, start=1)}
+
+
+def _rank(role: str) -> int:
+    if role not in _RANKS:
+        raise ValueError(f"❌ 'role' must be one of {', '.join(PROJECT_ROLES)}")
+    return _RANKS[role]
+
+
+class AccessIndex:
+    # pylint: disable=too-many-instance-attributes
+    # the matrix and its row, column and role indexes
+    """Effective project role of every user, computed from the groups they belong to and the rights of the groups
+    on each project. A user gets the highest role granted to any of their groups.
+
+    Roles are stored in a dense matrix, with one bytearray per user and one column per project, and the users
+    holding each role on a project are indexed in sets, so that queries do not call the platform.
+    An index can be saved with to_dict and reloaded with from_dict to be compared to a later one with diff.
+
+    Examples
+    --------
+    >>> index = AccessIndex.load(saagie_api)
+    >>> index.role("john.doe", "8321e13c-892a-4481-8552-5be4d6cc5df4")
+    'ROLE_PROJECT_EDITOR'
+    >>> index.users_with_role("8321e13c-892a-4481-8552-5be4d6cc5df4", "ROLE_PROJECT_MANAGER")
+    ['jane.doe']
+    >>> index.projects_for_user("john.doe")
+    {'8321e13c-892a-4481-8552-5be4d6cc5df4': 'ROLE_PROJECT_EDITOR'}
+    >>> index.diff(AccessIndex.from_dict(previous_snapshot))
+    [
+        {
+            "user": "john.doe",
+            "project_id": "8321e13c-892a-4481-8552-5be4d6cc5df4",
+            "project_name": "Project A",
+            "before": "ROLE_PROJECT_VIEWER",
+            "after": "ROLE_PROJECT_EDITOR"
+        }
+    ]
+    """
+
+    def __init__(
+        self,
+        user_groups: Dict[str, Iterable[str]],
+        group_roles: Dict[str, Dict[str, str]],
+        project_names: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Parameters
+        ----------
+        user_groups : dict
+            Groups of each user, by login
+        group_roles : dict
+            Role of each group by project id, by group name
+        project_names : dict, optional
+            Name of each project by id. Projects only present in group_roles are added without name
+
+        Raises
+        ------
+        ValueError
+            If a role is not one of PROJECT_ROLES
+        """
+        self.user_groups = {login: sorted(set(groups)) for login, groups in user_groups.items()}
+        self.group_roles = {group: dict(roles) for group, roles in group_roles.items()}
+        self.project_names = dict(project_names or {})
+        for roles in self.group_roles.values():
+            for project_id in roles:
+                self.project_names.setdefault(project_id, None)
+        self.errors: Dict[str, str] = {}
+
+        self.users = sorted(self.user_groups)
+        self.projects = sorted(self.project_names)
+        self._user_positions = {login: position for position, login in enumerate(self.users)}
+        self._project_positions = {project_id: position for position, project_id in enumerate(self.projects)}
+        self._matrix = [bytearray(len(self.projects)) for _ in self.users]
+        self._holders: List[Dict[int, set]] = [{rank: set() for rank in _RANKS.values()} for _ in self.projects]
+        for login, row in zip(self.users, self._matrix):
+            for group in self.user_groups[login]:
+                for project_id, role in self.group_roles.get(group, {}).items():
+                    position = self._project_positions[project_id]
+                    row[position] = max(row[position], _rank(role))
+            for position, rank in enumerate(row):
+                if rank:
+                    self._holders[position][rank].add(login)
+
+    @classmethod
+    def load(
+        cls, saagie_api, max_workers: int = DEFAULT_MAX_WORKERS, verify_ssl: Optional[bool] = None
+    ) -> "AccessIndex":
+        """Build the index of the platform. The users, groups and projects are listed concurrently, then the
+        permissions of every group and the rights on every project are fetched concurrently.
+        Group membership comes from the users list, the roles from the project rights (which include the groups
+        with rights on all projects) and from the PROJECT permissions of the groups
+
+        Parameters
+        ----------
+        saagie_api : SaagieApi
+            Connection to the platform, with the admin role
+        max_workers : int, optional
+            Maximum number of concurrent requests
+        verify_ssl : bool, optional
+            Enable or disable verification of SSL certification
+            By default, refers to saagie_api.verify_ssl
+
+        Returns
+        -------
+        AccessIndex
+            Index of the platform. Its errors attribute gives the error message by group name or project id, for
+            the permissions or rights that could not be fetched
+
+        Raises
+        ------
+        Exception
+            If the users, groups or projects cannot be listed
+        """
+        listings = run_concurrently(
+            lambda listing: listing(),
+            [
+                lambda: saagie_api.users.list(verify_ssl=verify_ssl),
+                lambda: saagie_api.groups.list(verify_ssl=verify_ssl),
+                lambda: saagie_api.projects.list(pprint_result=False)["projects"] or [],
+            ],
+            max_workers,
+        )
+        for _, _, exception in listings:
+            if exception:
+                raise exception
+        users, groups, projects = (result for _, result, _ in listings)
+
+        def fetch(item):
+            kind, key = item
+            if kind == "group":
+                return saagie_api.groups.get_permission(key, verify_ssl=verify_ssl)
+            return saagie_api.projects.get_rights(key)["rights"] or []
+
+        group_roles: Dict[str, Dict[str, str]] = {group["name"]: {} for group in groups}
+        project_names = {project["id"]: project["name"] for project in projects}
+        errors = {}
+        items = [("group", group["name"]) for group in groups] + [
+            ("project", project_id) for project_id in project_names
+        ]
+        for (kind, key), result, exception in run_concurrently(fetch, items, max_workers):
+            if exception:
+                logging.warning("❗Cannot get the permissions of the %s [%s]: %s", kind, key, exception)
+                errors[key] = str(exception)
+            elif kind == "group":
+                for authorization in result.get("authorizations") or []:
+                    for permission in authorization.get("permissions") or []:
+                        artifact = permission.get("artifact") or {}
+                        if artifact.get("type") == "PROJECT" and permission.get("role") in _RANKS:
+                            cls.__grant(group_roles.setdefault(key, {}), artifact["id"], permission["role"])
+            else:
+                for right in result:
+                    cls.__grant(group_roles.setdefault(right["name"], {}), key, right["role"])
+
+        index = cls({user["login"]: user.get("groups") or [] for user in users}, group_roles, project_names)
+        index.errors = errors
+        return index
+
+    @staticmethod
+    def __grant(roles: Dict[str, str], project_id: str, role: str) -> None:
+        if _rank(role) > _RANKS.get(roles.get(project_id), 0):
+            roles[project_id] = role
+
+    def role(self, login: str, project_id: str) -> Optional[str]:
+        """Highest role of a user on a project, None if the user has no access or is unknown"""
+        user_position = self._user_positions.get(login)
+        project_position = self._project_positions.get(project_id)
+        if user_position is None or project_position is None:
+            return None
+        rank = self._matrix[user_position][project_position]
+        return PROJECT_ROLES[rank - 1] if rank else None
+
+    def users_with_role(self, project_id: str, role: str, at_least: bool = False) -> List[str]:
+        """Users having a role on a project
+
+        Parameters
+        ----------
+        project_id : str
+            UUID of the project
+        role : str
+            One of PROJECT_ROLES
+        at_least : bool, optional
+            Whether to also return the users with a higher role
+
+        Returns
+        -------
+        list of str
+            Sorted logins
+        """
+        rank = _rank(role)
+        position = self._project_positions.get(project_id)
+        if position is None:
+            return []
+        holders = self._holders[position]
+        if not at_least:
+            return sorted(holders[rank])
+        return sorted(set().union(*(holders[higher] for higher in range(rank, len(PROJECT_ROLES) + 1))))
+
+    def projects_for_user(self, login: str, min_role: str = PROJECT_ROLES[0]) -> Dict[str, str]:
+        """Projects reachable by a user with at least a role
+
+        Returns
+        -------
+        dict
+            Highest role of the user by project id
+        """
+        min_rank = _rank(min_role)
+        position = self._user_positions.get(login)
+        if position is None:
+            return {}
+        return {
+            project_id: PROJECT_ROLES[rank - 1]
+            for project_id, rank in zip(self.projects, self._matrix[position])
+            if rank >= min_rank
+        }
+
+    def to_dict(self) -> Dict:
+        """Serializable snapshot of the index, see from_dict"""
+        return {
+            "user_groups": self.user_groups,
+            "group_roles": self.group_roles,
+            "project_names": self.project_names,
+        }
+
+    @classmethod
+    def from_dict(cls, snapshot: Dict) -> "AccessIndex":
+        """Rebuild an index from a snapshot returned by to_dict"""
+        return cls(snapshot["user_groups"], snapshot["group_roles"], snapshot["project_names"])
+
+    def diff(self, previous: "AccessIndex") -> List[Dict]:
+        """Effective roles that changed since a previous index
+
+        Parameters
+        ----------
+        previous : AccessIndex
+            Older index of the same platform
+
+        Returns
+        -------
+        list of dict
+            Changes sorted by user and project, with the keys "user", "project_id", "project_name", "before" and
+            "after", the role being None when the user has no access
+        """
+        changes = []
+        for login in sorted(set(self.users) | set(previous.users)):
+            before = previous.projects_for_user(login)
+            after = self.projects_for_user(login)
+            for project_id in sorted(set(before) | set(after)):
+                if before.get(project_id) != after.get(project_id):
+                    changes.append(
+                        {
+                            "user": login,
+                            "project_id": project_id,
+                            "project_name": self.project_names.get(project_id)
+                            or previous.project_names.get(project_id),
+                            "before": before.get(project_id),
+                            "after": after.get(project_id),
+                        }
+                    )
+        return changes
@@ -0,0 +1,4 @@
+from .app_metrics import AppMetricsCollector, RingBuffer
+from .instance_history import DAY, HOUR, WEEK, InstanceHistory
+
+__all__ = ["AppMetricsCollector", "InstanceHistory", "RingBuffer", "HOUR", "DAY", "WEEK"]
@@ -0,0 +1,348 @@
+import logging
+import math
+import time
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from ..utils.concurrency import DEFAULT_MAX_WORKERS, run_concurrently
+from ..utils.date_functions import parse_datetime
+from .instance_history import DAY, percentile
+
+METRICS = (
+    "uptime_percentage",
+    "downtime_percentage",
+    "recovered_count",
+    "status_changes",
+    "failures",
+    "running",
+)
+AGGREGATES = ("min", "avg", "max")
+
+
+def _format_date(timestamp: float) -> str:
+    """Date in the format expected by the app stats queries: "%Y-%m-%dT%H:%M:%S.%fZ" with milliseconds"""
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+class RingBuffer:
+    """Fixed-size time series: once full, each new sample overwrites the oldest one.
+    Timestamps and values are stored in preallocated typed arrays, missing values as NaN"""
+
+    def __init__(self, capacity: int, fields: Sequence[str]):
+        """
+        Parameters
+        ----------
+        capacity : int
+            Maximum number of samples kept
+        fields : Sequence[str]
+            Names of the values of each sample
+
+        Raises
+        ------
+        ValueError
+            If capacity is lower than 1
+        """
+        if capacity < 1:
+            raise ValueError("❌ capacity must be greater than 0")
+        self.capacity = capacity
+        self._timestamps = array("d", [math.nan]) * capacity
+        self._values = {field: array("d", [math.nan]) * capacity for field in fields}
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, timestamp: float, values: Dict[str, Optional[float]]) -> None:
+        """Add a sample. Fields missing from values, or None, are stored as NaN"""
+        self._timestamps[self._next] = timestamp
+        for field, column in self._values.items():
+            value = values.get(field)
+            column[self._next] = math.nan if value is None else float(value)
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def _positions(self) -> Iterable[int]:
+        start = (self._next - self._size) % self.capacity
+        return ((start + offset) % self.capacity for offset in range(self._size))
+
+    def items(self, field: str, since: Optional[float] = None) -> List[Tuple[float, float]]:
+        """(timestamp, value) of the samples in chronological order, skipping missing values"""
+        column = self._values[field]
+        return [
+            (self._timestamps[position], column[position])
+            for position in self._positions()
+            if not math.isnan(column[position]) and (since is None or self._timestamps[position] >= since)
+        ]
+
+
+class AppMetricsCollector:
+    """Sample the uptime, downtime, recoveries and status changes of many apps at regular intervals and keep
+    them in a fixed-size time series per app.
+
+    Each sampling fetches the status of all the apps with a few requests (see Apps.get_statuses), then the
+    stats, the number of status changes over the window and the statuses recorded since the previous sample,
+    for all the apps concurrently.
+
+    Metrics of each sample:
+    - "uptime_percentage", "downtime_percentage", "recovered_count": see Apps.get_stats, over the window
+    - "status_changes": number of status changes over the window, see Apps.count_history_statuses
+    - "failures": number of FAILED statuses recorded since the previous sample
+    - "running": 1 if the app is STARTED, 0 otherwise
+
+    Examples
+    --------
+    >>> collector = AppMetricsCollector(saagie_api, app_ids, capacity=1440, window=DAY)
+    >>> collector.run(interval=60, iterations=30)
+    >>> collector.top("downtime_percentage", count=5)
+    [
+        {
+            "app_id": "70e85ade-d6cc-4a90-8d7d-639adbd25e5d",
+            "app_name": "Superset",
+            "downtime_percentage": 42.5
+        },
+        ...
+    ]
+    >>> collector.downsample("70e85ade-d6cc-4a90-8d7d-639adbd25e5d", "status_changes", bucket=3600)
+    [
+        {"bucket_start": "2024-04-10T14:00:00+00:00", "count": 60, "min": 2.0, "avg": 2.5, "max": 4.0},
+        ...
+    ]
+    """
+
+    def __init__(
+        self,
+        saagie_api,
+        app_ids: Iterable[str] = (),
+        capacity: int = 1440,
+        window: float = DAY,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ):
+        """
+        Parameters
+        ----------
+        saagie_api : SaagieApi
+            Connection to the platform
+        app_ids : Iterable[str]
+            UUIDs of the apps to watch
+        capacity : int
+            Number of samples kept per app, default to 1440 (one day at one sample per minute)
+        window : float
+            Number of seconds over which the stats and the status changes are computed, default to one day
+        max_workers : int
+            Maximum number of apps sampled concurrently
+        """
+        self.saagie_api = saagie_api
+        self.capacity = capacity
+        self.window = window
+        self.max_workers = max_workers
+        self.series: Dict[str, RingBuffer] = {}
+        self.names: Dict[str, str] = {}
+        self._last_sample: Dict[str, float] = {}
+        self.add_apps(app_ids)
+
+    def add_apps(self, app_ids: Iterable[str]) -> None:
+        """Start watching apps"""
+        for app_id in app_ids:
+            if app_id not in self.series:
+                self.series[app_id] = RingBuffer(self.capacity, METRICS)
+
+    def remove_apps(self, app_ids: Iterable[str]) -> None:
+        """Stop watching apps and forget their samples"""
+        for app_id in app_ids:
+            self.series.pop(app_id, None)
+            self.names.pop(app_id, None)
+            self._last_sample.pop(app_id, None)
+
+    def sample(self, now: Optional[float] = None) -> Dict[str, str]:
+        """Take one sample of every app
+
+        Parameters
+        ----------
+        now : float, optional
+            Timestamp of the sample, default to the current time
+
+        Returns
+        -------
+        dict
+            Error message by app id, for the apps that could not be sampled
+        """
+        now = time.time() if now is None else now
+        statuses = self.saagie_api.apps.get_statuses(list(self.series))
+        errors = {}
+        to_sample = []
+        for app_id in self.series:
+            app = statuses.get(app_id)
+            if app is None:
+                errors[app_id] = "App not found"
+                continue
+            self.names[app_id] = app.get("name")
+            to_sample.append(app)
+
+        for app, values, exception in run_concurrently(
+            lambda app: self.__sample_app(app, now), to_sample, self.max_workers
+        ):
+            if exception:
+                logging.warning("❗Cannot sample the app [%s]: %s", app["id"], exception)
+                errors[app["id"]] = str(exception)
+                continue
+            self.series[app["id"]].append(now, values)
+            self._last_sample[app["id"]] = now
+        return errors
+
+    def __sample_app(self, app: Dict, now: float) -> Dict[str, Optional[float]]:
+        history = app.get("history") or {}
+        values: Dict[str, Optional[float]] = {"running": float(history.get("currentStatus") == "STARTED")}
+        version_number = history.get("runningVersionNumber") or (app.get("currentVersion") or {}).get("number")
+        if not history.get("id") or version_number is None:
+            return values
+        window_start = _format_date(now - self.window)
+        stats = self.saagie_api.apps.get_stats(history["id"], version_number, window_start)["appStats"] or {}
+        values["uptime_percentage"] = stats.get("uptimePercentage")
+        values["downtime_percentage"] = stats.get("downtimePercentage")
+        values["recovered_count"] = stats.get("recoveredCount")
+        values["status_changes"] = self.saagie_api.apps.count_history_statuses(
+            history["id"], version_number, window_start
+        )["countAppHistoryStatuses"]
+        since = self._last_sample.get(app["id"], now - self.window)
+        new_statuses = self.saagie_api.apps.get_history_statuses(history["id"], version_number, _format_date(since))[
+            "appHistoryStatuses"
+        ]
+        values["failures"] = sum(
+            1
+            for status in new_statuses or []
+            if status.get("status") == "FAILED" and parse_datetime(status["recordAt"]).timestamp() >= since
+        )
+        return values
+
+    def run(self, interval: float = 60, iterations: Optional[int] = None) -> None:
+        """Sample the apps every interval seconds
+
+        Parameters
+        ----------
+        interval : float
+            Number of seconds between the start of 2 samples
+        iterations : int, optional
+            Number of samples to take. If None, sample until interrupted
+        """
+        iteration = 0
+        while iterations is None or iteration < iterations:
+            start = time.monotonic()
+            self.sample()
+            iteration += 1
+            if iterations is None or iteration < iterations:
+                time.sleep(max(0.0, interval - (time.monotonic() - start)))
+
+    def values(self, app_id: str, metric: str, since: Optional[Union[str, datetime]] = None) -> List[Dict]:
+        """Samples of a metric of an app, in chronological order
+
+        Returns
+        -------
+        list of dict
+            Samples with the keys "time" (ISO 8601) and "value"
+        """
+        return [
+            {"time": datetime.fromtimestamp(timestamp, timezone.utc).isoformat(), "value": value}
+            for timestamp, value in self.__items(app_id, metric, since)
+        ]
+
+    def downsample(
+        self, app_id: str, metric: str, bucket: float, since: Optional[Union[str, datetime]] = None
+    ) -> List[Dict]:
+        """Minimum, average and maximum of a metric of an app per time bucket
+
+        Parameters
+        ----------
+        app_id : str
+            UUID of the app
+        metric : str
+            Name of the metric, see METRICS
+        bucket : float
+            Size of the buckets in seconds, for example HOUR
+        since : str or datetime, optional
+            Only use the samples taken at or after this date
+
+        Returns
+        -------
+        list of dict
+            One dict per bucket with samples, in chronological order, with the keys "bucket_start" (ISO 8601),
+            "count", "min", "avg" and "max"
+        """
+        buckets: Dict[float, List[float]] = {}
+        for timestamp, value in self.__items(app_id, metric, since):
+            buckets.setdefault(math.floor(timestamp / bucket) * bucket, []).append(value)
+        return [
+            {
+                "bucket_start": datetime.fromtimestamp(start, timezone.utc).isoformat(),
+                "count": len(values),
+                "min": min(values),
+                "avg": sum(values) / len(values),
+                "max": max(values),
+            }
+            for start, values in sorted(buckets.items())
+        ]
+
+    def percentiles(
+        self,
+        app_id: str,
+        metric: str,
+        percentiles: Sequence[float] = (50, 95, 99),
+        since: Optional[Union[str, datetime]] = None,
+    ) -> Dict[str, Optional[float]]:
+        """Percentiles of a metric of an app, with linear interpolation
+
+        Returns
+        -------
+        dict
+            Value by percentile, with keys like "p95". None when there is no sample
+        """
+        values = sorted(value for _, value in self.__items(app_id, metric, since))
+        return {f"p{percent:g}": percentile(values, percent) for percent in percentiles}
+
+    def top(
+        self, metric: str, count: int = 10, aggregate: str = "avg", since: Optional[Union[str, datetime]] = None
+    ) -> List[Dict]:
+        """Apps with the highest value of a metric
+
+        Parameters
+        ----------
+        metric : str
+            Name of the metric, see METRICS
+        count : int
+            Number of apps to return
+        aggregate : str
+            How the samples of each app are combined: min, avg or max
+        since : str or datetime, optional
+            Only use the samples taken at or after this date
+
+        Returns
+        -------
+        list of dict
+            Apps sorted by decreasing value, with the keys "app_id", "app_name" and the name of the metric
+
+        Raises
+        ------
+        ValueError
+            If aggregate is not valid
+        """
+        if aggregate not in AGGREGATES:
+            raise ValueError(f"❌ 'aggregate' must be one of {', '.join(AGGREGATES)}")
+        rows = []
+        for app_id in self.series:
+            values = [value for _, value in self.__items(app_id, metric, since)]
+            if not values:
+                continue
+            if aggregate == "avg":
+                value = sum(values) / len(values)
+            else:
+                value = min(values) if aggregate == "min" else max(values)
+            rows.append({"app_id": app_id, "app_name": self.names.get(app_id), metric: value})
+        rows.sort(key=lambda row: row[metric], reverse=True)
+        return rows[:count]
+
+    def __items(self, app_id: str, metric: str, since: Optional[Union[str, datetime]]) -> List[Tuple[float, float]]:
+        if metric not in METRICS:
+            raise ValueError(f"❌ 'metric' must be one of {', '.join(METRICS)}")
+        since = parse_datetime(since).timestamp() if since is not None else None
+        return self.series[app_id].items(metric, since)
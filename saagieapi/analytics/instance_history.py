@@ -0,0 +1,381 @@
+import math
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from ..utils.date_functions import parse_datetime
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+HOUR = 3600
+DAY = 24 * HOUR
+WEEK = 7 * DAY
+
+STATUSES = (
+    "AWAITING",
+    "REQUESTED",
+    "UNKNOWN",
+    "QUEUED",
+    "RUNNING",
+    "KILLING",
+    "KILLED",
+    "SUCCEEDED",
+    "FAILED",
+    "ERROR",
+    "SKIPPED",
+)
+SUCCESS_STATUSES = ("SUCCEEDED",)
+FAILURE_STATUSES = ("FAILED", "KILLED", "ERROR")
+GROUP_BY_VALUES = (None, "entity_type", "project", "entity")
+
+_STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+_SUCCESS_CODES = frozenset(_STATUS_CODES[status] for status in SUCCESS_STATUSES)
+_FAILURE_CODES = frozenset(_STATUS_CODES[status] for status in FAILURE_STATUSES)
+
+
+def percentile(sorted_values: Sequence[float], percent: float) -> Optional[float]:
+    """Percentile of sorted values with linear interpolation, as numpy.percentile does by default"""
+    if not sorted_values:
+        return None
+    position = percent / 100 * (len(sorted_values) - 1)
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+class InstanceHistory:
+    """Columnar store of job and pipeline instances, used to compute duration percentiles, success ratios and run
+    rates per job, pipeline, project and time bucket.
+
+    Instances are kept in compact typed arrays (one column per field) instead of nested dicts. Aggregations are
+    vectorized with numpy when it is installed, and computed with the standard library otherwise.
+    Only the start time, end time and status of each instance are kept.
+
+    Examples
+    --------
+    >>> history = InstanceHistory()
+    >>> history.add_jobs(saagieapi.jobs.list_for_project(project_id, instances_limit=500), project_id=project_id)
+    >>> history.add_pipelines(saagieapi.pipelines.list_for_project(project_id, instances_limit=500),
+    ...                       project_id=project_id)
+    >>> history.summary(group_by="entity", bucket=DAY)
+    [
+        {
+            "project_id": "860b8dc8-e634-4c98-b2e7-f9ec32ab4771",
+            "entity_type": "job",
+            "entity_id": "f5fce22d-2152-4a01-8c6a-4c2eb4808b6d",
+            "entity_name": "Python test job",
+            "bucket_start": "2022-04-19T00:00:00+00:00",
+            "count": 24,
+            "succeeded": 23,
+            "failed": 1,
+            "success_ratio": 0.9583333333333334,
+            "p50_duration": 7.6,
+            "p95_duration": 12.3,
+            "runs_per_hour": 1.0
+        }
+    ]
+    """
+
+    def __init__(self, use_numpy: Optional[bool] = None):
+        """
+        Parameters
+        ----------
+        use_numpy : bool, optional
+            Whether to compute the aggregations with numpy. By default, numpy is used when it is installed
+
+        Raises
+        ------
+        ImportError
+            If use_numpy is True and numpy is not installed
+        """
+        if use_numpy and np is None:
+            raise ImportError("❌ numpy is required to use the numpy backend, install it with 'pip install numpy'")
+        self.use_numpy = np is not None if use_numpy is None else use_numpy
+        # One entry per job or pipeline: (entity_type, entity_id, entity_name, project_id)
+        self._entities: List[Tuple[str, str, Optional[str], Optional[str]]] = []
+        self._entity_codes: Dict[Tuple[str, str], int] = {}
+        # One entry per instance
+        self._entity = array("i")
+        self._start = array("d")
+        self._end = array("d")
+        self._status = array("b")
+
+    def __len__(self) -> int:
+        return len(self._start)
+
+    @property
+    def backend(self) -> str:
+        """Name of the backend used for the aggregations: numpy or array"""
+        return "numpy" if self.use_numpy else "array"
+
+    def add_instances(
+        self,
+        entity_type: str,
+        entity_id: str,
+        instances: Iterable[Dict],
+        entity_name: Optional[str] = None,
+        project_id: Optional[str] = None,
+    ) -> int:
+        """
+        Add the instances of a job or a pipeline. Instances without start time are ignored
+        Parameters
+        ----------
+        entity_type : str
+            Type of the entity, for example "job" or "pipeline"
+        entity_id : str
+            UUID of the job or pipeline
+        instances : Iterable[dict]
+            Instances with at least the keys "startTime", "endTime" and "status", as returned by
+            Jobs.iter_instances or in the "instances" field of Jobs.list_for_project
+        entity_name : str, optional
+            Name of the job or pipeline
+        project_id : str, optional
+            UUID of the project of the entity
+
+        Returns
+        -------
+        int
+            Number of instances added
+        """
+        key = (entity_type, entity_id)
+        code = self._entity_codes.get(key)
+        if code is None:
+            code = self._entity_codes[key] = len(self._entities)
+            self._entities.append((entity_type, entity_id, entity_name, project_id))
+        added = 0
+        for instance in instances or []:
+            start_time = parse_datetime(instance.get("startTime"))
+            if start_time is None:
+                continue
+            end_time = parse_datetime(instance.get("endTime"))
+            status = instance.get("status") or ((instance.get("history") or {}).get("currentStatus") or {}).get(
+                "status"
+            )
+            self._entity.append(code)
+            self._start.append(start_time.timestamp())
+            self._end.append(end_time.timestamp() if end_time else math.nan)
+            self._status.append(_STATUS_CODES.get(status, _STATUS_CODES["UNKNOWN"]))
+            added += 1
+        return added
+
+    def add_jobs(self, jobs: Union[Dict, List[Dict]], project_id: Optional[str] = None) -> int:
+        """
+        Add the instances of jobs
+        Parameters
+        ----------
+        jobs : dict or list of dict
+            Result of Jobs.list_for_project, or list of jobs with the keys "id", "name" and "instances"
+        project_id : str, optional
+            UUID of the project of the jobs
+
+        Returns
+        -------
+        int
+            Number of instances added
+        """
+        if isinstance(jobs, dict):
+            jobs = jobs.get("jobs") or []
+        return sum(
+            self.add_instances("job", job["id"], job.get("instances"), job.get("name"), project_id) for job in jobs
+        )
+
+    def add_pipelines(self, pipelines: Union[Dict, List[Dict]], project_id: Optional[str] = None) -> int:
+        """
+        Add the instances of pipelines
+        Parameters
+        ----------
+        pipelines : dict or list of dict
+            Result of Pipelines.list_for_project, or list of pipelines with the keys "id", "name" and "instances"
+        project_id : str, optional
+            UUID of the project of the pipelines
+
+        Returns
+        -------
+        int
+            Number of instances added
+        """
+        if isinstance(pipelines, dict):
+            pipelines = (pipelines.get("project") or {}).get("pipelines") or []
+        return sum(
+            self.add_instances("pipeline", pipeline["id"], pipeline.get("instances"), pipeline.get("name"), project_id)
+            for pipeline in pipelines
+        )
+
+    def summary(
+        self,
+        group_by: Optional[str] = "entity",
+        bucket: Optional[int] = None,
+        percentiles: Sequence[float] = (50, 95),
+    ) -> List[Dict]:
+        """
+        Aggregate the instances per group and optionally per time bucket.
+        Durations are in seconds and only use the instances with an end time. The success ratio is the number of
+        succeeded instances divided by the number of succeeded and failed (FAILED, KILLED, ERROR) instances.
+        Runs per hour use the bucket length when bucket is given, otherwise the period between the first and the
+        last start time of the whole history
+        Parameters
+        ----------
+        group_by : str, optional
+            One of "entity" (each job and pipeline), "project", "entity_type" or None (all instances together)
+        bucket : int, optional
+            Length in seconds of the time buckets, based on the start time of the instances, for example HOUR or
+            DAY. Buckets are aligned on the Unix epoch, in UTC
+        percentiles : Sequence[float]
+            Duration percentiles to compute, each one returned under the key "p<percent>_duration"
+
+        Returns
+        -------
+        list of dict
+            One dict per group (and bucket), sorted by group then bucket
+        """
+        if group_by not in GROUP_BY_VALUES:
+            raise ValueError(f"❌ group_by must be one of {GROUP_BY_VALUES}, got {group_by}")
+        if bucket is not None and bucket <= 0:
+            raise ValueError("❌ bucket must be a positive number of seconds")
+        if not self._start:
+            return []
+        group_labels = self.__group_labels(group_by)
+        compute = self.__summarize_numpy if self.use_numpy else self.__summarize_array
+        groups = compute(group_labels[1], bucket, percentiles)
+
+        window_hours = None
+        if bucket is None:
+            window = max(self._start) - min(self._start)
+            window_hours = window / HOUR if window > 0 else None
+
+        summary = []
+        for (group, bucket_index), metrics in groups:
+            row = dict(group_labels[0][group])
+            if bucket is not None:
+                row["bucket_start"] = datetime.fromtimestamp(bucket_index * bucket, tz=timezone.utc).isoformat()
+            finished = metrics["succeeded"] + metrics["failed"]
+            row.update(
+                {
+                    "count": metrics["count"],
+                    "succeeded": metrics["succeeded"],
+                    "failed": metrics["failed"],
+                    "success_ratio": metrics["succeeded"] / finished if finished else None,
+                }
+            )
+            for percent, value in zip(percentiles, metrics["percentiles"]):
+                row[f"p{percent:g}_duration"] = value
+            hours = bucket / HOUR if bucket is not None else window_hours
+            row["runs_per_hour"] = metrics["count"] / hours if hours else None
+            summary.append(row)
+        return summary
+
+    def __group_labels(self, group_by: Optional[str]) -> Tuple[List[Dict], List[int]]:
+        """Labels of each group and group code of each entity"""
+        labels: List[Dict] = []
+        codes: Dict[Tuple, int] = {}
+        entity_groups = []
+        for entity_type, entity_id, entity_name, project_id in self._entities:
+            if group_by == "entity":
+                label = {
+                    "project_id": project_id,
+                    "entity_type": entity_type,
+                    "entity_id": entity_id,
+                    "entity_name": entity_name,
+                }
+            elif group_by == "project":
+                label = {"project_id": project_id}
+            elif group_by == "entity_type":
+                label = {"entity_type": entity_type}
+            else:
+                label = {}
+            key = tuple(label.values())
+            if key not in codes:
+                codes[key] = len(labels)
+                labels.append(label)
+            entity_groups.append(codes[key])
+        return labels, entity_groups
+
+    def __summarize_numpy(
+        self, entity_groups: List[int], bucket: Optional[int], percentiles: Sequence[float]
+    ) -> List[Tuple[Tuple[int, int], Dict]]:
+        start = np.frombuffer(self._start, dtype=np.float64).copy()
+        end = np.frombuffer(self._end, dtype=np.float64).copy()
+        status = np.frombuffer(self._status, dtype=np.int8).copy()
+        group = np.asarray(entity_groups, dtype=np.int64)[np.frombuffer(self._entity, dtype=np.intc)]
+
+        if bucket is not None:
+            bucket_index = np.floor(start / bucket).astype(np.int64)
+            first_bucket = int(bucket_index.min())
+            bucket_count = int(bucket_index.max()) - first_bucket + 1
+            keys = group * bucket_count + (bucket_index - first_bucket)
+        else:
+            first_bucket, bucket_count = 0, 1
+            keys = group
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        size = len(unique_keys)
+
+        counts = np.bincount(inverse, minlength=size)
+        succeeded = np.bincount(inverse, weights=np.isin(status, list(_SUCCESS_CODES)), minlength=size)
+        failed = np.bincount(inverse, weights=np.isin(status, list(_FAILURE_CODES)), minlength=size)
+
+        # Sort the durations by group, then compute every percentile of every group at once
+        durations = end - start
+        finished = ~np.isnan(durations)
+        finished_groups = inverse[finished]
+        finished_durations = durations[finished]
+        order = np.lexsort((finished_durations, finished_groups))
+        sorted_durations = finished_durations[order]
+        finished_counts = np.bincount(finished_groups, minlength=size)
+        offsets = np.concatenate(([0], np.cumsum(finished_counts)[:-1]))
+        has_durations = finished_counts > 0
+        group_percentiles = []
+        for percent in percentiles:
+            position = percent / 100 * np.maximum(finished_counts - 1, 0)
+            lower = np.floor(position).astype(np.int64)
+            upper = np.minimum(lower + 1, np.maximum(finished_counts - 1, 0))
+            values = np.full(size, np.nan)
+            lower_values = sorted_durations[(offsets + lower)[has_durations]]
+            upper_values = sorted_durations[(offsets + upper)[has_durations]]
+            values[has_durations] = lower_values + (upper_values - lower_values) * (position - lower)[has_durations]
+            group_percentiles.append(values)
+
+        groups = []
+        for index, key in enumerate(unique_keys.tolist()):
+            groups.append(
+                (
+                    (key // bucket_count, key % bucket_count + first_bucket),
+                    {
+                        "count": int(counts[index]),
+                        "succeeded": int(succeeded[index]),
+                        "failed": int(failed[index]),
+                        "percentiles": [
+                            float(values[index]) if has_durations[index] else None for values in group_percentiles
+                        ],
+                    },
+                )
+            )
+        return groups
+
+    def __summarize_array(
+        self, entity_groups: List[int], bucket: Optional[int], percentiles: Sequence[float]
+    ) -> List[Tuple[Tuple[int, int], Dict]]:
+        metrics: Dict[Tuple[int, int], Dict] = {}
+        for entity, start, end, status in zip(self._entity, self._start, self._end, self._status):
+            key = (entity_groups[entity], math.floor(start / bucket) if bucket is not None else 0)
+            group = metrics.get(key)
+            if group is None:
+                group = metrics[key] = {"count": 0, "succeeded": 0, "failed": 0, "durations": array("d")}
+            group["count"] += 1
+            if status in _SUCCESS_CODES:
+                group["succeeded"] += 1
+            elif status in _FAILURE_CODES:
+                group["failed"] += 1
+            if not math.isnan(end):
+                group["durations"].append(end - start)
+
+        groups = []
+        for key in sorted(metrics):
+            group = metrics[key]
+            durations = sorted(group.pop("durations"))
+            group["percentiles"] = [percentile(durations, percent) for percent in percentiles]
+            groups.append((key, group))
+        return groups
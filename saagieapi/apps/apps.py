@@ -1,10 +1,12 @@
 import json
 import logging
+import time
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Union
 
 from gql import gql
 
+from ..utils.concurrency import DEFAULT_MAX_WORKERS, run_concurrently
 from ..utils.folder_functions import create_folder, write_error, write_to_json_file
 from .gql_queries import *
 
@@ -12,6 +14,22 @@ LIST_EXPOSED_PORT_FIELD = ["basePathVariableName", "isRewriteUrl", "scope", "num
 LIST_EXPOSED_PORT_MANDATORY = ["isRewriteUrl", "scope", "number"]
 
 
+def build_app_statuses_query(count: int) -> str:
+    """
+    Build a query fetching the status of count apps in a single request, the app i being returned under the
+    alias "app<i>" and its id given by the variable "id<i>"
+    """
+    variables = ", ".join(f"$id{index}: UUID!" for index in range(count))
+    fields = "\n".join(f"    app{index}: app(id: $id{index}){{ ...appStatus }}" for index in range(count))
+    return f"query appStatusesQuery({variables}){{\n{fields}\n}}\n{GQL_APP_STATUS_FRAGMENT}"
+
+
+def app_history_state(app: Optional[Dict]) -> tuple:
+    """Status, execution and start time of the current history of an app returned by get_statuses"""
+    history = (app or {}).get("history") or {}
+    return history.get("currentStatus"), history.get("currentExecutionId"), history.get("startTime")
+
+
 def handle_error(msg, exception):
     logging.warning(msg)
     logging.error("Something went wrong %s", exception)
@@ -836,6 +854,264 @@ class Apps:
         logging.info("✅ App [%s] successfully stopped", app_id)
         return result
 
+    def run_many(
+        self, app_ids: List[str], max_workers: int = DEFAULT_MAX_WORKERS, wait: bool = False, timeout: int = 600
+    ) -> List[Dict]:
+        """Start several apps concurrently, and optionally wait for them to be STARTED
+
+        Parameters
+        ----------
+        app_ids : List[str]
+            UUIDs of your apps
+        max_workers : int, optional
+            Maximum number of apps started concurrently
+        wait : bool, optional
+            Whether to wait for the apps to be STARTED, see wait_for_status
+        timeout : int, optional
+            Number of seconds to wait for the apps, when wait is True
+
+        Returns
+        -------
+        list of dict
+            One dict per app, in the order of app_ids, with the keys "app_id", "action", "success", "error" and
+            "duration" (seconds taken by the request). When wait is True, the keys "status", "outcome" and
+            "elapsed" of wait_for_status are added for the apps successfully started
+
+        Examples
+        --------
+        >>> saagie_api.apps.run_many(
+        ...     app_ids=["a6de6956-4038-493e-bbd3-f7b3616df39e", "70e85ade-d6cc-4a90-8d7d-639adbd25e5d"],
+        ...     wait=True
+        ... )
+        [
+            {
+                "app_id": "a6de6956-4038-493e-bbd3-f7b3616df39e",
+                "action": "run",
+                "success": True,
+                "error": None,
+                "duration": 0.42,
+                "status": "STARTED",
+                "outcome": "reached",
+                "elapsed": 36
+            },
+            {
+                "app_id": "70e85ade-d6cc-4a90-8d7d-639adbd25e5d",
+                "action": "run",
+                "success": True,
+                "error": None,
+                "duration": 0.38,
+                "status": "FAILED",
+                "outcome": "failed",
+                "elapsed": 12
+            }
+        ]
+        """
+        return self.__run_bulk("run", self.run, app_ids, max_workers, ("STARTED",) if wait else None, timeout)
+
+    def stop_many(
+        self, app_ids: List[str], max_workers: int = DEFAULT_MAX_WORKERS, wait: bool = False, timeout: int = 600
+    ) -> List[Dict]:
+        """Stop several apps concurrently, and optionally wait for them to be STOPPED.
+        See run_many for the parameters and the result
+
+        Examples
+        --------
+        >>> saagie_api.apps.stop_many(app_ids=["a6de6956-4038-493e-bbd3-f7b3616df39e"], wait=True)
+        [
+            {
+                "app_id": "a6de6956-4038-493e-bbd3-f7b3616df39e",
+                "action": "stop",
+                "success": True,
+                "error": None,
+                "duration": 0.31,
+                "status": "STOPPED",
+                "outcome": "reached",
+                "elapsed": 6
+            }
+        ]
+        """
+        return self.__run_bulk("stop", self.stop, app_ids, max_workers, ("STOPPED",) if wait else None, timeout)
+
+    def upgrade_many(
+        self, apps: Union[List[str], Dict[str, Dict]], max_workers: int = DEFAULT_MAX_WORKERS, **kwargs
+    ) -> List[Dict]:
+        """Upgrade several apps concurrently
+
+        Parameters
+        ----------
+        apps : List[str] or Dict[str, Dict]
+            UUIDs of your apps, or parameters of upgrade by app UUID
+        max_workers : int, optional
+            Maximum number of apps upgraded concurrently
+        **kwargs
+            Parameters of upgrade shared by all the apps (release_note, image, technology_context...).
+            The parameters given for an app in apps take precedence
+
+        Returns
+        -------
+        list of dict
+            One dict per app, see run_many
+
+        Examples
+        --------
+        >>> saagie_api.apps.upgrade_many(
+        ...     apps=["a6de6956-4038-493e-bbd3-f7b3616df39e", "70e85ade-d6cc-4a90-8d7d-639adbd25e5d"],
+        ...     release_note="Monthly image update",
+        ...     image="saagie/jupyter-python-nbk:v2-3.10-1.139.0"
+        ... )
+        [
+            {
+                "app_id": "a6de6956-4038-493e-bbd3-f7b3616df39e",
+                "action": "upgrade",
+                "success": True,
+                "error": None,
+                "duration": 0.51
+            },
+            ...
+        ]
+        """
+        apps = apps if isinstance(apps, dict) else {app_id: {} for app_id in apps}
+        params = {app_id: {**kwargs, **(app_params or {})} for app_id, app_params in apps.items()}
+        return self.__run_bulk("upgrade", self.upgrade, list(params), max_workers, params=params)
+
+    def wait_for_status(
+        self,
+        app_ids: Iterable[str],
+        statuses: Iterable[str] = ("STARTED",),
+        failure_statuses: Iterable[str] = ("FAILED",),
+        min_interval: float = 2,
+        max_interval: float = 30,
+        timeout: int = 600,
+        previous: Optional[Dict[str, Optional[Dict]]] = None,
+    ) -> Dict[str, Dict]:
+        """Wait for several apps to reach one of the given statuses. The statuses of all the apps still waited
+        for are fetched together at each poll (see get_statuses). The interval between polls is reset to
+        min_interval when an app changed status and doubled, up to max_interval, otherwise.
+        When the states of the apps before an action are given in previous, the status of an app is only
+        taken into account once its status, execution or start time changed, so that a status left from before
+        the action is not taken for its outcome
+
+        Parameters
+        ----------
+        app_ids : Iterable[str]
+            UUIDs of your apps
+        statuses : Iterable[str], optional
+            Statuses to wait for, default to STARTED
+        failure_statuses : Iterable[str], optional
+            Statuses after which an app is not waited for anymore, default to FAILED
+        min_interval : float, optional
+            Number of seconds between 2 polls while statuses are changing
+        max_interval : float, optional
+            Maximum number of seconds between 2 polls when nothing changes
+        timeout : int, optional
+            Number of seconds before giving up, -1 for no timeout
+        previous : dict, optional
+            Apps as returned by get_statuses before the action waited for, by app id
+
+        Returns
+        -------
+        dict
+            By app id, a dict with the last known "status", the "outcome" (reached, failed, not_found or timeout)
+            and the number of seconds waited before the outcome was known ("elapsed")
+
+        Examples
+        --------
+        >>> saagie_api.apps.wait_for_status(app_ids=["a6de6956-4038-493e-bbd3-f7b3616df39e"])
+        {
+            "a6de6956-4038-493e-bbd3-f7b3616df39e": {"status": "STARTED", "outcome": "reached", "elapsed": 36}
+        }
+        """
+        statuses, failure_statuses = set(statuses), set(failure_statuses)
+        previous = dict(previous or {})
+        pending = list(dict.fromkeys(app_ids))
+        last_status: Dict[str, Optional[str]] = {}
+        results: Dict[str, Dict] = {}
+        interval = min_interval
+        sec = 0
+        while pending:
+            changed = False
+            for app_id, app in self.get_statuses(pending).items():
+                if app is None:
+                    results[app_id] = {"status": None, "outcome": "not_found", "elapsed": sec}
+                    continue
+                status = (app.get("history") or {}).get("currentStatus")
+                changed = changed or last_status.get(app_id) != status
+                last_status[app_id] = status
+                if app_id in previous and app_history_state(app) == app_history_state(previous[app_id]):
+                    continue
+                previous.pop(app_id, None)
+                if status in statuses:
+                    results[app_id] = {"status": status, "outcome": "reached", "elapsed": sec}
+                elif status in failure_statuses:
+                    results[app_id] = {"status": status, "outcome": "failed", "elapsed": sec}
+            pending = [app_id for app_id in pending if app_id not in results]
+            if not pending:
+                break
+            if timeout != -1 and sec >= timeout:
+                for app_id in pending:
+                    results[app_id] = {"status": last_status.get(app_id), "outcome": "timeout", "elapsed": sec}
+                logging.warning("❗Apps %s have not reached the status %s after %s seconds", pending, statuses, sec)
+                break
+            interval = min_interval if changed else min(interval * 2, max_interval)
+            time.sleep(interval)
+            sec += interval
+        return results
+
+    def __run_bulk(
+        self,
+        action: str,
+        func: Callable[[str], Dict],
+        app_ids: List[str],
+        max_workers: int,
+        wait_statuses: Optional[Iterable[str]] = None,
+        timeout: int = 600,
+        params: Optional[Dict[str, Dict]] = None,
+    ) -> List[Dict]:
+        """
+        Call func on each app concurrently, with the keyword arguments given for the app in params. Each dict of
+        the result has the keys "app_id", "action", "success", "error" and "duration" (seconds taken by the
+        request), plus the keys of wait_for_status when wait_statuses is given
+        """
+        params = params or {}
+        previous = {}
+        if wait_statuses:
+            # running an app restarts it, so any status seen before is stale. Stopping an app that is already
+            # in the awaited status does not change it, so that status is the outcome
+            previous = {
+                app_id: app
+                for app_id, app in self.get_statuses(app_ids).items()
+                if action == "run" or app_history_state(app)[0] not in wait_statuses
+            }
+
+        def timed(app_id):
+            start = time.monotonic()
+            func(app_id, **params.get(app_id, {}))
+            return time.monotonic() - start
+
+        report = []
+        for app_id, duration, exception in run_concurrently(timed, app_ids, max_workers):
+            if exception:
+                logging.error("❌ Cannot %s the app [%s]: %s", action, app_id, exception)
+            report.append(
+                {
+                    "app_id": app_id,
+                    "action": action,
+                    "success": exception is None,
+                    "error": str(exception) if exception else None,
+                    "duration": duration,
+                }
+            )
+        if wait_statuses:
+            waited = self.wait_for_status(
+                [row["app_id"] for row in report if row["success"]],
+                statuses=wait_statuses,
+                timeout=timeout,
+                previous=previous,
+            )
+            for row in report:
+                row.update(waited.get(row["app_id"], {}))
+        return report
+
     @staticmethod
     def check_exposed_ports(exposed_ports: List[Dict]):
         """
@@ -1346,6 +1622,56 @@ class Apps:
             return app["id"]
         raise NameError(f"❌ App {app_name} does not exist.")
 
+    def get_statuses(self, app_ids: List[str], chunk_size: int = 50) -> Dict[str, Optional[Dict]]:
+        """Get the current status of several apps, with one request per chunk of apps
+
+        Parameters
+        ----------
+        app_ids : List[str]
+            UUIDs of your apps
+        chunk_size : int, optional
+            Maximum number of apps fetched by request
+
+        Returns
+        -------
+        dict
+            App with its id, name, project, current version and history by app id. None for the apps that do not
+            exist
+
+        Examples
+        --------
+        >>> saagieapi.apps.get_statuses(app_ids=["70e85ade-d6cc-4a90-8d7d-639adbd25e5d"])
+        {
+            "70e85ade-d6cc-4a90-8d7d-639adbd25e5d": {
+                "id": "70e85ade-d6cc-4a90-8d7d-639adbd25e5d",
+                "name": "Jupyter",
+                "project": {"id": "860b8dc8-e634-4c98-b2e7-f9ec32ab4771"},
+                "currentVersion": {"number": 2},
+                "history": {
+                    "id": "55943477-c41b-4dfe-a8ca-c110909d9204",
+                    "runningVersionNumber": 2,
+                    "currentStatus": "STARTED",
+                    "currentStatusReason": None,
+                    "currentExecutionId": "e3e31074-4a12-450e-96e4-0eae7801dfca",
+                    "startTime": "2024-04-10T14:26:27.073Z",
+                    "stopTime": None
+                }
+            }
+        }
+        """
+        app_ids = list(dict.fromkeys(app_ids))
+        statuses = {}
+        for start in range(0, len(app_ids), chunk_size):
+            chunk = app_ids[start : start + chunk_size]
+            result = self.saagie_api.client.execute(
+                query=gql(build_app_statuses_query(len(chunk))),
+                variable_values={f"id{index}": app_id for index, app_id in enumerate(chunk)},
+                pprint_result=False,
+            )
+            for index, app_id in enumerate(chunk):
+                statuses[app_id] = result.get(f"app{index}")
+        return statuses
+
     def get_stats(self, history_id, version_number, start_time):
         """Get stats of the app
 
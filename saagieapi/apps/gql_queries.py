@@ -426,6 +426,28 @@ mutation rollbackAppVersionMutation($appId: UUID!, $versionNumber: Int!) {
 }
 """
 
+GQL_APP_STATUS_FRAGMENT = """
+fragment appStatus on App {
+    id
+    name
+    project {
+        id
+    }
+    currentVersion {
+        number
+    }
+    history {
+        id
+        runningVersionNumber
+        currentStatus
+        currentStatusReason
+        currentExecutionId
+        startTime
+        stopTime
+    }
+}
+"""
+
 GQL_STATS_APP = """
 query appStats($appHistoryId: UUID!, $versionNumber: Int!, $startTime: DateTime!) {
     appStats(appHistoryId: $appHistoryId, versionNumber: $versionNumber, startTime: $startTime) 
@@ -1,8 +1,9 @@
 import logging
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional, Tuple
 
 from gql import gql
 
+from ..utils.concurrency import DEFAULT_MAX_WORKERS, run_concurrently
 from .gql_queries import *
 
 
@@ -342,3 +343,112 @@ class DockerCredentials:
         result = self.saagie_api.client.execute(query=gql(GQL_DELETE_DOCKER_CREDENTIALS), variable_values=params)
         logging.info("✅ Docker Credentials for user [%s] successfully deleted", username)
         return result
+
+    def rotate(
+        self,
+        username: str,
+        registry: Optional[str],
+        new_password: str,
+        projects: Optional[Iterable[str]] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        dry_run: bool = False,
+    ) -> Dict:
+        """
+        Update the password of the docker credentials of a username and registry in many projects.
+        The credentials of all the projects are listed concurrently and indexed by (project, username, registry),
+        then the matching credentials are updated concurrently
+
+        Parameters
+        ----------
+        username : str
+            Login of the container registry
+        registry : str, optional
+            Url of the container registry, None for Docker Hub
+        new_password : str
+            New password to the container registry
+        projects : Iterable[str], optional
+            IDs of the projects, default to all the projects you have rights on
+        max_workers : int, optional
+            Maximum number of concurrent requests
+        dry_run : bool, optional
+            Whether to only return the projects whose credentials would be updated
+
+        Returns
+        -------
+        dict
+            Report with the keys "username", "registry", "dry_run", "updated" (IDs of the projects whose
+            credentials were updated, or would be with dry_run), "not_found" (IDs of the projects without these
+            credentials) and "errors" (error message by project ID, for the projects whose credentials could not
+            be listed or updated)
+
+        Examples
+        --------
+        >>> saagieapi.docker_credentials.rotate(
+        ...     username="myuser",
+        ...     registry=None,
+        ...     new_password="mynewpassword"
+        ... )
+        {
+            "username": "myuser",
+            "registry": None,
+            "dry_run": False,
+            "updated": ["860b8dc8-e734-4c98-b2e7-f9ec32ab4771"],
+            "not_found": ["1d2e3f4a-5b6c-4d7e-8f90-a1b2c3d4e5f6"],
+            "errors": {}
+        }
+        """
+        if projects is None:
+            projects = [
+                project["id"] for project in self.saagie_api.projects.list(pprint_result=False)["projects"] or []
+            ]
+        projects = list(dict.fromkeys(projects))
+        index, errors = self.__index(projects, max_workers)
+        report = {
+            "username": username,
+            "registry": registry,
+            "dry_run": dry_run,
+            "updated": [],
+            "not_found": [],
+            "errors": errors,
+        }
+        to_update = []
+        for project_id in projects:
+            if project_id in errors:
+                continue
+            if credentials := index.get((project_id, username, registry)):
+                to_update.append((project_id, credentials["id"]))
+            else:
+                report["not_found"].append(project_id)
+        if dry_run:
+            report["updated"] = [project_id for project_id, _ in to_update]
+            return report
+
+        for (project_id, _), _, exception in run_concurrently(
+            lambda item: self.upgrade(item[0], item[1], new_password, registry, username),
+            to_update,
+            max_workers,
+        ):
+            if exception:
+                logging.warning("❗Cannot update the docker credentials of the project [%s]: %s", project_id, exception)
+                report["errors"][project_id] = str(exception)
+            else:
+                report["updated"].append(project_id)
+        return report
+
+    def __index(
+        self, project_ids: Iterable[str], max_workers: int
+    ) -> Tuple[Dict[Tuple[str, str, Optional[str]], Dict], Dict[str, str]]:
+        """Docker credentials of many projects by (project ID, username, registry), and the error message by
+        project ID for the projects whose credentials could not be listed"""
+        index = {}
+        errors = {}
+        for project_id, result, exception in run_concurrently(
+            lambda project_id: self.list_for_project(project_id, pprint_result=False), project_ids, max_workers
+        ):
+            if exception:
+                logging.warning("❗Cannot list the docker credentials of the project [%s]: %s", project_id, exception)
+                errors[project_id] = str(exception)
+                continue
+            for credentials in result["allDockerCredentials"] or []:
+                index[(project_id, credentials["username"], credentials["registry"])] = credentials
+        return index, errors
@@ -1,3 +1,4 @@
+from .effective_env import EffectiveEnvResolver
 from .env_vars import EnvVars
 
-__all__ = ["EnvVars"]
+__all__ = ["EffectiveEnvResolver", "EnvVars"]
@@ -0,0 +1,241 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..utils.concurrency import DEFAULT_MAX_WORKERS, run_concurrently
+
+# entity types, from the lowest to the highest priority layer
+ENTITY_TYPES = ("project", "pipeline", "app")
+_SCOPES = {"project": "PROJECT", "pipeline": "PIPELINE", "app": "APP"}
+
+
+class EffectiveEnvResolver:
+    """Compute the environment variables that projects, pipelines and apps actually see, for a whole platform.
+
+    The global variables are fetched once, then the variables of each project, pipeline and app are fetched
+    without their inherited layers, a few dozen entities per request (see EnvVars.list_by_entity). The layers
+    are merged locally: a pipeline or app variable overrides the project variable with the same name, which
+    overrides the global one. Every effective variable keeps the scope it comes from and the scopes it overrides.
+
+    Password values are not readable: their value is None.
+
+    Examples
+    --------
+    >>> resolver = EffectiveEnvResolver(saagie_api)
+    >>> resolver.load()
+    {}
+    >>> resolver.effective("pipeline", "5d1999f5-fa70-47d9-9f41-55ad48333629")["DB_HOST"]
+    {
+        "name": "DB_HOST",
+        "value": "db-replica.internal",
+        "scope": "PIPELINE",
+        "isPassword": False,
+        "description": "",
+        "overrides": ["PROJECT", "GLOBAL"]
+    }
+    >>> resolver.find("DB_HOST", "db.internal", entity_types=["pipeline", "app"])
+    [
+        {
+            "entity_type": "app",
+            "entity_id": "d0d6a466-10d9-4120-8101-56e46563e05a",
+            "entity_name": "Jupyter Notebook",
+            "project_id": "860b8dc8-e634-4c98-b2e7-f9ec32ab4771",
+            "project_name": "Project A",
+            "value": "db.internal",
+            "scope": "GLOBAL"
+        }
+    ]
+    """
+
+    def __init__(self, saagie_api, max_workers: int = DEFAULT_MAX_WORKERS, chunk_size: int = 50):
+        """
+        Parameters
+        ----------
+        saagie_api : SaagieApi
+            Connection to the platform
+        max_workers : int
+            Maximum number of concurrent requests
+        chunk_size : int
+            Maximum number of entities whose variables are fetched by request
+        """
+        self.saagie_api = saagie_api
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.globals: Dict[str, Dict] = {}
+        # entity (type, id) -> {"name", "project_id"}
+        self.entities: Dict[Tuple[str, str], Dict] = {}
+        # entity (type, id) -> variables defined at its level, by name
+        self.layers: Dict[Tuple[str, str], Dict[str, Dict]] = {}
+
+    def load(self, project_ids: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """Fetch the variables of the platform, replacing the ones previously loaded
+
+        Parameters
+        ----------
+        project_ids : Iterable[str], optional
+            UUIDs of the projects to load, default to all the projects you have rights on
+
+        Returns
+        -------
+        dict
+            Error message by entity id, for the projects whose pipelines or apps could not be listed and the
+            entities whose variables could not be fetched
+        """
+        self.globals = {
+            var["name"]: var
+            for var in self.saagie_api.env_vars.list("GLOBAL", scope_only=True, pprint_result=False) or []
+        }
+        if project_ids is None:
+            projects = self.saagie_api.projects.list(pprint_result=False)["projects"] or []
+        else:
+            projects = [{"id": project_id, "name": None} for project_id in project_ids]
+        self.entities = {
+            ("project", project["id"]): {"name": project["name"], "project_id": project["id"]} for project in projects
+        }
+        self.layers = {}
+        errors = {}
+
+        for project, children, exception in run_concurrently(self.__list_children, projects, self.max_workers):
+            if exception:
+                logging.warning("❗Cannot list the pipelines and apps of the project [%s]: %s", project["id"], exception)
+                errors[project["id"]] = str(exception)
+                continue
+            for entity_type, entity in children:
+                self.entities[(entity_type, entity["id"])] = {"name": entity["name"], "project_id": project["id"]}
+
+        chunks = []
+        for entity_type in ENTITY_TYPES:
+            ids = [entity_id for kind, entity_id in self.entities if kind == entity_type]
+            chunks += [
+                (entity_type, ids[start : start + self.chunk_size]) for start in range(0, len(ids), self.chunk_size)
+            ]
+        for (entity_type, ids), layers, exception in run_concurrently(
+            lambda chunk: self.saagie_api.env_vars.list_by_entity(_SCOPES[chunk[0]], chunk[1], self.chunk_size),
+            chunks,
+            self.max_workers,
+        ):
+            if exception:
+                logging.warning("❗Cannot fetch the variables of %d %ss: %s", len(ids), entity_type, exception)
+                errors.update({entity_id: str(exception) for entity_id in ids})
+                continue
+            for entity_id, variables in layers.items():
+                if variables is None:
+                    errors[entity_id] = f"{entity_type.capitalize()} not found"
+                    continue
+                self.layers[(entity_type, entity_id)] = {var["name"]: var for var in variables}
+        return errors
+
+    def __list_children(self, project: Dict) -> List[Tuple[str, Dict]]:
+        pipelines = self.saagie_api.pipelines.list_for_project_minimal(project["id"])["project"]["pipelines"] or []
+        apps = self.saagie_api.apps.list_for_project_minimal(project["id"])["project"]["apps"] or []
+        return [("pipeline", pipeline) for pipeline in pipelines] + [("app", app) for app in apps]
+
+    def __stack(self, entity_type: str, entity_id: str) -> List[Tuple[str, Dict[str, Dict]]]:
+        """Layers seen by an entity, from the highest to the lowest priority"""
+        if entity_type not in ENTITY_TYPES:
+            raise ValueError(f"❌ 'entity_type' must be one of {', '.join(ENTITY_TYPES)}")
+        entity = self.entities.get((entity_type, entity_id))
+        if entity is None:
+            raise ValueError(f"❌ The {entity_type} [{entity_id}] is not loaded")
+        stack = [(_SCOPES[entity_type], self.layers.get((entity_type, entity_id), {}))]
+        if entity_type != "project":
+            stack.append(("PROJECT", self.layers.get(("project", entity["project_id"]), {})))
+        stack.append(("GLOBAL", self.globals))
+        return stack
+
+    def effective(self, entity_type: str, entity_id: str) -> Dict[str, Dict]:
+        """Variables seen by a project, pipeline or app
+
+        Parameters
+        ----------
+        entity_type : str
+            project, pipeline or app
+        entity_id : str
+            UUID of the entity
+
+        Returns
+        -------
+        dict
+            Effective variables by name, with the keys "name", "value", "scope" (scope it comes from),
+            "isPassword", "description" and "overrides" (lower priority scopes defining the same name)
+
+        Raises
+        ------
+        ValueError
+            If the entity type is not valid or the entity is not loaded
+        """
+        merged: Dict[str, Dict] = {}
+        for scope, layer in self.__stack(entity_type, entity_id):
+            for name, var in layer.items():
+                if name in merged:
+                    merged[name]["overrides"].append(scope)
+                    continue
+                merged[name] = {
+                    "name": name,
+                    "value": var["value"],
+                    "scope": scope,
+                    "isPassword": var["isPassword"],
+                    "description": var["description"],
+                    "overrides": [],
+                }
+        return merged
+
+    def resolve(self, entity_type: str, entity_id: str, name: str) -> Optional[Dict]:
+        """Effective variable with this name seen by an entity, see effective. None if it does not see it"""
+        for scope, layer in self.__stack(entity_type, entity_id):
+            if name in layer:
+                var = layer[name]
+                return {
+                    "name": name,
+                    "value": var["value"],
+                    "scope": scope,
+                    "isPassword": var["isPassword"],
+                    "description": var["description"],
+                }
+        return None
+
+    def find(self, name: str, value: Optional[str] = None, entity_types: Iterable[str] = ENTITY_TYPES) -> List[Dict]:
+        """Entities that see a variable, optionally only with a given value
+
+        Parameters
+        ----------
+        name : str
+            Name of the variable
+        value : str, optional
+            Only return the entities that see this value. Password values cannot be compared
+        entity_types : Iterable[str], optional
+            Types of the entities to return, default to projects, pipelines and apps
+
+        Returns
+        -------
+        list of dict
+            Entities sorted by project, type and name, with the keys "entity_type", "entity_id", "entity_name",
+            "project_id", "project_name", "value" and "scope" (scope the effective value comes from)
+        """
+        entity_types = set(entity_types)
+        results = []
+        for (entity_type, entity_id), entity in self.entities.items():
+            if entity_type not in entity_types:
+                continue
+            var = self.resolve(entity_type, entity_id, name)
+            if var is None or (value is not None and (var["isPassword"] or var["value"] != value)):
+                continue
+            results.append(
+                {
+                    "entity_type": entity_type,
+                    "entity_id": entity_id,
+                    "entity_name": entity["name"],
+                    "project_id": entity["project_id"],
+                    "project_name": self.entities[("project", entity["project_id"])]["name"],
+                    "value": var["value"],
+                    "scope": var["scope"],
+                }
+            )
+        results.sort(
+            key=lambda row: (
+                row["project_name"] or "",
+                row["project_id"],
+                ENTITY_TYPES.index(row["entity_type"]),
+                row["entity_name"] or "",
+            )
+        )
+        return results
@@ -1,11 +1,12 @@
 import json
 import logging
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterable, List, Optional, Union
 
 import deprecation
 from gql import gql
 
+from ..utils.concurrency import DEFAULT_MAX_WORKERS, run_concurrently
 from ..utils.folder_functions import create_folder, write_error, write_to_json_file
 from .gql_queries import *
 
@@ -30,6 +31,87 @@ def check_scope(scope, project_id, pipeline_id, app_id):
         raise ValueError("❌ 'app_id' must be provided for scope APP")
 
 
+# query field and id argument listing the variables of an entity, by scope
+ENTITY_ENV_VARS_FIELDS = {
+    "PROJECT": ("projectEnvironmentVariables", "projectId"),
+    "PIPELINE": ("pipelineEnvironmentVariables", "pipelineId"),
+    "APP": ("appEnvironmentVariables", "appId"),
+}
+
+
+def build_env_vars_by_entity_query(scope: str, count: int) -> str:
+    """
+    Build a query fetching the variables of count entities of a scope in a single request, the variables of the
+    entity i being returned under the alias "entity<i>" and its id given by the variable "id<i>".
+    Pipelines and apps only return their own layer, projects also return the global variables
+    """
+    field, argument = ENTITY_ENV_VARS_FIELDS[scope]
+    scope_filter = "" if scope == "PROJECT" else f", scope: {scope}"
+    variables = ", ".join(f"$id{index}: UUID!" for index in range(count))
+    fields = "\n".join(
+        f"    entity{index}: {field}({argument}: $id{index}{scope_filter}){{ ...envVarLayer }}"
+        for index in range(count)
+    )
+    return f"query envVarsByEntityQuery({variables}){{\n{fields}\n}}\n{GQL_ENV_VAR_LAYER_FRAGMENT}"
+
+
+# name of the file holding all the variables of a scope, written by export with single_file=True
+ENV_VARS_FILE = "env_vars.json"
+
+
+def read_exported_env_vars(folder) -> List[Dict]:
+    """
+    Read the variables exported in a folder, either in the single file env_vars.json or with one
+    <name>/variable.json file per variable. An empty list is returned if the folder does not exist
+    """
+    folder = Path(folder)
+    if (folder / ENV_VARS_FILE).exists():
+        with (folder / ENV_VARS_FILE).open("r", encoding="utf-8") as file:
+            return json.load(file)
+    if not folder.exists():
+        return []
+    env_vars = []
+    for env_var_folder in sorted(folder.iterdir()):
+        if (env_var_folder / "variable.json").exists():
+            with (env_var_folder / "variable.json").open("r", encoding="utf-8") as file:
+                env_vars.append(json.load(file))
+    return env_vars
+
+
+# scopes whose variables can be replaced with one raw mutation by sync. GLOBAL is left out so that a sync never
+# replaces all the variables of the platform in one call
+RAW_BULK_SCOPES = ("PROJECT", "PIPELINE", "APP")
+
+
+def normalize_env_var_spec(spec: Union[str, Dict, None]) -> Dict:
+    """Desired state of a variable given either as its value or as a dict with the keys value, description and
+    is_password (or isPassword). None means that the property is left unchanged"""
+    if not isinstance(spec, dict):
+        return {"value": spec, "description": None, "is_password": None}
+    return {
+        "value": spec.get("value"),
+        "description": spec.get("description"),
+        "is_password": spec.get("is_password", spec.get("isPassword")),
+    }
+
+
+def is_raw_compatible(spec: Dict) -> bool:
+    """Whether a variable can be written in the raw format "NAME=value", which has no description nor password"""
+    return (
+        not spec["is_password"] and not spec["description"] and spec["value"] is not None and "\n" not in spec["value"]
+    )
+
+
+def env_var_differs(existing: Dict, spec: Dict) -> bool:
+    """Whether an existing variable must be updated to match a normalized spec. The value of a password is not
+    readable, so a password with a desired value is always updated"""
+    return (
+        (spec["value"] is not None and (existing["isPassword"] or existing["value"] != spec["value"]))
+        or (spec["description"] is not None and spec["description"] != (existing["description"] or ""))
+        or (spec["is_password"] is not None and spec["is_password"] != existing["isPassword"])
+    )
+
+
 class EnvVars:
     # pylint: disable=singleton-comparison
     def __init__(self, saagie_api):
@@ -1441,6 +1523,275 @@ class EnvVars:
         logging.info("✅ Environment variable [%s] successfully deleted", name)
         return result
 
+    def list_by_entity(self, scope: str, entity_ids: Iterable[str], chunk_size: int = 50) -> Dict[str, List[Dict]]:
+        """
+        List the variables defined at the level of many projects, pipelines or apps, with one request per chunk of
+        entities. Unlike list with scope_only=False, the variables inherited from the upper scopes are not returned
+
+        Parameters
+        ----------
+        scope : str
+            Scope of the entities. Must be one of PROJECT, PIPELINE or APP
+        entity_ids : Iterable[str]
+            UUIDs of the projects, pipelines or apps
+        chunk_size : int, optional
+            Maximum number of entities fetched by request, default to 50
+
+        Returns
+        -------
+        dict
+            Variables (id, name, scope, value, description, isPassword) by entity id. None for the entities that
+            were not found
+
+        Raises
+        ------
+        ValueError
+            If the scope is not valid
+
+        Examples
+        --------
+        >>> saagieapi.env_vars.list_by_entity("PIPELINE", ["5d1999f5-fa70-47d9-9f41-55ad48333629"])
+        {
+            "5d1999f5-fa70-47d9-9f41-55ad48333629": [
+                {
+                    "id": "4a3a5ea5-0ee2-4f1a-8a29-3c1ea3b1e1f8",
+                    "name": "BATCH_SIZE",
+                    "scope": "PIPELINE",
+                    "value": "500",
+                    "description": "",
+                    "isPassword": False
+                }
+            ]
+        }
+        """
+        if scope not in ENTITY_ENV_VARS_FIELDS:
+            raise ValueError(f"❌ 'scope' must be one of {', '.join(ENTITY_ENV_VARS_FIELDS)}")
+        entity_ids = list(dict.fromkeys(entity_ids))
+        variables = {}
+        for start in range(0, len(entity_ids), chunk_size):
+            chunk = entity_ids[start : start + chunk_size]
+            result = self.saagie_api.client.execute(
+                query=gql(build_env_vars_by_entity_query(scope, len(chunk))),
+                variable_values={f"id{index}": entity_id for index, entity_id in enumerate(chunk)},
+                pprint_result=False,
+            )
+            for index, entity_id in enumerate(chunk):
+                layer = result.get(f"entity{index}")
+                variables[entity_id] = None if layer is None else [var for var in layer if var["scope"] == scope]
+        return variables
+
+    def sync(
+        self,
+        scope: str,
+        desired: Dict[str, Union[str, Dict]],
+        project_id: str = None,
+        pipeline_id: str = None,
+        app_id: str = None,
+        prune: bool = False,
+        dry_run: bool = False,
+        use_bulk: Optional[bool] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> Dict:
+        """Make the environment variables of a scope match a desired state.
+        The variables of the scope are listed once and compared locally to compute the variables to add, update
+        and delete. For the scopes PROJECT, PIPELINE and APP, the changes are applied with a single raw mutation
+        replacing all the variables of the scope that can be written as "NAME=value" (no description, single line),
+        as long as this does not drop the description of existing variables. Passwords, which this mutation does
+        not touch, and the other variables are then changed with one mutation each, with bounded concurrency
+
+        Parameters
+        ----------
+        scope : str
+            Scope of the environment variables. Must be one of GLOBAL, PROJECT, PIPELINE or APP
+        desired : Dict[str, Union[str, Dict]]
+            Desired variables by name, with either their value, or a dict with the keys "value", "description" and
+            "is_password". A missing or None property is left unchanged on existing variables
+        project_id : str, optional
+            UUID of your project (see README on how to find it)
+        pipeline_id : str, optional
+            UUID of your pipeline (see README on how to find it)
+        app_id : str, optional
+            UUID of your app (see README on how to find it)
+        prune : bool, optional
+            Whether to delete the variables of the scope that are not in desired
+        dry_run : bool, optional
+            Whether to only compute the changes, without applying them
+        use_bulk : bool, optional
+            Whether to apply the changes with the raw mutation. If None, it is used when possible
+        max_workers : int, optional
+            Maximum number of concurrent mutations for the changes not applied by the raw mutation
+
+        Returns
+        -------
+        dict
+            Report with the names of the variables "added", "updated", "deleted" and "unchanged", the "method"
+            used to apply them ("bulk", "mixed", "mutations", or None when there is nothing to change), "dry_run", and
+            the error message by variable name in "errors"
+
+        Raises
+        ------
+        ValueError
+            If the scope is not valid, or if use_bulk is True and the raw mutation cannot be used
+
+        Examples
+        --------
+        >>> saagieapi.env_vars.sync(
+        ...     scope="PROJECT",
+        ...     desired={"DB_HOST": "db.internal", "DB_PORT": "5432", "DB_PASSWORD": {"value": "s3cr3t", "is_password": True}},
+        ...     project_id="50033e21-83c2-4431-a723-d54c2693b964",
+        ...     prune=True
+        ... )
+        {
+            "scope": "PROJECT",
+            "entity_id": "50033e21-83c2-4431-a723-d54c2693b964",
+            "method": "mixed",
+            "dry_run": False,
+            "added": ["DB_PASSWORD"],
+            "updated": ["DB_HOST"],
+            "deleted": ["OLD_VARIABLE"],
+            "unchanged": ["DB_PORT"],
+            "errors": {}
+        }
+        """  # pylint: disable=line-too-long
+        check_scope(scope, project_id, pipeline_id, app_id)
+        entity_id = {"PROJECT": project_id, "PIPELINE": pipeline_id, "APP": app_id}.get(scope)
+        wanted = {name: normalize_env_var_spec(spec) for name, spec in desired.items()}
+        existing = {
+            var["name"]: var
+            for var in self.list(scope, project_id, pipeline_id, app_id, scope_only=True, pprint_result=False)
+        }
+
+        report = {
+            "scope": scope,
+            "entity_id": entity_id,
+            "method": None,
+            "dry_run": dry_run,
+            "added": [name for name in wanted if name not in existing],
+            "updated": [name for name in wanted if name in existing and env_var_differs(existing[name], wanted[name])],
+            "deleted": sorted(name for name in existing if name not in wanted) if prune else [],
+            "unchanged": [
+                name for name in wanted if name in existing and not env_var_differs(existing[name], wanted[name])
+            ],
+            "errors": {},
+        }
+        if not (report["added"] or report["updated"] or report["deleted"]):
+            return report
+
+        final = {}
+        for name, var in existing.items():
+            if name not in wanted and not prune:
+                final[name] = {
+                    "value": None if var["isPassword"] else var["value"],
+                    "description": var["description"],
+                    "is_password": var["isPassword"],
+                }
+        for name, spec in wanted.items():
+            var = existing.get(name) or {}
+            final[name] = {
+                "value": spec["value"] if spec["value"] is not None else var.get("value"),
+                "description": spec["description"] if spec["description"] is not None else var.get("description"),
+                "is_password": spec["is_password"] if spec["is_password"] is not None else var.get("isPassword"),
+            }
+        # the raw mutation replaces all the variables of the scope except the passwords, which it neither deletes
+        # nor updates: passwords and the variables that do not fit the raw format go through one mutation each
+        raw_values = {
+            name: spec["value"]
+            for name, spec in final.items()
+            if is_raw_compatible(spec) and not (existing.get(name) or {}).get("isPassword")
+        }
+        raw_possible = scope in RAW_BULK_SCOPES and all(
+            name in raw_values or name not in existing or existing[name]["isPassword"] for name in final
+        )
+        if use_bulk and not raw_possible:
+            raise ValueError(
+                "❌ The raw mutation cannot be used: the scope is GLOBAL, or some existing variables that are not "
+                "passwords would have a description or a multi-line value"
+            )
+        actions = (
+            [("create", name) for name in report["added"]]
+            + [("update", name) for name in report["updated"]]
+            + [("delete", name) for name in report["deleted"]]
+        )
+        raw_actions = []
+        if raw_possible and use_bulk is not False:
+            raw_actions = [
+                (action, name)
+                for action, name in actions
+                if name in raw_values or (action == "delete" and not existing[name]["isPassword"])
+            ]
+            actions = [action for action in actions if action not in raw_actions]
+        report["method"] = ("mixed" if actions else "bulk") if raw_actions else "mutations"
+        if dry_run:
+            return report
+
+        if raw_actions:
+            try:
+                result = self.__replace_by_raw(scope, entity_id, raw_values)
+                if result.get("replaceEnvironmentVariablesByRawForScope") is None:
+                    raise ValueError(result)
+            except Exception as exception:  # pylint: disable=broad-exception-caught
+                logging.error("❌ Cannot replace the environment variables of scope [%s]: %s", scope, exception)
+                report["errors"].update({name: str(exception) for _, name in raw_actions})
+
+        for (action, name), _, exception in run_concurrently(
+            lambda item: self.__apply_change(item[0], scope, entity_id, item[1], wanted.get(item[1]), existing),
+            actions,
+            max_workers,
+        ):
+            if exception:
+                logging.error("❌ Cannot %s the environment variable [%s]: %s", action, name, exception)
+                report["errors"][name] = str(exception)
+        logging.info("✅ Environment variables of scope [%s] successfully synchronized", scope)
+        return report
+
+    def __replace_by_raw(self, scope: str, entity_id: Optional[str], env_vars: Dict[str, str]) -> Dict:
+        """Replace all the variables of a scope with one raw mutation"""
+        params = {
+            "entityId": entity_id,
+            "scope": scope,
+            "rawEnvironmentVariables": "".join(f"{name}={value}\n" for name, value in env_vars.items()),
+        }
+        return self.saagie_api.client.execute(
+            query=gql(GQL_CREATE_PIPELINE_ENV_VAR), variable_values=params, pprint_result=False
+        )
+
+    def __apply_change(
+        self, action: str, scope: str, entity_id: Optional[str], name: str, spec: Optional[Dict], existing: Dict
+    ) -> Dict:
+        """Create, update or delete one variable from the state listed by sync, without listing the scope again"""
+        if action == "delete":
+            return self.saagie_api.client.execute(
+                query=gql(GQL_DELETE_ENV_VAR), variable_values={"id": existing[name]["id"]}, pprint_result=False
+            )
+        if action == "create":
+            env_var = {
+                "name": name,
+                "value": spec["value"] if spec["value"] is not None else "",
+                "description": spec["description"] or "",
+                "isPassword": bool(spec["is_password"]),
+                "scope": scope,
+            }
+            query = GQL_CREATE_ENV_VAR
+        else:
+            var = existing[name]
+            env_var = {key: var[key] for key in ("id", "name", "scope", "value", "description", "isPassword")}
+            if var["isPassword"]:
+                env_var.pop("value")
+            if spec["value"] is not None:
+                env_var["value"] = spec["value"]
+            if spec["description"] is not None:
+                env_var["description"] = spec["description"]
+            if spec["is_password"] is not None:
+                env_var["isPassword"] = spec["is_password"]
+            query = GQL_UPDATE_ENV_VAR
+        params = {"envVar": env_var}
+        if entity_id is not None:
+            params["entityId"] = entity_id
+        result = self.saagie_api.client.execute(query=gql(query), variable_values=params, pprint_result=False)
+        if result.get("saveEnvironmentVariable") is None:
+            raise ValueError(result)
+        return result
+
     def bulk_create_for_pipeline(self, pipeline_id: str, env_vars: Dict) -> Dict:
         """Delete all existing env vars and create new ones for the pipeline
 
@@ -1497,7 +1848,12 @@ class EnvVars:
         return result
 
     def export(
-        self, project_id, output_folder: str, error_folder: Optional[str] = "", project_only: bool = False
+        self,
+        project_id,
+        output_folder: str,
+        error_folder: Optional[str] = "",
+        project_only: bool = False,
+        single_file: bool = False,
     ) -> bool:
         """Export the environment variables of scope GLOBAL or PROJECT in a folder
         To export PIPELINE variables, use the pipelines.export function
@@ -1512,6 +1868,9 @@ class EnvVars:
             True if only project environment variable should be exported False otherwise
         error_folder : str, optional
             Path to store the project ID in case of error. If not set, project ID is not write
+        single_file : bool, optional
+            Whether to write all the variables in the file env_vars.json, that can be imported with
+            import_from_file. Otherwise, each variable is written in its own <name>/variable.json file
 
         Returns
         -------
@@ -1543,9 +1902,13 @@ class EnvVars:
             return True
 
         try:
-            for env in project_env_var:
-                create_folder(output_folder / env["name"])
-                write_to_json_file(output_folder / env["name"] / "variable.json", env)
+            if single_file:
+                create_folder(output_folder)
+                write_to_json_file(output_folder / ENV_VARS_FILE, project_env_var)
+            else:
+                for env in project_env_var:
+                    create_folder(output_folder / env["name"])
+                    write_to_json_file(output_folder / env["name"] / "variable.json", env)
 
             logging.info("✅ Environment variables of the project [%s] have been successfully exported", project_id)
         except Exception as exception:
@@ -1606,3 +1969,75 @@ class EnvVars:
         logging.info("✅ Environment variables of the project [%s] have been successfully imported", project_id)
 
         return True
+
+    def import_from_file(
+        self,
+        json_file: str,
+        project_id: str = None,
+        pipeline_id: str = None,
+        app_id: str = None,
+        scopes: Optional[List[str]] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> bool:
+        """Import all the environment variables written in a single file by export with single_file=True.
+        The variables of each scope are applied with sync, without deleting the variables that are not in the
+        file: with one raw mutation where possible, and one mutation per password or variable with a description.
+        Passwords exported without value are created with an empty value, and keep their value if they exist
+
+        Parameters
+        ----------
+        json_file : str
+            Path to the JSON file that contains the list of variables
+        project_id : str, optional
+            UUID of the project receiving the PROJECT variables
+        pipeline_id : str, optional
+            UUID of the pipeline receiving the PIPELINE variables
+        app_id : str, optional
+            UUID of the app receiving the APP variables
+        scopes : List[str], optional
+            Scopes of the variables to import, default to all the scopes found in the file
+        max_workers : int, optional
+            Maximum number of concurrent mutations
+
+        Returns
+        -------
+        bool
+            True if environment variables are imported False otherwise
+
+        Examples
+        --------
+        >>> saagieapi.env_vars.import_from_file(
+        ...     json_file="/path/to/the/env_vars/env_vars.json",
+        ...     project_id="860b8dc8-e634-4c98-b2e7-f9ec32ab4771",
+        ...     scopes=["PROJECT"]
+        ... )
+        True
+        """
+        json_file = Path(json_file)
+        try:
+            with json_file.open("r", encoding="utf-8") as file:
+                env_vars_info = json.load(file)
+        except Exception as exception:
+            return handle_error(f"{exception}\n Cannot open the JSON file {json_file}", project_id)
+
+        desired_by_scope: Dict[str, Dict[str, Dict]] = {}
+        for env_var_info in env_vars_info:
+            if scopes is None or env_var_info["scope"] in scopes:
+                desired_by_scope.setdefault(env_var_info["scope"], {})[env_var_info["name"]] = {
+                    "value": env_var_info["value"],
+                    "description": env_var_info["description"] or "",
+                    "is_password": env_var_info["isPassword"],
+                }
+
+        status = True
+        for scope, desired in desired_by_scope.items():
+            try:
+                report = self.sync(scope, desired, project_id, pipeline_id, app_id, max_workers=max_workers)
+                if report["errors"]:
+                    status = handle_error(report["errors"], project_id)
+            except Exception as exception:  # pylint: disable=broad-exception-caught
+                status = handle_error(exception, project_id)
+
+        if status:
+            logging.info("✅ Environment variables of the project [%s] have been successfully imported", project_id)
+        return status
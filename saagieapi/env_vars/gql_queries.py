@@ -149,3 +149,14 @@ mutation replaceEnvironmentVariablesByRawForScope($entityId: UUID,
     }
 }
 """
+
+GQL_ENV_VAR_LAYER_FRAGMENT = """
+fragment envVarLayer on EnvironmentVariable {
+    id
+    name
+    scope
+    value
+    description
+    isPassword
+}
+"""
@@ -3,6 +3,7 @@ import logging
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from ..utils.concurrency import DEFAULT_MAX_WORKERS, run_concurrently
 from ..utils.folder_functions import check_folder_path, create_folder, write_error, write_to_json_file
 
 
@@ -152,8 +153,15 @@ class Groups:
         logging.info("✅ Successfully list group's users on the platform")
         return response.json()
 
-    def export(self, output_folder: str, error_folder: Optional[str] = "", verify_ssl: Optional[bool] = None) -> bool:
+    def export(
+        self,
+        output_folder: str,
+        error_folder: Optional[str] = "",
+        verify_ssl: Optional[bool] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> bool:
         """Export groups
+        The users and permissions of the groups are fetched concurrently
         NB: You can only export group's information if you have the admin role on the platform
 
         Parameters
@@ -166,6 +174,8 @@ class Groups:
         verify_ssl: bool, optional
             Enable or disable verification of SSL certification
             By default, refers to saagie_api.verify_ssl
+        max_workers : int, optional
+            Maximum number of groups fetched concurrently
 
         Returns
         -------
@@ -193,17 +203,23 @@ class Groups:
             return True
 
         list_failed = []
-        for group_name in group_names:
-            try:
-                if group_user_list := self.get_users(group_name, verify_ssl=verify_ssl):
-                    write_to_json_file(f"{output_folder}user_{group_name}.json", group_user_list)
-
-                if permission_list := self.get_permission(group_name, verify_ssl=verify_ssl):
-                    write_to_json_file(f"{output_folder}perm_{group_name}.json", permission_list)
-
-            except Exception as exception:
+        for group_name, result, exception in run_concurrently(
+            lambda name: (
+                self.get_users(name, verify_ssl=verify_ssl),
+                self.get_permission(name, verify_ssl=verify_ssl),
+            ),
+            group_names,
+            max_workers,
+        ):
+            if exception:
                 logging.error("Something went wrong when getting group's users or group's permissions: %s", exception)
                 list_failed.append(group_name)
+                continue
+            group_user_list, permission_list = result
+            if group_user_list:
+                write_to_json_file(f"{output_folder}user_{group_name}.json", group_user_list)
+            if permission_list:
+                write_to_json_file(f"{output_folder}perm_{group_name}.json", permission_list)
         if list_failed:
             logging.warning("❌ The following groups are failed to export: %s", list_failed)
             write_error(error_folder, "groups", str(list_failed))
@@ -361,9 +377,15 @@ class Groups:
         return True
 
     def import_from_json(
-        self, path_to_folder: str, error_folder: Optional[str] = "", verify_ssl: Optional[bool] = None
+        self,
+        path_to_folder: str,
+        error_folder: Optional[str] = "",
+        verify_ssl: Optional[bool] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
     ) -> bool:
         """Import groups from JSON format
+        The groups of the platform are listed once to skip the existing ones, then the other groups are created
+        concurrently. The imported, already existing and failed groups are logged in the order of the file
         NB: You can only use this function if you have the admin role on the platform
             All protected groups (created at platform installation) will not be imported.
             For the moment, authorizations of groups are not imported, so if you want the same authorization,
@@ -379,6 +401,8 @@ class Groups:
         verify_ssl: bool, optional
             Enable or disable verification of SSL certification
             By default, refers to saagie_api.verify_ssl
+        max_workers : int, optional
+            Maximum number of groups created concurrently
 
         Returns
         -------
@@ -409,43 +433,30 @@ class Groups:
             return False
         total_group = len(groups_list)
 
+        try:
+            existing_names = {group["name"] for group in self.list(verify_ssl=verify_ssl)}
+        except Exception as exception:
+            logging.warning("❌ Cannot get the groups of the platform")
+            logging.error("Something went wrong %s", exception)
+            return False
+
+        to_create = []
         for group in groups_list:
             if group["protected"]:
                 bypassed_list.append(group["name"])
-                continue
-
-            group_name = group["name"]
-            res = self.saagie_api.request_client.send(
-                method="GET",
-                url=f"{self.saagie_api.url_saagie}auth/api/groups/{group_name}",
-                raise_for_status=False,
-                verify_ssl=verify_ssl,
-            )
-            if res.status_code != 500:
+            elif group["name"] in existing_names:
                 already_exist_list.append(group["name"])
-                continue
-
-            groups_user_json_path = path_to_folder / "groups" / f"user_{group_name}.json"
-            group_permission_json_path = path_to_folder / "groups" / f"perm_{group_name}.json"
-            try:
-                with groups_user_json_path.open("r", encoding="utf-8") as file:
-                    group_user = json.load(file)
-                if group_user:
-                    self.create(group_name=group_name, users=group_user["users"], verify_ssl=verify_ssl)
-
-                with group_permission_json_path.open("r", encoding="utf-8") as file:
-                    group_permission = json.load(file)
-                if group_permission:
-                    self.edit_permission(
-                        group_name=group_name,
-                        authorizations=[],
-                        realm_authorization=group_permission["realmAuthorization"],
-                        verify_ssl=verify_ssl,
-                    )
-                imported_list.append(group_name)
-            except Exception as err:
-                logging.error("Something went wrong when importing group [%s]: %s", group_name, err)
+            else:
+                to_create.append(group["name"])
+
+        for group_name, _, exception in run_concurrently(
+            lambda name: self.__import_group(path_to_folder, name, verify_ssl), to_create, max_workers
+        ):
+            if exception:
+                logging.error("Something went wrong when importing group [%s]: %s", group_name, exception)
                 failed_list.append(group_name)
+            else:
+                imported_list.append(group_name)
         if failed_list:
             logging.info("%s/%s are failed to import", len(failed_list), total_group)
             logging.warning("❌ The following groups are failed to import: %s", failed_list)
@@ -456,3 +467,20 @@ class Groups:
         logging.info("%s/%s are already exist", len(already_exist_list), total_group)
         logging.info("✅ Groups have been successfully imported")
         return True
+
+    def __import_group(self, path_to_folder: Path, group_name: str, verify_ssl: bool) -> None:
+        """Create a group with the users and the realm authorization exported in the folder groups"""
+        with (path_to_folder / "groups" / f"user_{group_name}.json").open("r", encoding="utf-8") as file:
+            group_user = json.load(file)
+        if group_user:
+            self.create(group_name=group_name, users=group_user["users"], verify_ssl=verify_ssl)
+
+        with (path_to_folder / "groups" / f"perm_{group_name}.json").open("r", encoding="utf-8") as file:
+            group_permission = json.load(file)
+        if group_permission:
+            self.edit_permission(
+                group_name=group_name,
+                authorizations=[],
+                realm_authorization=group_permission["realmAuthorization"],
+                verify_ssl=verify_ssl,
+            )
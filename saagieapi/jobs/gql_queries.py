@@ -165,6 +165,31 @@ query jobInstanceQuery($jobInstanceId: UUID!){
 }
 """
 
+GQL_GET_JOB_INSTANCES_PAGE = """
+query jobInstancesQuery($jobId: UUID!, $limit: Int, $skip: Int){
+    job(id: $jobId){
+        id
+        instances(limit: $limit, skip: $skip){
+            id
+            number
+            status
+            history {
+                currentStatus {
+                    status
+                    details
+                    reason
+                }
+            }
+            startTime
+            endTime
+            version {
+                number
+            }
+        }
+    }
+}
+"""
+
 GQL_RUN_JOB = """
 mutation runJobMutation($jobId: UUID!){
     runJob(jobId: $jobId){
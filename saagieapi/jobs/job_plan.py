@@ -0,0 +1,184 @@
+from typing import Dict, List, Optional
+
+
+def normalize_docker_info(docker_info: Optional[Dict]) -> Optional[Dict]:
+    if not docker_info:
+        return None
+    return {"image": docker_info.get("image"), "dockerCredentialsId": docker_info.get("dockerCredentialsId")}
+
+
+def normalize_extra_technology(extra_technology: Optional[Dict]) -> Optional[Dict]:
+    if not extra_technology or not extra_technology.get("language"):
+        return None
+    return {"language": extra_technology.get("language"), "version": extra_technology.get("version")}
+
+
+def normalize_resources(resources: Optional[Dict]) -> Optional[Dict]:
+    if not resources:
+        return None
+    normalized = {
+        resource: {
+            "request": (resources.get(resource) or {}).get("request"),
+            "limit": (resources.get(resource) or {}).get("limit"),
+        }
+        for resource in ("cpu", "memory")
+    }
+    return normalized if any(v for values in normalized.values() for v in values.values()) else None
+
+
+def normalize_alerting(alerting: Optional[Dict]) -> Optional[Dict]:
+    if not alerting or not alerting.get("emails"):
+        return None
+    return {"emails": sorted(alerting["emails"]), "statusList": sorted(alerting.get("statusList") or [])}
+
+
+def normalize_schedule(is_scheduled: bool, cron_scheduling: Optional[str], schedule_timezone: Optional[str]) -> Dict:
+    if not is_scheduled:
+        return {"isScheduled": False}
+    return {"isScheduled": True, "cronScheduling": cron_scheduling, "scheduleTimezone": schedule_timezone}
+
+
+def desired_schedule(spec: Dict) -> Optional[Dict]:
+    """Normalized schedule requested by a job spec, None when the spec leaves the schedule unchanged"""
+    if spec.get("cron_scheduling") and spec.get("is_scheduled") is not False:
+        return normalize_schedule(True, spec["cron_scheduling"], spec.get("schedule_timezone") or "UTC")
+    if spec.get("is_scheduled") is False:
+        return normalize_schedule(False, None, None)
+    return None
+
+
+def desired_alerting(spec: Dict) -> Optional[Dict]:
+    """Alerting requested by a job spec, with the same default status list as SaagieApi.check_alerting"""
+    if not spec.get("emails"):
+        return None
+    return {"emails": spec["emails"], "statusList": spec.get("status_list") or ["FAILED"]}
+
+
+def diff_job_settings(spec: Dict, job: Dict) -> Dict:
+    """Compare the settings of a job spec with the ones of an existing job (editJob mutation)
+
+    Parameters
+    ----------
+    spec : dict
+        Desired state of the job. Keys that are missing or None are left unchanged
+    job : dict
+        Current state of the job, as returned by Jobs.list_for_project
+
+    Returns
+    -------
+    dict
+        Dict of changed fields with their current and desired values
+    """
+    changes = {}
+    if spec.get("description") is not None and spec["description"] != job.get("description"):
+        changes["description"] = {"current": job.get("description"), "desired": spec["description"]}
+
+    current_schedule = normalize_schedule(
+        job.get("isScheduled"), job.get("cronScheduling"), job.get("scheduleTimezone")
+    )
+    schedule = desired_schedule(spec) or current_schedule
+    if schedule != current_schedule:
+        changes["schedule"] = {"current": current_schedule, "desired": schedule}
+
+    if spec.get("resources") is not None:
+        resources = normalize_resources(spec["resources"])
+        if resources != normalize_resources(job.get("resources")):
+            changes["resources"] = {"current": job.get("resources"), "desired": spec["resources"]}
+
+    if spec.get("emails") is not None:
+        alerting = desired_alerting(spec)
+        current_alerting = job.get("alerting")
+        if normalize_alerting(alerting) != normalize_alerting(current_alerting):
+            changes["alerting"] = {
+                "current": normalize_alerting(current_alerting),
+                "desired": normalize_alerting(alerting),
+            }
+    return changes
+
+
+def diff_version_settings(spec: Dict, version: Optional[Dict]) -> Dict:
+    """Compare the version settings of a job spec with the current version of a job (addJobVersion mutation).
+    The artifact is not compared here
+
+    Parameters
+    ----------
+    spec : dict
+        Desired state of the job. Keys that are missing or None are left unchanged
+    version : dict
+        Current version of the job
+
+    Returns
+    -------
+    dict
+        Dict of changed fields with their current and desired values
+    """
+    version = version or {}
+    changes = {}
+    for key, field in (("runtime_version", "runtimeVersion"), ("command_line", "commandLine")):
+        if spec.get(key) is not None and spec[key] != version.get(field):
+            changes[field] = {"current": version.get(field), "desired": spec[key]}
+
+    if spec.get("docker_info") is not None:
+        docker_info = normalize_docker_info(spec["docker_info"])
+        if docker_info != normalize_docker_info(version.get("dockerInfo")):
+            changes["dockerInfo"] = {"current": version.get("dockerInfo"), "desired": docker_info}
+
+    if spec.get("extra_technology") is not None:
+        extra_technology = normalize_extra_technology(
+            {"language": spec["extra_technology"], "version": spec.get("extra_technology_version")}
+        )
+        if extra_technology != normalize_extra_technology(version.get("extraTechnology")):
+            changes["extraTechnology"] = {"current": version.get("extraTechnology"), "desired": extra_technology}
+
+    if spec.get("source_url") and spec["source_url"] != version.get("sourceUrl"):
+        changes["sourceUrl"] = {"current": version.get("sourceUrl"), "desired": spec["source_url"]}
+    return changes
+
+
+def build_edit_params(spec: Dict, job: Dict, changes: Dict) -> Dict:
+    """Build the variables of the editJob mutation, keeping the current value of unchanged fields"""
+    params = {
+        "jobId": job["id"],
+        "name": job["name"],
+        "description": spec.get("description") if "description" in changes else job.get("description"),
+        "resources": spec["resources"] if "resources" in changes else job.get("resources"),
+    }
+    if "schedule" in changes:
+        params.update(changes["schedule"]["desired"])
+    else:
+        params.update(
+            normalize_schedule(job.get("isScheduled"), job.get("cronScheduling"), job.get("scheduleTimezone"))
+        )
+
+    alerting = desired_alerting(spec) if "alerting" in changes else job.get("alerting")
+    params["alerting"] = {"emails": alerting["emails"], "statusList": alerting["statusList"]} if alerting else None
+    return params
+
+
+def build_upgrade_params(spec: Dict, job: Dict, version: Optional[Dict], use_previous_artifact: bool) -> Dict:
+    """Build the variables of the addJobVersion mutation, keeping the current value of unchanged fields"""
+    version = version or {}
+    params = {
+        "jobId": job["id"],
+        "releaseNote": spec.get("release_note") or "",
+        "runtimeVersion": spec.get("runtime_version") or version.get("runtimeVersion"),
+        "commandLine": spec.get("command_line") or version.get("commandLine"),
+        "usePreviousArtifact": bool(use_previous_artifact and version.get("packageInfo")),
+        "dockerInfo": spec.get("docker_info") or version.get("dockerInfo"),
+    }
+    if spec.get("extra_technology") is not None:
+        params["extraTechnology"] = {
+            "language": spec["extra_technology"],
+            "version": spec.get("extra_technology_version"),
+        }
+    if spec.get("source_url"):
+        params["sourceUrl"] = spec["source_url"]
+    return params
+
+
+def summarize_plan(plan: List[Dict]) -> Dict:
+    """Count the jobs of a plan by action"""
+    summary = {"create": 0, "update": 0, "unchanged": 0}
+    for item in plan:
+        summary[item["action"]] += 1
+    return summary
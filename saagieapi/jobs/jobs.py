@@ -4,21 +4,34 @@ import os
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
 import deprecation
-import requests
 from gql import gql
 
+from ..utils.artifact_cache import ArtifactHashCache, compute_file_hash, compute_response_hash
+from ..utils.concurrency import DEFAULT_MAX_WORKERS, run_concurrently
 from ..utils.folder_functions import (
+    DOWNLOAD_CHUNK_SIZE,
     create_folder,
+    download_file,
     remove_slash_folder_path,
     write_error,
-    write_request_response_to_file,
     write_to_json_file,
 )
+from ..utils.pagination import DEFAULT_PAGE_SIZE, iter_instances_pages
 from ..utils.rich_console import console
 from .gql_queries import *
+from .job_plan import (
+    build_edit_params,
+    build_upgrade_params,
+    desired_schedule,
+    diff_job_settings,
+    diff_version_settings,
+    normalize_docker_info,
+    normalize_extra_technology,
+    summarize_plan,
+)
 
 
 def handle_write_error(msg, job_id, error_folder):
@@ -259,6 +272,55 @@ class Jobs:
             pprint_result=pprint_result,
         )
 
+    def iter_instances(
+        self,
+        job_id: str,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        since: Optional[Union[str, datetime]] = None,
+        status: Optional[Union[str, List[str]]] = None,
+    ) -> Iterator[Dict]:
+        """Iterate over the instances of a job, from the most recent to the oldest.
+        Instances are fetched lazily, one page at a time, so only the pages actually consumed are requested
+
+        Parameters
+        ----------
+        job_id : str
+            UUID of your job
+        page_size : int, optional
+            Number of instances fetched per request, default to 100
+        since : str or datetime, optional
+            Stop iterating at the first instance started before this date, for example "2022-04-19T00:00:00Z".
+            Naive datetimes are considered as UTC
+        status : str or list of str, optional
+            Only yield the instances with this status (or one of these statuses), for example "FAILED".
+            The filter is applied client-side
+
+        Yields
+        ------
+        dict
+            Instance information
+
+        Examples
+        --------
+        >>> for instance in saagieapi.jobs.iter_instances(
+        ...     job_id="f5fce22d-2152-4a01-8c6a-4c2eb4808b6d",
+        ...     since="2022-04-19T00:00:00Z",
+        ...     status=["FAILED", "KILLED"],
+        ... ):
+        ...     print(instance["id"], instance["status"])
+        """
+        query = gql(GQL_GET_JOB_INSTANCES_PAGE)
+
+        def fetch_page(limit: int, skip: int) -> List[Dict]:
+            result = self.saagie_api.client.execute(
+                query=query,
+                variable_values={"jobId": job_id, "limit": limit, "skip": skip},
+                pprint_result=False,
+            )
+            return (result.get("job") or {}).get("instances") or []
+
+        return iter_instances_pages(fetch_page, page_size=page_size, since=since, status=status)
+
     def get_id(self, job_name: str, project_name: str) -> str:
         """Get the job id with the job name and project name
 
@@ -885,6 +947,8 @@ class Jobs:
         extra_technology_version: str = None,
         source_url: str = "",
         docker_info: dict = None,
+        skip_if_unchanged: bool = False,
+        hash_cache: Optional[str] = None,
     ) -> Dict:
         """Upgrade a job
 
@@ -914,11 +978,21 @@ class Jobs:
         docker_info: dict (optional)
             Docker information for the job
             Example: {"image": "my_image", "dockerCredentialsId": "MY_CREDENTIALS_ID"}
+        skip_if_unchanged: bool (optional)
+            If True, compare the SHA-256 digest of the file with the artifact of the current version.
+            When the artifact and the version settings (runtime, command line, docker info, extra
+            technology, source URL) are unchanged, no version is created. When only the settings changed,
+            the new version reuses the previous artifact instead of uploading the file again.
+        hash_cache: str (optional)
+            Path of a local JSON file caching the artifact digests by job id and version number.
+            If the current version is not cached, the current artifact is downloaded and hashed.
 
         Returns
         -------
         dict
             Dict with version number
+            When skip_if_unchanged is True, the key "upgradeSkipped" tells whether the upgrade was skipped,
+            in which case the version number is the one of the current version
 
         Examples
         --------
@@ -978,10 +1052,122 @@ class Jobs:
         if source_url:
             params["sourceUrl"] = source_url
 
+        cache = ArtifactHashCache(hash_cache) if hash_cache else None
+        local_sha256, local_size = compute_file_hash(file) if file and (skip_if_unchanged or cache) else (None, None)
+
+        if skip_if_unchanged:
+            current_version = job_info["versions"][0]
+            if file:
+                artifact_unchanged = self.__is_artifact_unchanged(
+                    job_id, (local_sha256, local_size), current_version, cache
+                )
+            else:
+                artifact_unchanged = params["usePreviousArtifact"] or not current_version["packageInfo"]
+
+            if artifact_unchanged and not self.__version_settings_changed(params, current_version):
+                logging.info(
+                    "⏭️ Job [%s] is unchanged, upgrade skipped and version [%s] kept",
+                    job_id,
+                    current_version["number"],
+                )
+                return {"data": {"addJobVersion": {"number": current_version["number"]}}, "upgradeSkipped": True}
+
+            if file and artifact_unchanged:
+                logging.info("Artifact of job [%s] is unchanged, the previous artifact will be reused", job_id)
+                file = None
+                params["usePreviousArtifact"] = True
+
         result = self.__launch_request(file, GQL_UPGRADE_JOB, params)
         logging.info("✅ Job [%s] successfully upgraded", job_id)
+
+        # a reused artifact is identical to the local file, so the new version gets its digest as well
+        if cache and local_sha256 and (new_version := (result["data"] or {}).get("addJobVersion")):
+            cache.set(job_id, new_version["number"], local_sha256, local_size)
+        if skip_if_unchanged:
+            result["upgradeSkipped"] = False
         return result
 
+    def __is_artifact_unchanged(
+        self, job_id: str, local_hash: Tuple[str, int], current_version: Dict, cache: Optional[ArtifactHashCache]
+    ) -> bool:
+        """Check whether the artifact of the current job version has the given digest.
+        The local cache is used when it knows the current version, otherwise the artifact is downloaded
+        and hashed on the fly, and the cache is updated
+
+        Parameters
+        ----------
+        job_id : str
+            UUID of your job
+        local_hash : (str, int)
+            SHA-256 digest and size of the local file
+        current_version : dict
+            Current version of the job, as returned by get_info
+        cache : ArtifactHashCache, optional
+            Local cache of the artifact digests
+
+        Returns
+        -------
+        bool
+            True if the artifact of the current version is identical to the local file
+        """
+        package_info = current_version.get("packageInfo")
+        if not package_info:
+            return False
+
+        local_sha256, local_size = local_hash
+        if cache and (entry := cache.get(job_id, current_version["number"])):
+            return entry["size"] == local_size and entry["sha256"] == local_sha256
+
+        if not package_info.get("downloadUrl"):
+            return False
+        response = self.saagie_api.request_client.send(
+            method="GET",
+            url=f'{remove_slash_folder_path(self.saagie_api.url_saagie)}{package_info["downloadUrl"]}',
+            raise_for_status=False,
+            stream=True,
+        )
+        if response.status_code != 200:
+            logging.warning("❗Cannot download the current artifact of the job [%s], it will be uploaded", job_id)
+            return False
+        with response:
+            content_length = response.headers.get("Content-Length")
+            if content_length is not None and int(content_length) != local_size:
+                return False
+            remote_sha256, remote_size = compute_response_hash(response)
+
+        if cache:
+            cache.set(job_id, current_version["number"], remote_sha256, remote_size)
+        return remote_size == local_size and remote_sha256 == local_sha256
+
+    @staticmethod
+    def __version_settings_changed(params: Dict, current_version: Dict) -> bool:
+        """Check whether the settings of a job version to create differ from the current version
+
+        Parameters
+        ----------
+        params : dict
+            Variable values of the upgrade request
+        current_version : dict
+            Current version of the job, as returned by get_info
+
+        Returns
+        -------
+        bool
+            True if the runtime, the command line, the docker info, the extra technology or the source URL
+            differs from the current version
+        """
+        if params["runtimeVersion"] != current_version.get("runtimeVersion"):
+            return True
+        if params["commandLine"] != current_version.get("commandLine"):
+            return True
+        if normalize_docker_info(params["dockerInfo"]) != normalize_docker_info(current_version.get("dockerInfo")):
+            return True
+        if "extraTechnology" in params and normalize_extra_technology(
+            params["extraTechnology"]
+        ) != normalize_extra_technology(current_version.get("extraTechnology")):
+            return True
+        return "sourceUrl" in params and params["sourceUrl"] != current_version.get("sourceUrl")
+
     def upgrade_by_name(
         self,
         job_name: str,
@@ -1079,6 +1265,8 @@ class Jobs:
         status_list: List = None,
         source_url: str = "",
         docker_info: dict = None,
+        skip_if_unchanged: bool = False,
+        hash_cache: Optional[str] = None,
     ) -> Dict:
         """Create or upgrade a job
 
@@ -1128,12 +1316,19 @@ class Jobs:
         docker_info: dict (optional)
             Docker information for the job
             Example: {"image": "my_image", "dockerCredentialsId": "MY_CREDENTIALS_ID"}
+        skip_if_unchanged: bool (optional)
+            If True and the job exists, do not upload the file nor create a new version when the artifact
+            and the version settings are unchanged, see upgrade
+        hash_cache: str (optional)
+            Path of a local JSON file caching the artifact digests by job id and version number, see upgrade
 
         Returns
         -------
         dict
             Either the same dict as create_job, or the one returned by
             concatenation of upgrade_job and edit_job
+            When skip_if_unchanged is True and the job exists, the key "upgradeSkipped" tells whether
+            the version upgrade was skipped
 
         Examples
         --------
@@ -1181,20 +1376,23 @@ class Jobs:
         if job_name in [job["name"] for job in job_list]:
             job_id = next(job["id"] for job in job_list if job["name"] == job_name)
 
-            responses = {
-                "addJobVersion": self.upgrade(
-                    job_id=job_id,
-                    file=file,
-                    use_previous_artifact=use_previous_artifact,
-                    runtime_version=runtime_version,
-                    command_line=command_line,
-                    release_note=release_note,
-                    extra_technology=extra_technology,
-                    extra_technology_version=extra_technology_version,
-                    source_url=source_url,
-                    docker_info=docker_info,
-                )["data"]["addJobVersion"]
-            }
+            upgrade_result = self.upgrade(
+                job_id=job_id,
+                file=file,
+                use_previous_artifact=use_previous_artifact,
+                runtime_version=runtime_version,
+                command_line=command_line,
+                release_note=release_note,
+                extra_technology=extra_technology,
+                extra_technology_version=extra_technology_version,
+                source_url=source_url,
+                docker_info=docker_info,
+                skip_if_unchanged=skip_if_unchanged,
+                hash_cache=hash_cache,
+            )
+            responses = {"addJobVersion": upgrade_result["data"]["addJobVersion"]}
+            if skip_if_unchanged:
+                responses["upgradeSkipped"] = upgrade_result.get("upgradeSkipped", False)
 
             responses["editJob"] = self.edit(
                 job_id=job_id,
@@ -1237,7 +1435,279 @@ class Jobs:
             if v is not None  # Remove None values from the dict
         }
 
-        return self.create(**args)
+        result = self.create(**args)
+        if hash_cache and file and (created_job := (result["data"] or {}).get("createJob")):
+            ArtifactHashCache(hash_cache).set(
+                created_job["id"], created_job["versions"][0]["number"], *compute_file_hash(file)
+            )
+        return result
+
+    def plan(self, specs, project_id: str, hash_cache: Optional[str] = None) -> List[Dict]:
+        """Compute the minimal list of mutations needed to bring jobs of a project to a desired state.
+        The jobs of the project are fetched once, then each spec is compared field by field with
+        the current job and its current version. Nothing is modified on the platform.
+
+        Parameters
+        ----------
+        specs : dict or list of dict
+            Desired state of one or several jobs. Each spec uses the parameters of the create method
+            (job_name is mandatory, file, description, category, technology, technology_catalog,
+            runtime_version, command_line, release_note, extra_technology, extra_technology_version,
+            cron_scheduling, schedule_timezone, resources, emails, status_list, source_url, docker_info)
+            and the is_scheduled parameter of the edit method.
+            Keys that are missing or None are left unchanged on existing jobs
+        project_id : str
+            UUID of your project
+        hash_cache : str, optional
+            Path of a local JSON file caching the artifact digests by job id and version number.
+            If the current version of a job is not cached, its artifact is downloaded and hashed
+
+        Returns
+        -------
+        list of dict
+            One item per spec, in the same order, with the job name and id, the action
+            ('create', 'update' or 'unchanged'), the mutations to run ('createJob', 'addJobVersion',
+            'editJob'), the changed fields with their current and desired values, the artifact
+            status ('new', 'changed', 'unchanged' or None when the spec has no file) and the
+            'artifact_hash' of the file ({'sha256': ..., 'size': ...}, None when the spec has no file)
+
+        Raises
+        ------
+        ValueError
+            When a job name is missing or duplicated in the specs
+
+        Examples
+        --------
+        >>> saagieapi.jobs.plan(
+        ...     specs=[
+        ...         {"job_name": "my job", "file": "/tmp/test.py", "command_line": "python {file} arg1"},
+        ...         {"job_name": "my other job", "cron_scheduling": "0 0 * * *", "schedule_timezone": "UTC"},
+        ...     ],
+        ...     project_id="860b8dc8-e634-4c98-b2e7-f9ec32ab4771",
+        ... )
+        [
+            {
+                "job_name": "my job",
+                "job_id": "fc7b6f52-5c3e-45bb-9a5f-a34bcea0fc10",
+                "action": "update",
+                "mutations": ["addJobVersion"],
+                "changes": {
+                    "commandLine": {"current": "python {file}", "desired": "python {file} arg1"}
+                },
+                "artifact": "unchanged",
+                "artifact_hash": {"sha256": "9f86d081884c7d659a2feaa0c55ad015...", "size": 1024}
+            },
+            {
+                "job_name": "my other job",
+                "job_id": "e92ed170-50d6-4041-bba9-098a8e16f444",
+                "action": "unchanged",
+                "mutations": [],
+                "changes": {},
+                "artifact": None,
+                "artifact_hash": None
+            }
+        ]
+        """
+        specs = self.__check_specs(specs)
+        cache = ArtifactHashCache(hash_cache) if hash_cache else None
+        return self.__build_plan(specs, project_id, self.__list_jobs_by_name(project_id), cache)
+
+    def __check_specs(self, specs) -> List[Dict]:
+        """Check the job names, the scheduling and the alerting of job specs
+
+        Parameters
+        ----------
+        specs : dict or list of dict
+            Desired state of one or several jobs, see plan
+
+        Returns
+        -------
+        list of dict
+            List of specs
+        """
+        specs = [specs] if isinstance(specs, dict) else list(specs)
+        job_names = [spec.get("job_name") for spec in specs]
+        if not all(job_names):
+            raise ValueError("❌ Each job spec must have a job_name")
+        if duplicates := sorted({name for name in job_names if job_names.count(name) > 1}):
+            raise ValueError(f"❌ The following jobs are specified several times: {duplicates}")
+
+        for spec in specs:
+            if spec.get("cron_scheduling") and spec.get("is_scheduled") is not False:
+                self.saagie_api.check_scheduling(spec["cron_scheduling"], spec.get("schedule_timezone") or "UTC")
+            if spec.get("emails"):
+                self.saagie_api.check_alerting(spec["emails"], spec.get("status_list"))
+        return specs
+
+    def __list_jobs_by_name(self, project_id: str) -> Dict[str, Dict]:
+        """Fetch the jobs of a project with their current version, indexed by name"""
+        jobs = self.list_for_project(project_id, instances_limit=1, versions_only_current=True, pprint_result=False)
+        return {job["name"]: job for job in (jobs.get("jobs") or [])}
+
+    def __build_plan(
+        self, specs: List[Dict], project_id: str, jobs_by_name: Dict[str, Dict], cache: Optional[ArtifactHashCache]
+    ) -> List[Dict]:
+        """Compare job specs with the current jobs of a project, see plan"""
+        plan = []
+        for spec in specs:
+            job = jobs_by_name.get(spec["job_name"])
+            local_hash = compute_file_hash(spec["file"]) if spec.get("file") else None
+            artifact_hash = {"sha256": local_hash[0], "size": local_hash[1]} if local_hash else None
+            if not job:
+                plan.append(
+                    {
+                        "job_name": spec["job_name"],
+                        "job_id": None,
+                        "action": "create",
+                        "mutations": ["createJob"],
+                        "changes": {},
+                        "artifact": "new" if spec.get("file") else None,
+                        "artifact_hash": artifact_hash,
+                    }
+                )
+                continue
+
+            version = next(iter(job.get("versions") or []), None)
+            changes = diff_job_settings(spec, job)
+            version_changes = diff_version_settings(spec, version)
+            artifact = None
+            if spec.get("file"):
+                unchanged = self.__is_artifact_unchanged(job["id"], local_hash, version or {}, cache)
+                artifact = "unchanged" if unchanged else "changed"
+                if not unchanged:
+                    version_changes["artifact"] = {"current": (version or {}).get("number"), "desired": spec["file"]}
+
+            mutations = (["addJobVersion"] if version_changes else []) + (["editJob"] if changes else [])
+            plan.append(
+                {
+                    "job_name": spec["job_name"],
+                    "job_id": job["id"],
+                    "action": "update" if mutations else "unchanged",
+                    "mutations": mutations,
+                    "changes": {**version_changes, **changes},
+                    "artifact": artifact,
+                    "artifact_hash": artifact_hash,
+                }
+            )
+
+        logging.info("Plan for project [%s]: %s", project_id, summarize_plan(plan))
+        return plan
+
+    def apply(self, specs, project_id: str, hash_cache: Optional[str] = None) -> List[Dict]:
+        """Bring jobs of a project to a desired state, running only the needed mutations.
+        See the plan method for the format of the specs. Existing jobs are not fetched again: the
+        mutations are built from the state fetched by the plan, and the artifact is only uploaded
+        when its digest differs from the current version.
+
+        Parameters
+        ----------
+        specs : dict or list of dict
+            Desired state of one or several jobs, see plan
+        project_id : str
+            UUID of your project
+        hash_cache : str, optional
+            Path of a local JSON file caching the artifact digests by job id and version number.
+            It is updated with the digests of the uploaded artifacts
+
+        Returns
+        -------
+        list of dict
+            The plan items, with the responses of the mutations in the 'result' key, or the error
+            message in the 'error' key if the mutations of a job failed
+
+        Examples
+        --------
+        >>> saagieapi.jobs.apply(
+        ...     specs=[{"job_name": "my job", "file": "/tmp/test.py", "command_line": "python {file} arg1"}],
+        ...     project_id="860b8dc8-e634-4c98-b2e7-f9ec32ab4771",
+        ... )
+        [
+            {
+                "job_name": "my job",
+                "job_id": "fc7b6f52-5c3e-45bb-9a5f-a34bcea0fc10",
+                "action": "update",
+                "mutations": ["addJobVersion"],
+                "changes": {
+                    "commandLine": {"current": "python {file}", "desired": "python {file} arg1"}
+                },
+                "artifact": "unchanged",
+                "artifact_hash": {"sha256": "9f86d081884c7d659a2feaa0c55ad015...", "size": 1024},
+                "result": {"addJobVersion": {"number": 4}}
+            }
+        ]
+        """
+        specs = self.__check_specs(specs)
+        cache = ArtifactHashCache(hash_cache) if hash_cache else None
+        jobs_by_name = self.__list_jobs_by_name(project_id)
+        plan = self.__build_plan(specs, project_id, jobs_by_name, cache)
+
+        for spec, item in zip(specs, plan):
+            if not item["mutations"]:
+                continue
+            try:
+                item["result"] = self.__apply_job_spec(
+                    spec, item, project_id, jobs_by_name.get(item["job_name"]), cache
+                )
+            except Exception as exception:
+                logging.error("❌ Job [%s] has not been successfully applied: %s", item["job_name"], exception)
+                item["error"] = str(exception)
+        return plan
+
+    def __apply_job_spec(
+        self, spec: Dict, item: Dict, project_id: str, job: Optional[Dict], cache: Optional[ArtifactHashCache]
+    ) -> Dict:
+        """Run the mutations of a plan item
+
+        Parameters
+        ----------
+        spec : dict
+            Desired state of the job
+        item : dict
+            Plan item of the job
+        project_id : str
+            UUID of your project
+        job : dict, optional
+            Current state of the job, None if the job has to be created
+        cache : ArtifactHashCache, optional
+            Local cache of the artifact digests
+
+        Returns
+        -------
+        dict
+            Responses of the mutations, by mutation name
+        """
+        artifact_hash = item.get("artifact_hash")
+        if "createJob" in item["mutations"]:
+            schedule_keys = ("is_scheduled", "cron_scheduling", "schedule_timezone")
+            args = {k: v for k, v in spec.items() if v is not None and k not in schedule_keys}
+            schedule = desired_schedule(spec) or {"isScheduled": False}
+            if schedule["isScheduled"]:
+                args.update(cron_scheduling=schedule["cronScheduling"], schedule_timezone=schedule["scheduleTimezone"])
+            result = self.create(project_id=project_id, **args)["data"]
+            if cache and artifact_hash and (created_job := (result or {}).get("createJob")):
+                cache.set(
+                    created_job["id"],
+                    created_job["versions"][0]["number"],
+                    artifact_hash["sha256"],
+                    artifact_hash["size"],
+                )
+            return result
+
+        result = {}
+        version = next(iter(job.get("versions") or []), None)
+        if "addJobVersion" in item["mutations"]:
+            file = spec.get("file") if item["artifact"] == "changed" else None
+            params = build_upgrade_params(spec, job, version, use_previous_artifact=file is None)
+            result.update(self.__launch_request(file, GQL_UPGRADE_JOB, params)["data"])
+            if cache and artifact_hash and (new_version := result.get("addJobVersion")):
+                cache.set(job["id"], new_version["number"], artifact_hash["sha256"], artifact_hash["size"])
+            logging.info("✅ Job [%s] successfully upgraded", job["id"])
+
+        if "editJob" in item["mutations"]:
+            params = build_edit_params(spec, job, item["changes"])
+            result.update(self.saagie_api.client.execute(query=gql(GQL_EDIT_JOB), variable_values=params))
+            logging.info("✅ Job [%s] successfully edited", job["id"])
+        return result
 
     def rollback(self, job_id: str, version_number: str):
         """Rollback a given job to the given version
@@ -1483,6 +1953,9 @@ class Jobs:
         error_folder: Optional[str] = "",
         versions_limit: Optional[int] = None,
         versions_only_current: bool = False,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+        resume: bool = True,
     ) -> bool:
         """Export the job in a folder
 
@@ -1499,6 +1972,12 @@ class Jobs:
             to the oldest
         versions_only_current : bool, optional
             Whether to only fetch the current version of each job
+        max_workers : int, optional
+            Maximum number of versions downloaded concurrently
+        chunk_size : int, optional
+            Size in bytes of the chunks written to the version files
+        resume : bool, optional
+            Whether to skip versions already downloaded and resume partially downloaded versions
 
         Returns
         -------
@@ -1545,28 +2024,150 @@ class Jobs:
         job_info["technology"]["technology_catalog"] = repo_name
         write_to_json_file(output_folder / job_id / "job.json", job_info)
 
-        for version in [version for version in job_info.get("versions", []) if version["packageInfo"]]:
-            local_folder = output_folder / job_id / "version" / str(version["number"])
-            create_folder(local_folder)
-            req = requests.get(
+        versions = [version for version in job_info.get("versions", []) if version["packageInfo"]]
+        self.__download_versions(
+            [(job_id, version) for version in versions], output_folder, error_folder, max_workers, chunk_size, resume
+        )
+
+        logging.info("✅ Job [%s] successfully exported", job_id)
+        return True
+
+    def download_versions(
+        self,
+        job_ids: List[str],
+        output_folder: str,
+        error_folder: Optional[str] = "",
+        versions_limit: Optional[int] = None,
+        versions_only_current: bool = False,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+        resume: bool = True,
+    ) -> Dict[str, bool]:
+        """Download the artifacts of the versions of several jobs, with the same folder layout as export
+        (output_folder/job_id/version/number/artifact). All the versions of all the jobs are downloaded
+        in a single pool of concurrent downloads
+
+        Parameters
+        ----------
+        job_ids : list of str
+            UUID of the jobs
+        output_folder : str
+            Path to store the downloaded artifacts
+        error_folder : str, optional
+            Path to store the job ID in case of error. If not set, job ID is not write
+        versions_limit : int, optional
+            Maximum limit of versions to fetch per job. Fetch from most recent
+            to the oldest
+        versions_only_current : bool, optional
+            Whether to only fetch the current version of each job
+        max_workers : int, optional
+            Maximum number of versions downloaded concurrently
+        chunk_size : int, optional
+            Size in bytes of the chunks written to the version files
+        resume : bool, optional
+            Whether to skip versions already downloaded and resume partially downloaded versions
+
+        Returns
+        -------
+        dict
+            Dict of job IDs with True if all the versions of the job have been downloaded, False otherwise
+
+        Examples
+        --------
+        >>> saagieapi.jobs.download_versions(
+        ...    job_ids=["f5fce22d-2152-4a01-8c6a-4c2eb4808b6d", "e92ed170-50d6-4041-bba9-098a8e16f444"],
+        ...    output_folder="./output/job/",
+        ...    max_workers=8
+        ... )
+        {
+            "f5fce22d-2152-4a01-8c6a-4c2eb4808b6d": True,
+            "e92ed170-50d6-4041-bba9-098a8e16f444": True
+        }
+        """
+        output_folder = Path(output_folder)
+        downloads = []
+        status = {}
+        for job_id in job_ids:
+            try:
+                job_info = self.get_info(
+                    job_id=job_id,
+                    instances_limit=1,
+                    versions_limit=versions_limit,
+                    versions_only_current=versions_only_current,
+                    pprint_result=False,
+                )["job"]
+            except Exception as exception:
+                logging.error("Something went wrong %s", exception)
+                job_info = None
+            if not job_info:
+                status[job_id] = handle_write_error("Cannot get the information of the job [%s]", job_id, error_folder)
+                continue
+            status[job_id] = True
+            downloads.extend((job_id, version) for version in job_info.get("versions", []) if version["packageInfo"])
+
+        for job_id, _ in self.__download_versions(
+            downloads, output_folder, error_folder, max_workers, chunk_size, resume
+        ):
+            status[job_id] = False
+        return status
+
+    def __download_versions(
+        self,
+        downloads: List[Tuple[str, Dict]],
+        output_folder: Path,
+        error_folder: Optional[str],
+        max_workers: int,
+        chunk_size: int,
+        resume: bool,
+    ) -> List[Tuple[str, Dict]]:
+        """Download concurrently the artifacts of job versions to output_folder/job_id/version/number/
+
+        Parameters
+        ----------
+        downloads : list of (str, dict)
+            Job ID and version to download, the version must have a packageInfo
+        output_folder : Path
+            Path to store the downloaded artifacts
+        error_folder : str, optional
+            Path to store the job ID in case of error
+        max_workers : int
+            Maximum number of concurrent downloads
+        chunk_size : int
+            Size in bytes of the chunks written to the files
+        resume : bool
+            Whether to skip versions already downloaded and resume partially downloaded versions
+
+        Returns
+        -------
+        list of (str, dict)
+            Job ID and version of the failed downloads
+        """
+        for job_id, version in downloads:
+            create_folder(output_folder / job_id / "version" / str(version["number"]))
+
+        def download(job_version):
+            job_id, version = job_version
+            logging.info("Downloading the version %s of the job %s", version["number"], job_id)
+            return download_file(
                 f'{remove_slash_folder_path(self.saagie_api.url_saagie)}{version["packageInfo"]["downloadUrl"]}',
+                output_folder / job_id / "version" / str(version["number"]) / version["packageInfo"]["name"],
                 auth=self.saagie_api.auth,
-                stream=True,
-                timeout=60,
+                chunk_size=chunk_size,
+                resume=resume,
             )
-            if req.status_code == 200:
-                logging.info("Downloading the version %s of the job", version["number"])
-                write_request_response_to_file(local_folder / version["packageInfo"]["name"], req)
-            else:
+
+        failed = []
+        for (job_id, version), _, exception in run_concurrently(download, downloads, max_workers=max_workers):
+            if exception:
+                logging.error("Something went wrong %s", exception)
                 handle_write_error(
                     f"❌ Cannot download the version [{version['number']}] of the job [%s], \
                         please verify if everything is ok",
                     job_id,
                     error_folder,
                 )
-
-        logging.info("✅ Job [%s] successfully exported", job_id)
-        return True
+                failed.append((job_id, version))
+        return failed
 
     def import_from_json(
         self,
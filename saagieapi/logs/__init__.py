@@ -0,0 +1,4 @@
+from .log_reader import ENTITY_TYPES, LogReader
+from .log_store import LogStore
+
+__all__ = ["ENTITY_TYPES", "LogReader", "LogStore"]
@@ -0,0 +1,238 @@
+import json
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Union
+
+from ..utils.concurrency import DEFAULT_MAX_WORKERS, iter_concurrently
+
+ENTITY_TYPES = ("app_execution", "job_instance", "condition_instance")
+DEFAULT_STREAMS = [
+    "ENVVARS_STDOUT",
+    "ENVVARS_STDERR",
+    "ORCHESTRATION_STDOUT",
+    "ORCHESTRATION_STDERR",
+    "STDERR",
+    "STDOUT",
+]
+DEFAULT_LOG_PAGE_SIZE = 1000
+
+
+class LogReader:
+    """Read the logs of app executions, job instances and condition instances from the log-proxy, page by page
+
+    Examples
+    --------
+    Write all the logs of a job instance to a file, fetching 4 pages at a time:
+
+    >>> reader = LogReader(saagie_api, page_size=5000, max_workers=4)
+    >>> reader.write_to_file(
+    ...     "job_instance",
+    ...     project_id="860b8dc8-e634-4c98-b2e7-f9ec32ab4771",
+    ...     instance_id="e3e31074-4a12-450e-96e4-0eae7801dfca",
+    ...     file_path="/tmp/driver.log",
+    ...     streams=["STDOUT", "STDERR"],
+    ... )
+    1254302
+
+    Follow the logs of an app execution until the app is stopped:
+
+    >>> for line in reader.iter_lines(
+    ...     "app_execution",
+    ...     project_id="860b8dc8-e634-4c98-b2e7-f9ec32ab4771",
+    ...     instance_id="e3e31074-4a12-450e-96e4-0eae7801dfca",
+    ...     follow=True,
+    ...     stop_when=lambda: app_is_stopped(),
+    ... ):
+    ...     print(line["value"])
+    """
+
+    def __init__(self, saagie_api, page_size: int = DEFAULT_LOG_PAGE_SIZE, max_workers: int = DEFAULT_MAX_WORKERS):
+        """
+        Parameters
+        ----------
+        saagie_api : SaagieApi
+            Connection to the platform
+        page_size : int
+            Number of log lines fetched by request
+        max_workers : int
+            Maximum number of pages fetched concurrently. It also bounds the number of pages held in memory
+
+        Raises
+        ------
+        ValueError
+            If page_size is lower than 1
+        """
+        if page_size < 1:
+            raise ValueError("❌ page_size must be greater than 0")
+        self.saagie_api = saagie_api
+        self.page_size = page_size
+        self.max_workers = max_workers
+
+    def fetch_page(
+        self,
+        entity_type: str,
+        project_id: str,
+        instance_id: str,
+        skip: int = 0,
+        limit: Optional[int] = None,
+        streams: Optional[List[str]] = None,
+    ) -> Dict:
+        """Fetch one page of logs
+
+        Parameters
+        ----------
+        entity_type : str
+            Type of the instance: app_execution, job_instance or condition_instance
+        project_id : str
+            UUID of the project
+        instance_id : str
+            UUID of the app execution, job instance or condition instance
+        skip : int, optional
+            Number of log lines to skip from the beginning
+        limit : int, optional
+            Number of log lines to return, default to page_size
+        streams : List[str], optional
+            Streams of logs to fetch, default to all of them:
+            ENVVARS_STDOUT, ENVVARS_STDERR, ORCHESTRATION_STDOUT, ORCHESTRATION_STDERR, STDERR, STDOUT
+
+        Returns
+        -------
+        dict
+            Page of logs as returned by the log-proxy, with the keys "logs" and "total"
+
+        Raises
+        ------
+        ValueError
+            If entity_type is not valid
+        """
+        if entity_type not in ENTITY_TYPES:
+            raise ValueError(f"❌ 'entity_type' must be one of {', '.join(ENTITY_TYPES)}")
+        limit = self.page_size if limit is None else limit
+        log_stream = ",".join(streams or DEFAULT_STREAMS)
+        url = (
+            f"{self.saagie_api.url_saagie}log-proxy/api/logs/{self.saagie_api.realm}/platform/"
+            f"{self.saagie_api.platform}/project/{project_id}/{entity_type}/{instance_id}"
+            f"?limit={limit}&skip={skip}&streams={log_stream}"
+        )
+        response = self.saagie_api.request_client.send(method="GET", url=url, raise_for_status=True)
+        return response.json()
+
+    def count(self, entity_type: str, project_id: str, instance_id: str, streams: Optional[List[str]] = None) -> int:
+        """Get the number of log lines of an instance, see fetch_page for the parameters"""
+        return self.fetch_page(entity_type, project_id, instance_id, skip=0, limit=1, streams=streams)["total"]
+
+    def iter_lines(
+        self,
+        entity_type: str,
+        project_id: str,
+        instance_id: str,
+        streams: Optional[List[str]] = None,
+        skip: int = 0,
+        follow: bool = False,
+        poll_interval: float = 5,
+        timeout: float = -1,
+        stop_when: Optional[Callable[[], bool]] = None,
+    ) -> Iterator[Dict]:
+        """Iterate over the log lines of an instance, in order.
+        The number of lines is read first, then the pages are fetched concurrently, at most max_workers at a time.
+        In follow mode, the lines written afterwards are then polled, starting at the first index not read yet
+
+        Parameters
+        ----------
+        entity_type : str
+            Type of the instance: app_execution, job_instance or condition_instance
+        project_id : str
+            UUID of the project
+        instance_id : str
+            UUID of the app execution, job instance or condition instance
+        streams : List[str], optional
+            Streams of logs to fetch, default to all of them
+        skip : int, optional
+            Number of log lines to skip from the beginning
+        follow : bool, optional
+            Whether to keep polling for new lines once all the existing ones are read
+        poll_interval : float, optional
+            Number of seconds between 2 polls in follow mode
+        timeout : float, optional
+            Number of seconds after which the follow mode stops, -1 for no timeout
+        stop_when : Callable, optional
+            Function called in follow mode before each poll, that returns True when no line will be added anymore
+            (the instance is finished). Following stops once it returned True and the poll got no new line
+
+        Yields
+        ------
+        dict
+            Log lines, with the keys "index", "stream", "value" and, for apps, "time"
+        """
+        index = skip
+        total = self.count(entity_type, project_id, instance_id, streams)
+        pages = iter_concurrently(
+            lambda page_skip: (
+                page_skip,
+                self.fetch_page(entity_type, project_id, instance_id, page_skip, streams=streams).get("logs") or [],
+            ),
+            range(skip, total, self.page_size),
+            self.max_workers,
+        )
+        for page_skip, lines in pages:
+            yield from lines
+            index = page_skip + len(lines)
+        if not follow:
+            return
+
+        sec = 0
+        while True:
+            finished = stop_when() if stop_when is not None else False
+            lines = self.fetch_page(entity_type, project_id, instance_id, index, streams=streams).get("logs") or []
+            yield from lines
+            index += len(lines)
+            if len(lines) == self.page_size:
+                continue
+            if (finished and not lines) or (timeout != -1 and sec >= timeout):
+                return
+            time.sleep(poll_interval)
+            sec += poll_interval
+
+    def write_to_file(
+        self,
+        entity_type: str,
+        project_id: str,
+        instance_id: str,
+        file_path: Union[str, Path],
+        streams: Optional[List[str]] = None,
+        with_metadata: bool = False,
+        **kwargs,
+    ) -> int:
+        """Write the log lines of an instance to a file as they are fetched, so that memory does not grow with
+        the size of the logs
+
+        Parameters
+        ----------
+        entity_type : str
+            Type of the instance: app_execution, job_instance or condition_instance
+        project_id : str
+            UUID of the project
+        instance_id : str
+            UUID of the app execution, job instance or condition instance
+        file_path : str or Path
+            Path of the file to write, overwritten if it exists
+        streams : List[str], optional
+            Streams of logs to fetch, default to all of them
+        with_metadata : bool, optional
+            Whether to write each line as a JSON object with its index, stream and time (JSON Lines) instead of
+            its value only
+        **kwargs
+            Other parameters of iter_lines (skip, follow, poll_interval, timeout, stop_when)
+
+        Returns
+        -------
+        int
+            Number of lines written
+        """
+        count = 0
+        with Path(file_path).open("w", encoding="utf-8") as file:
+            for line in self.iter_lines(entity_type, project_id, instance_id, streams=streams, **kwargs):
+                file.write(json.dumps(line) if with_metadata else line.get("value") or "")
+                file.write("\n")
+                count += 1
+        return count
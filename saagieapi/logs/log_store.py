@@ -0,0 +1,332 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+from ..utils.date_functions import parse_datetime
+from .log_reader import ENTITY_TYPES, LogReader
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS log_lines (
+    id INTEGER PRIMARY KEY,
+    project_id TEXT NOT NULL,
+    entity_type TEXT NOT NULL,
+    entity_id TEXT,
+    instance_id TEXT NOT NULL,
+    line_index INTEGER NOT NULL,
+    stream TEXT,
+    timestamp REAL NOT NULL,
+    value TEXT NOT NULL,
+    UNIQUE (entity_type, instance_id, stream, line_index)
+);
+CREATE INDEX IF NOT EXISTS log_lines_timestamp ON log_lines (timestamp);
+CREATE INDEX IF NOT EXISTS log_lines_project ON log_lines (project_id, timestamp);
+CREATE TABLE IF NOT EXISTS ingestions (
+    entity_type TEXT NOT NULL,
+    instance_id TEXT NOT NULL,
+    streams TEXT NOT NULL,
+    next_skip INTEGER NOT NULL,
+    PRIMARY KEY (entity_type, instance_id, streams)
+);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS log_lines_fts USING fts5(value, content='log_lines', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS log_lines_insert AFTER INSERT ON log_lines BEGIN
+    INSERT INTO log_lines_fts(rowid, value) VALUES (new.id, new.value);
+END;
+CREATE TRIGGER IF NOT EXISTS log_lines_delete AFTER DELETE ON log_lines BEGIN
+    INSERT INTO log_lines_fts(log_lines_fts, rowid, value) VALUES ('delete', old.id, old.value);
+END;
+"""
+
+_COLUMNS = ("project_id", "entity_type", "entity_id", "instance_id", "line_index", "stream", "timestamp", "value")
+
+
+class LogStore:
+    """Local archive of log lines, stored in SQLite and indexed for full-text search with FTS5 when the SQLite
+    library supports it. Lines are identified by project, entity, instance, stream and time
+
+    Examples
+    --------
+    Archive the logs of a failed job instance, then search them:
+
+    >>> store = LogStore("/tmp/logs.db")
+    >>> store.ingest(
+    ...     LogReader(saagie_api),
+    ...     "job_instance",
+    ...     project_id="860b8dc8-e634-4c98-b2e7-f9ec32ab4771",
+    ...     instance_id="e3e31074-4a12-450e-96e4-0eae7801dfca",
+    ...     entity_id="f5fce22d-2152-4a01-8c6a-4c2eb4808b6d",
+    ... )
+    1532
+    >>> store.search("OutOfMemoryError", since="2024-04-09T00:00:00Z", stream="STDERR")
+    [
+        {
+            "project_id": "860b8dc8-e634-4c98-b2e7-f9ec32ab4771",
+            "entity_type": "job_instance",
+            "entity_id": "f5fce22d-2152-4a01-8c6a-4c2eb4808b6d",
+            "instance_id": "e3e31074-4a12-450e-96e4-0eae7801dfca",
+            "line_index": 1498,
+            "stream": "STDERR",
+            "time": "2024-04-09T13:38:36.982000+00:00",
+            "value": "java.lang.OutOfMemoryError: Java heap space"
+        }
+    ]
+    """
+
+    def __init__(self, path: Union[str, Path] = ":memory:", use_fts: Optional[bool] = None):
+        """
+        Parameters
+        ----------
+        path : str or Path
+            Path of the SQLite database, created if it does not exist. Default to an in-memory database
+        use_fts : bool, optional
+            Whether to index the lines with FTS5. If None, FTS5 is used when available. Without it, search looks
+            for the query as a substring
+
+        Raises
+        ------
+        RuntimeError
+            If use_fts is True and the SQLite library does not support FTS5
+        """
+        self.connection = sqlite3.connect(str(path))
+        self.connection.executescript(_SCHEMA)
+        self.use_fts = False
+        if use_fts is not False:
+            try:
+                self.connection.executescript(_FTS_SCHEMA)
+                self.use_fts = True
+            except sqlite3.OperationalError as exception:
+                if use_fts:
+                    raise RuntimeError("❌ FTS5 is not available in this SQLite library") from exception
+        self.connection.commit()
+
+    def close(self) -> None:
+        """Close the database"""
+        self.connection.close()
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM log_lines").fetchone()[0]
+
+    def add_lines(
+        self,
+        entity_type: str,
+        project_id: str,
+        instance_id: str,
+        lines: Iterable[Dict],
+        entity_id: Optional[str] = None,
+    ) -> int:
+        """Store log lines, as returned in the "logs" of a log-proxy page (see LogReader, Apps.get_logs and
+        SaagieApi.get_condition_instance_logs_by_instance). Lines already stored are ignored
+
+        Parameters
+        ----------
+        entity_type : str
+            Type of the instance: app_execution, job_instance or condition_instance
+        project_id : str
+            UUID of the project
+        instance_id : str
+            UUID of the app execution, job instance or condition instance
+        lines : Iterable[dict]
+            Log lines with the keys "index", "value", and optionally "stream" and "time".
+            Lines without time are stored with the current time
+        entity_id : str, optional
+            UUID of the app, job or condition node the instance belongs to
+
+        Returns
+        -------
+        int
+            Number of lines added
+
+        Raises
+        ------
+        ValueError
+            If entity_type is not valid
+        """
+        if entity_type not in ENTITY_TYPES:
+            raise ValueError(f"❌ 'entity_type' must be one of {', '.join(ENTITY_TYPES)}")
+        now = datetime.now(timezone.utc).timestamp()
+        rows = (
+            (
+                project_id,
+                entity_type,
+                entity_id,
+                instance_id,
+                line["index"],
+                line.get("stream"),
+                parse_datetime(line["time"]).timestamp() if line.get("time") else now,
+                line.get("value") or "",
+            )
+            for line in lines
+        )
+        with self.connection:
+            cursor = self.connection.executemany(
+                f"INSERT OR IGNORE INTO log_lines ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                rows,
+            )
+        return max(cursor.rowcount, 0)
+
+    def ingest(
+        self,
+        reader: LogReader,
+        entity_type: str,
+        project_id: str,
+        instance_id: str,
+        entity_id: Optional[str] = None,
+        streams: Optional[List[str]] = None,
+        batch_size: int = 1000,
+    ) -> int:
+        """Fetch and store the log lines of an instance. Only the lines written since the previous ingestion of
+        the same instance and streams are fetched
+
+        Parameters
+        ----------
+        reader : LogReader
+            Reader used to fetch the lines
+        entity_type : str
+            Type of the instance: app_execution, job_instance or condition_instance
+        project_id : str
+            UUID of the project
+        instance_id : str
+            UUID of the app execution, job instance or condition instance
+        entity_id : str, optional
+            UUID of the app, job or condition node the instance belongs to
+        streams : List[str], optional
+            Streams of logs to fetch, default to all of them
+        batch_size : int, optional
+            Number of lines inserted by transaction
+
+        Returns
+        -------
+        int
+            Number of lines added
+        """
+        streams_key = ",".join(sorted(streams or []))
+        row = self.connection.execute(
+            "SELECT next_skip FROM ingestions WHERE entity_type = ? AND instance_id = ? AND streams = ?",
+            (entity_type, instance_id, streams_key),
+        ).fetchone()
+        skip = row[0] if row else 0
+        added = 0
+        batch = []
+        for line in reader.iter_lines(entity_type, project_id, instance_id, streams=streams, skip=skip):
+            batch.append(line)
+            if len(batch) >= batch_size:
+                added += self.add_lines(entity_type, project_id, instance_id, batch, entity_id)
+                skip += len(batch)
+                batch = []
+        added += self.add_lines(entity_type, project_id, instance_id, batch, entity_id)
+        skip += len(batch)
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO ingestions (entity_type, instance_id, streams, next_skip) VALUES (?, ?, ?, ?)",
+                (entity_type, instance_id, streams_key, skip),
+            )
+        return added
+
+    def search(
+        self,
+        query: str,
+        since: Optional[Union[str, datetime]] = None,
+        stream: Optional[str] = None,
+        project_id: Optional[str] = None,
+        instance_id: Optional[str] = None,
+        limit: Optional[int] = 100,
+    ) -> List[Dict]:
+        """Search the stored log lines
+
+        Parameters
+        ----------
+        query : str
+            With FTS5, a full-text query (for example 'OutOfMemoryError', '"heap space"' or 'error NOT retry').
+            Otherwise, a substring to look for
+        since : str or datetime, optional
+            Only return the lines written at or after this date
+        stream : str, optional
+            Only return the lines of this stream, for example STDERR
+        project_id : str, optional
+            Only return the lines of this project
+        instance_id : str, optional
+            Only return the lines of this instance
+        limit : int, optional
+            Maximum number of lines to return, default to 100. None for no limit
+
+        Returns
+        -------
+        list of dict
+            Matching lines sorted by time, with the keys "project_id", "entity_type", "entity_id", "instance_id",
+            "line_index", "stream", "time" (ISO 8601) and "value"
+        """
+        if self.use_fts:
+            sql = "SELECT l.* FROM log_lines_fts f JOIN log_lines l ON l.id = f.rowid WHERE log_lines_fts MATCH ?"
+            params: List = [query]
+        else:
+            sql = "SELECT l.* FROM log_lines l WHERE instr(l.value, ?) > 0"
+            params = [query]
+        for column, value in (("stream", stream), ("project_id", project_id), ("instance_id", instance_id)):
+            if value is not None:
+                sql += f" AND l.{column} = ?"
+                params.append(value)
+        if since is not None:
+            sql += " AND l.timestamp >= ?"
+            params.append(parse_datetime(since).timestamp())
+        sql += " ORDER BY l.timestamp, l.instance_id, l.line_index"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        cursor = self.connection.execute(sql, params)
+        names = [description[0] for description in cursor.description]
+        results = []
+        for row in cursor:
+            line = dict(zip(names, row))
+            line.pop("id")
+            line["time"] = datetime.fromtimestamp(line.pop("timestamp"), timezone.utc).isoformat()
+            results.append(line)
+        return results
+
+    def purge(
+        self,
+        older_than_days: Optional[float] = None,
+        before: Optional[Union[str, datetime]] = None,
+        project_id: Optional[str] = None,
+        instance_id: Optional[str] = None,
+    ) -> int:
+        """Delete stored log lines. Without parameter, every line is deleted
+
+        Parameters
+        ----------
+        older_than_days : float, optional
+            Delete the lines written more than this number of days ago
+        before : str or datetime, optional
+            Delete the lines written before this date
+        project_id : str, optional
+            Only delete the lines of this project
+        instance_id : str, optional
+            Only delete the lines of this instance. Its next ingestion will fetch all its lines again
+
+        Returns
+        -------
+        int
+            Number of lines deleted
+        """
+        conditions = []
+        params: List = []
+        if older_than_days is not None:
+            conditions.append("timestamp < ?")
+            params.append((datetime.now(timezone.utc) - timedelta(days=older_than_days)).timestamp())
+        if before is not None:
+            conditions.append("timestamp < ?")
+            params.append(parse_datetime(before).timestamp())
+        for column, value in (("project_id", project_id), ("instance_id", instance_id)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self.connection:
+            deleted = self.connection.execute(f"DELETE FROM log_lines{where}", params).rowcount
+            if instance_id is not None:
+                self.connection.execute("DELETE FROM ingestions WHERE instance_id = ?", (instance_id,))
+            elif not conditions:
+                self.connection.execute("DELETE FROM ingestions")
+        return deleted
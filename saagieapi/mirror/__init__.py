@@ -0,0 +1,3 @@
+from .inventory_mirror import InventoryMirror
+
+__all__ = ["InventoryMirror"]
@@ -0,0 +1,97 @@
+GQL_MIRROR_PROJECT_SUMMARY = """
+query mirrorProjectQuery($projectId: UUID!) {
+    jobs(projectId: $projectId) {
+        id
+        name
+        alias
+        category
+        creationDate
+        isScheduled
+        cronScheduling
+        scheduleTimezone
+        scheduleStatus
+        isStreaming
+        technology {
+            id
+        }
+        versions(onlyCurrent: true) {
+            number
+            creationDate
+        }
+    }
+    project(id: $projectId) {
+        pipelines {
+            id
+            name
+            alias
+            creationDate
+            isScheduled
+            cronScheduling
+            scheduleTimezone
+            scheduleStatus
+            versions(onlyCurrent: true) {
+                number
+                creationDate
+            }
+        }
+        apps {
+            id
+            name
+            creationDate
+            technology {
+                id
+            }
+            currentVersion {
+                number
+                creationDate
+            }
+        }
+    }
+}
+"""
+
+GQL_MIRROR_JOB_FRAGMENT = """
+fragment mirrorJob on Job {
+    id
+    versions(onlyCurrent: true) {
+        number
+        creationDate
+        runtimeVersion
+        commandLine
+        dockerInfo {
+            image
+        }
+    }
+}
+"""
+
+GQL_MIRROR_PIPELINE_FRAGMENT = """
+fragment mirrorPipeline on Pipeline {
+    id
+    versions(onlyCurrent: true) {
+        number
+        creationDate
+        graph {
+            jobNodes {
+                job {
+                    id
+                }
+            }
+        }
+    }
+}
+"""
+
+GQL_MIRROR_APP_FRAGMENT = """
+fragment mirrorApp on App {
+    id
+    currentVersion {
+        number
+        creationDate
+        runtimeContextId
+        dockerInfo {
+            image
+        }
+    }
+}
+"""
@@ -0,0 +1,565 @@
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from gql import gql
+
+from ..utils.concurrency import DEFAULT_MAX_WORKERS, run_concurrently
+from .gql_queries import *
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    creator TEXT,
+    description TEXT,
+    jobs_count INTEGER,
+    status TEXT,
+    refreshed_at REAL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    project_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    alias TEXT,
+    category TEXT,
+    technology_id TEXT,
+    creation_date TEXT,
+    is_scheduled INTEGER,
+    cron_scheduling TEXT,
+    schedule_timezone TEXT,
+    schedule_status TEXT,
+    is_streaming INTEGER,
+    version_number INTEGER,
+    runtime_version TEXT,
+    command_line TEXT,
+    docker_image TEXT,
+    fingerprint TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_project ON jobs (project_id);
+CREATE INDEX IF NOT EXISTS jobs_technology ON jobs (technology_id, runtime_version);
+CREATE TABLE IF NOT EXISTS pipelines (
+    id TEXT PRIMARY KEY,
+    project_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    alias TEXT,
+    creation_date TEXT,
+    is_scheduled INTEGER,
+    cron_scheduling TEXT,
+    schedule_timezone TEXT,
+    schedule_status TEXT,
+    version_number INTEGER,
+    fingerprint TEXT
+);
+CREATE INDEX IF NOT EXISTS pipelines_project ON pipelines (project_id);
+CREATE TABLE IF NOT EXISTS pipeline_jobs (
+    pipeline_id TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    PRIMARY KEY (pipeline_id, job_id)
+);
+CREATE INDEX IF NOT EXISTS pipeline_jobs_job ON pipeline_jobs (job_id);
+CREATE TABLE IF NOT EXISTS apps (
+    id TEXT PRIMARY KEY,
+    project_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    technology_id TEXT,
+    creation_date TEXT,
+    version_number INTEGER,
+    runtime_context_id TEXT,
+    docker_image TEXT,
+    fingerprint TEXT
+);
+CREATE INDEX IF NOT EXISTS apps_project ON apps (project_id);
+CREATE TABLE IF NOT EXISTS env_vars (
+    entity_type TEXT NOT NULL,
+    entity_id TEXT,
+    project_id TEXT,
+    name TEXT NOT NULL,
+    scope TEXT,
+    value TEXT,
+    description TEXT,
+    is_password INTEGER
+);
+CREATE INDEX IF NOT EXISTS env_vars_name ON env_vars (name);
+CREATE INDEX IF NOT EXISTS env_vars_entity ON env_vars (entity_type, entity_id);
+"""
+
+# kind, also name of its table -> (query field, fragment name, fragment, columns filled from the project summary)
+_KINDS = {
+    "jobs": (
+        "job",
+        "mirrorJob",
+        GQL_MIRROR_JOB_FRAGMENT,
+        (
+            "name",
+            "alias",
+            "category",
+            "technology_id",
+            "creation_date",
+            "is_scheduled",
+            "cron_scheduling",
+            "schedule_timezone",
+            "schedule_status",
+            "is_streaming",
+        ),
+    ),
+    "pipelines": (
+        "graphPipeline",
+        "mirrorPipeline",
+        GQL_MIRROR_PIPELINE_FRAGMENT,
+        ("name", "alias", "creation_date", "is_scheduled", "cron_scheduling", "schedule_timezone", "schedule_status"),
+    ),
+    "apps": ("app", "mirrorApp", GQL_MIRROR_APP_FRAGMENT, ("name", "technology_id", "creation_date")),
+}
+_ENV_VAR_SCOPES = {"projects": "PROJECT", "pipelines": "PIPELINE", "apps": "APP"}
+
+
+def build_details_query(kind: str, count: int) -> str:
+    """
+    Build a query fetching the details of count jobs, pipelines or apps in a single request, the entity i being
+    returned under the alias "entity<i>" and its id given by the variable "id<i>"
+    """
+    field, fragment_name, fragment, _ = _KINDS[kind]
+    variables = ", ".join(f"$id{index}: UUID!" for index in range(count))
+    fields = "\n".join(f"    entity{index}: {field}(id: $id{index}){{ ...{fragment_name} }}" for index in range(count))
+    return f"query mirrorDetailsQuery({variables}){{\n{fields}\n}}\n{fragment}"
+
+
+def _current_version(entity: Dict) -> Dict:
+    if "currentVersion" in entity:
+        return entity["currentVersion"] or {}
+    return next(iter(entity.get("versions") or []), {})
+
+
+def _fingerprint(entity: Dict) -> Optional[str]:
+    """Number and creation date of the current version: the details of an entity are fetched again when it changes"""
+    version = _current_version(entity)
+    return f"{version.get('number')}|{version.get('creationDate')}" if version else None
+
+
+def _summary_row(kind: str, entity: Dict) -> Dict:
+    row = {
+        "name": entity["name"],
+        "alias": entity.get("alias"),
+        "category": entity.get("category"),
+        "technology_id": (entity.get("technology") or {}).get("id"),
+        "creation_date": entity.get("creationDate"),
+        "is_scheduled": entity.get("isScheduled"),
+        "cron_scheduling": entity.get("cronScheduling"),
+        "schedule_timezone": entity.get("scheduleTimezone"),
+        "schedule_status": entity.get("scheduleStatus"),
+        "is_streaming": entity.get("isStreaming"),
+    }
+    return {column: row[column] for column in _KINDS[kind][3]}
+
+
+class InventoryMirror:
+    """Local copy of the inventory of a platform (projects, jobs, pipelines, apps and environment variables) in
+    SQLite, to search it without calling the platform.
+
+    Each refresh fetches one summary of each project (names, schedules, technologies, number and creation date
+    of the current versions). The details of the current version of the jobs, pipelines and apps (runtime,
+    command line, docker image, jobs of the pipeline graph) are only fetched for the new entities and the ones
+    whose current version changed since the previous refresh, a few dozen entities per request. Environment
+    variables have no version: they are fetched again at each refresh, a few dozen entities per request, unless
+    env_vars is False.
+
+    Examples
+    --------
+    >>> mirror = InventoryMirror("/tmp/inventory.db")
+    >>> mirror.refresh(saagie_api)
+    {
+        "projects": 12,
+        "fetched": {"jobs": 3, "pipelines": 0, "apps": 1},
+        "unchanged": {"jobs": 412, "pipelines": 38, "apps": 25},
+        "removed": {"projects": 0, "jobs": 1, "pipelines": 0, "apps": 0},
+        "env_vars": 236,
+        "errors": {}
+    }
+    >>> mirror.search_jobs("ingest")
+    [
+        {
+            "id": "f5fce22d-2152-4a01-8c6a-4c2eb4808b6d",
+            "project_id": "860b8dc8-e634-4c98-b2e7-f9ec32ab4771",
+            "project_name": "Project A",
+            "name": "daily ingestion",
+            ...
+        }
+    ]
+    >>> [schedule["name"] for schedule in mirror.cron_schedules()]
+    ['daily ingestion', 'nightly']
+    """
+
+    def __init__(self, path: Union[str, Path] = ":memory:"):
+        """
+        Parameters
+        ----------
+        path : str or Path
+            Path of the SQLite database, created if it does not exist. Default to an in-memory database
+        """
+        self.connection = sqlite3.connect(str(path))
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(_SCHEMA)
+        self.connection.commit()
+
+    def close(self) -> None:
+        """Close the database"""
+        self.connection.close()
+
+    def refresh(
+        self,
+        saagie_api,
+        project_ids: Optional[Iterable[str]] = None,
+        env_vars: bool = True,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        chunk_size: int = 50,
+    ) -> Dict:
+        """Update the mirror with the current state of the platform
+
+        Parameters
+        ----------
+        saagie_api : SaagieApi
+            Connection to the platform
+        project_ids : Iterable[str], optional
+            UUIDs of the projects to refresh, default to all the projects you have rights on. The projects that
+            do not exist anymore are removed from the mirror only when refreshing all of them
+        env_vars : bool, optional
+            Whether to refresh the environment variables
+        max_workers : int, optional
+            Maximum number of concurrent requests
+        chunk_size : int, optional
+            Maximum number of entities whose details or variables are fetched by request
+
+        Returns
+        -------
+        dict
+            Summary with the keys "projects" (number of projects refreshed), "fetched" and "unchanged" (number of
+            jobs, pipelines and apps whose details were fetched or kept), "removed" (number of entities removed),
+            "env_vars" (number of variables stored) and "errors" (error message by project or entity id)
+        """
+        projects = saagie_api.projects.list(pprint_result=False)["projects"] or []
+        report = {
+            "projects": 0,
+            "fetched": dict.fromkeys(_KINDS, 0),
+            "unchanged": dict.fromkeys(_KINDS, 0),
+            "removed": {"projects": 0, **dict.fromkeys(_KINDS, 0)},
+            "env_vars": 0,
+            "errors": {},
+        }
+        if project_ids is None:
+            gone = {row["id"] for row in self.connection.execute("SELECT id FROM projects")} - {
+                project["id"] for project in projects
+            }
+            for project_id in gone:
+                self.__remove_project(project_id)
+            report["removed"]["projects"] = len(gone)
+        else:
+            wanted = set(project_ids)
+            projects = [project for project in projects if project["id"] in wanted]
+
+        # kind -> (id, fingerprint of the summary) of the entities whose details must be fetched
+        to_fetch: Dict[str, List[Tuple[str, str]]] = {kind: [] for kind in _KINDS}
+        refreshed = []
+        for project, summary, exception in run_concurrently(
+            lambda project: saagie_api.client.execute(
+                query=gql(GQL_MIRROR_PROJECT_SUMMARY), variable_values={"projectId": project["id"]}
+            ),
+            projects,
+            max_workers,
+        ):
+            if exception:
+                logging.warning("❗Cannot refresh the project [%s]: %s", project["id"], exception)
+                report["errors"][project["id"]] = str(exception)
+                continue
+            entities = {
+                "jobs": summary["jobs"] or [],
+                "pipelines": summary["project"]["pipelines"] or [],
+                "apps": summary["project"]["apps"] or [],
+            }
+            with self.connection:
+                self.__store_project(project)
+                for kind, items in entities.items():
+                    changed, removed = self.__store_summaries(kind, project["id"], items)
+                    to_fetch[kind] += changed
+                    report["unchanged"][kind] += len(items) - len(changed)
+                    report["removed"][kind] += removed
+            refreshed.append(project["id"])
+        report["projects"] = len(refreshed)
+
+        chunks = [
+            (kind, batch[start : start + chunk_size])
+            for kind, batch in to_fetch.items()
+            for start in range(0, len(batch), chunk_size)
+        ]
+        for (kind, batch), result, exception in run_concurrently(
+            lambda chunk: saagie_api.client.execute(
+                query=gql(build_details_query(chunk[0], len(chunk[1]))),
+                variable_values={f"id{index}": entity_id for index, (entity_id, _) in enumerate(chunk[1])},
+            ),
+            chunks,
+            max_workers,
+        ):
+            if exception:
+                logging.warning("❗Cannot fetch the details of %d %s: %s", len(batch), kind, exception)
+                report["errors"].update({entity_id: str(exception) for entity_id, _ in batch})
+                continue
+            with self.connection:
+                for index, (_, fingerprint) in enumerate(batch):
+                    if result.get(f"entity{index}") is not None:
+                        self.__store_details(kind, result[f"entity{index}"], fingerprint)
+                        report["fetched"][kind] += 1
+
+        if env_vars:
+            report["env_vars"] = self.__refresh_env_vars(saagie_api, refreshed, report, max_workers, chunk_size)
+        return report
+
+    def __store_project(self, project: Dict) -> None:
+        self.connection.execute(
+            "INSERT OR REPLACE INTO projects (id, name, creator, description, jobs_count, status, refreshed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                project["id"],
+                project["name"],
+                project.get("creator"),
+                project.get("description"),
+                project.get("jobsCount"),
+                project.get("status"),
+                time.time(),
+            ),
+        )
+
+    def __store_summaries(self, kind: str, project_id: str, entities: List[Dict]) -> Tuple[List[Tuple[str, str]], int]:
+        """Upsert the summary of the entities of a project and remove the ones that do not exist anymore.
+        Return the (id, fingerprint) of the entities whose details must be fetched, and the number of entities
+        removed. The fingerprint is only stored once the details are fetched"""
+        stored = {
+            row["id"]: row["fingerprint"]
+            for row in self.connection.execute(
+                f"SELECT id, fingerprint FROM {kind} WHERE project_id = ?", (project_id,)
+            )
+        }
+        columns = _KINDS[kind][3]
+        changed = []
+        for entity in entities:
+            row = _summary_row(kind, entity)
+            self.connection.execute(
+                f"INSERT INTO {kind} (id, project_id, {', '.join(columns)}) "
+                f"VALUES (?, ?, {', '.join('?' * len(columns))}) "
+                f"ON CONFLICT (id) DO UPDATE SET project_id = excluded.project_id, "
+                f"{', '.join(f'{column} = excluded.{column}' for column in columns)}",
+                (entity["id"], project_id, *row.values()),
+            )
+            fingerprint = _fingerprint(entity)
+            if entity["id"] not in stored or stored[entity["id"]] != fingerprint:
+                changed.append((entity["id"], fingerprint))
+        gone = set(stored) - {entity["id"] for entity in entities}
+        for entity_id in gone:
+            self.__remove_entity(kind, entity_id)
+        return changed, len(gone)
+
+    def __store_details(self, kind: str, entity: Dict, fingerprint: str) -> None:
+        version = _current_version(entity)
+        docker_image = (version.get("dockerInfo") or {}).get("image")
+        if kind == "jobs":
+            self.connection.execute(
+                "UPDATE jobs SET version_number = ?, runtime_version = ?, command_line = ?, docker_image = ?, "
+                "fingerprint = ? WHERE id = ?",
+                (
+                    version.get("number"),
+                    version.get("runtimeVersion"),
+                    version.get("commandLine"),
+                    docker_image,
+                    fingerprint,
+                    entity["id"],
+                ),
+            )
+        elif kind == "pipelines":
+            self.connection.execute(
+                "UPDATE pipelines SET version_number = ?, fingerprint = ? WHERE id = ?",
+                (version.get("number"), fingerprint, entity["id"]),
+            )
+            self.connection.execute("DELETE FROM pipeline_jobs WHERE pipeline_id = ?", (entity["id"],))
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO pipeline_jobs (pipeline_id, job_id) VALUES (?, ?)",
+                [
+                    (entity["id"], node["job"]["id"])
+                    for node in (version.get("graph") or {}).get("jobNodes") or []
+                    if node.get("job")
+                ],
+            )
+        else:
+            self.connection.execute(
+                "UPDATE apps SET version_number = ?, runtime_context_id = ?, docker_image = ?, fingerprint = ? "
+                "WHERE id = ?",
+                (
+                    version.get("number"),
+                    version.get("runtimeContextId"),
+                    docker_image,
+                    fingerprint,
+                    entity["id"],
+                ),
+            )
+
+    def __remove_entity(self, kind: str, entity_id: str) -> None:
+        self.connection.execute(f"DELETE FROM {kind} WHERE id = ?", (entity_id,))
+        self.connection.execute("DELETE FROM env_vars WHERE entity_type = ? AND entity_id = ?", (kind, entity_id))
+        if kind == "pipelines":
+            self.connection.execute("DELETE FROM pipeline_jobs WHERE pipeline_id = ?", (entity_id,))
+        elif kind == "jobs":
+            self.connection.execute("DELETE FROM pipeline_jobs WHERE job_id = ?", (entity_id,))
+
+    def __remove_project(self, project_id: str) -> None:
+        with self.connection:
+            for kind in _KINDS:
+                rows = self.connection.execute(f"SELECT id FROM {kind} WHERE project_id = ?", (project_id,)).fetchall()
+                for row in rows:
+                    self.__remove_entity(kind, row["id"])
+            self.connection.execute("DELETE FROM env_vars WHERE project_id = ?", (project_id,))
+            self.connection.execute("DELETE FROM projects WHERE id = ?", (project_id,))
+
+    def __refresh_env_vars(
+        self, saagie_api, project_ids: List[str], report: Dict, max_workers: int, chunk_size: int
+    ) -> int:
+        entities = {"projects": {project_id: project_id for project_id in project_ids}}
+        for kind in ("pipelines", "apps"):
+            entities[kind] = {}
+            for project_id in project_ids:
+                for row in self.connection.execute(f"SELECT id FROM {kind} WHERE project_id = ?", (project_id,)):
+                    entities[kind][row["id"]] = project_id
+
+        chunks = [("global", [])]
+        for kind, owners in entities.items():
+            ids = list(owners)
+            chunks += [(kind, ids[start : start + chunk_size]) for start in range(0, len(ids), chunk_size)]
+
+        def fetch(chunk):
+            kind, ids = chunk
+            if kind == "global":
+                return {None: saagie_api.env_vars.list("GLOBAL", scope_only=True, pprint_result=False)}
+            return saagie_api.env_vars.list_by_entity(_ENV_VAR_SCOPES[kind], ids, chunk_size)
+
+        for (kind, ids), result, exception in run_concurrently(fetch, chunks, max_workers):
+            if exception:
+                logging.warning("❗Cannot fetch the environment variables of %s: %s", kind, exception)
+                report["errors"].update({entity_id: str(exception) for entity_id in ids or [kind]})
+                continue
+            with self.connection:
+                if kind == "global":
+                    self.connection.execute("DELETE FROM env_vars WHERE entity_type = 'global'")
+                else:
+                    self.connection.executemany(
+                        "DELETE FROM env_vars WHERE entity_type = ? AND entity_id = ?",
+                        [(kind, entity_id) for entity_id in ids],
+                    )
+                for entity_id, variables in result.items():
+                    self.connection.executemany(
+                        "INSERT INTO env_vars (entity_type, entity_id, project_id, name, scope, value, description, "
+                        "is_password) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        [
+                            (
+                                kind,
+                                entity_id,
+                                entities.get(kind, {}).get(entity_id),
+                                var["name"],
+                                var.get("scope"),
+                                var.get("value"),
+                                var.get("description"),
+                                var.get("isPassword"),
+                            )
+                            for var in variables or []
+                        ],
+                    )
+        return self.connection.execute("SELECT COUNT(*) FROM env_vars").fetchone()[0]
+
+    def query(self, sql: str, params: Iterable = ()) -> List[Dict]:
+        """Run a read query on the mirror, see the tables projects, jobs, pipelines, pipeline_jobs, apps and
+        env_vars. Return the rows as dicts"""
+        return [dict(row) for row in self.connection.execute(sql, tuple(params))]
+
+    def search_jobs(self, text: str, project_id: Optional[str] = None) -> List[Dict]:
+        """Jobs whose name or alias contains a text, case-insensitive, sorted by project and name
+
+        Returns
+        -------
+        list of dict
+            Rows of the jobs table with the name of their project as "project_name"
+        """
+        pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        sql = (
+            "SELECT j.*, p.name AS project_name FROM jobs j LEFT JOIN projects p ON p.id = j.project_id "
+            "WHERE (j.name LIKE ? ESCAPE '\\' OR j.alias LIKE ? ESCAPE '\\')"
+        )
+        params = [pattern, pattern]
+        if project_id is not None:
+            sql += " AND j.project_id = ?"
+            params.append(project_id)
+        return self.query(sql + " ORDER BY p.name, j.name", params)
+
+    def jobs_by_technology(self, technology_id: str, runtime_version: Optional[str] = None) -> List[Dict]:
+        """Jobs of a technology, optionally only the ones whose current version uses a runtime version
+
+        Parameters
+        ----------
+        technology_id : str
+            UUID of the technology
+        runtime_version : str, optional
+            Runtime context of the current version, for example "3.10"
+
+        Returns
+        -------
+        list of dict
+            Rows of the jobs table with the name of their project as "project_name", sorted by project and name
+        """
+        sql = (
+            "SELECT j.*, p.name AS project_name FROM jobs j LEFT JOIN projects p ON p.id = j.project_id "
+            "WHERE j.technology_id = ?"
+        )
+        params = [technology_id]
+        if runtime_version is not None:
+            sql += " AND j.runtime_version = ?"
+            params.append(runtime_version)
+        return self.query(sql + " ORDER BY p.name, j.name", params)
+
+    def cron_schedules(self, project_id: Optional[str] = None) -> List[Dict]:
+        """Scheduled jobs and pipelines
+
+        Returns
+        -------
+        list of dict
+            Sorted by project and name, with the keys "entity_type" (jobs or pipelines), "id", "name",
+            "project_id", "project_name", "cron_scheduling", "schedule_timezone" and "schedule_status"
+        """
+        selects = [
+            f"SELECT '{kind}' AS entity_type, e.id AS id, e.name AS name, e.project_id AS project_id, "
+            "p.name AS project_name, e.cron_scheduling, e.schedule_timezone, e.schedule_status "
+            f"FROM {kind} e LEFT JOIN projects p ON p.id = e.project_id "
+            "WHERE e.is_scheduled AND e.cron_scheduling IS NOT NULL" + (" AND e.project_id = ?" if project_id else "")
+            for kind in ("jobs", "pipelines")
+        ]
+        params = [project_id, project_id] if project_id else []
+        return self.query(" UNION ALL ".join(selects) + " ORDER BY project_name, name", params)
+
+    def pipelines_for_job(self, job_id: str) -> List[Dict]:
+        """Pipelines whose current version runs a job, as rows of the pipelines table sorted by name"""
+        return self.query(
+            "SELECT p.* FROM pipelines p JOIN pipeline_jobs pj ON pj.pipeline_id = p.id WHERE pj.job_id = ? "
+            "ORDER BY p.name",
+            (job_id,),
+        )
+
+    def find_env_vars(self, name: str, value: Optional[str] = None) -> List[Dict]:
+        """Environment variables with a name, optionally only with a value (passwords cannot be compared)
+
+        Returns
+        -------
+        list of dict
+            Rows of the env_vars table, with entity_type global, projects, pipelines or apps
+        """
+        sql = "SELECT * FROM env_vars WHERE name = ?"
+        params = [name]
+        if value is not None:
+            sql += " AND value = ? AND NOT is_password"
+            params.append(value)
+        return self.query(sql + " ORDER BY entity_type, project_id, entity_id", params)
@@ -0,0 +1,234 @@
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from ..analytics import InstanceHistory
+from .graph_analysis import analyze_graph
+
+CONDITION_BRANCHES = ("success", "failure", "both")
+_EPSILON = 1e-9
+
+
+def job_durations_from_instances(
+    jobs: Iterable[Dict], percentile: float = 50, statuses: Sequence[str] = ("SUCCEEDED",)
+) -> Dict[str, float]:
+    """
+    Estimate the duration of jobs from their instances
+    Parameters
+    ----------
+    jobs : Iterable[dict]
+        Jobs with the keys "id" and "instances", as returned by Jobs.list_for_project or Jobs.get_info
+    percentile : float
+        Percentile of the durations used as estimation, default to the median
+    statuses : Sequence[str]
+        Statuses of the instances taken into account, default to SUCCEEDED only
+
+    Returns
+    -------
+    dict
+        Estimated duration in seconds by job id. Jobs without finished instance are left out
+    """
+    history = InstanceHistory()
+    for job in jobs:
+        instances = [instance for instance in job.get("instances") or [] if instance.get("status") in statuses]
+        history.add_instances("job", job["id"], instances)
+    key = f"p{percentile:g}_duration"
+    return {
+        row["entity_id"]: row[key]
+        for row in history.summary(group_by="entity", percentiles=(percentile,))
+        if row[key] is not None
+    }
+
+
+def compute_critical_path(
+    job_nodes: List[Dict],
+    condition_nodes: Optional[List[Dict]],
+    durations: Dict[str, float],
+    condition_branch: str = "success",
+) -> Dict:
+    """
+    Compute the critical path, the expected makespan and the slack of each node of a pipeline graph.
+    A node starts when all its predecessors are finished. Condition nodes take no time and only the branches
+    selected by condition_branch are followed, the nodes that are only reachable through the other branches
+    being considered as not executed
+
+    Parameters
+    ----------
+    job_nodes : list of dict
+        Job nodes, with the keys "id", "nextNodes" and "job" ({"id": job_id, "name": job_name})
+    condition_nodes : list of dict, optional
+        Condition nodes, with the keys "id", "nextNodesSuccess" and "nextNodesFailure"
+    durations : dict
+        Estimated duration in seconds by job id, see job_durations_from_instances.
+        Jobs without duration are counted as taking no time and listed in "missing_durations"
+    condition_branch : str
+        Branches of the condition nodes to follow: "success", "failure" or "both". Default to "success"
+
+    Returns
+    -------
+    dict
+        Dict with the keys:
+        - "makespan": expected duration of the pipeline in seconds
+        - "total_work": sum of the durations of the executed jobs
+        - "parallelism": total_work divided by makespan
+        - "critical_path": nodes of the critical path in execution order, with their job, duration, start and end
+        - "nodes": earliest/latest start and finish and slack of each executed node, by node id
+        - "speed_up_candidates": jobs of the critical path sorted by the makespan reduction ("gain") obtained if
+          they took no time
+        - "missing_durations": ids of the executed jobs without duration
+
+    Raises
+    ------
+    ValueError
+        If the graph is not valid (see analyze_graph)
+    """
+    if condition_branch not in CONDITION_BRANCHES:
+        raise ValueError(f"❌ condition_branch must be one of {CONDITION_BRANCHES}")
+    condition_nodes = condition_nodes or []
+    analysis = analyze_graph(job_nodes, condition_nodes)
+    if not analysis["valid"]:
+        raise ValueError(f"❌ Invalid pipeline graph: {'; '.join(analysis['errors'])}")
+
+    jobs = {node["id"]: node.get("job") or {} for node in job_nodes}
+    successors = {node["id"]: list(node.get("nextNodes") or []) for node in job_nodes}
+    for node in condition_nodes:
+        successors[node["id"]] = (list(node.get("nextNodesSuccess") or []) if condition_branch != "failure" else []) + (
+            list(node.get("nextNodesFailure") or []) if condition_branch != "success" else []
+        )
+
+    order = _executed_order(analysis["roots"], successors)
+    missing_durations = sorted(
+        {jobs[node_id].get("id") for node_id in order if node_id in jobs and jobs[node_id].get("id") not in durations}
+    )
+    duration = {
+        node_id: float(durations.get(jobs[node_id].get("id")) or 0) if node_id in jobs else 0.0 for node_id in order
+    }
+    schedule = _schedule(order, successors, duration)
+    makespan = max((times["earliest_finish"] for times in schedule.values()), default=0.0)
+
+    critical_path = _critical_path(analysis["roots"], successors, schedule)
+    candidates = []
+    for node_id in critical_path:
+        if node_id in jobs and duration[node_id] > 0:
+            reduced = _makespan(order, successors, {**duration, node_id: 0.0})
+            candidates.append(
+                {
+                    "node_id": node_id,
+                    "job_id": jobs[node_id].get("id"),
+                    "job_name": jobs[node_id].get("name"),
+                    "duration": duration[node_id],
+                    "gain": makespan - reduced,
+                }
+            )
+    candidates.sort(key=lambda candidate: candidate["gain"], reverse=True)
+
+    total_work = sum(duration[node_id] for node_id in order if node_id in jobs)
+    return {
+        "makespan": makespan,
+        "total_work": total_work,
+        "parallelism": total_work / makespan if makespan else None,
+        "critical_path": [
+            {
+                "node_id": node_id,
+                "type": "job" if node_id in jobs else "condition",
+                "job_id": jobs.get(node_id, {}).get("id"),
+                "job_name": jobs.get(node_id, {}).get("name"),
+                "duration": duration[node_id],
+                "start": schedule[node_id]["earliest_start"],
+                "end": schedule[node_id]["earliest_finish"],
+            }
+            for node_id in critical_path
+        ],
+        "nodes": {
+            node_id: {
+                "type": "job" if node_id in jobs else "condition",
+                "job_id": jobs.get(node_id, {}).get("id"),
+                "job_name": jobs.get(node_id, {}).get("name"),
+                "duration": duration[node_id],
+                **schedule[node_id],
+            }
+            for node_id in order
+        },
+        "speed_up_candidates": candidates,
+        "missing_durations": missing_durations,
+    }
+
+
+def _executed_order(roots: List[str], successors: Dict[str, List[str]]) -> List[str]:
+    """Topological order of the nodes reachable from the roots through the followed branches"""
+    executed = set(roots)
+    stack = list(roots)
+    while stack:
+        for next_id in successors[stack.pop()]:
+            if next_id not in executed:
+                executed.add(next_id)
+                stack.append(next_id)
+    in_degree = {node_id: 0 for node_id in executed}
+    for node_id in executed:
+        for next_id in successors[node_id]:
+            in_degree[next_id] += 1
+    queue = deque(roots)
+    order = []
+    while queue:
+        node_id = queue.popleft()
+        order.append(node_id)
+        for next_id in successors[node_id]:
+            in_degree[next_id] -= 1
+            if in_degree[next_id] == 0:
+                queue.append(next_id)
+    return order
+
+
+def _earliest_finish(order: List[str], successors: Dict[str, List[str]], duration: Dict[str, float]) -> Dict:
+    earliest_start = {node_id: 0.0 for node_id in order}
+    earliest_finish = {}
+    for node_id in order:
+        earliest_finish[node_id] = earliest_start[node_id] + duration[node_id]
+        for next_id in successors[node_id]:
+            earliest_start[next_id] = max(earliest_start[next_id], earliest_finish[node_id])
+    return earliest_finish
+
+
+def _makespan(order: List[str], successors: Dict[str, List[str]], duration: Dict[str, float]) -> float:
+    return max(_earliest_finish(order, successors, duration).values(), default=0.0)
+
+
+def _schedule(order: List[str], successors: Dict[str, List[str]], duration: Dict[str, float]) -> Dict[str, Dict]:
+    earliest_finish = _earliest_finish(order, successors, duration)
+    makespan = max(earliest_finish.values(), default=0.0)
+    latest_finish = {}
+    for node_id in reversed(order):
+        latest_finish[node_id] = min(
+            (latest_finish[next_id] - duration[next_id] for next_id in successors[node_id]), default=makespan
+        )
+    return {
+        node_id: {
+            "earliest_start": earliest_finish[node_id] - duration[node_id],
+            "earliest_finish": earliest_finish[node_id],
+            "latest_start": latest_finish[node_id] - duration[node_id],
+            "latest_finish": latest_finish[node_id],
+            "slack": latest_finish[node_id] - earliest_finish[node_id],
+        }
+        for node_id in order
+    }
+
+
+def _critical_path(roots: List[str], successors: Dict[str, List[str]], schedule: Dict[str, Dict]) -> List[str]:
+    """Follow the nodes without slack from a root to a node finishing at the end of the pipeline"""
+    node_id = next(
+        (root for root in roots if abs(schedule[root]["slack"]) < _EPSILON and schedule[root]["earliest_start"] == 0),
+        None,
+    )
+    path = []
+    while node_id is not None:
+        path.append(node_id)
+        end = schedule[node_id]["earliest_finish"]
+        node_id = next(
+            (
+                next_id
+                for next_id in successors[node_id]
+                if abs(schedule[next_id]["slack"]) < _EPSILON
+                and abs(schedule[next_id]["earliest_start"] - end) < _EPSILON
+            ),
+            None,
+        )
+    return path
@@ -475,6 +475,50 @@ query pipelineInstanceQuery($id: UUID!){
 }
 """
 
+GQL_PIPELINE_INSTANCE_PROGRESS_FRAGMENT = """
+fragment pipelineInstanceProgress on PipelineInstance {
+    id
+    status
+    startTime
+    endTime
+    pipelineId
+    jobsInstance{
+        id
+        jobId
+        jobNodeId
+        number
+        status
+        startTime
+        endTime
+    }
+    conditionsInstance{
+        id
+        conditionNodeId
+        isSuccess
+        startTime
+        endTime
+    }
+}
+"""
+
+GQL_GET_PIPELINE_INSTANCES_PAGE = """
+query pipelineInstancesQuery($id: UUID!, $limit: Int, $skip: Int){
+    graphPipeline(id: $id){
+        id
+        instances(limit: $limit, skip: $skip){
+            id
+            number
+            status
+            startTime
+            endTime
+            version{
+                number
+            }
+        }
+    }
+}
+"""
+
 GQL_CREATE_GRAPH_PIPELINE = """
 mutation createGraphPipelineMutation($name: String!, 
 									 $description: String, 
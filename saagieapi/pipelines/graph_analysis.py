@@ -0,0 +1,198 @@
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def analyze_graph(
+    job_nodes: List[Dict], condition_nodes: Optional[List[Dict]] = None, known_job_ids: Optional[Iterable[str]] = None
+) -> Dict:
+    """
+    Check a pipeline graph and compute its structure, in time linear in the number of nodes and edges.
+    The graph is given in the format sent to the API by create_graph and upgrade (see
+    GraphPipeline.to_pipeline_graph_input), which is also the format of the "graph" of a pipeline version
+    returned by Pipelines.get_info.
+
+    The following problems make the graph invalid:
+    - several nodes with the same id
+    - references in nextNodes, nextNodesSuccess or nextNodesFailure to nodes that are not in the graph
+    - cycles
+    - nodes that cannot be reached from a node without predecessor
+    - condition nodes without success nor failure branch, or without condition value
+    - job ids not in known_job_ids, when given
+
+    Parameters
+    ----------
+    job_nodes : list of dict
+        Job nodes, with the keys "id", "nextNodes" and "job" ({"id": job_id})
+    condition_nodes : list of dict, optional
+        Condition nodes, with the keys "id", "nextNodesSuccess", "nextNodesFailure" and optionally "condition"
+    known_job_ids : Iterable[str], optional
+        Ids of the jobs that exist in the project. If None, job ids are not checked
+
+    Returns
+    -------
+    dict
+        Dict with the keys:
+        - "valid": whether no problem was found
+        - "errors": description of each problem
+        - "roots", "leaves": ids of the nodes without predecessor and without successor
+        - "topological_order": ids of the nodes sorted so that each node comes after its predecessors
+          (nodes on or after a cycle are left out)
+        - "depth": depth of each node, roots having a depth of 0
+        - "max_depth": number of levels of the graph
+        - "max_width": largest number of job nodes at the same depth, that can run in parallel
+        - "duplicated_ids", "dangling_references", "cycle", "unreachable_nodes",
+          "conditions_without_branches", "conditions_without_value", "unknown_job_ids": details of the problems
+    """
+    nodes, kinds, duplicated_ids = _index_nodes(job_nodes, condition_nodes or [])
+    successors = {node_id: _next_node_ids(node, kinds[node_id]) for node_id, node in nodes.items()}
+    conditions_without_branches, conditions_without_value = _check_conditions(nodes, kinds)
+    unknown_job_ids = []
+    if known_job_ids is not None:
+        known_job_ids = set(known_job_ids)
+        unknown_job_ids = [
+            job_id
+            for node_id, node in nodes.items()
+            if kinds[node_id] == "job" and (job_id := (node.get("job") or {}).get("id")) not in known_job_ids
+        ]
+
+    dangling_references = []
+    predecessors: Dict[str, List[str]] = {node_id: [] for node_id in successors}
+    for node_id, next_ids in successors.items():
+        dangling_references += [{"node": node_id, "next": next_id} for next_id in next_ids if next_id not in nodes]
+        successors[node_id] = [next_id for next_id in next_ids if next_id in nodes]
+        for next_id in successors[node_id]:
+            predecessors[next_id].append(node_id)
+
+    # Kahn's algorithm: topological order and longest distance from a root
+    roots = [node_id for node_id, preds in predecessors.items() if not preds]
+    in_degree = {node_id: len(preds) for node_id, preds in predecessors.items()}
+    depth = {node_id: 0 for node_id in roots}
+    topological_order = []
+    queue = deque(roots)
+    while queue:
+        node_id = queue.popleft()
+        topological_order.append(node_id)
+        for next_id in successors[node_id]:
+            depth[next_id] = max(depth.get(next_id, 0), depth[node_id] + 1)
+            in_degree[next_id] -= 1
+            if in_degree[next_id] == 0:
+                queue.append(next_id)
+
+    cycle = _find_cycle(predecessors, in_degree)
+    unreachable_nodes = _unreachable_nodes(roots, successors)
+
+    widths: Dict[int, int] = {}
+    for node_id in topological_order:
+        if kinds[node_id] == "job":
+            widths[depth[node_id]] = widths.get(depth[node_id], 0) + 1
+
+    analysis = {
+        "roots": roots,
+        "leaves": [node_id for node_id, next_ids in successors.items() if not next_ids],
+        "topological_order": topological_order,
+        "depth": {node_id: depth[node_id] for node_id in topological_order},
+        "max_depth": max((depth[node_id] for node_id in topological_order), default=-1) + 1,
+        "max_width": max(widths.values(), default=0),
+        "duplicated_ids": duplicated_ids,
+        "dangling_references": dangling_references,
+        "cycle": cycle,
+        "unreachable_nodes": unreachable_nodes,
+        "conditions_without_branches": conditions_without_branches,
+        "conditions_without_value": conditions_without_value,
+        "unknown_job_ids": unknown_job_ids,
+    }
+    errors = _describe_errors(analysis)
+    return {"valid": not errors, "errors": errors, **analysis}
+
+
+def _describe_errors(analysis: Dict) -> List[str]:
+    errors = [f"Node {node_id} is defined several times" for node_id in analysis["duplicated_ids"]]
+    errors += [f"Node {ref['node']} references unknown node {ref['next']}" for ref in analysis["dangling_references"]]
+    if cycle := analysis["cycle"]:
+        errors.append(f"Cycle detected: {' -> '.join(cycle + cycle[:1])}")
+    errors += [f"Node {node_id} cannot be reached from a root node" for node_id in analysis["unreachable_nodes"]]
+    errors += [
+        f"Condition node {node_id} has no success nor failure branch"
+        for node_id in analysis["conditions_without_branches"]
+    ]
+    errors += [f"Condition node {node_id} has no condition value" for node_id in analysis["conditions_without_value"]]
+    errors += [f"Job {job_id} does not exist in the project" for job_id in analysis["unknown_job_ids"]]
+    return errors
+
+
+def _index_nodes(job_nodes: List[Dict], condition_nodes: List[Dict]) -> Tuple[Dict, Dict[str, str], List[str]]:
+    """Nodes and their kind ("job" or "condition") by id, the first definition of an id winning over the others"""
+    nodes: Dict[str, Dict] = {}
+    kinds: Dict[str, str] = {}
+    duplicated_ids = []
+    for kind, kind_nodes in (("job", job_nodes), ("condition", condition_nodes)):
+        for node in kind_nodes:
+            if node["id"] in nodes:
+                duplicated_ids.append(node["id"])
+                continue
+            nodes[node["id"]] = node
+            kinds[node["id"]] = kind
+    return nodes, kinds, duplicated_ids
+
+
+def _next_node_ids(node: Dict, kind: str) -> List[str]:
+    if kind == "job":
+        return list(node.get("nextNodes") or [])
+    return list(node.get("nextNodesSuccess") or []) + list(node.get("nextNodesFailure") or [])
+
+
+def _check_conditions(nodes: Dict[str, Dict], kinds: Dict[str, str]) -> Tuple[List[str], List[str]]:
+    """Ids of the condition nodes without success nor failure branch, and of those without condition value"""
+    without_branches = []
+    without_value = []
+    for node_id, node in nodes.items():
+        if kinds[node_id] != "condition":
+            continue
+        if not _next_node_ids(node, "condition"):
+            without_branches.append(node_id)
+        if "condition" in node and not _condition_value(node["condition"]):
+            without_value.append(node_id)
+    return without_branches, without_value
+
+
+def _condition_value(condition: Optional[Dict]) -> Optional[str]:
+    """Status value or custom expression of a condition node, as sent to the API or as returned by get_info"""
+    condition = condition or {}
+    return (
+        (condition.get("status") or {}).get("value")
+        or (condition.get("custom") or {}).get("expression")
+        or condition.get("toString")
+    )
+
+
+def _find_cycle(predecessors: Dict[str, List[str]], in_degree: Dict[str, int]) -> List[str]:
+    """
+    Return one cycle of the graph, or an empty list if there is none, given the in-degrees left by Kahn's
+    algorithm: every node with a remaining in-degree has a predecessor with a remaining in-degree, so walking
+    backwards always ends up in a cycle
+    """
+    remaining = {node_id for node_id, degree in in_degree.items() if degree > 0}
+    if not remaining:
+        return []
+    node_id = next(node_id for node_id in in_degree if node_id in remaining)
+    path: List[str] = []
+    positions: Dict[str, int] = {}
+    while node_id not in positions:
+        positions[node_id] = len(path)
+        path.append(node_id)
+        node_id = next(pred for pred in predecessors[node_id] if pred in remaining)
+    cycle = path[positions[node_id] :]
+    cycle.reverse()
+    return cycle
+
+
+def _unreachable_nodes(roots: List[str], successors: Dict[str, List[str]]) -> List[str]:
+    """Ids of the nodes that no path from a root node leads to, in the order of successors"""
+    reachable = set(roots)
+    stack = list(roots)
+    while stack:
+        for next_id in successors[stack.pop()]:
+            if next_id not in reachable:
+                reachable.add(next_id)
+                stack.append(next_id)
+    return [node_id for node_id in successors if node_id not in reachable]
@@ -1,15 +1,35 @@
 import uuid
-from typing import List
+from typing import Dict, Iterable, List, Optional
+
+from .graph_analysis import analyze_graph
 
 # pylint: disable=missing-function-docstring
 
 
 class Node:
+    __slots__ = ("_uid", "_uid_str")
+
     def __init__(self) -> None:
         self.uid = uuid.uuid4()
 
+    @property
+    def uid(self) -> uuid.UUID:
+        return self._uid
+
+    @uid.setter
+    def uid(self, value: uuid.UUID) -> None:
+        self._uid = value
+        self._uid_str = str(value)
+
+    @property
+    def uid_str(self) -> str:
+        """String form of uid, computed once when uid is set"""
+        return self._uid_str
+
 
 class JobNode(Node):
+    __slots__ = ("job_id", "next_nodes")
+
     def __init__(self, job_id) -> None:
         super().__init__()
         self.job_id = job_id
@@ -20,6 +40,8 @@ class JobNode(Node):
 
 
 class ConditionNode(Node):
+    __slots__ = ("next_nodes_success", "next_nodes_failure")
+
     def __init__(self) -> None:
         super().__init__()
         self.next_nodes_success: List[Node] = []
@@ -33,6 +55,8 @@ class ConditionNode(Node):
 
 
 class ConditionStatusNode(ConditionNode):
+    __slots__ = ("condition_value",)
+
     def __init__(self) -> None:
         super().__init__()
         self.condition_value: str = ""
@@ -48,6 +72,8 @@ class ConditionStatusNode(ConditionNode):
 
 
 class ConditionExpressionNode(ConditionNode):
+    __slots__ = ("expression",)
+
     def __init__(self) -> None:
         super().__init__()
         self.expression: str = ""
@@ -61,43 +87,64 @@ class GraphPipeline:
         self.root_nodes = []
         self.list_job_nodes = []
         self.list_conditions_nodes = []
+        self._visited_uids = set()
 
     def add_root_node(self, node: JobNode):
         self.root_nodes.append(node)
 
     def fill_nodes_lists(self, node):
-        if str(node.uid) not in [jn.get("uid") for jn in self.list_job_nodes] and str(node.uid) not in [
-            cn.get("uid") for cn in self.list_conditions_nodes
-        ]:
-            if isinstance(node, JobNode):
-                dict_job = {"id": str(node.uid), "nextNodes": [str(nn.uid) for nn in node.next_nodes], "job": {}}
-                dict_job["job"]["id"] = node.job_id
-                self.list_job_nodes.append(dict_job)
-                if node.next_nodes:
-                    for nex in node.next_nodes:
-                        self.fill_nodes_lists(nex)
-            elif isinstance(node, (ConditionStatusNode, ConditionExpressionNode)):
+        """Add the given node and all the nodes reachable from it to list_job_nodes and list_conditions_nodes.
+        The graph is traversed depth-first without recursion, and nodes that are already in the lists are
+        skipped, so shared successors and long chains are handled in linear time"""
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            uid = current.uid_str
+            if uid in self._visited_uids:
+                continue
+            if isinstance(current, JobNode):
+                next_nodes = current.next_nodes
+                self.list_job_nodes.append(
+                    {"id": uid, "nextNodes": [nn.uid_str for nn in next_nodes], "job": {"id": current.job_id}}
+                )
+            elif isinstance(current, (ConditionStatusNode, ConditionExpressionNode)):
                 dict_condition = {
-                    "id": str(node.uid),
-                    "nextNodesSuccess": [str(nn.uid) for nn in node.next_nodes_success],
-                    "nextNodesFailure": [str(nn.uid) for nn in node.next_nodes_failure],
+                    "id": uid,
+                    "nextNodesSuccess": [nn.uid_str for nn in current.next_nodes_success],
+                    "nextNodesFailure": [nn.uid_str for nn in current.next_nodes_failure],
                 }
-                if isinstance(node, ConditionStatusNode):
+                if isinstance(current, ConditionStatusNode):
                     # "condition": {"status": {"value" : "AtLeastOneSuccess"}}
-                    dict_condition["condition"] = {"status": {"value": node.condition_value}}
-
-                if isinstance(node, ConditionExpressionNode):
+                    dict_condition["condition"] = {"status": {"value": current.condition_value}}
+                else:
                     # "condition": {"custom": {"value" : "1 + 1 == 2"}}
-                    dict_condition["condition"] = {"custom": {"expression": node.expression}}
-
+                    dict_condition["condition"] = {"custom": {"expression": current.expression}}
                 self.list_conditions_nodes.append(dict_condition)
-                if node.next_nodes_success:
-                    for nex in node.next_nodes_success:
-                        self.fill_nodes_lists(nex)
-                if node.next_nodes_failure:
-                    for nex in node.next_nodes_failure:
-                        self.fill_nodes_lists(nex)
+                next_nodes = current.next_nodes_success + current.next_nodes_failure
+            else:
+                continue
+            self._visited_uids.add(uid)
+            # Reversed so that nodes are visited in the same order as a recursive traversal
+            stack.extend(reversed(next_nodes))
 
     def to_pipeline_graph_input(self):
         for root_n in self.root_nodes:
             self.fill_nodes_lists(root_n)
+
+    def analyze(self, known_job_ids: Optional[Iterable[str]] = None) -> Dict:
+        """Check the graph and compute its topological order, depth and maximum parallel width locally,
+        without any call to the platform. See graph_analysis.analyze_graph for the content of the result
+
+        Parameters
+        ----------
+        known_job_ids : Iterable[str], optional
+            Ids of the jobs that exist in the project. If None, job ids are not checked
+
+        Returns
+        -------
+        dict
+            Result of the analysis, with the keys "valid" and "errors" among others
+        """
+        if not self.list_job_nodes:
+            self.to_pipeline_graph_input()
+        return analyze_graph(self.list_job_nodes, self.list_conditions_nodes, known_job_ids)
@@ -0,0 +1,90 @@
+from typing import Dict, List, Optional
+
+FINAL_STATUSES = ("SUCCEEDED", "FAILED", "KILLED", "SKIPPED", "ERROR", "UNKNOWN")
+
+
+def diff_instance_snapshots(previous: Optional[Dict], current: Dict) -> List[Dict]:
+    """
+    Compare two successive snapshots of a pipeline instance and describe what happened between them
+
+    Parameters
+    ----------
+    previous : dict, optional
+        Previous snapshot of the pipeline instance, None for the first one
+    current : dict
+        Current snapshot, with the fields of GQL_PIPELINE_INSTANCE_PROGRESS_FRAGMENT
+
+    Returns
+    -------
+    list of dict
+        Events with the keys "pipeline_instance_id", "type" and "time", whose type is one of:
+        - "status_changed": the pipeline instance has a new status, that is not final ("status", "previous_status")
+        - "node_started": a job instance was created ("node_id", "job_id", "job_instance_id", "status")
+        - "node_status_changed": a job instance has a new status, that is not final (same keys)
+        - "node_finished": a job instance has a final status (same keys)
+        - "condition_evaluated": a condition got its result ("node_id", "is_success")
+        - "instance_finished": the pipeline instance has a final status ("status")
+    """
+    previous = previous or {}
+    pipeline_instance_id = current["id"]
+    status = current.get("status")
+    events = []
+    if status != previous.get("status") and status not in FINAL_STATUSES:
+        events.append(
+            {
+                "pipeline_instance_id": pipeline_instance_id,
+                "type": "status_changed",
+                "status": status,
+                "previous_status": previous.get("status"),
+                "time": current.get("startTime"),
+            }
+        )
+
+    previous_jobs = {job["id"]: job for job in previous.get("jobsInstance") or []}
+    for job in current.get("jobsInstance") or []:
+        before = previous_jobs.get(job["id"])
+        node = {
+            "pipeline_instance_id": pipeline_instance_id,
+            "node_id": job.get("jobNodeId"),
+            "job_id": job.get("jobId"),
+            "job_instance_id": job["id"],
+            "status": job.get("status"),
+        }
+        if before is None:
+            events.append({**node, "type": "node_started", "time": job.get("startTime")})
+        if _job_finished(job):
+            if before is None or not _job_finished(before):
+                events.append({**node, "type": "node_finished", "time": job.get("endTime")})
+        elif before is not None and before.get("status") != job.get("status"):
+            events.append({**node, "type": "node_status_changed", "time": job.get("startTime")})
+
+    previous_conditions = {
+        condition["conditionNodeId"]: condition for condition in previous.get("conditionsInstance") or []
+    }
+    for condition in current.get("conditionsInstance") or []:
+        before = previous_conditions.get(condition["conditionNodeId"]) or {}
+        if condition.get("isSuccess") is not None and before.get("isSuccess") is None:
+            events.append(
+                {
+                    "pipeline_instance_id": pipeline_instance_id,
+                    "type": "condition_evaluated",
+                    "node_id": condition["conditionNodeId"],
+                    "is_success": condition["isSuccess"],
+                    "time": condition.get("endTime") or condition.get("startTime"),
+                }
+            )
+
+    if status in FINAL_STATUSES and previous.get("status") not in FINAL_STATUSES:
+        events.append(
+            {
+                "pipeline_instance_id": pipeline_instance_id,
+                "type": "instance_finished",
+                "status": status,
+                "time": current.get("endTime"),
+            }
+        )
+    return events
+
+
+def _job_finished(job: Dict) -> bool:
+    return job.get("status") in FINAL_STATUSES
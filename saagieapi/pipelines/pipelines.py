@@ -3,14 +3,19 @@ import logging
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Union
 
 from gql import gql
 
+from ..env_vars.env_vars import ENV_VARS_FILE, read_exported_env_vars
+from ..utils.concurrency import DEFAULT_MAX_WORKERS, run_concurrently
 from ..utils.folder_functions import create_folder, write_error, write_to_json_file
+from ..utils.pagination import DEFAULT_PAGE_SIZE, iter_instances_pages
 from ..utils.rich_console import console
+from .critical_path import compute_critical_path, job_durations_from_instances
 from .gql_queries import *
 from .graph_pipeline import GraphPipeline
+from .instance_stream import FINAL_STATUSES, diff_instance_snapshots
 
 
 def handle_error(msg, pipeline_name):
@@ -44,13 +49,18 @@ def parse_version_conditions(version):
 
 
 def parse_version_jobs(jobs_target_pj, version):
+    # jobs_target_pj is either the list of jobs of the target project or an index of their ids by name
+    if isinstance(jobs_target_pj, dict):
+        jobs_by_name = jobs_target_pj
+    else:
+        jobs_by_name = build_job_name_index(jobs_target_pj)
     jobs_not_found = []
     jobs_found = []
     for job_node in version["graph"]["jobNodes"]:
-        if job := next((job for job in jobs_target_pj if job["name"] == job_node["job"]["name"]), None):
+        if job_id := jobs_by_name.get(job_node["job"]["name"]):
             node_dict = {
                 "id": job_node["id"],
-                "job": {"id": job["id"]},
+                "job": {"id": job_id},
                 "nextNodes": job_node["nextNodes"],
             }
             jobs_found.append(node_dict)
@@ -59,6 +69,29 @@ def parse_version_jobs(jobs_target_pj, version):
     return jobs_not_found, jobs_found
 
 
+def build_job_name_index(jobs):
+    # when several jobs have the same name, the first one is kept
+    jobs_by_name = {}
+    for job in jobs:
+        jobs_by_name.setdefault(job["name"], job["id"])
+    return jobs_by_name
+
+
+def build_progress_query(count: int) -> str:
+    """
+    Build a query fetching the progress of count pipeline instances in a single request, the instance i being
+    returned under the alias "instance<i>" and its id given by the variable "id<i>"
+    """
+    variables = ", ".join(f"$id{index}: UUID!" for index in range(count))
+    fields = "\n".join(
+        f"    instance{index}: pipelineInstance(id: $id{index}){{ ...pipelineInstanceProgress }}"
+        for index in range(count)
+    )
+    return (
+        f"query pipelineInstancesProgressQuery({variables}){{\n{fields}\n}}\n{GQL_PIPELINE_INSTANCE_PROGRESS_FRAGMENT}"
+    )
+
+
 class Pipelines:
     def __init__(self, saagie_api):
         self.saagie_api = saagie_api
@@ -890,6 +923,55 @@ class Pipelines:
             pprint_result=pprint_result,
         )
 
+    def iter_instances(
+        self,
+        pipeline_id: str,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        since: Optional[Union[str, datetime]] = None,
+        status: Optional[Union[str, List[str]]] = None,
+    ) -> Iterator[Dict]:
+        """Iterate over the instances of a pipeline, from the most recent to the oldest.
+        Instances are fetched lazily, one page at a time, so only the pages actually consumed are requested
+
+        Parameters
+        ----------
+        pipeline_id : str
+            UUID of your pipeline
+        page_size : int, optional
+            Number of instances fetched per request, default to 100
+        since : str or datetime, optional
+            Stop iterating at the first instance started before this date, for example "2022-04-19T00:00:00Z".
+            Naive datetimes are considered as UTC
+        status : str or list of str, optional
+            Only yield the instances with this status (or one of these statuses), for example "FAILED".
+            The filter is applied client-side
+
+        Yields
+        ------
+        dict
+            Instance information
+
+        Examples
+        --------
+        >>> for instance in saagieapi.pipelines.iter_instances(
+        ...     pipeline_id="ca79c5c8-2e57-4a35-bcfc-5065f0ee901c",
+        ...     since="2022-04-19T00:00:00Z",
+        ...     status=["FAILED", "KILLED"],
+        ... ):
+        ...     print(instance["id"], instance["status"])
+        """
+        query = gql(GQL_GET_PIPELINE_INSTANCES_PAGE)
+
+        def fetch_page(limit: int, skip: int) -> List[Dict]:
+            result = self.saagie_api.client.execute(
+                query=query,
+                variable_values={"id": pipeline_id, "limit": limit, "skip": skip},
+                pprint_result=False,
+            )
+            return (result.get("graphPipeline") or {}).get("instances") or []
+
+        return iter_instances_pages(fetch_page, page_size=page_size, since=since, status=status)
+
     def create_graph(
         self,
         name: str,
@@ -904,6 +986,7 @@ class Pipelines:
         schedule_timezone: str = "UTC",
         has_execution_variables_enabled: bool = None,
         source_url: str = "",
+        validate: bool = False,
     ) -> Dict:
         """
         Create a pipeline in a given project
@@ -942,6 +1025,9 @@ class Pipelines:
             Boolean to activate or desactivate the execution variables
         source_url: str, optional
             URL of the source code used for the pipeline (link to the commit for example)
+        validate: bool, optional
+            Whether to check the graph locally before creating the pipeline (see validate_graph),
+            default to False
 
         Returns
         -------
@@ -990,6 +1076,8 @@ class Pipelines:
         """
         if not graph_pipeline.list_job_nodes:
             graph_pipeline.to_pipeline_graph_input()
+        if validate:
+            self.__check_graph(graph_pipeline, project_id)
 
         params = {
             "name": name,
@@ -1019,6 +1107,235 @@ class Pipelines:
         logging.info("✅ Pipeline [%s] successfully created", name)
         return result
 
+    def validate_graph(self, graph_pipeline: GraphPipeline, project_id: Optional[str] = None) -> Dict:
+        """
+        Check a pipeline graph locally: cycles, references to unknown nodes, unreachable nodes, condition nodes
+        without branch and, if project_id is given, job ids that do not exist in the project (checked with a
+        single listing of the jobs of the project). Also computes the topological order, the depth and the
+        maximum parallel width of the graph
+
+        Parameters
+        ----------
+        graph_pipeline : GraphPipeline
+            Graph to check
+        project_id : str, optional
+            UUID of the project of the pipeline. If None, job ids are not checked
+
+        Returns
+        -------
+        dict
+            Result of the analysis, see saagieapi.pipelines.graph_analysis.analyze_graph
+
+        Examples
+        --------
+        >>> saagie_api.pipelines.validate_graph(
+        ...     graph_pipeline=graph_pipeline,
+        ...     project_id="860b8dc8-e634-4c98-b2e7-f9ec32ab4771"
+        ... )
+        {
+            "valid": False,
+            "errors": ["Job 7a706539-69dd-4f5d-bba3-4eac6be74d8d does not exist in the project"],
+            "roots": ["5a4e7a8e-0a0c-4bd8-9d3c-5d2a5d0e2f55"],
+            "leaves": ["0b3e1f1a-7e5c-4b38-8f5a-4a3bb5d2c7e2"],
+            "topological_order": ["5a4e7a8e-0a0c-4bd8-9d3c-5d2a5d0e2f55", "0b3e1f1a-7e5c-4b38-8f5a-4a3bb5d2c7e2"],
+            "depth": {"5a4e7a8e-0a0c-4bd8-9d3c-5d2a5d0e2f55": 0, "0b3e1f1a-7e5c-4b38-8f5a-4a3bb5d2c7e2": 1},
+            "max_depth": 2,
+            "max_width": 1,
+            "duplicated_ids": [],
+            "dangling_references": [],
+            "cycle": [],
+            "unreachable_nodes": [],
+            "conditions_without_branches": [],
+            "conditions_without_value": [],
+            "unknown_job_ids": ["7a706539-69dd-4f5d-bba3-4eac6be74d8d"]
+        }
+        """
+        known_job_ids = None
+        if project_id:
+            jobs = self.saagie_api.jobs.list_for_project_minimal(project_id)["jobs"]
+            known_job_ids = {job["id"] for job in jobs}
+        return graph_pipeline.analyze(known_job_ids)
+
+    def __check_graph(self, graph_pipeline: GraphPipeline, project_id: Optional[str] = None) -> None:
+        analysis = self.validate_graph(graph_pipeline, project_id)
+        if not analysis["valid"]:
+            raise ValueError(f"❌ Invalid pipeline graph: {'; '.join(analysis['errors'])}")
+
+    def critical_path(
+        self,
+        pipeline_id: str,
+        instances_limit: int = 100,
+        percentile: float = 50,
+        condition_branch: str = "success",
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> Dict:
+        """
+        Estimate the makespan of the current version of a pipeline from the durations of the last succeeded
+        instances of its jobs, and find its critical path, the slack of each node and the jobs whose speed-up
+        would shorten the pipeline the most
+
+        Parameters
+        ----------
+        pipeline_id : str
+            UUID of your pipeline (see README on how to find it)
+        instances_limit : int, optional
+            Number of last instances of each job used to estimate its duration, default to 100
+        percentile : float, optional
+            Percentile of the durations of the succeeded instances used as estimation, default to the median
+        condition_branch : str, optional
+            Branches of the condition nodes to follow: "success", "failure" or "both". Default to "success"
+        max_workers : int, optional
+            Maximum number of jobs fetched concurrently
+
+        Returns
+        -------
+        dict
+            Dict with the keys "pipeline_id" and "pipeline_name", and the keys described in
+            saagieapi.pipelines.critical_path.compute_critical_path
+
+        Examples
+        --------
+        >>> saagie_api.pipelines.critical_path(pipeline_id="ca79c5c8-2e57-4a35-bcfc-5065f0ee901c")
+        {
+            "pipeline_id": "ca79c5c8-2e57-4a35-bcfc-5065f0ee901c",
+            "pipeline_name": "Pipeline A",
+            "makespan": 10800.0,
+            "total_work": 2400.0,
+            "parallelism": 0.2222222222222222,
+            "critical_path": [
+                {
+                    "node_id": "00000000-0000-0000-0000-000000000001",
+                    "type": "job",
+                    "job_id": "f5fce22d-2152-4a01-8c6a-4c2eb4808b6d",
+                    "job_name": "Extract",
+                    "duration": 9000.0,
+                    "start": 0.0,
+                    "end": 9000.0
+                },
+                ...
+            ],
+            "nodes": {...},
+            "speed_up_candidates": [
+                {
+                    "node_id": "00000000-0000-0000-0000-000000000001",
+                    "job_id": "f5fce22d-2152-4a01-8c6a-4c2eb4808b6d",
+                    "job_name": "Extract",
+                    "duration": 9000.0,
+                    "gain": 8400.0
+                }
+            ],
+            "missing_durations": []
+        }
+        """
+        pipeline = self.get_info(pipeline_id, instances_limit=0, versions_only_current=True, pprint_result=False)[
+            "graphPipeline"
+        ]
+        graph = self.__current_graph(pipeline)
+        job_ids = sorted({(node.get("job") or {}).get("id") for node in graph.get("jobNodes") or []})
+        jobs = []
+        for job_id, result, exception in run_concurrently(
+            lambda job_id: self.saagie_api.jobs.get_info(
+                job_id, instances_limit=instances_limit, versions_only_current=True, pprint_result=False
+            ),
+            job_ids,
+            max_workers,
+        ):
+            if exception:
+                logging.warning("❗Cannot get the instances of the job [%s]: %s", job_id, exception)
+            elif result and result.get("job"):
+                jobs.append(result["job"])
+        durations = job_durations_from_instances(jobs, percentile=percentile)
+        return {
+            "pipeline_id": pipeline_id,
+            "pipeline_name": pipeline.get("name"),
+            **compute_critical_path(graph.get("jobNodes"), graph.get("conditionNodes"), durations, condition_branch),
+        }
+
+    def critical_path_report(
+        self, project_id: str, instances_limit: int = 100, percentile: float = 50, condition_branch: str = "success"
+    ) -> List[Dict]:
+        """
+        Estimate the makespan and the critical path of the current version of every pipeline of a project.
+        The jobs and the pipelines of the project are each fetched with a single request
+
+        Parameters
+        ----------
+        project_id : str
+            UUID of your project (see README on how to find it)
+        instances_limit : int, optional
+            Number of last instances of each job used to estimate its duration, default to 100
+        percentile : float, optional
+            Percentile of the durations of the succeeded instances used as estimation, default to the median
+        condition_branch : str, optional
+            Branches of the condition nodes to follow: "success", "failure" or "both". Default to "success"
+
+        Returns
+        -------
+        list of dict
+            One dict per pipeline, sorted by decreasing makespan, with the keys "pipeline_id", "pipeline_name",
+            "makespan", "total_work", "parallelism", "critical_path" (names of the jobs),
+            "speed_up_candidates" (3 best ones) and "missing_durations", or "error" if the graph is not valid
+
+        Examples
+        --------
+        >>> saagie_api.pipelines.critical_path_report(project_id="860b8dc8-e634-4c98-b2e7-f9ec32ab4771")
+        [
+            {
+                "pipeline_id": "ca79c5c8-2e57-4a35-bcfc-5065f0ee901c",
+                "pipeline_name": "Pipeline A",
+                "makespan": 10800.0,
+                "total_work": 2400.0,
+                "parallelism": 0.2222222222222222,
+                "critical_path": ["Extract", "Load"],
+                "speed_up_candidates": [
+                    {"job_id": "f5fce22d-2152-4a01-8c6a-4c2eb4808b6d", "job_name": "Extract", "gain": 8400.0}
+                ],
+                "missing_durations": []
+            }
+        ]
+        """
+        jobs = self.saagie_api.jobs.list_for_project(
+            project_id, instances_limit=instances_limit, versions_only_current=True, pprint_result=False
+        )["jobs"]
+        durations = job_durations_from_instances(jobs, percentile=percentile)
+        pipelines = self.list_for_project(
+            project_id, instances_limit=0, versions_only_current=True, pprint_result=False
+        )
+        report = []
+        for pipeline in (pipelines.get("project") or {}).get("pipelines") or []:
+            row = {"pipeline_id": pipeline["id"], "pipeline_name": pipeline.get("name")}
+            graph = self.__current_graph(pipeline)
+            try:
+                result = compute_critical_path(
+                    graph.get("jobNodes"), graph.get("conditionNodes"), durations, condition_branch
+                )
+            except ValueError as exception:
+                row["error"] = str(exception)
+                report.append(row)
+                continue
+            row.update(
+                {
+                    "makespan": result["makespan"],
+                    "total_work": result["total_work"],
+                    "parallelism": result["parallelism"],
+                    "critical_path": [node["job_name"] for node in result["critical_path"] if node["type"] == "job"],
+                    "speed_up_candidates": [
+                        {key: candidate[key] for key in ("job_id", "job_name", "gain")}
+                        for candidate in result["speed_up_candidates"][:3]
+                    ],
+                    "missing_durations": result["missing_durations"],
+                }
+            )
+            report.append(row)
+        report.sort(key=lambda row: row.get("makespan") or 0, reverse=True)
+        return report
+
+    @staticmethod
+    def __current_graph(pipeline: Dict) -> Dict:
+        versions = pipeline.get("versions") or []
+        version = next((v for v in versions if v.get("isCurrent")), versions[0] if versions else {})
+        return version.get("graph") or {}
+
     def delete(self, pipeline_id: str) -> Dict:
         """Delete a pipeline given pipeline id
 
@@ -1045,7 +1362,12 @@ class Pipelines:
         return result
 
     def upgrade(
-        self, pipeline_id: str, graph_pipeline: GraphPipeline, release_note: str = "", source_url: str = ""
+        self,
+        pipeline_id: str,
+        graph_pipeline: GraphPipeline,
+        release_note: str = "",
+        source_url: str = "",
+        validate: bool = False,
     ) -> Dict:
         """
         Upgrade a pipeline in a given project
@@ -1059,6 +1381,9 @@ class Pipelines:
             Release note of the pipeline
         source_url: str, optional
             URL of the source code used for the pipeline (link to the commit for example)
+        validate: bool, optional
+            Whether to check the structure of the graph locally before upgrading the pipeline
+            (see GraphPipeline.analyze), default to False. Job ids are not checked
 
         Returns
         -------
@@ -1124,6 +1449,8 @@ class Pipelines:
         """
         if not graph_pipeline.list_job_nodes:
             graph_pipeline.to_pipeline_graph_input()
+        if validate:
+            self.__check_graph(graph_pipeline)
 
         params = {
             "id": pipeline_id,
@@ -1529,6 +1856,115 @@ class Pipelines:
 
         return (state, pipeline_instance_id)
 
+    def stream_instance(
+        self, pipeline_instance_id: str, min_interval: float = 1, max_interval: float = 30, timeout: int = -1
+    ) -> Iterator[Dict]:
+        """Follow a pipeline instance until it reaches a final status (SUCCEEDED, FAILED, KILLED, SKIPPED, ERROR or
+        UNKNOWN) and yield only what changed between two polls: status changes, nodes started and finished, and
+        conditions evaluated. See stream_instances
+
+        Parameters
+        ----------
+        pipeline_instance_id : str
+            UUID of your pipeline instance (see README on how to find it)
+        min_interval : float, optional
+            Number of seconds between 2 polls while the instance is changing
+        max_interval : float, optional
+            Maximum number of seconds between 2 polls when nothing changes
+        timeout : int, optional
+            Number of seconds before timeout, -1 for no timeout
+
+        Yields
+        ------
+        dict
+            Events, see saagieapi.pipelines.instance_stream.diff_instance_snapshots
+
+        Raises
+        ------
+        TimeoutError
+            If the instance has not finished before the timeout
+
+        Examples
+        --------
+        >>> for event in saagieapi.pipelines.stream_instance("4e8ec5b4-b3e2-4a42-8b4d-a2f1f6b2f4c1"):
+        ...     print(event["type"], event.get("node_id"), event.get("status"))
+        status_changed None RUNNING
+        node_started 2ba5ad1c-b5fb-4bc3-a4c7-3c2fe49f0f2e RUNNING
+        node_finished 2ba5ad1c-b5fb-4bc3-a4c7-3c2fe49f0f2e SUCCEEDED
+        condition_evaluated 7a3b8b6d-7f6a-4d5b-9d3f-0f9e2b0b7e51 None
+        instance_finished None SUCCEEDED
+        """
+        return self.stream_instances(
+            [pipeline_instance_id], min_interval=min_interval, max_interval=max_interval, timeout=timeout
+        )
+
+    def stream_instances(
+        self, pipeline_instance_ids: List[str], min_interval: float = 1, max_interval: float = 30, timeout: int = -1
+    ) -> Iterator[Dict]:
+        """Follow several pipeline instances with a single poller until they all reach a final status.
+        Each poll fetches the progress of all the unfinished instances in one request, and the snapshots are
+        compared client-side so that only the changes are yielded. The interval between polls is reset to
+        min_interval when something changed and doubled, up to max_interval, otherwise
+
+        Parameters
+        ----------
+        pipeline_instance_ids : list of str
+            UUIDs of your pipeline instances (see README on how to find them)
+        min_interval : float, optional
+            Number of seconds between 2 polls while instances are changing
+        max_interval : float, optional
+            Maximum number of seconds between 2 polls when nothing changes
+        timeout : int, optional
+            Number of seconds before timeout, -1 for no timeout
+
+        Yields
+        ------
+        dict
+            Events, see saagieapi.pipelines.instance_stream.diff_instance_snapshots. An event of type "not_found"
+            is yielded for the instances that do not exist
+
+        Raises
+        ------
+        TimeoutError
+            If some instances have not finished before the timeout
+        """
+        pending = list(dict.fromkeys(pipeline_instance_ids))
+        snapshots = {}
+        queries = {}
+        interval = min_interval
+        sec = 0
+        while pending:
+            if len(pending) not in queries:
+                queries[len(pending)] = gql(build_progress_query(len(pending)))
+            result = self.saagie_api.client.execute(
+                query=queries[len(pending)],
+                variable_values={f"id{index}": instance_id for index, instance_id in enumerate(pending)},
+                pprint_result=False,
+            )
+            changed = False
+            finished = set()
+            for index, instance_id in enumerate(pending):
+                current = result.get(f"instance{index}")
+                if current is None:
+                    logging.warning("❗Pipeline instance [%s] not found", instance_id)
+                    finished.add(instance_id)
+                    yield {"pipeline_instance_id": instance_id, "type": "not_found"}
+                    continue
+                events = diff_instance_snapshots(snapshots.get(instance_id), current)
+                snapshots[instance_id] = current
+                changed = changed or bool(events)
+                yield from events
+                if current.get("status") in FINAL_STATUSES:
+                    finished.add(instance_id)
+            pending = [instance_id for instance_id in pending if instance_id not in finished]
+            if not pending:
+                return
+            interval = min_interval if changed else min(interval * 2, max_interval)
+            if timeout != -1 and sec >= timeout:
+                raise TimeoutError(f"❌ Pipeline instances {pending} have not finished after {sec} seconds")
+            time.sleep(interval)
+            sec += interval
+
     def stop(self, pipeline_instance_id: str) -> Dict:
         """Stop a given pipeline instance
         NB : You can only stop pipeline instance if you have at least the
@@ -1572,6 +2008,7 @@ class Pipelines:
         versions_limit: Optional[int] = None,
         versions_only_current: bool = False,
         env_var_scope: str = "PIPELINE",
+        env_vars_single_file: bool = False,
     ) -> bool:
         """Export the pipeline in a folder
 
@@ -1591,6 +2028,9 @@ class Pipelines:
         env_var_scope : str, optional
             Scope of the environment variables to export. Can be "GLOBAL", "PROJECT" or "PIPELINE"
             Default value is "PIPELINE".
+        env_vars_single_file : bool, optional
+            Whether to write all the environment variables in the file env_vars/env_vars.json. Otherwise, each
+            variable is written in its own env_vars/<name>/variable.json file
 
         Returns
         -------
@@ -1634,9 +2074,13 @@ class Pipelines:
             env_vars = self.saagie_api.env_vars.list(scope="PIPELINE", pipeline_id=pipeline_id)
             env_vars = [env for env in env_vars if env["scope"] in scopes]
 
-            for env in env_vars:
-                create_folder(pipeline_folder / "env_vars" / env["name"])
-                write_to_json_file(pipeline_folder / "env_vars" / env["name"] / "variable.json", env)
+            if env_vars_single_file:
+                create_folder(pipeline_folder / "env_vars")
+                write_to_json_file(pipeline_folder / "env_vars" / ENV_VARS_FILE, env_vars)
+            else:
+                for env in env_vars:
+                    create_folder(pipeline_folder / "env_vars" / env["name"])
+                    write_to_json_file(pipeline_folder / "env_vars" / env["name"] / "variable.json", env)
 
             logging.info("✅ Pipeline [%s] successfully exported", pipeline_id)
         except Exception as exception:
@@ -1672,72 +2116,171 @@ class Pipelines:
         True
         """
         json_file = Path(json_file)
-        env_vars_folder = json_file.parent / "env_vars"
         try:
-            with json_file.open("r", encoding="utf-8") as file:
-                pipeline_info = json.load(file)
+            pipeline_info = self.__read_import_file(json_file)
         except Exception as exception:
             return handle_error(f"Cannot open the JSON file {json_file}", exception)
 
+        pipeline_name = pipeline_info.get("name")
         try:
-            pipeline_name = pipeline_info["name"]
+            jobs_by_name = build_job_name_index(self.saagie_api.jobs.list_for_project_minimal(project_id)["jobs"])
+            graph_pipeline = self.__resolve_import_graph(pipeline_info, jobs_by_name, project_id)
+            self.__create_imported_pipeline(json_file, pipeline_info, graph_pipeline, project_id)
+        except Exception as exception:
+            return handle_error(exception, pipeline_name)
 
-            version = next((version for version in pipeline_info["versions"] if version["isCurrent"]), None)
-            if not version:
-                return handle_error("❌ Current version not found", pipeline_name)
+        logging.info("✅ Pipeline [%s] has been successfully imported", pipeline_name)
+        return True
 
-            jobs_target_pj = self.saagie_api.jobs.list_for_project_minimal(project_id)["jobs"]
+    def import_many(
+        self, json_files: List[str], project_id: str, max_workers: int = DEFAULT_MAX_WORKERS
+    ) -> Dict[str, List[str]]:
+        """Import several pipelines from JSON format in the same project.
+        The jobs of the project are listed once, the job references of every pipeline are checked before any
+        creation, then the pipelines are created concurrently and the environment variables of each pipeline are
+        created in bulk
 
-            jobs_not_found, jobs_found = parse_version_jobs(jobs_target_pj, version)
+        Parameters
+        ----------
+        json_files : list of str
+            Paths to the JSON files that contain pipeline information. The environment variables of a pipeline are
+            read from the folder env_vars next to its JSON file, in either layout written by export
+        project_id : str
+            Project ID
+        max_workers : int, optional
+            Maximum number of pipelines created concurrently
 
-            if jobs_not_found:
-                not_found = "".join(f"{job}, " for job in jobs_not_found)
-                return handle_error(
-                    f"❌ Import aborted, in target project (id : {project_id}), \
-                        the following jobs were not found: {not_found}",
-                    pipeline_name,
-                )
+        Returns
+        -------
+        dict
+            Dict with the paths of the imported JSON files in "imported" and of the others in "failed", in the order
+            of json_files
 
-            graph_pipeline = GraphPipeline()
-            graph_pipeline.list_job_nodes = jobs_found
-            graph_pipeline.list_conditions_nodes = parse_version_conditions(version)
-            res = self.create_graph(
-                name=pipeline_name,
-                alias=pipeline_info["alias"],
-                project_id=project_id,
-                graph_pipeline=graph_pipeline,
-                description=pipeline_info["description"],
-                release_note=version["releaseNote"],
-                emails=(pipeline_info.get("alerting") or {}).get("emails", ""),
-                status_list=(pipeline_info.get("alerting") or {}).get("statusList", ""),
-                cron_scheduling=pipeline_info["cronScheduling"],
-                schedule_timezone=pipeline_info["scheduleTimezone"],
-                has_execution_variables_enabled=pipeline_info["hasExecutionVariablesEnabled"],
-            )
-            if res["createGraphPipeline"] is None:
-                return handle_error(res, pipeline_name)
-
-            # check if env_var_folder exists
-            if env_vars_folder.exists():
-                for env_var_folder in env_vars_folder.iterdir():
-                    with (env_var_folder / "variable.json").open("r", encoding="utf-8") as file:
-                        env_var_info = json.load(file)
-                    res_env = self.saagie_api.env_vars.create(
-                        scope=env_var_info["scope"],
-                        name=env_var_info["name"],
-                        value=env_var_info["value"] or "",
-                        description=env_var_info["description"],
-                        is_password=env_var_info["isPassword"],
-                        project_id=project_id,
-                        pipeline_id=res["createGraphPipeline"]["id"],
+        Examples
+        --------
+        >>> saagieapi.pipelines.import_many(
+        ...     json_files=["/path/to/pipeline_1/pipeline.json", "/path/to/pipeline_2/pipeline.json"],
+        ...     project_id="860b8dc8-e634-4c98-b2e7-f9ec32ab4771"
+        ... )
+        {
+            "imported": ["/path/to/pipeline_1/pipeline.json"],
+            "failed": ["/path/to/pipeline_2/pipeline.json"]
+        }
+        """
+        json_files = [Path(json_file) for json_file in json_files]
+        failed = set()
+        to_create = []
+        jobs_by_name = None
+        for json_file in json_files:
+            try:
+                pipeline_info = self.__read_import_file(json_file)
+            except Exception as exception:
+                handle_error(f"Cannot open the JSON file {json_file}", exception)
+                failed.add(json_file)
+                continue
+            try:
+                if jobs_by_name is None:
+                    jobs_by_name = build_job_name_index(
+                        self.saagie_api.jobs.list_for_project_minimal(project_id)["jobs"]
                     )
-                    if res_env["saveEnvironmentVariable"] is None:
-                        return handle_error(res_env, pipeline_name)
-        except Exception as exception:
-            return handle_error(exception, pipeline_name)
+                graph_pipeline = self.__resolve_import_graph(pipeline_info, jobs_by_name, project_id)
+            except Exception as exception:
+                handle_error(exception, pipeline_info.get("name"))
+                failed.add(json_file)
+                continue
+            to_create.append((json_file, pipeline_info, graph_pipeline))
+
+        for (json_file, pipeline_info, _), _, exception in run_concurrently(
+            lambda item: self.__create_imported_pipeline(item[0], item[1], item[2], project_id),
+            to_create,
+            max_workers,
+        ):
+            if exception:
+                handle_error(exception, pipeline_info.get("name"))
+                failed.add(json_file)
+            else:
+                logging.info("✅ Pipeline [%s] has been successfully imported", pipeline_info.get("name"))
 
-        logging.info("✅ Pipeline [%s] has been successfully imported", pipeline_name)
-        return True
+        return {
+            "imported": [str(json_file) for json_file in json_files if json_file not in failed],
+            "failed": [str(json_file) for json_file in json_files if json_file in failed],
+        }
+
+    @staticmethod
+    def __read_import_file(json_file: Path) -> Dict:
+        with json_file.open("r", encoding="utf-8") as file:
+            return json.load(file)
+
+    @staticmethod
+    def __resolve_import_graph(pipeline_info: Dict, jobs_by_name: Dict[str, str], project_id: str) -> GraphPipeline:
+        version = next((version for version in pipeline_info["versions"] if version["isCurrent"]), None)
+        if not version:
+            raise ValueError("❌ Current version not found")
+
+        jobs_not_found, jobs_found = parse_version_jobs(jobs_by_name, version)
+        if jobs_not_found:
+            not_found = "".join(f"{job}, " for job in jobs_not_found)
+            raise ValueError(
+                f"❌ Import aborted, in target project (id : {project_id}), \
+                    the following jobs were not found: {not_found}"
+            )
+
+        graph_pipeline = GraphPipeline()
+        graph_pipeline.list_job_nodes = jobs_found
+        graph_pipeline.list_conditions_nodes = parse_version_conditions(version)
+        return graph_pipeline
+
+    def __create_imported_pipeline(
+        self, json_file: Path, pipeline_info: Dict, graph_pipeline: GraphPipeline, project_id: str
+    ) -> str:
+        version = next(version for version in pipeline_info["versions"] if version["isCurrent"])
+        res = self.create_graph(
+            name=pipeline_info["name"],
+            alias=pipeline_info["alias"],
+            project_id=project_id,
+            graph_pipeline=graph_pipeline,
+            description=pipeline_info["description"],
+            release_note=version["releaseNote"],
+            emails=(pipeline_info.get("alerting") or {}).get("emails", ""),
+            status_list=(pipeline_info.get("alerting") or {}).get("statusList", ""),
+            cron_scheduling=pipeline_info["cronScheduling"],
+            schedule_timezone=pipeline_info["scheduleTimezone"],
+            has_execution_variables_enabled=pipeline_info["hasExecutionVariablesEnabled"],
+        )
+        if res["createGraphPipeline"] is None:
+            raise ValueError(res)
+        pipeline_id = res["createGraphPipeline"]["id"]
+
+        env_vars_info = read_exported_env_vars(json_file.parent / "env_vars")
+
+        # the raw format of the bulk creation cannot hold a description, a password flag or a multi-line value
+        raw_env_vars = {
+            env_var_info["name"]: env_var_info["value"] or ""
+            for env_var_info in env_vars_info
+            if env_var_info["scope"] == "PIPELINE"
+            and not env_var_info["description"]
+            and not env_var_info["isPassword"]
+            and "\n" not in (env_var_info["value"] or "")
+        }
+        if raw_env_vars:
+            res_env = self.saagie_api.env_vars.bulk_create_for_pipeline(pipeline_id, raw_env_vars)
+            if res_env["replaceEnvironmentVariablesByRawForScope"] is None:
+                raise ValueError(res_env)
+        for env_var_info in env_vars_info:
+            if env_var_info["scope"] == "PIPELINE" and env_var_info["name"] in raw_env_vars:
+                continue
+            res_env = self.saagie_api.env_vars.create(
+                scope=env_var_info["scope"],
+                name=env_var_info["name"],
+                value=env_var_info["value"] or "",
+                description=env_var_info["description"],
+                is_password=env_var_info["isPassword"],
+                project_id=project_id,
+                pipeline_id=pipeline_id,
+            )
+            if res_env["saveEnvironmentVariable"] is None:
+                raise ValueError(res_env)
+        return pipeline_id
 
     def count_deletable_instances_by_status(self, pipeline_id: str) -> Dict:
         """Count deletable instances of pipeline by status
@@ -1,3 +1,4 @@
+from .project_snapshot import ProjectSnapshot
 from .projects import Projects
 
-__all__ = ["Projects"]
+__all__ = ["ProjectSnapshot", "Projects"]
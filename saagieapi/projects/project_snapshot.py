@@ -0,0 +1,301 @@
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from ..utils.concurrency import DEFAULT_MAX_WORKERS, run_concurrently
+
+# version of the format returned by ProjectSnapshot.to_dict
+SNAPSHOT_FORMAT_VERSION = 1
+ENTITY_KINDS = ("jobs", "pipelines", "apps", "storages", "docker_credentials", "env_vars")
+
+
+def _current_version(entity: Dict) -> Dict:
+    """Current version of a job, pipeline or app, from its currentVersion or its versions"""
+    if entity.get("currentVersion"):
+        return entity["currentVersion"]
+    versions = entity.get("versions") or []
+    return next((version for version in versions if version.get("isCurrent")), versions[0] if versions else {})
+
+
+class SnapshotEntity:
+    """Entity of a project snapshot. data is the dict returned by the API"""
+
+    __slots__ = ("id", "name", "data")
+
+    def __init__(self, data: Dict) -> None:
+        self.id = data["id"]  # pylint: disable=invalid-name
+        self.name = data.get("name")
+        self.data = data
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(id={self.id!r}, name={self.name!r})"
+
+
+class JobSnapshot(SnapshotEntity):
+    __slots__ = ("technology_id", "runtime_version", "pipelines", "docker_credentials")
+
+    def __init__(self, data: Dict) -> None:
+        super().__init__(data)
+        self.technology_id: Optional[str] = (data.get("technology") or {}).get("id")
+        self.runtime_version: Optional[str] = _current_version(data).get("runtimeVersion")
+        self.pipelines: List[PipelineSnapshot] = []
+        self.docker_credentials: Optional[DockerCredentialsSnapshot] = None
+
+
+class PipelineSnapshot(SnapshotEntity):
+    __slots__ = ("jobs", "env_vars")
+
+    def __init__(self, data: Dict) -> None:
+        super().__init__(data)
+        self.jobs: List[JobSnapshot] = []
+        self.env_vars: List[EnvVarSnapshot] = []
+
+
+class AppSnapshot(SnapshotEntity):
+    __slots__ = ("technology_id", "runtime_context_id", "storages", "env_vars")
+
+    def __init__(self, data: Dict) -> None:
+        super().__init__(data)
+        self.technology_id: Optional[str] = (data.get("technology") or {}).get("id")
+        self.runtime_context_id: Optional[str] = _current_version(data).get("runtimeContextId")
+        self.storages: List[StorageSnapshot] = []
+        self.env_vars: List[EnvVarSnapshot] = []
+
+
+class StorageSnapshot(SnapshotEntity):
+    __slots__ = ("size", "app")
+
+    def __init__(self, data: Dict) -> None:
+        super().__init__(data)
+        self.size: Optional[str] = data.get("size")
+        self.app: Optional[AppSnapshot] = None
+
+
+class DockerCredentialsSnapshot(SnapshotEntity):
+    """Docker credentials, named after their username"""
+
+    __slots__ = ("registry", "jobs")
+
+    def __init__(self, data: Dict) -> None:
+        super().__init__({**data, "name": data.get("username")})
+        self.registry: Optional[str] = data.get("registry")
+        self.jobs: List[JobSnapshot] = []
+
+
+class EnvVarSnapshot(SnapshotEntity):
+    """Environment variable. owner is the pipeline or app defining it, None for the GLOBAL and PROJECT ones"""
+
+    __slots__ = ("scope", "value", "is_password", "owner")
+
+    def __init__(self, data: Dict, owner: Optional[SnapshotEntity] = None) -> None:
+        super().__init__(data)
+        self.scope: str = data.get("scope")
+        self.value: Optional[str] = data.get("value")
+        self.is_password: bool = bool(data.get("isPassword"))
+        self.owner = owner
+
+
+class ProjectSnapshot:
+    # pylint: disable=too-many-instance-attributes
+    # one index per entity kind
+    """Jobs, pipelines, apps, storages, docker credentials and environment variables of a project, fetched
+    concurrently and linked together:
+
+    - job.pipelines and pipeline.jobs, from the graph of the current version of the pipelines
+    - app.storages and storage.app, from the linked app of the storages
+    - job.docker_credentials and docker_credentials.jobs
+    - pipeline.env_vars and app.env_vars, the variables defined at their level. The GLOBAL and PROJECT ones are in
+      env_vars, see effective_env_vars for the merge
+
+    Entities are indexed by id and by name for each kind. The snapshot can be saved with to_dict or save and
+    reloaded offline with from_dict or load_file.
+
+    Examples
+    --------
+    >>> snapshot = saagie_api.projects.snapshot("860b8dc8-e634-4c98-b2e7-f9ec32ab4771")
+    >>> job = snapshot.find("jobs", "daily ingestion")[0]
+    >>> [pipeline.name for pipeline in job.pipelines]
+    ['nightly']
+    >>> [storage.name for storage in snapshot.find("apps", "Jupyter Notebook")[0].storages]
+    ['storage Jupyter Notebook (0)']
+    >>> snapshot.save("/tmp/project.json")
+    >>> ProjectSnapshot.load_file("/tmp/project.json").get("f5fce22d-2152-4a01-8c6a-4c2eb4808b6d")
+    JobSnapshot(id='f5fce22d-2152-4a01-8c6a-4c2eb4808b6d', name='daily ingestion')
+    """
+
+    def __init__(self, data: Dict):
+        """
+        Parameters
+        ----------
+        data : dict
+            Raw data of the project, as returned by to_dict
+        """
+        self.data = data
+        self.project_id: str = data["project_id"]
+        self.errors: Dict[str, str] = dict(data.get("errors") or {})
+        self.jobs = {job["id"]: JobSnapshot(job) for job in data.get("jobs") or []}
+        self.pipelines = {pipeline["id"]: PipelineSnapshot(pipeline) for pipeline in data.get("pipelines") or []}
+        self.apps = {app["id"]: AppSnapshot(app) for app in data.get("apps") or []}
+        self.storages = {storage["id"]: StorageSnapshot(storage) for storage in data.get("storages") or []}
+        self.docker_credentials = {
+            credentials["id"]: DockerCredentialsSnapshot(credentials)
+            for credentials in data.get("docker_credentials") or []
+        }
+        self.env_vars = {var["id"]: EnvVarSnapshot(var) for var in data.get("env_vars") or []}
+        self.__link()
+
+        self._by_id: Dict[str, SnapshotEntity] = {}
+        self._by_name: Dict[str, Dict[str, List[SnapshotEntity]]] = {}
+        for kind in ENTITY_KINDS:
+            names: Dict[str, List[SnapshotEntity]] = {}
+            for entity in getattr(self, kind).values():
+                self._by_id[entity.id] = entity
+                names.setdefault(entity.name, []).append(entity)
+            self._by_name[kind] = names
+
+    def __link(self) -> None:
+        for pipeline in self.pipelines.values():
+            for node in (_current_version(pipeline.data).get("graph") or {}).get("jobNodes") or []:
+                job = self.jobs.get((node.get("job") or {}).get("id"))
+                if job is not None and job not in pipeline.jobs:
+                    pipeline.jobs.append(job)
+                    job.pipelines.append(pipeline)
+        for storage in self.storages.values():
+            app = self.apps.get((storage.data.get("linkedApp") or {}).get("id"))
+            if app is not None:
+                storage.app = app
+                app.storages.append(storage)
+        for credentials in self.docker_credentials.values():
+            for job_data in credentials.data.get("jobs") or []:
+                job = self.jobs.get(job_data["id"])
+                if job is not None:
+                    job.docker_credentials = credentials
+                    credentials.jobs.append(job)
+        for key, owners in (("pipeline_env_vars", self.pipelines), ("app_env_vars", self.apps)):
+            for owner_id, variables in (self.data.get(key) or {}).items():
+                owner = owners.get(owner_id)
+                if owner is None:
+                    continue
+                for var in variables or []:
+                    env_var = EnvVarSnapshot(var, owner)
+                    owner.env_vars.append(env_var)
+                    self.env_vars[env_var.id] = env_var
+
+    @classmethod
+    def load(
+        cls, saagie_api, project_id: str, max_workers: int = DEFAULT_MAX_WORKERS, chunk_size: int = 50
+    ) -> "ProjectSnapshot":
+        """Fetch the entities of a project. The jobs, pipelines, apps, storages, docker credentials and project
+        variables are fetched concurrently, then the variables of the pipelines and apps, a chunk of entities
+        per request (see EnvVars.list_by_entity)
+
+        Parameters
+        ----------
+        saagie_api : SaagieApi
+            Connection to the platform
+        project_id : str
+            UUID of the project
+        max_workers : int, optional
+            Maximum number of concurrent requests
+        chunk_size : int, optional
+            Maximum number of pipelines or apps whose variables are fetched by request
+
+        Returns
+        -------
+        ProjectSnapshot
+            Snapshot of the project. Its errors attribute gives the error message by kind of entity, for the
+            kinds that could not be fetched. They are empty in the snapshot
+        """
+        fetchers = {
+            "jobs": lambda: saagie_api.jobs.list_for_project(
+                project_id, instances_limit=0, versions_only_current=True, pprint_result=False
+            )["jobs"],
+            "pipelines": lambda: saagie_api.pipelines.list_for_project(
+                project_id, instances_limit=0, versions_only_current=True, pprint_result=False
+            )["project"]["pipelines"],
+            "apps": lambda: saagie_api.apps.list_for_project(
+                project_id, versions_only_current=True, pprint_result=False
+            )["project"]["apps"],
+            "storages": lambda: saagie_api.storages.list_for_project(project_id, pprint_result=False)["project"][
+                "volumes"
+            ],
+            "docker_credentials": lambda: saagie_api.docker_credentials.list_for_project(
+                project_id, pprint_result=False
+            )["allDockerCredentials"],
+            "env_vars": lambda: saagie_api.env_vars.list("PROJECT", project_id=project_id, pprint_result=False),
+        }
+        data = {"format_version": SNAPSHOT_FORMAT_VERSION, "project_id": project_id, "errors": {}}
+        for kind, result, exception in run_concurrently(lambda kind: fetchers[kind](), list(fetchers), max_workers):
+            if exception:
+                logging.warning("❗Cannot fetch the %s of the project [%s]: %s", kind, project_id, exception)
+                data["errors"][kind] = str(exception)
+            data[kind] = result or []
+
+        scopes = {"pipeline_env_vars": ("PIPELINE", "pipelines"), "app_env_vars": ("APP", "apps")}
+        for key, result, exception in run_concurrently(
+            lambda key: saagie_api.env_vars.list_by_entity(
+                scopes[key][0], [entity["id"] for entity in data[scopes[key][1]]], chunk_size
+            ),
+            list(scopes),
+            max_workers,
+        ):
+            if exception:
+                logging.warning("❗Cannot fetch the %s of the project [%s]: %s", key, project_id, exception)
+                data["errors"][key] = str(exception)
+            data[key] = result or {}
+        return cls(data)
+
+    def to_dict(self) -> Dict:
+        """Serializable snapshot, see from_dict"""
+        return self.data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ProjectSnapshot":
+        """Rebuild a snapshot from the dict returned by to_dict
+
+        Raises
+        ------
+        ValueError
+            If the dict was written with a newer format
+        """
+        if data.get("format_version", SNAPSHOT_FORMAT_VERSION) > SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"❌ Unsupported snapshot format version: {data['format_version']}")
+        return cls(data)
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write the snapshot to a JSON file"""
+        with Path(path).open("w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, indent=4)
+
+    @classmethod
+    def load_file(cls, path: Union[str, Path]) -> "ProjectSnapshot":
+        """Read a snapshot written by save"""
+        with Path(path).open(encoding="utf-8") as file:
+            return cls.from_dict(json.load(file))
+
+    def get(self, entity_id: str) -> Optional[SnapshotEntity]:
+        """Entity of any kind with this id, None if there is none"""
+        return self._by_id.get(entity_id)
+
+    def find(self, kind: str, name: str) -> List[SnapshotEntity]:
+        """Entities of a kind with this name (username for docker credentials)
+
+        Raises
+        ------
+        ValueError
+            If the kind is not one of ENTITY_KINDS
+        """
+        if kind not in ENTITY_KINDS:
+            raise ValueError(f"❌ 'kind' must be one of {', '.join(ENTITY_KINDS)}")
+        return list(self._by_name[kind].get(name, []))
+
+    def effective_env_vars(self, entity: Union[PipelineSnapshot, AppSnapshot]) -> Dict[str, EnvVarSnapshot]:
+        """Variables seen by a pipeline or app by name: its own variables override the PROJECT ones, which
+        override the GLOBAL ones"""
+        layers = [
+            [var for var in self.env_vars.values() if var.owner is None and var.scope == "GLOBAL"],
+            [var for var in self.env_vars.values() if var.owner is None and var.scope == "PROJECT"],
+            entity.env_vars,
+        ]
+        return {var.name: var for layer in layers for var in layer}
@@ -7,8 +7,11 @@ from typing import Dict, List, Optional
 
 from gql import gql
 
+from ..env_vars.env_vars import ENV_VARS_FILE
+from ..utils.concurrency import DEFAULT_MAX_WORKERS
 from ..utils.folder_functions import create_folder, write_to_json_file
 from .gql_queries import *
+from .project_snapshot import ProjectSnapshot
 
 
 class Projects:
@@ -170,6 +173,31 @@ class Projects:
             query=gql(GQL_GET_PROJECT_INFO), variable_values={"id": project_id}, pprint_result=pprint_result
         )
 
+    def snapshot(self, project_id: str, max_workers: int = DEFAULT_MAX_WORKERS) -> ProjectSnapshot:
+        """Fetch the jobs, pipelines, apps, storages, docker credentials and environment variables of a project
+        concurrently, into a ProjectSnapshot indexing them by id and name and linking them together
+        NB: You need at least the viewer role on this project.
+
+        Parameters
+        ----------
+        project_id : str
+            UUID of your project (see README on how to find it)
+        max_workers : int, optional
+            Maximum number of concurrent requests
+
+        Returns
+        -------
+        ProjectSnapshot
+            Snapshot of the project, serializable with to_dict or save
+
+        Examples
+        --------
+        >>> snapshot = saagieapi.projects.snapshot(project_id="8321e13c-892a-4481-8552-5be4d6cc5df4")
+        >>> [job.name for job in snapshot.find("pipelines", "nightly")[0].jobs]
+        ['extract', 'load']
+        """
+        return ProjectSnapshot.load(self.saagie_api, project_id, max_workers)
+
     def get_info_by_name(self, project_name: str, pprint_result: Optional[bool] = None) -> Dict:
         """Get information for a given project (id, name, creator, description,
         jobCount and status)
@@ -610,6 +638,7 @@ class Projects:
         versions_limit: Optional[int] = None,
         versions_only_current: bool = False,
         project_only_env_vars: bool = False,
+        env_vars_single_file: bool = False,
     ) -> bool:
         """Export the project in a folder
 
@@ -628,6 +657,9 @@ class Projects:
             Whether to only fetch the current version of each job/app/pipeline
         project_only_env_vars : bool, optional
             True if only project environment variable should be exported False otherwise
+        env_vars_single_file : bool, optional
+            Whether to write the environment variables of the project and of each pipeline in a single
+            env_vars.json file, instead of one env_vars/<name>/variable.json file per variable
 
         Returns
         -------
@@ -693,6 +725,7 @@ class Projects:
             output_folder=output_folder / "env_vars",
             error_folder=error_folder,
             project_only=project_only_env_vars,
+            single_file=env_vars_single_file,
         )
         if not env_vars_export:
             env_var_failed.append(project_id)
@@ -715,6 +748,7 @@ class Projects:
                 error_folder=error_folder,
                 versions_limit=versions_limit,
                 versions_only_current=versions_only_current,
+                env_vars_single_file=env_vars_single_file,
             )
             if not pipeline_export:
                 pipeline_failed.append(id_pipeline)
@@ -802,11 +836,12 @@ class Projects:
                 status = False
 
         # Import pipelines
-        for filename in (path_to_folder / "pipelines").rglob("pipeline.json"):
-            pipeline_status = self.saagie_api.pipelines.import_from_json(json_file=filename, project_id=new_project_id)
-            if not pipeline_status:
-                list_failed["pipelines"].append(filename.parent.name)
-                status = False
+        pipelines_status = self.saagie_api.pipelines.import_many(
+            json_files=sorted((path_to_folder / "pipelines").rglob("pipeline.json")), project_id=new_project_id
+        )
+        if pipelines_status["failed"]:
+            list_failed["pipelines"].extend(Path(filename).parent.name for filename in pipelines_status["failed"])
+            status = False
 
         # Import apps
         for filename in (path_to_folder / "apps").rglob("app.json"):
@@ -815,7 +850,13 @@ class Projects:
                 list_failed["apps"].append(filename.parent.name)
                 status = False
 
-        # Import env vars
+        # Import env vars, from the single file if the project was exported with env_vars_single_file
+        env_vars_file = path_to_folder / "env_vars" / ENV_VARS_FILE
+        if env_vars_file.exists() and not self.saagie_api.env_vars.import_from_file(
+            json_file=env_vars_file, project_id=new_project_id, scopes=["PROJECT"]
+        ):
+            list_failed["env_vars"].append(env_vars_file.name)
+            status = False
         for filename in (path_to_folder / "env_vars").rglob("env_var.json"):
             env_var_status = self.saagie_api.env_vars.import_from_json(json_file=filename, project_id=new_project_id)
             if not env_var_status:
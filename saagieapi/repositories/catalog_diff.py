@@ -0,0 +1,160 @@
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from ..utils.concurrency import DEFAULT_MAX_WORKERS, run_concurrently
+
+
+def file_hash(file: Union[str, Path]) -> str:
+    """SHA-256 of a file, read by blocks"""
+    digest = hashlib.sha256()
+    with Path(file).open(mode="rb") as file_content:
+        for block in iter(lambda: file_content.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def catalog_contexts(technologies: Iterable[Dict]) -> Dict[Tuple[str, str], Dict]:
+    """Runtime contexts of technologies as returned by Repositories.get_info, by (technology UUID, context id).
+    For Spark technologies, the contexts are the Spark versions"""
+    contexts = {}
+    for technology in technologies:
+        for context in technology.get("contexts") or technology.get("appContexts") or []:
+            contexts[(technology["id"], context["id"])] = {
+                "technology_id": technology["id"],
+                "technology": technology.get("technologyId"),
+                "technology_label": technology.get("label"),
+                "context_id": context["id"],
+                "context_label": context.get("label"),
+                "available": context.get("available"),
+                "deprecation_date": context.get("deprecationDate"),
+            }
+    return contexts
+
+
+def diff_catalogs(before: Iterable[Dict], after: Iterable[Dict]) -> Dict:
+    """Changes of the technologies of a repository between two get_info snapshots
+
+    Parameters
+    ----------
+    before : Iterable[dict]
+        Technologies of the repository before the change, see Repositories.get_info
+    after : Iterable[dict]
+        Technologies of the repository after the change
+
+    Returns
+    -------
+    dict
+        With the keys "technologies" and "contexts". "technologies" has the keys "added", "removed" and
+        "unavailable" (available before, not anymore), each a list of dicts with the keys "technology_id",
+        "technology" and "technology_label". "contexts" has the keys "added", "removed", "deprecated" (without
+        deprecation date before) and "unavailable", each a list of contexts as returned by catalog_contexts
+    """
+    before = {technology["id"]: technology for technology in before}
+    after = {technology["id"]: technology for technology in after}
+
+    def technology_summary(technology):
+        return {
+            "technology_id": technology["id"],
+            "technology": technology.get("technologyId"),
+            "technology_label": technology.get("label"),
+        }
+
+    technologies = {
+        "added": [technology_summary(after[key]) for key in after if key not in before],
+        "removed": [technology_summary(before[key]) for key in before if key not in after],
+        "unavailable": [
+            technology_summary(after[key])
+            for key in after
+            if key in before and before[key].get("available") and not after[key].get("available")
+        ],
+    }
+
+    contexts_before = catalog_contexts(before.values())
+    contexts_after = catalog_contexts(after.values())
+    contexts = {
+        "added": [context for key, context in contexts_after.items() if key not in contexts_before],
+        "removed": [context for key, context in contexts_before.items() if key not in contexts_after],
+        "deprecated": [
+            context
+            for key, context in contexts_after.items()
+            if key in contexts_before and context["deprecation_date"] and not contexts_before[key]["deprecation_date"]
+        ],
+        "unavailable": [
+            context
+            for key, context in contexts_after.items()
+            if key in contexts_before and contexts_before[key]["available"] and not context["available"]
+        ],
+    }
+    return {"technologies": technologies, "contexts": contexts}
+
+
+def find_runtime_usages(
+    saagie_api,
+    runtimes: Iterable[Tuple[str, str]],
+    project_ids: Optional[Iterable[str]] = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> Tuple[List[Dict], Dict[str, str]]:
+    """Jobs and apps whose current version uses some runtime contexts, scanning the projects concurrently
+
+    Parameters
+    ----------
+    saagie_api : SaagieApi
+        Connection to the platform
+    runtimes : Iterable[tuple]
+        (technology UUID, context id) of the runtime contexts to look for
+    project_ids : Iterable[str], optional
+        UUIDs of the projects to scan, default to all the projects you have rights on
+    max_workers : int, optional
+        Maximum number of concurrent requests
+
+    Returns
+    -------
+    tuple
+        The usages, sorted by project, type and name, as dicts with the keys "project_id", "entity_type" (job or
+        app), "entity_id", "entity_name", "technology_id" and "context_id", and the error message by project id
+        for the projects that could not be scanned
+    """
+    runtimes: Set[Tuple[str, str]] = set(runtimes)
+    if not runtimes:
+        return [], {}
+    if project_ids is None:
+        project_ids = [project["id"] for project in saagie_api.projects.list(pprint_result=False)["projects"] or []]
+
+    def scan(project_id):
+        jobs = saagie_api.jobs.list_for_project(
+            project_id, instances_limit=0, versions_only_current=True, pprint_result=False
+        )["jobs"]
+        apps = saagie_api.apps.list_for_project(project_id, versions_only_current=True, pprint_result=False)["project"][
+            "apps"
+        ]
+        found = []
+        for job in jobs or []:
+            current = next((version for version in job.get("versions") or [] if version.get("isCurrent")), {})
+            found.append(("job", job, current.get("runtimeVersion")))
+        for app in apps or []:
+            found.append(("app", app, (app.get("currentVersion") or {}).get("runtimeContextId")))
+        return [
+            {
+                "project_id": project_id,
+                "entity_type": entity_type,
+                "entity_id": entity["id"],
+                "entity_name": entity["name"],
+                "technology_id": (entity.get("technology") or {}).get("id"),
+                "context_id": context_id,
+            }
+            for entity_type, entity, context_id in found
+            if ((entity.get("technology") or {}).get("id"), context_id) in runtimes
+        ]
+
+    usages = []
+    errors = {}
+    for project_id, result, exception in run_concurrently(scan, project_ids, max_workers):
+        if exception:
+            logging.warning("❗Cannot scan the jobs and apps of the project [%s]: %s", project_id, exception)
+            errors[project_id] = str(exception)
+            continue
+        usages += result
+    usages.sort(key=lambda usage: (usage["project_id"], usage["entity_type"], usage["entity_name"]))
+    return usages, errors
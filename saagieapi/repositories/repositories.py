@@ -1,15 +1,20 @@
+import json
 import logging
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional
 
 from gql import gql
 
+from ..utils.concurrency import DEFAULT_MAX_WORKERS
+from .catalog_diff import catalog_contexts, diff_catalogs, file_hash, find_runtime_usages
 from .gql_queries import *
 
 
 class Repositories:
     def __init__(self, saagie_api):
         self.saagie_api = saagie_api
+        # SHA-256 of the last zip file synchronized by repository id, see synchronize_with_report
+        self.__synchronized_hashes: Dict[str, str] = {}
 
     def list(
         self, minimal: Optional[bool] = False, last_synchronization: bool = True, pprint_result: Optional[bool] = None
@@ -469,6 +474,144 @@ class Repositories:
         logging.info("✅ Repository [%s] successfully synchronized", repository_id)
         return result
 
+    def synchronize_with_report(
+        self,
+        repository_id: str,
+        file: str = None,
+        state_file: str = None,
+        force: bool = False,
+        scan_usages: bool = True,
+        project_ids: Optional[Iterable[str]] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> Dict:
+        """
+        Synchronize a repository, then report the changes of its technologies and the jobs and apps using the
+        runtime contexts that were removed or are deprecated.
+        With a zip file, the synchronization is skipped when the file did not change since the last
+        synchronization done with this method, by comparing its SHA-256
+
+        Parameters
+        ----------
+        repository_id : str
+            UUID of your repository (see README on how to find it)
+        file : str, optional
+            Path to the new zip file of the repository, if it was created by zip file
+        state_file : str, optional
+            Path of a JSON file keeping the SHA-256 of the last synchronized zip file of each repository, to skip
+            unchanged files across sessions. If not filled, the hashes are only kept by this object
+        force : bool, optional
+            Whether to synchronize even if the zip file did not change
+        scan_usages : bool, optional
+            Whether to look for the jobs and apps using removed or deprecated runtime contexts
+        project_ids : Iterable[str], optional
+            UUIDs of the projects to scan, default to all the projects you have rights on
+        max_workers : int, optional
+            Maximum number of projects scanned concurrently
+
+        Returns
+        -------
+        dict
+            Report with the keys "repository_id", "skipped" (whether the file was unchanged), "file_hash",
+            "synchronization" (result of synchronize), "failure" (failure message of the synchronization, None if
+            it succeeded), "diff" (see diff_catalogs), "usages" and "errors" (see find_runtime_usages).
+            The hash of the file is only kept when the synchronization succeeded, so that a failed file is sent
+            again by the next call
+
+        Examples
+        --------
+        >>> saagie.repositories.synchronize_with_report(
+        ...     repository_id="d04e578f-546a-41bf-bb8c-790e99a4f6c8",
+        ...     file="./test_input/new_technologies.zip",
+        ...     state_file="./repositories_state.json"
+        ... )
+        {
+            "repository_id": "d04e578f-546a-41bf-bb8c-790e99a4f6c8",
+            "skipped": False,
+            "file_hash": "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08",
+            "synchronization": {"synchronizeRepository": {...}},
+            "failure": None,
+            "diff": {
+                "technologies": {"added": [], "removed": [], "unavailable": []},
+                "contexts": {
+                    "added": [],
+                    "removed": [],
+                    "deprecated": [
+                        {
+                            "technology_id": "0db6d0a7-ab32-4e2b-9d9d-3b0d4a4b1a1b",
+                            "technology": "python",
+                            "technology_label": "Python",
+                            "context_id": "3.8",
+                            "context_label": "3.8",
+                            "available": True,
+                            "deprecation_date": "2024-06-30T00:00:00Z"
+                        }
+                    ],
+                    "unavailable": []
+                }
+            },
+            "usages": [
+                {
+                    "project_id": "860b8dc8-e634-4c98-b2e7-f9ec32ab4771",
+                    "entity_type": "job",
+                    "entity_id": "f5fce22d-2152-4a01-8c6a-4c2eb4808b6d",
+                    "entity_name": "daily ingestion",
+                    "technology_id": "0db6d0a7-ab32-4e2b-9d9d-3b0d4a4b1a1b",
+                    "context_id": "3.8"
+                }
+            ],
+            "errors": {}
+        }
+        """
+        report = {
+            "repository_id": repository_id,
+            "skipped": False,
+            "file_hash": None,
+            "synchronization": None,
+            "failure": None,
+            "diff": None,
+            "usages": [],
+            "errors": {},
+        }
+        hashes = self.__synchronized_hashes
+        if state_file and Path(state_file).exists():
+            with Path(state_file).open(encoding="utf-8") as state:
+                hashes = {**hashes, **json.load(state)}
+        if file:
+            report["file_hash"] = file_hash(file)
+            if not force and hashes.get(repository_id) == report["file_hash"]:
+                logging.info("✅ Repository [%s] is already synchronized with this file", repository_id)
+                report["skipped"] = True
+                return report
+
+        before = self.get_info(repository_id, last_synchronization=True, pprint_result=False)["repository"]
+        report["synchronization"] = self.synchronize(repository_id, file)
+        sync_report = ((report["synchronization"] or {}).get("synchronizeRepository") or {}).get("report") or {}
+        report["failure"] = sync_report.get("failure")
+        if report["failure"]:
+            logging.error("❌ Synchronization of the repository [%s] failed: %s", repository_id, report["failure"])
+        after = self.get_info(repository_id, last_synchronization=True, pprint_result=False)["repository"]
+        report["diff"] = diff_catalogs(before["technologies"] or [], after["technologies"] or [])
+
+        if file and not report["failure"]:
+            hashes[repository_id] = report["file_hash"]
+            self.__synchronized_hashes[repository_id] = report["file_hash"]
+            if state_file:
+                with Path(state_file).open("w", encoding="utf-8") as state:
+                    json.dump(hashes, state, indent=4)
+
+        if scan_usages:
+            contexts = report["diff"]["contexts"]
+            runtimes = {(context["technology_id"], context["context_id"]) for context in contexts["removed"]}
+            runtimes |= {
+                (context["technology_id"], context["context_id"])
+                for context in catalog_contexts(after["technologies"] or []).values()
+                if context["deprecation_date"]
+            }
+            report["usages"], report["errors"] = find_runtime_usages(
+                self.saagie_api, runtimes, project_ids, max_workers
+            )
+        return report
+
     def revert_last_synchronization(self, repository_id: str) -> Dict:
         """
         Revert the last synchronization
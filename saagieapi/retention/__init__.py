@@ -0,0 +1,3 @@
+from .retention import RetentionEngine, RetentionPolicy
+
+__all__ = ["RetentionEngine", "RetentionPolicy"]
@@ -0,0 +1,444 @@
+import fnmatch
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Union
+
+from ..utils.concurrency import DEFAULT_MAX_WORKERS, RateLimiter, run_concurrently
+from ..utils.date_functions import parse_datetime
+
+ENTITY_TYPES = ("job", "pipeline")
+INSTANCE_SELECTORS = ("ALL", "SUCCEEDED", "FAILED", "STOPPED", "UNKNOWN")
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
+
+
+class RetentionPolicy:
+    """Declarative retention rules applied to the jobs and pipelines of projects
+
+    Examples
+    --------
+    Keep the last 5 versions and delete the instances older than 30 days, except the latest succeeded one:
+
+    >>> RetentionPolicy(keep_last_versions=5, instances_older_than_days=30, keep_latest_success=True)
+
+    Delete every failed instance of the jobs whose name starts with "tmp_":
+
+    >>> RetentionPolicy(instances_selector="FAILED", entity_types=["job"], name_pattern="tmp_*")
+    """
+
+    def __init__(
+        self,
+        keep_last_versions: Optional[int] = None,
+        instances_older_than_days: Optional[float] = None,
+        keep_latest_success: bool = True,
+        instances_selector: Optional[str] = None,
+        entity_types: Iterable[str] = ENTITY_TYPES,
+        name_pattern: Optional[str] = None,
+    ):
+        """
+        Parameters
+        ----------
+        keep_last_versions : int, optional
+            Number of most recent versions to keep. The current version is always kept.
+            If None, versions are not deleted
+        instances_older_than_days : float, optional
+            Delete the instances started more than this number of days ago. If None, instances are not deleted
+            by date
+        keep_latest_success : bool
+            Whether to keep the latest succeeded instance when deleting instances by date or with the ALL and
+            SUCCEEDED selectors, default to True
+        instances_selector : str, optional
+            Delete the instances with this status, whatever their date, in this list :
+            ALL, SUCCEEDED, FAILED, STOPPED, UNKNOWN
+        entity_types : Iterable[str]
+            Types of entities the policy applies to, "job" and/or "pipeline". Default to both
+        name_pattern : str, optional
+            Shell-style pattern (see fnmatch) the job or pipeline name must match. Default to every name
+
+        Raises
+        ------
+        ValueError
+            If a parameter is not valid
+        """
+        if keep_last_versions is not None and keep_last_versions < 1:
+            raise ValueError("❌ keep_last_versions must be at least 1")
+        if instances_older_than_days is not None and instances_older_than_days < 0:
+            raise ValueError("❌ instances_older_than_days must be positive")
+        if instances_selector is not None and instances_selector not in INSTANCE_SELECTORS:
+            raise ValueError(f"❌ instances_selector must be one of {INSTANCE_SELECTORS}")
+        entity_types = tuple(entity_types)
+        if unknown_types := set(entity_types) - set(ENTITY_TYPES):
+            raise ValueError(f"❌ Unknown entity types {sorted(unknown_types)}, must be in {ENTITY_TYPES}")
+        self.keep_last_versions = keep_last_versions
+        self.instances_older_than_days = instances_older_than_days
+        self.keep_latest_success = keep_latest_success
+        self.instances_selector = instances_selector
+        self.entity_types = entity_types
+        self.name_pattern = name_pattern
+
+    def __repr__(self):
+        return (
+            f"RetentionPolicy(keep_last_versions={self.keep_last_versions}, "
+            f"instances_older_than_days={self.instances_older_than_days}, "
+            f"keep_latest_success={self.keep_latest_success}, instances_selector={self.instances_selector}, "
+            f"entity_types={self.entity_types}, name_pattern={self.name_pattern})"
+        )
+
+    def matches(self, entity_type: str, name: str) -> bool:
+        """Whether the policy applies to the given job or pipeline"""
+        if entity_type not in self.entity_types:
+            return False
+        return self.name_pattern is None or fnmatch.fnmatchcase(name or "", self.name_pattern)
+
+    def versions_to_delete(self, versions: List[Dict]) -> List[int]:
+        """
+        Select the versions to delete, keeping the keep_last_versions most recent ones and the current one
+        Parameters
+        ----------
+        versions : list of dict
+            Versions of the job or pipeline, with at least the keys "number" and "isCurrent". Versions with a
+            "deletableState" that is not deletable are never selected
+
+        Returns
+        -------
+        list of int
+            Numbers of the versions to delete, in ascending order
+        """
+        if self.keep_last_versions is None:
+            return []
+        ordered = sorted(versions or [], key=lambda version: version["number"], reverse=True)
+        return sorted(
+            version["number"]
+            for version in ordered[self.keep_last_versions :]
+            if not version.get("isCurrent") and (version.get("deletableState") or {}).get("deletable", True)
+        )
+
+    def date_before(self, now: Optional[datetime] = None) -> Optional[str]:
+        """Date before which instances are deleted, in the format expected by the API"""
+        if self.instances_older_than_days is None:
+            return None
+        now = now or datetime.now(timezone.utc)
+        return (now - timedelta(days=self.instances_older_than_days)).strftime(DATE_FORMAT)
+
+
+class RetentionEngine:
+    """Evaluate retention policies on every job and pipeline of projects, then delete the selected instances and
+    versions concurrently
+
+    The evaluation (dry run) only uses the count_deletable_* queries, the version lists and, when the latest
+    success must be kept, the first page of succeeded instances. Deletions run on a bounded number of threads,
+    optionally rate limited, the actions of one job or pipeline running sequentially: instances first, then
+    versions.
+
+    Examples
+    --------
+    >>> engine = RetentionEngine(saagie_api, max_workers=8, calls_per_second=20)
+    >>> report = engine.run(
+    ...     project_ids=["860b8dc8-e634-4c98-b2e7-f9ec32ab4771"],
+    ...     policies=[
+    ...         RetentionPolicy(instances_selector="FAILED", name_pattern="tmp_*"),
+    ...         RetentionPolicy(keep_last_versions=5, instances_older_than_days=30),
+    ...     ],
+    ...     dry_run=True,
+    ... )
+    >>> report["summary"]
+    {
+        "entities": 42,
+        "actions": 51,
+        "instances": 120534,
+        "versions": 87,
+        "errors": 0
+    }
+    """
+
+    def __init__(self, saagie_api, max_workers: int = DEFAULT_MAX_WORKERS, calls_per_second: Optional[float] = None):
+        """
+        Parameters
+        ----------
+        saagie_api : SaagieApi
+            Connected SaagieApi instance
+        max_workers : int
+            Maximum number of concurrent requests
+        calls_per_second : float, optional
+            Maximum number of requests per second, shared by all the threads. Not limited by default
+        """
+        self.saagie_api = saagie_api
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(calls_per_second) if calls_per_second else None
+
+    def list_entities(self, project_ids: List[str], policies: List[RetentionPolicy]) -> List[Dict]:
+        """
+        List the jobs and pipelines of the projects with their versions, and associate each one with the first
+        matching policy. Entities without matching policy are left out
+        Parameters
+        ----------
+        project_ids : list of str
+            UUIDs of the projects
+        policies : list of RetentionPolicy
+            Policies, the first matching one applies to each job or pipeline
+
+        Returns
+        -------
+        list of dict
+            Dicts with the keys "project_id", "entity_type", "entity_id", "entity_name", "versions" and "policy"
+        """
+        entity_types = {entity_type for policy in policies for entity_type in policy.entity_types}
+        listings = [(project_id, entity_type) for project_id in project_ids for entity_type in sorted(entity_types)]
+        entities = []
+        for (project_id, entity_type), result, exception in run_concurrently(
+            self.__list_project_entities, listings, self.max_workers
+        ):
+            if exception:
+                raise exception
+            for entity in result:
+                if policy := next((p for p in policies if p.matches(entity_type, entity.get("name"))), None):
+                    entities.append(
+                        {
+                            "project_id": project_id,
+                            "entity_type": entity_type,
+                            "entity_id": entity["id"],
+                            "entity_name": entity.get("name"),
+                            "versions": entity.get("versions") or [],
+                            "policy": policy,
+                        }
+                    )
+        return entities
+
+    def plan(
+        self,
+        project_ids: Union[str, List[str]],
+        policies: Union[RetentionPolicy, List[RetentionPolicy]],
+        now: Optional[datetime] = None,
+    ) -> List[Dict]:
+        """
+        Evaluate the policies without deleting anything
+        Parameters
+        ----------
+        project_ids : str or list of str
+            UUID(s) of the projects
+        policies : RetentionPolicy or list of RetentionPolicy
+            Policies, the first matching one applies to each job or pipeline
+        now : datetime, optional
+            Reference date of the instances_older_than_days rules, default to the current date
+
+        Returns
+        -------
+        list of dict
+            One action per deletion to perform, with the keys "project_id", "entity_type", "entity_id",
+            "entity_name", "action" (delete_instances_by_date, delete_instances_by_selector or delete_versions),
+            "params" and "count" (number of instances or versions that would be deleted).
+            Actions of entities that could not be evaluated have the key "error" instead of "count"
+        """
+        project_ids = [project_ids] if isinstance(project_ids, str) else list(project_ids)
+        policies = [policies] if isinstance(policies, RetentionPolicy) else list(policies)
+        entities = self.list_entities(project_ids, policies)
+        now = now or datetime.now(timezone.utc)
+
+        actions = []
+        for entity, result, exception in run_concurrently(
+            lambda entity: self.__plan_entity(entity, now), entities, self.max_workers
+        ):
+            if exception:
+                logging.warning(
+                    "❗Cannot evaluate the retention of %s [%s]: %s",
+                    entity["entity_type"],
+                    entity["entity_id"],
+                    exception,
+                )
+                actions.append({**self.__describe(entity), "action": None, "params": None, "error": str(exception)})
+            else:
+                actions.extend(result)
+        return actions
+
+    def apply(self, actions: List[Dict]) -> List[Dict]:
+        """
+        Execute the actions of a plan. Actions deleting nothing are skipped
+        Parameters
+        ----------
+        actions : list of dict
+            Actions returned by plan
+
+        Returns
+        -------
+        list of dict
+            Executed actions, with the key "deleted" (number of deleted instances or versions) or "error"
+        """
+        by_entity: Dict[tuple, List[Dict]] = {}
+        for action in actions:
+            if action.get("action") and action.get("count"):
+                by_entity.setdefault((action["entity_type"], action["entity_id"]), []).append(action)
+
+        results = []
+        for _, entity_results, exception in run_concurrently(self.__apply_entity, by_entity.values(), self.max_workers):
+            if exception:  # pragma: no cover - __apply_entity catches the errors of each action
+                raise exception
+            results.extend(entity_results)
+        return results
+
+    def run(
+        self,
+        project_ids: Union[str, List[str]],
+        policies: Union[RetentionPolicy, List[RetentionPolicy]],
+        dry_run: bool = True,
+        now: Optional[datetime] = None,
+    ) -> Dict:
+        """
+        Evaluate the policies and, if dry_run is False, delete the selected instances and versions
+        Parameters
+        ----------
+        project_ids : str or list of str
+            UUID(s) of the projects
+        policies : RetentionPolicy or list of RetentionPolicy
+            Policies, the first matching one applies to each job or pipeline
+        dry_run : bool
+            Whether to only count what would be deleted, default to True
+        now : datetime, optional
+            Reference date of the instances_older_than_days rules, default to the current date
+
+        Returns
+        -------
+        dict
+            Report with the keys "dry_run", "actions" (see plan and apply) and "summary"
+        """
+        actions = self.plan(project_ids, policies, now=now)
+        if not dry_run:
+            self.apply(actions)
+        report = {"dry_run": dry_run, "actions": actions, "summary": self.summarize(actions, dry_run)}
+        logging.info("✅ Retention %s: %s", "evaluated (dry run)" if dry_run else "applied", report["summary"])
+        return report
+
+    @staticmethod
+    def summarize(actions: List[Dict], dry_run: bool = True) -> Dict:
+        """Count the entities, actions, instances, versions and errors of a plan or of executed actions"""
+        count_key = "count" if dry_run else "deleted"
+        summary = {
+            "entities": len({(action["entity_type"], action["entity_id"]) for action in actions}),
+            "actions": 0,
+            "instances": 0,
+            "versions": 0,
+            "errors": 0,
+        }
+        for action in actions:
+            if action.get("error"):
+                summary["errors"] += 1
+            if not action.get("action") or not action.get(count_key):
+                continue
+            summary["actions"] += 1
+            summary["versions" if action["action"] == "delete_versions" else "instances"] += action[count_key]
+        return summary
+
+    def __wait(self) -> None:
+        if self.rate_limiter:
+            self.rate_limiter.wait()
+
+    def __list_project_entities(self, listing: tuple) -> List[Dict]:
+        project_id, entity_type = listing
+        self.__wait()
+        if entity_type == "job":
+            return self.saagie_api.jobs.list_for_project(project_id, instances_limit=0, pprint_result=False)["jobs"]
+        result = self.saagie_api.pipelines.list_for_project(project_id, instances_limit=0, pprint_result=False)
+        return (result.get("project") or {}).get("pipelines") or []
+
+    def __entity_api(self, entity_type: str):
+        return self.saagie_api.jobs if entity_type == "job" else self.saagie_api.pipelines
+
+    @staticmethod
+    def __describe(entity: Dict) -> Dict:
+        return {key: entity[key] for key in ("project_id", "entity_type", "entity_id", "entity_name")}
+
+    def __plan_entity(self, entity: Dict, now: datetime) -> List[Dict]:
+        policy: RetentionPolicy = entity["policy"]
+        api = self.__entity_api(entity["entity_type"])
+        id_key = "job_id" if entity["entity_type"] == "job" else "pipeline_id"
+        description = self.__describe(entity)
+        latest_success = []
+        actions = []
+
+        def get_latest_success() -> Optional[Dict]:
+            if not latest_success:
+                self.__wait()
+                latest_success.append(
+                    next(api.iter_instances(entity["entity_id"], page_size=20, status="SUCCEEDED"), None)
+                )
+            return latest_success[0]
+
+        if date_before := policy.date_before(now):
+            self.__wait()
+            count = self.__first_value(api.count_deletable_instances_by_date(entity["entity_id"], date_before)) or 0
+            exclude_instances_id = []
+            if count and policy.keep_latest_success and (instance := get_latest_success()):
+                start_time = parse_datetime(instance.get("startTime"))
+                if start_time and start_time < parse_datetime(date_before):
+                    exclude_instances_id.append(instance["id"])
+                    count -= 1
+            actions.append(
+                {
+                    **description,
+                    "action": "delete_instances_by_date",
+                    "params": {
+                        id_key: entity["entity_id"],
+                        "date_before": date_before,
+                        "exclude_instances_id": exclude_instances_id,
+                    },
+                    "count": max(count, 0),
+                }
+            )
+
+        if policy.instances_selector:
+            self.__wait()
+            counts = self.__first_value(api.count_deletable_instances_by_status(entity["entity_id"])) or []
+            count = next((c["count"] for c in counts if c["selector"] == policy.instances_selector), 0)
+            exclude_instances_id = []
+            if (
+                count
+                and policy.keep_latest_success
+                and policy.instances_selector in ("ALL", "SUCCEEDED")
+                and (instance := get_latest_success())
+            ):
+                exclude_instances_id.append(instance["id"])
+                count -= 1
+            actions.append(
+                {
+                    **description,
+                    "action": "delete_instances_by_selector",
+                    "params": {
+                        id_key: entity["entity_id"],
+                        "selector": policy.instances_selector,
+                        "exclude_instances_id": exclude_instances_id,
+                    },
+                    "count": max(count, 0),
+                }
+            )
+
+        if versions := policy.versions_to_delete(entity["versions"]):
+            actions.append(
+                {
+                    **description,
+                    "action": "delete_versions",
+                    "params": {id_key: entity["entity_id"], "versions": versions},
+                    "count": len(versions),
+                }
+            )
+        return actions
+
+    @staticmethod
+    def __first_value(result: Optional[Dict]):
+        """Value of the single field of a query result"""
+        return next(iter(result.values()), None) if result else None
+
+    def __apply_entity(self, actions: List[Dict]) -> List[Dict]:
+        for action in actions:
+            api = self.__entity_api(action["entity_type"])
+            try:
+                self.__wait()
+                value = self.__first_value(getattr(api, action["action"])(**action["params"]))
+                if isinstance(value, list):
+                    action["deleted"] = sum(1 for item in value if item.get("success"))
+                else:
+                    action["deleted"] = value or 0
+            except Exception as exception:  # pylint: disable=broad-exception-caught
+                logging.warning(
+                    "❗Cannot %s of %s [%s]: %s", action["action"], action["entity_type"], action["entity_id"], exception
+                )
+                action["deleted"] = 0
+                action["error"] = str(exception)
+        return actions
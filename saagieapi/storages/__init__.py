@@ -1,3 +1,4 @@
+from .storage_index import StorageIndex
 from .storages import Storages
 
-__all__ = ["Storages"]
+__all__ = ["StorageIndex", "Storages"]
@@ -0,0 +1,207 @@
+import logging
+import re
+from typing import Dict, Iterable, List, Optional, Union
+
+from ..utils.concurrency import DEFAULT_MAX_WORKERS, run_concurrently
+
+_SIZE_UNITS = {"B": 1, "KB": 1024, "MB": 1024**2, "GB": 1024**3, "TB": 1024**4}
+_SIZE_PATTERN = re.compile(r"^\s*([0-9]+(?:\.[0-9]+)?)\s*([KMGT]?B)?\s*$", re.IGNORECASE)
+
+
+def parse_size(size: Union[str, int, None]) -> int:
+    """Number of bytes of a storage size as returned by the API, for example "128 MB". A number without unit is a
+    number of bytes. 0 if the size is empty
+
+    Raises
+    ------
+    ValueError
+        If the size cannot be parsed
+    """
+    if not size:
+        return 0
+    match = _SIZE_PATTERN.match(str(size))
+    if match is None:
+        raise ValueError(f"❌ Cannot parse the storage size '{size}'")
+    return int(float(match.group(1)) * _SIZE_UNITS[(match.group(2) or "B").upper()])
+
+
+def is_used_by_app(storage: Dict) -> bool:
+    """Whether a storage is mounted by the current version of its linked app"""
+    current_version = (storage.get("linkedApp") or {}).get("currentVersion") or {}
+    return any(
+        (volume.get("volume") or {}).get("id") == storage["id"]
+        for volume in current_version.get("volumesWithPath") or []
+    )
+
+
+class StorageIndex:
+    """Storages of many projects, indexed by id, project and linked app, to compute the provisioned sizes and find
+    the storages that can be reclaimed without calling the platform for each storage.
+
+    A storage is an orphan when it has no linked app. A storage is in use when the current version of its linked
+    app mounts it: it can neither be deleted nor unlinked.
+
+    Examples
+    --------
+    >>> index = saagie_api.storages.scan()
+    >>> index.total_size()
+    3355443200
+    >>> [storage["name"] for storage in index.orphans()]
+    ['old data', 'test']
+    >>> saagie_api.storages.delete_many([storage["id"] for storage in index.orphans()], index=index)
+    {
+        "deleted": ["905d8441-8955-444f-a333-19d7c6fe6274", "fdb43a11-ccec-4b10-9690-2b83fbd7eb93"],
+        "skipped": {},
+        "errors": {}
+    }
+    """
+
+    def __init__(self, storages: Iterable[Dict], project_names: Optional[Dict[str, str]] = None):
+        """
+        Parameters
+        ----------
+        storages : Iterable[dict]
+            Storages as returned by Storages.list_for_project (not minimal), with their projectId
+        project_names : dict, optional
+            Name of each project by id. Projects without storage are kept in the index
+        """
+        self.project_names = dict(project_names or {})
+        # error message by project id for the projects that could not be listed, and by storage id for the
+        # storages whose size cannot be parsed. These storages count for 0 byte in the sizes
+        self.errors: Dict[str, str] = {}
+        self.by_id: Dict[str, Dict] = {}
+        self.sizes: Dict[str, int] = {}
+        self.by_project: Dict[str, List[str]] = {project_id: [] for project_id in self.project_names}
+        self.by_app: Dict[str, List[str]] = {}
+        for storage in storages:
+            self.add(storage)
+
+    @classmethod
+    def load(
+        cls, saagie_api, project_ids: Optional[Iterable[str]] = None, max_workers: int = DEFAULT_MAX_WORKERS
+    ) -> "StorageIndex":
+        """List the storages of many projects concurrently
+
+        Parameters
+        ----------
+        saagie_api : SaagieApi
+            Connection to the platform
+        project_ids : Iterable[str], optional
+            UUIDs of the projects to scan, default to all the projects you have rights on
+        max_workers : int, optional
+            Maximum number of concurrent requests
+
+        Returns
+        -------
+        StorageIndex
+            Index of the storages. Its errors attribute gives the error message by project id, for the projects
+            whose storages could not be listed, and by storage id, for the storages whose size cannot be parsed
+        """
+        if project_ids is None:
+            projects = saagie_api.projects.list(pprint_result=False)["projects"] or []
+            project_names = {project["id"]: project["name"] for project in projects}
+        else:
+            project_names = {project_id: None for project_id in project_ids}
+
+        storages = []
+        errors = {}
+        for project_id, result, exception in run_concurrently(
+            lambda project_id: saagie_api.storages.list_for_project(project_id, pprint_result=False),
+            list(project_names),
+            max_workers,
+        ):
+            if exception:
+                logging.warning("❗Cannot list the storages of the project [%s]: %s", project_id, exception)
+                errors[project_id] = str(exception)
+                continue
+            for storage in result["project"]["volumes"] or []:
+                storages.append({**storage, "projectId": storage.get("projectId") or project_id})
+
+        index = cls(storages, project_names)
+        index.errors.update(errors)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def __contains__(self, storage_id: str) -> bool:
+        return storage_id in self.by_id
+
+    def add(self, storage: Dict) -> None:
+        """Add a storage to the index, or replace it if it is already indexed"""
+        if storage["id"] in self.by_id:
+            self.remove(storage["id"])
+        self.by_id[storage["id"]] = storage
+        try:
+            self.sizes[storage["id"]] = parse_size(storage.get("size"))
+        except ValueError as exception:
+            logging.warning("❗Storage [%s] is counted as empty: %s", storage["id"], exception)
+            self.errors[storage["id"]] = str(exception)
+            self.sizes[storage["id"]] = 0
+        self.by_project.setdefault(storage.get("projectId"), []).append(storage["id"])
+        app_id = (storage.get("linkedApp") or {}).get("id")
+        if app_id:
+            self.by_app.setdefault(app_id, []).append(storage["id"])
+
+    def remove(self, storage_id: str) -> Optional[Dict]:
+        """Remove a storage from the index and return it, None if it is not indexed"""
+        storage = self.by_id.pop(storage_id, None)
+        if storage is None:
+            return None
+        del self.sizes[storage_id]
+        self.errors.pop(storage_id, None)
+        self.by_project[storage.get("projectId")].remove(storage_id)
+        app_id = (storage.get("linkedApp") or {}).get("id")
+        if app_id:
+            self.by_app[app_id].remove(storage_id)
+            if not self.by_app[app_id]:
+                del self.by_app[app_id]
+        return storage
+
+    def get(self, storage_id: str) -> Optional[Dict]:
+        """Storage with this id, None if it is not indexed"""
+        return self.by_id.get(storage_id)
+
+    def for_project(self, project_id: str) -> List[Dict]:
+        """Storages of a project"""
+        return [self.by_id[storage_id] for storage_id in self.by_project.get(project_id, [])]
+
+    def for_app(self, app_id: str) -> List[Dict]:
+        """Storages linked to an app"""
+        return [self.by_id[storage_id] for storage_id in self.by_app.get(app_id, [])]
+
+    def orphans(self, project_id: Optional[str] = None) -> List[Dict]:
+        """Storages without linked app, optionally only the ones of a project"""
+        storages = self.for_project(project_id) if project_id is not None else self.by_id.values()
+        return [storage for storage in storages if not storage.get("linkedApp")]
+
+    def total_size(self, project_id: Optional[str] = None, orphans_only: bool = False) -> int:
+        """Provisioned size in bytes of the storages, optionally only of a project or of the orphans"""
+        if orphans_only:
+            storages = self.orphans(project_id)
+        else:
+            storages = self.for_project(project_id) if project_id is not None else self.by_id.values()
+        return sum(self.sizes[storage["id"]] for storage in storages)
+
+    def summary(self) -> List[Dict]:
+        """Usage of each project
+
+        Returns
+        -------
+        list of dict
+            One dict per project sorted by decreasing size, with the keys "project_id", "project_name",
+            "storage_count", "total_size", "orphan_count" and "orphan_size" (sizes in bytes)
+        """
+        rows = [
+            {
+                "project_id": project_id,
+                "project_name": self.project_names.get(project_id),
+                "storage_count": len(storage_ids),
+                "total_size": self.total_size(project_id),
+                "orphan_count": len(self.orphans(project_id)),
+                "orphan_size": self.total_size(project_id, orphans_only=True),
+            }
+            for project_id, storage_ids in self.by_project.items()
+        ]
+        rows.sort(key=lambda row: (-row["total_size"], row["project_name"] or "", row["project_id"] or ""))
+        return rows
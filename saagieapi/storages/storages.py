@@ -1,10 +1,12 @@
 import logging
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional
 
 import deprecation
 from gql import gql
 
+from ..utils.concurrency import DEFAULT_MAX_WORKERS, run_concurrently
 from .gql_queries import *
+from .storage_index import StorageIndex, is_used_by_app
 
 
 class Storages:
@@ -532,3 +534,149 @@ class Storages:
             query=gql(GQL_DUPLICATE_STORAGE),
             variable_values={"volumeId": storage_id},
         )
+
+    def scan(self, project_ids: Optional[Iterable[str]] = None, max_workers: int = DEFAULT_MAX_WORKERS) -> StorageIndex:
+        """List the storages of many projects concurrently and index them by id, project and linked app,
+        see StorageIndex
+
+        Parameters
+        ----------
+        project_ids : Iterable[str], optional
+            UUIDs of the projects to scan, default to all the projects you have rights on
+        max_workers : int, optional
+            Maximum number of concurrent requests
+
+        Returns
+        -------
+        StorageIndex
+            Index of the storages
+
+        Examples
+        --------
+        >>> index = saagie_api.storages.scan()
+        >>> index.summary()[0]
+        {
+            "project_id": "860b8dc8-e634-4c98-b2e7-f9ec32ab4771",
+            "project_name": "Project A",
+            "storage_count": 2,
+            "total_size": 201326592,
+            "orphan_count": 1,
+            "orphan_size": 134217728
+        }
+        """
+        return StorageIndex.load(self.saagie_api, project_ids, max_workers)
+
+    def delete_many(
+        self,
+        storage_ids: Iterable[str],
+        index: Optional[StorageIndex] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        dry_run: bool = False,
+    ) -> Dict:
+        """Delete many storages concurrently. Storages currently used by an app are skipped.
+        The storages are checked in the index instead of being fetched one by one, and the deleted ones are
+        removed from it
+
+        Parameters
+        ----------
+        storage_ids : Iterable[str]
+            UUIDs of the storages to delete
+        index : StorageIndex, optional
+            Index containing the storages, see scan. If not filled, all the projects are scanned
+        max_workers : int, optional
+            Maximum number of concurrent requests
+        dry_run : bool, optional
+            Whether to only return the storages that would be deleted
+
+        Returns
+        -------
+        dict
+            Report with the keys "deleted" (UUIDs), "skipped" and "errors" (reason by storage id)
+
+        Examples
+        --------
+        >>> saagie_api.storages.delete_many(
+        ...     storage_ids=["905d8441-8955-444f-a333-19d7c6fe6274", "89bf5f86-3fc3-4bf6-879b-7ca8eafe6c4f"],
+        ...     index=index
+        ... )
+        {
+            "deleted": ["905d8441-8955-444f-a333-19d7c6fe6274"],
+            "skipped": {"89bf5f86-3fc3-4bf6-879b-7ca8eafe6c4f": "Used by the app [Jupyter Notebook]"},
+            "errors": {}
+        }
+        """
+        return self.__apply_many("delete", storage_ids, index, max_workers, dry_run)
+
+    def unlink_many(
+        self,
+        storage_ids: Iterable[str],
+        index: Optional[StorageIndex] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        dry_run: bool = False,
+    ) -> Dict:
+        """Unlink many storages from their app concurrently. Storages without linked app or currently used by
+        their app are skipped. The storages are checked in the index instead of being fetched one by one, and the
+        unlinked ones are updated in it
+
+        Parameters
+        ----------
+        storage_ids : Iterable[str]
+            UUIDs of the storages to unlink
+        index : StorageIndex, optional
+            Index containing the storages, see scan. If not filled, all the projects are scanned
+        max_workers : int, optional
+            Maximum number of concurrent requests
+        dry_run : bool, optional
+            Whether to only return the storages that would be unlinked
+
+        Returns
+        -------
+        dict
+            Report with the keys "unlinked" (UUIDs), "skipped" and "errors" (reason by storage id)
+        """
+        return self.__apply_many("unlink", storage_ids, index, max_workers, dry_run)
+
+    def __apply_many(
+        self,
+        action: str,
+        storage_ids: Iterable[str],
+        index: Optional[StorageIndex],
+        max_workers: int,
+        dry_run: bool,
+    ) -> Dict:
+        if index is None:
+            index = self.scan(max_workers=max_workers)
+        done = "deleted" if action == "delete" else "unlinked"
+        report = {done: [], "skipped": {}, "errors": {}}
+        to_apply = []
+        for storage_id in dict.fromkeys(storage_ids):
+            storage = index.get(storage_id)
+            if storage is None:
+                report["skipped"][storage_id] = "Storage not found"
+            elif is_used_by_app(storage):
+                report["skipped"][storage_id] = f"Used by the app [{storage['linkedApp'].get('name')}]"
+            elif action == "unlink" and not storage.get("linkedApp"):
+                report["skipped"][storage_id] = "Not linked to an app"
+            else:
+                to_apply.append(storage_id)
+        if dry_run:
+            report[done] = to_apply
+            return report
+
+        query = gql(GQL_DELETE_STORAGE if action == "delete" else GQL_UNLINK_STORAGE)
+        for storage_id, _, exception in run_concurrently(
+            lambda storage_id: self.saagie_api.client.execute(query=query, variable_values={"id": storage_id}),
+            to_apply,
+            max_workers,
+        ):
+            if exception:
+                logging.warning("❗Cannot %s the storage [%s]: %s", action, storage_id, exception)
+                report["errors"][storage_id] = str(exception)
+                continue
+            if action == "delete":
+                index.remove(storage_id)
+            else:
+                index.add({**index.get(storage_id), "linkedApp": None})
+            report[done].append(storage_id)
+        logging.info("✅ %d storages successfully %s", len(report[done]), done)
+        return report
@@ -3,6 +3,7 @@ import logging
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from ..utils.concurrency import DEFAULT_MAX_WORKERS, run_concurrently
 from ..utils.folder_functions import create_folder, write_error, write_to_json_file
 
 
@@ -152,9 +153,16 @@ class Users:
         return False
 
     def import_from_json(
-        self, json_file: str, temp_pwd: str, error_folder: Optional[str] = "", verify_ssl: Optional[bool] = None
+        self,
+        json_file: str,
+        temp_pwd: str,
+        error_folder: Optional[str] = "",
+        verify_ssl: Optional[bool] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
     ) -> bool:
         """Import users from JSON format file
+        The users of the platform are listed once to skip the existing ones, then the other users are created
+        concurrently. The imported, already existing and failed users are logged in the order of the file
 
         NOTE
         ----
@@ -174,6 +182,8 @@ class Users:
         verify_ssl: bool, optional
             Enable or disable verification of SSL certification
             By default, refers to saagie_api.verify_ssl
+        max_workers : int, optional
+            Maximum number of users created concurrently
 
         Returns
         -------
@@ -206,31 +216,38 @@ class Users:
 
         total_user = len(users_list)
 
+        try:
+            existing_logins = {user["login"] for user in self.list(verify_ssl=verify_ssl)}
+        except Exception as exception:
+            logging.warning("❌ Cannot get the user's information on the platform")
+            logging.error("Something went wrong %s", exception)
+            return False
+
+        to_create = []
         for user in users_list:
             if user["protected"]:
                 bypassed_list.append(user["login"])
+            elif user["login"] in existing_logins:
+                already_exist_list.append(user["login"])
+            else:
+                to_create.append(user)
+
+        for user, _, exception in run_concurrently(
+            lambda user: self.create(
+                user_name=user["login"],
+                password=temp_pwd,
+                platforms=user["platforms"],
+                roles=user["roles"],
+                verify_ssl=verify_ssl,
+            ),
+            to_create,
+            max_workers,
+        ):
+            if exception:
+                logging.error(exception)
+                failed_list.append(user["login"])
             else:
-                res = self.saagie_api.request_client.send(
-                    method="GET",
-                    url=f"{self.saagie_api.url_saagie}auth/api/users/{user['login']}",
-                    verify_ssl=verify_ssl,
-                )
-                if res.status_code == 404:
-                    try:
-                        self.create(
-                            user_name=user["login"],
-                            password=temp_pwd,
-                            platforms=user["platforms"],
-                            roles=user["roles"],
-                            verify_ssl=verify_ssl,
-                        )
-                        imported_list.append(user["login"])
-                    except Exception as err:
-                        logging.error(err)
-                        failed_list.append(user["login"])
-
-                else:
-                    already_exist_list.append(user["login"])
+                imported_list.append(user["login"])
 
         if failed_list:
             logging.info("%s/%s are failed to import", len(failed_list), total_user)
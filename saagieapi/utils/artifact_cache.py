@@ -0,0 +1,143 @@
+import hashlib
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+import requests
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def compute_file_hash(file_path: str, chunk_size: int = HASH_CHUNK_SIZE) -> Tuple[str, int]:
+    """
+    Compute the SHA-256 digest and the size of a local file, reading it by chunks
+    Parameters
+    ----------
+    file_path : str
+        Path of the file
+    chunk_size : int
+        Number of bytes read at once
+
+    Returns
+    -------
+    (str, int)
+        Hexadecimal SHA-256 digest and size in bytes of the file
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with open(file_path, "rb") as file:
+        while chunk := file.read(chunk_size):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def compute_chunks_hash(chunks: Iterable[bytes]) -> Tuple[str, int]:
+    """
+    Compute the SHA-256 digest and the size of a stream of bytes without storing it
+    Parameters
+    ----------
+    chunks : Iterable[bytes]
+        Chunks of the content to hash, for example response.iter_content()
+
+    Returns
+    -------
+    (str, int)
+        Hexadecimal SHA-256 digest and size in bytes of the content
+    """
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in chunks:
+        if chunk:
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def compute_response_hash(response: requests.Response, chunk_size: int = HASH_CHUNK_SIZE) -> Tuple[str, int]:
+    """
+    Compute the SHA-256 digest and the size of the body of a streamed response
+    Parameters
+    ----------
+    response : requests.Response
+        Response of a request made with stream=True
+    chunk_size : int
+        Chunk size
+
+    Returns
+    -------
+    (str, int)
+        Hexadecimal SHA-256 digest and size in bytes of the response body
+    """
+    return compute_chunks_hash(response.iter_content(chunk_size=chunk_size))
+
+
+class ArtifactHashCache:
+    """Local JSON cache of the artifact digests uploaded for each job version
+
+    The cache is a JSON file with the following structure:
+    {
+        "<job_id>": {"version": 3, "sha256": "<hex digest>", "size": 1234}
+    }
+    Only the last known version of each job is kept.
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Parameters
+        ----------
+        file_path : str
+            Path of the JSON file storing the digests. Created on the first save if it does not exist
+        """
+        self.file_path = Path(file_path)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}
+        if self.file_path.exists():
+            try:
+                with self.file_path.open("r", encoding="utf-8") as file:
+                    self._entries = json.load(file)
+            except (OSError, ValueError) as exception:
+                logging.warning("❗Cannot read the artifact hash cache %s, ignoring it: %s", self.file_path, exception)
+
+    def get(self, job_id: str, version_number: int) -> Optional[Dict]:
+        """
+        Get the cached digest of the artifact of the given job version
+        Parameters
+        ----------
+        job_id : str
+            UUID of the job
+        version_number : int
+            Number of the job version
+
+        Returns
+        -------
+        dict or None
+            Dict with the keys "version", "sha256" and "size", None if the version is not cached
+        """
+        with self._lock:
+            entry = self._entries.get(job_id)
+        if entry and entry.get("version") == version_number:
+            return entry
+        return None
+
+    def set(self, job_id: str, version_number: int, sha256: str, size: int) -> None:
+        """
+        Store the digest of the artifact of the given job version and save the cache file
+        Parameters
+        ----------
+        job_id : str
+            UUID of the job
+        version_number : int
+            Number of the job version
+        sha256 : str
+            Hexadecimal SHA-256 digest of the artifact
+        size : int
+            Size in bytes of the artifact
+        """
+        with self._lock:
+            self._entries[job_id] = {"version": version_number, "sha256": sha256, "size": size}
+            self.file_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.file_path.open("w", encoding="utf-8") as file:
+                json.dump(self._entries, file, indent=4)
@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_MAX_WORKERS = 4
+
+
+class RateLimiter:
+    """Limit the number of calls per second shared by several threads"""
+
+    def __init__(self, calls_per_second: float):
+        """
+        Parameters
+        ----------
+        calls_per_second : float
+            Maximum number of calls per second
+        """
+        self.interval = 1.0 / calls_per_second
+        self._lock = threading.Lock()
+        self._next_call = 0.0
+
+    def wait(self) -> None:
+        """Block until the next call is allowed"""
+        with self._lock:
+            now = time.monotonic()
+            wait_time = self._next_call - now
+            self._next_call = max(now, self._next_call) + self.interval
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+
+def run_concurrently(
+    func: Callable[[Any], Any],
+    items: Iterable[Any],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    rate_limiter: Optional[RateLimiter] = None,
+) -> List[Tuple[Any, Any, Optional[Exception]]]:
+    """
+    Call func on each item with a bounded number of threads. An exception raised for one item does not
+    stop the others.
+    Parameters
+    ----------
+    func : Callable
+        Function called with each item
+    items : Iterable
+        Items to process
+    max_workers : int
+        Maximum number of concurrent calls. With 1, items are processed sequentially in the calling thread
+    rate_limiter : RateLimiter, optional
+        Rate limiter applied before each call
+
+    Returns
+    -------
+    list of (item, result, exception)
+        One tuple per item, in the order of the items. exception is None if the call succeeded
+    """
+
+    def call(item):
+        if rate_limiter:
+            rate_limiter.wait()
+        try:
+            return item, func(item), None
+        except Exception as exception:  # pylint: disable=broad-exception-caught
+            return item, None, exception
+
+    items = list(items)
+    if max_workers <= 1 or len(items) <= 1:
+        return [call(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(call, items))
+
+
+def iter_concurrently(
+    func: Callable[[Any], Any], items: Iterable[Any], max_workers: int = DEFAULT_MAX_WORKERS
+) -> Iterator[Any]:
+    """
+    Call func on each item with a bounded number of threads and yield the results in the order of the items.
+    Unlike run_concurrently, at most max_workers calls are in progress or waiting to be consumed, so that memory
+    does not grow with the number of items. The first exception raised by func is raised when its result is
+    reached
+
+    Parameters
+    ----------
+    func : Callable
+        Function called with each item
+    items : Iterable
+        Items to process, consumed lazily
+    max_workers : int
+        Maximum number of concurrent calls. With 1, items are processed sequentially in the calling thread
+
+    Yields
+    ------
+    Any
+        Result of func for each item
+    """
+    if max_workers <= 1:
+        for item in items:
+            yield func(item)
+        return
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        try:
+            for item in items:
+                pending.append(executor.submit(func, item))
+                if len(pending) >= max_workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
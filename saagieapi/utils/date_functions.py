@@ -0,0 +1,29 @@
+import re
+from datetime import datetime, timezone
+from typing import Optional, Union
+
+
+def parse_datetime(value: Optional[Union[str, datetime]]) -> Optional[datetime]:
+    """
+    Parse a date returned by the API (ISO 8601, for example "2022-04-19T13:45:49.783Z") into an aware datetime.
+    Naive datetimes are considered as UTC. Fractions of seconds are truncated to microseconds, the log-proxy
+    returning nanoseconds
+    Parameters
+    ----------
+    value : str or datetime, optional
+        Date to parse
+
+    Returns
+    -------
+    datetime or None
+        Timezone-aware datetime, None if value is None or empty
+    """
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = value.replace("Z", "+00:00")
+        value = re.sub(r"\.(\d+)", lambda match: "." + match.group(1)[:6].ljust(6, "0"), value)
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
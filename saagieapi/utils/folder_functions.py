@@ -1,11 +1,15 @@
 import json
 import logging
 import os
+import re
 import shutil
 from pathlib import Path
+from typing import Optional
 
 import requests
 
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
 
 def create_folder(folder_path: str) -> None:
     """
@@ -97,6 +101,109 @@ def write_request_response_to_file(file_path: str, response: requests.Response,
                 file.write(chunk)
 
 
+def download_file(
+    url: str,
+    file_path: str,
+    auth: requests.auth.AuthBase,
+    chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+    resume: bool = True,
+    timeout: int = 60,
+) -> int:
+    """
+    Download url to file_path by chunks, through a temporary '.part' file renamed once the download is
+    complete and its size verified against the size announced by the server.
+    If resume is True, an existing complete file is not downloaded again, and an existing '.part' file
+    is completed with an HTTP Range request. If the server ignores the Range header, the file is
+    downloaded from the beginning.
+    Parameters
+    ----------
+    url : str
+        URL of the file to download
+    file_path : str
+        Path of the downloaded file
+    auth : requests.auth.AuthBase
+        Authentication of the request
+    chunk_size : int
+        Chunk size
+    resume : bool
+        Whether to skip complete files and resume partially downloaded files
+    timeout : int
+        Timeout of the request in seconds
+
+    Returns
+    -------
+    int
+        Size of the downloaded file in bytes
+
+    Raises
+    ------
+    requests.HTTPError
+        When the server does not answer the request with a 200 or 206 status code
+    IOError
+        When the size of the downloaded file differs from the size announced by the server
+    """
+    path = Path(file_path)
+    if resume and path.exists():
+        logging.info("File '%s' already downloaded", path)
+        return path.stat().st_size
+
+    part_path = path.with_name(f"{path.name}.part")
+    offset = part_path.stat().st_size if resume and part_path.exists() else 0
+    headers = {"Range": f"bytes={offset}-"} if offset else None
+    response = requests.get(url, auth=auth, headers=headers, stream=True, timeout=timeout)
+    if offset and response.status_code == 416:
+        # The partial file is larger than the remote one, it can not be resumed
+        response.close()
+        part_path.unlink()
+        return download_file(url, file_path, auth, chunk_size, resume=False, timeout=timeout)
+    if response.status_code not in (200, 206):
+        response.close()
+        raise requests.HTTPError(f"{response.status_code} error while downloading {url}", response=response)
+
+    with response:
+        expected_size = _get_expected_size(response.headers, offset if response.status_code == 206 else 0)
+        if response.status_code == 206:
+            logging.info("Resuming the download of '%s' from byte %s", path, offset)
+            mode = "ab"
+        else:
+            mode = "wb"
+        with open(part_path, mode) as file:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    file.write(chunk)
+
+    size = part_path.stat().st_size
+    if expected_size is not None and size != expected_size:
+        raise IOError(f"Downloaded size of '{path}' is {size} bytes instead of {expected_size} bytes")
+    part_path.replace(path)
+    return size
+
+
+def _get_expected_size(headers, offset: int) -> Optional[int]:
+    """
+    Get the total size of a file being downloaded from the Content-Range or Content-Length headers
+    Parameters
+    ----------
+    headers : dict
+        Headers of the response
+    offset : int
+        Number of bytes already downloaded when the response is partial
+
+    Returns
+    -------
+    int or None
+        Total size of the file, None if the server did not announce it
+    """
+    if headers.get("Content-Encoding", "identity") != "identity":
+        # The announced size is the one of the encoded content, not the one of the written file
+        return None
+    if (content_range := headers.get("Content-Range")) and (match := re.search(r"/(\d+)$", content_range)):
+        return int(match[1])
+    if (content_length := headers.get("Content-Length")) is not None:
+        return int(content_length) + offset
+    return None
+
+
 def remove_slash_folder_path(folder_path: str) -> str:
     """
     Remove slash at the end of the folder_path
@@ -1,4 +1,5 @@
 import logging
+import threading
 from typing import Dict, Optional
 
 import requests
@@ -12,14 +13,53 @@ from .rich_console import console
 
 
 class GqlClient:
+    # pylint: disable=too-many-instance-attributes
+    # transport settings kept to build one client per thread
     def __init__(self, api_endpoint: str, auth: BearerAuth, timeout: int, retries: int = 0):
         self.auth = auth
-        self._transport = RequestsHTTPTransport(
-            url=api_endpoint, auth=auth, use_json=True, verify=False, retries=retries, timeout=timeout
-        )
+        self._api_endpoint = api_endpoint
+        self._timeout = timeout
+        self._retries = retries
+        self._transport = self._create_transport()
         self.client: Client = Client(
             transport=self._transport, fetch_schema_from_transport=True, execute_timeout=timeout
         )
+        self._local = threading.local()
+        self._local.client = self.client
+
+    def _create_transport(self) -> RequestsHTTPTransport:
+        return RequestsHTTPTransport(
+            url=self._api_endpoint,
+            auth=self.auth,
+            use_json=True,
+            verify=False,
+            retries=self._retries,
+            timeout=self._timeout,
+        )
+
+    def _get_client(self) -> Client:
+        """
+        Return the gql client of the current thread.
+        A gql client and its transport cannot execute several requests at the same time, so each thread uses its
+        own client. The clients created for other threads reuse the schema fetched by the main client when
+        it is available
+
+        Returns
+        -------
+        Client
+            gql client of the current thread
+        """
+        client = getattr(self._local, "client", None)
+        if client is None:
+            schema = self.client.schema
+            client = Client(
+                transport=self._create_transport(),
+                schema=schema,
+                fetch_schema_from_transport=schema is None,
+                execute_timeout=self._timeout,
+            )
+            self._local.client = client
+        return client
 
     def execute(
         self,
@@ -53,7 +93,9 @@ class GqlClient:
         """
         pprint_result = pprint_result if pprint_result is not None else self.pprint_global
         try:
-            result = self.client.execute(document=query, variable_values=variable_values, upload_files=upload_files)
+            result = self._get_client().execute(
+                document=query, variable_values=variable_values, upload_files=upload_files
+            )
             if pprint_result:
                 console.print(result)
             return result
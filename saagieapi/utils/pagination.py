@@ -0,0 +1,49 @@
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+from .date_functions import parse_datetime
+
+DEFAULT_PAGE_SIZE = 100
+
+
+def iter_instances_pages(
+    fetch_page: Callable[[int, int], List[Dict]],
+    page_size: int = DEFAULT_PAGE_SIZE,
+    since: Optional[Union[str, datetime]] = None,
+    status: Optional[Union[str, Iterable[str]]] = None,
+) -> Iterator[Dict]:
+    """
+    Yield the instances returned by fetch_page one at a time, requesting the next page only when the current one
+    has been consumed. Instances are expected from the most recent to the oldest, as returned by the API
+    Parameters
+    ----------
+    fetch_page : Callable[[int, int], list]
+        Function called with (limit, skip) returning one page of instances
+    page_size : int
+        Number of instances requested per page
+    since : str or datetime, optional
+        Stop as soon as an instance started before this date. Strings are parsed as ISO 8601 dates
+    status : str or list of str, optional
+        Only yield the instances with this status (or one of these statuses)
+
+    Yields
+    ------
+    dict
+        Instance information
+    """
+    if page_size < 1:
+        raise ValueError("❌ page_size must be a positive integer")
+    since = parse_datetime(since)
+    statuses = {status} if isinstance(status, str) else set(status) if status else None
+    skip = 0
+    while True:
+        instances = fetch_page(page_size, skip) or []
+        for instance in instances:
+            start_time = parse_datetime(instance.get("startTime"))
+            if since and start_time and start_time < since:
+                return
+            if statuses is None or instance.get("status") in statuses:
+                yield instance
+        if len(instances) < page_size:
+            return
+        skip += page_size
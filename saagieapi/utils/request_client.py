@@ -4,15 +4,24 @@ from typing import Optional
 import requests
 from requests import ConnectionError as requestsConnectionError
 from requests import HTTPError, RequestException, Timeout
+from requests.adapters import HTTPAdapter
 
 from .bearer_auth import BearerAuth
 
+# maximum number of connections kept alive per host, enough for the concurrent helpers of the package
+POOL_MAXSIZE = 32
+
 
 class RequestClient:
     def __init__(self, auth: BearerAuth, realm: str, verify_ssl: bool):
         self.auth = auth
         self.realm = realm
         self.verify_ssl = verify_ssl
+        # connections are reused between requests, including by concurrent threads
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_MAXSIZE, pool_maxsize=POOL_MAXSIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
     def send(
         self,
@@ -55,7 +64,7 @@ class RequestClient:
         """
         verify_ssl = verify_ssl if verify_ssl is not None else self.verify_ssl
         try:
-            response = requests.request(
+            response = self.session.request(
                 method=method,
                 url=url,
                 auth=self.auth,
@@ -0,0 +1,51 @@
+"""Build and serialize large graph pipelines
+
+Run with: poetry run python tests/benchmarks/graph_pipeline_benchmark.py [number_of_nodes]
+"""
+import sys
+import time
+
+from saagieapi.pipelines.graph_pipeline import ConditionStatusNode, GraphPipeline, JobNode
+
+JOB_ID = "5d1999f5-fa70-47d9-9f41-55ad48333629"
+
+
+def build_chain(size: int) -> GraphPipeline:
+    """Linear pipeline: job 1 -> job 2 -> ... -> job n"""
+    nodes = [JobNode(JOB_ID) for _ in range(size)]
+    for node, next_node in zip(nodes, nodes[1:]):
+        node.add_next_node(next_node)
+    graph_pipeline = GraphPipeline()
+    graph_pipeline.add_root_node(nodes[0])
+    return graph_pipeline
+
+
+def build_fan_out(size: int) -> GraphPipeline:
+    """Fan-out pipeline: a root job followed by a condition and n jobs joining on a last job"""
+    root, last = JobNode(JOB_ID), JobNode(JOB_ID)
+    condition_node = ConditionStatusNode()
+    condition_node.put_all_success()
+    root.add_next_node(condition_node)
+    for _ in range(size - 3):
+        node = JobNode(JOB_ID)
+        node.add_next_node(last)
+        condition_node.add_success_node(node)
+    condition_node.add_failure_node(last)
+    graph_pipeline = GraphPipeline()
+    graph_pipeline.add_root_node(root)
+    return graph_pipeline
+
+
+def run(size: int) -> None:
+    for name, build in (("chain", build_chain), ("fan-out", build_fan_out)):
+        start = time.perf_counter()
+        graph_pipeline = build(size)
+        built = time.perf_counter()
+        graph_pipeline.to_pipeline_graph_input()
+        serialized = time.perf_counter()
+        count = len(graph_pipeline.list_job_nodes) + len(graph_pipeline.list_conditions_nodes)
+        print(f"{name:8} {count:>8} nodes  build {built - start:.3f}s  serialize {serialized - built:.3f}s")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
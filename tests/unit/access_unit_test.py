@@ -0,0 +1,106 @@
+from unittest.mock import Mock
+
+import pytest
+
+from saagieapi.access import AccessIndex
+
+
+class TestAccessIndex:
+    @pytest.fixture
+    def saagie_api_mock(self):
+        saagie_api_mock = Mock()
+        saagie_api_mock.users.list.return_value = [
+            {"login": "admin", "groups": ["administrators"]},
+            {"login": "john", "groups": ["readers", "editors"]},
+            {"login": "jane", "groups": ["editors"]},
+            {"login": "new", "groups": []},
+        ]
+        saagie_api_mock.groups.list.return_value = [
+            {"name": "administrators", "protected": True},
+            {"name": "readers", "protected": False},
+            {"name": "editors", "protected": False},
+        ]
+        saagie_api_mock.projects.list.return_value = {
+            "projects": [{"id": "project_a", "name": "Project A"}, {"id": "project_b", "name": "Project B"}]
+        }
+        permissions = {
+            "administrators": {"authorizations": []},
+            "readers": {
+                "authorizations": [
+                    {
+                        "platformId": 1,
+                        "permissions": [
+                            {"artifact": {"type": "PROJECTS_ENVVAR_EDITOR"}, "role": "ROLE_PROJECT_ENVVAR_EDITOR"},
+                            {"artifact": {"id": "project_b", "type": "PROJECT"}, "role": "ROLE_PROJECT_VIEWER"},
+                        ],
+                    }
+                ]
+            },
+        }
+
+        def get_permission(name, verify_ssl):
+            if name not in permissions:
+                raise ValueError("error")
+            return permissions[name]
+
+        saagie_api_mock.groups.get_permission.side_effect = get_permission
+        rights = {
+            "project_a": [
+                {"name": "administrators", "role": "ROLE_PROJECT_MANAGER", "isAllProjects": True},
+                {"name": "readers", "role": "ROLE_PROJECT_VIEWER", "isAllProjects": False},
+                {"name": "editors", "role": "ROLE_PROJECT_EDITOR", "isAllProjects": False},
+            ],
+            "project_b": [{"name": "administrators", "role": "ROLE_PROJECT_MANAGER", "isAllProjects": True}],
+        }
+        saagie_api_mock.projects.get_rights.side_effect = lambda project_id: {"rights": rights[project_id]}
+        return saagie_api_mock
+
+    def test_load(self, saagie_api_mock):
+        index = AccessIndex.load(saagie_api_mock, max_workers=3)
+
+        assert index.errors == {"editors": "error"}
+        assert index.role("john", "project_a") == "ROLE_PROJECT_EDITOR"
+        assert index.role("john", "project_b") == "ROLE_PROJECT_VIEWER"
+        assert index.role("new", "project_a") is None
+        assert index.role("unknown", "project_a") is None
+        assert index.project_names == {"project_a": "Project A", "project_b": "Project B"}
+
+    def test_queries(self, saagie_api_mock):
+        index = AccessIndex.load(saagie_api_mock)
+
+        assert index.users_with_role("project_a", "ROLE_PROJECT_EDITOR") == ["jane", "john"]
+        assert index.users_with_role("project_a", "ROLE_PROJECT_EDITOR", at_least=True) == ["admin", "jane", "john"]
+        assert not index.users_with_role("unknown", "ROLE_PROJECT_VIEWER")
+        assert index.projects_for_user("john") == {
+            "project_a": "ROLE_PROJECT_EDITOR",
+            "project_b": "ROLE_PROJECT_VIEWER",
+        }
+        assert index.projects_for_user("john", min_role="ROLE_PROJECT_EDITOR") == {"project_a": "ROLE_PROJECT_EDITOR"}
+        with pytest.raises(ValueError):
+            index.users_with_role("project_a", "ROLE_ADMIN")
+
+    def test_snapshot_diff(self, saagie_api_mock):
+        previous = AccessIndex.from_dict(AccessIndex.load(saagie_api_mock).to_dict())
+        current = AccessIndex(
+            user_groups={**previous.user_groups, "john": ["readers"], "new": ["editors"]},
+            group_roles=previous.group_roles,
+            project_names=previous.project_names,
+        )
+
+        assert current.diff(previous) == [
+            {
+                "user": "john",
+                "project_id": "project_a",
+                "project_name": "Project A",
+                "before": "ROLE_PROJECT_EDITOR",
+                "after": "ROLE_PROJECT_VIEWER",
+            },
+            {
+                "user": "new",
+                "project_id": "project_a",
+                "project_name": "Project A",
+                "before": None,
+                "after": "ROLE_PROJECT_EDITOR",
+            },
+        ]
+        assert not previous.diff(AccessIndex.from_dict(previous.to_dict()))
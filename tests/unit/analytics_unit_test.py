@@ -0,0 +1,220 @@
+from unittest.mock import Mock
+
+import pytest
+
+from saagieapi.analytics import DAY, HOUR, AppMetricsCollector, InstanceHistory, RingBuffer, instance_history
+
+BACKENDS = [
+    False,
+    pytest.param(True, marks=pytest.mark.skipif(instance_history.np is None, reason="numpy is not installed")),
+]
+
+
+def make_instance(start, duration, status="SUCCEEDED"):
+    return {
+        "id": f"{start}-{status}",
+        "status": status,
+        "startTime": f"2022-04-19T{start}:00.000Z",
+        "endTime": None if duration is None else f"2022-04-19T{start}:{duration:02d}.000Z",
+    }
+
+
+class TestInstanceHistory:
+    def setup_method(self):
+        self.jobs = {
+            "jobs": [
+                {
+                    "id": "job_1",
+                    "name": "Job 1",
+                    "instances": [
+                        make_instance("10:00", 10),
+                        make_instance("10:30", 20),
+                        make_instance("11:00", 30, "FAILED"),
+                        make_instance("12:00", 40),
+                        make_instance("13:00", None, "RUNNING"),
+                    ],
+                },
+                {"id": "job_2", "name": "Job 2", "instances": [make_instance("11:00", 5, "KILLED")]},
+            ]
+        }
+        self.pipelines = {
+            "project": {
+                "pipelines": [
+                    {
+                        "id": "pipeline_1",
+                        "name": "Pipeline 1",
+                        "instances": [make_instance("10:00", 50), {"id": "queued", "status": "QUEUED"}],
+                    }
+                ]
+            }
+        }
+
+    def make_history(self, use_numpy):
+        history = InstanceHistory(use_numpy=use_numpy)
+        assert history.add_jobs(self.jobs, project_id="project_1") == 6
+        assert history.add_pipelines(self.pipelines, project_id="project_2") == 1
+        return history
+
+    @pytest.mark.parametrize("use_numpy", BACKENDS)
+    def test_summary_by_entity(self, use_numpy):
+        history = self.make_history(use_numpy)
+
+        summary = history.summary(group_by="entity")
+
+        assert len(history) == 7
+        assert [row["entity_id"] for row in summary] == ["job_1", "job_2", "pipeline_1"]
+        job_1 = summary[0]
+        assert job_1["project_id"] == "project_1"
+        assert job_1["entity_type"] == "job"
+        assert job_1["entity_name"] == "Job 1"
+        assert job_1["count"] == 5
+        assert job_1["succeeded"] == 3
+        assert job_1["failed"] == 1
+        assert job_1["success_ratio"] == pytest.approx(0.75)
+        assert job_1["p50_duration"] == pytest.approx(25)
+        assert job_1["p95_duration"] == pytest.approx(38.5)
+        # 5 runs between 10:00 and 13:00
+        assert job_1["runs_per_hour"] == pytest.approx(5 / 3)
+        assert summary[1]["success_ratio"] == 0
+        assert summary[2]["p50_duration"] == pytest.approx(50)
+
+    @pytest.mark.parametrize("use_numpy", BACKENDS)
+    def test_summary_by_project_and_bucket(self, use_numpy):
+        history = self.make_history(use_numpy)
+
+        summary = history.summary(group_by="project", bucket=HOUR, percentiles=(50,))
+
+        assert [(row["project_id"], row["bucket_start"], row["count"]) for row in summary] == [
+            ("project_1", "2022-04-19T10:00:00+00:00", 2),
+            ("project_1", "2022-04-19T11:00:00+00:00", 2),
+            ("project_1", "2022-04-19T12:00:00+00:00", 1),
+            ("project_1", "2022-04-19T13:00:00+00:00", 1),
+            ("project_2", "2022-04-19T10:00:00+00:00", 1),
+        ]
+        assert summary[0]["p50_duration"] == pytest.approx(15)
+        assert summary[0]["runs_per_hour"] == 2
+        assert summary[3]["p50_duration"] is None
+        assert summary[3]["success_ratio"] is None
+        assert "p95_duration" not in summary[0]
+
+    @pytest.mark.parametrize("use_numpy", BACKENDS)
+    def test_summary_all(self, use_numpy):
+        history = self.make_history(use_numpy)
+
+        summary = history.summary(group_by=None, bucket=DAY)
+
+        assert len(summary) == 1
+        assert summary[0]["bucket_start"] == "2022-04-19T00:00:00+00:00"
+        assert summary[0]["count"] == 7
+        assert summary[0]["succeeded"] == 4
+        assert summary[0]["failed"] == 2
+
+    def test_summary_empty(self):
+        assert not InstanceHistory(use_numpy=False).summary()
+
+    def test_summary_wrong_group_by(self):
+        history = self.make_history(False)
+        with pytest.raises(ValueError):
+            history.summary(group_by="technology")
+
+    def test_backends_consistent(self):
+        if instance_history.np is None:
+            pytest.skip("numpy is not installed")
+        results = [self.make_history(use_numpy).summary(group_by="entity_type", bucket=HOUR) for use_numpy in (0, 1)]
+        assert len(results[0]) == len(results[1])
+        for row_array, row_numpy in zip(*results):
+            assert row_array.keys() == row_numpy.keys()
+            for key, value in row_array.items():
+                if isinstance(value, float):
+                    assert row_numpy[key] == pytest.approx(value)
+                else:
+                    assert row_numpy[key] == value
+
+
+class TestRingBuffer:
+    def test_append_wraps(self):
+        buffer = RingBuffer(3, ["a", "b"])
+        for timestamp in range(5):
+            buffer.append(timestamp, {"a": timestamp * 10, "b": None if timestamp == 3 else timestamp})
+
+        assert len(buffer) == 3
+        assert buffer.items("a") == [(2, 20), (3, 30), (4, 40)]
+        assert buffer.items("b") == [(2, 2), (4, 4)]
+        assert buffer.items("a", since=3) == [(3, 30), (4, 40)]
+
+    def test_invalid_capacity(self):
+        with pytest.raises(ValueError):
+            RingBuffer(0, ["a"])
+
+
+class TestAppMetricsCollector:
+    START = 1712757600  # 2024-04-10T14:00:00Z
+
+    def setup_method(self):
+        self.saagie_api = Mock()
+        self.saagie_api.apps.get_statuses.return_value = {
+            "app_1": {
+                "id": "app_1",
+                "name": "Jupyter",
+                "history": {"id": "history_1", "runningVersionNumber": 2, "currentStatus": "STARTED"},
+            },
+            "app_2": {"id": "app_2", "name": "Superset", "currentVersion": {"number": 1}, "history": None},
+            "app_3": None,
+        }
+        self.downtimes = iter([10.0, 30.0, 20.0, 60.0])
+        self.saagie_api.apps.get_stats.side_effect = lambda *args: {
+            "appStats": {"uptimePercentage": 50.0, "downtimePercentage": next(self.downtimes), "recoveredCount": 1}
+        }
+        self.saagie_api.apps.count_history_statuses.return_value = {"countAppHistoryStatuses": 4}
+        self.saagie_api.apps.get_history_statuses.return_value = {
+            "appHistoryStatuses": [
+                {"status": "FAILED", "recordAt": "2024-04-10T14:00:30.000Z"},
+                {"status": "RECOVERING", "recordAt": "2024-04-10T14:00:31.000Z"},
+            ]
+        }
+
+    def test_sample(self):
+        collector = AppMetricsCollector(self.saagie_api, ["app_1", "app_2", "app_3"], capacity=3, max_workers=2)
+
+        for minute in range(4):
+            errors = collector.sample(now=self.START + 60 * minute)
+
+        assert errors == {"app_3": "App not found"}
+        assert len(collector.series["app_1"]) == 3
+        assert [row["value"] for row in collector.values("app_1", "downtime_percentage")] == [30.0, 20.0, 60.0]
+        # the FAILED status is only counted by the first sample taken after it was recorded
+        assert [row["value"] for row in collector.values("app_1", "failures")] == [1, 0, 0]
+        assert collector.values("app_2", "running")[0] == {"time": "2024-04-10T14:01:00+00:00", "value": 0.0}
+        assert not collector.values("app_2", "downtime_percentage")
+        self.saagie_api.apps.get_stats.assert_called_with("history_1", 2, "2024-04-09T14:03:00.000Z")
+        self.saagie_api.apps.get_history_statuses.assert_called_with("history_1", 2, "2024-04-10T14:02:00.000Z")
+
+    def test_first_sample_counts_failures(self):
+        collector = AppMetricsCollector(self.saagie_api, ["app_1"])
+
+        collector.sample(now=self.START + 60)
+
+        assert collector.values("app_1", "failures")[0]["value"] == 1
+
+    def test_queries(self):
+        collector = AppMetricsCollector(self.saagie_api, ["app_1", "app_2"])
+        for minute in (0, 30, 60, 90):
+            collector.sample(now=self.START + 60 * minute)
+
+        assert collector.downsample("app_1", "downtime_percentage", bucket=HOUR) == [
+            {"bucket_start": "2024-04-10T14:00:00+00:00", "count": 2, "min": 10.0, "avg": 20.0, "max": 30.0},
+            {"bucket_start": "2024-04-10T15:00:00+00:00", "count": 2, "min": 20.0, "avg": 40.0, "max": 60.0},
+        ]
+        assert collector.percentiles("app_1", "downtime_percentage", percentiles=(50, 100)) == {
+            "p50": pytest.approx(25.0),
+            "p100": 60.0,
+        }
+        assert collector.top("running", aggregate="max") == [
+            {"app_id": "app_1", "app_name": "Jupyter", "running": 1.0},
+            {"app_id": "app_2", "app_name": "Superset", "running": 0.0},
+        ]
+        assert collector.top("downtime_percentage", since="2024-04-10T15:00:00Z")[0]["downtime_percentage"] == 40.0
+        with pytest.raises(ValueError):
+            collector.top("cpu")
+        with pytest.raises(ValueError):
+            collector.top("running", aggregate="sum")
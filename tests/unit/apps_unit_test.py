@@ -7,6 +7,7 @@ import pytest
 from gql import gql
 
 from saagieapi.apps import Apps
+from saagieapi.apps.apps import build_app_statuses_query
 from saagieapi.apps.gql_queries import *
 
 from .saagie_api_unit_test import create_gql_client
@@ -735,6 +736,141 @@ class TestApps:
             }
             app.get_id(app_name="app_name", project_name="project_name")
 
+    def test_get_statuses_gql(self):
+        query = gql(build_app_statuses_query(2))
+        self.client.validate(query)
+
+    def test_get_statuses(self, saagie_api_mock):
+        app = Apps(saagie_api_mock)
+        saagie_api_mock.client.execute.side_effect = [
+            {"app0": {"id": "app_1"}, "app1": {"id": "app_2"}},
+            {"app0": None},
+        ]
+
+        statuses = app.get_statuses(["app_1", "app_2", "app_1", "app_3"], chunk_size=2)
+
+        assert statuses == {"app_1": {"id": "app_1"}, "app_2": {"id": "app_2"}, "app_3": None}
+        saagie_api_mock.client.execute.assert_called_with(
+            query=gql(build_app_statuses_query(1)), variable_values={"id0": "app_3"}, pprint_result=False
+        )
+
+    @staticmethod
+    def app_status(app_id, status, start_time=None):
+        return {"id": app_id, "history": {"currentStatus": status, "startTime": start_time}}
+
+    def test_run_many(self, saagie_api_mock):
+        app = Apps(saagie_api_mock)
+        saagie_api_mock.client.execute.side_effect = lambda query, variable_values, **kwargs: (
+            (_ for _ in ()).throw(RuntimeError("error")) if variable_values.get("id") == "app_2" else {"runApp": {}}
+        )
+
+        with patch.object(app, "get_statuses") as get_statuses, patch("time.sleep") as sleep:
+            get_statuses.side_effect = [
+                {app_id: self.app_status(app_id, "STOPPED") for app_id in ["app_1", "app_2", "app_3"]},
+                {"app_1": self.app_status("app_1", "STARTING"), "app_3": self.app_status("app_3", "STARTING")},
+                {"app_1": self.app_status("app_1", "STARTING"), "app_3": self.app_status("app_3", "FAILED")},
+                {"app_1": self.app_status("app_1", "STARTED")},
+            ]
+
+            report = app.run_many(["app_1", "app_2", "app_3"], max_workers=3, wait=True)
+
+        assert [(row["app_id"], row["success"], row.get("outcome"), row.get("elapsed")) for row in report] == [
+            ("app_1", True, "reached", 4),
+            ("app_2", False, None, None),
+            ("app_3", True, "failed", 2),
+        ]
+        assert report[1]["error"] == "error"
+        assert [call.args[0] for call in sleep.call_args_list] == [2, 2]
+        get_statuses.assert_called_with(["app_1"])
+
+    def test_run_many_ignores_statuses_before_the_action(self, saagie_api_mock):
+        app = Apps(saagie_api_mock)
+        saagie_api_mock.client.execute.return_value = {"runApp": {}}
+
+        with patch.object(app, "get_statuses") as get_statuses, patch("time.sleep"):
+            get_statuses.side_effect = [
+                {
+                    "failed": self.app_status("failed", "FAILED", "t0"),
+                    "started": self.app_status("started", "STARTED", "t0"),
+                },
+                {
+                    "failed": self.app_status("failed", "FAILED", "t0"),
+                    "started": self.app_status("started", "STARTED", "t0"),
+                },
+                {
+                    "failed": self.app_status("failed", "STARTING", "t1"),
+                    "started": self.app_status("started", "STARTING", "t1"),
+                },
+                {
+                    "failed": self.app_status("failed", "FAILED", "t1"),
+                    "started": self.app_status("started", "STARTED", "t1"),
+                },
+            ]
+
+            report = app.run_many(["failed", "started"], wait=True)
+
+        assert [(row["app_id"], row["outcome"], row["elapsed"]) for row in report] == [
+            ("failed", "failed", 4),
+            ("started", "reached", 4),
+        ]
+
+    def test_stop_many_wait_already_stopped(self, saagie_api_mock):
+        app = Apps(saagie_api_mock)
+
+        with patch.object(app, "get_statuses") as get_statuses, patch("time.sleep") as sleep:
+            get_statuses.side_effect = [
+                {
+                    "stopped": self.app_status("stopped", "STOPPED", "t0"),
+                    "started": self.app_status("started", "STARTED", "t0"),
+                },
+                {
+                    "stopped": self.app_status("stopped", "STOPPED", "t0"),
+                    "started": self.app_status("started", "STOPPED", "t0"),
+                },
+            ]
+
+            report = app.stop_many(["stopped", "started"], wait=True)
+
+        assert [(row["app_id"], row["outcome"]) for row in report] == [("stopped", "reached"), ("started", "reached")]
+        sleep.assert_not_called()
+
+    def test_stop_many(self, saagie_api_mock):
+        app = Apps(saagie_api_mock)
+
+        report = app.stop_many(["app_1", "app_2"])
+
+        assert [row["success"] for row in report] == [True, True]
+        assert "outcome" not in report[0]
+        saagie_api_mock.client.execute.assert_called_with(query=gql(GQL_STOP_APP), variable_values={"id": "app_2"})
+
+    def test_upgrade_many(self, saagie_api_mock):
+        app = Apps(saagie_api_mock)
+
+        with patch.object(app, "upgrade") as upgrade:
+            report = app.upgrade_many(
+                {"app_1": {"image": "image:2"}, "app_2": None}, release_note="note", image="image:1"
+            )
+
+        assert [row["action"] for row in report] == ["upgrade", "upgrade"]
+        upgrade.assert_any_call("app_1", release_note="note", image="image:2")
+        upgrade.assert_any_call("app_2", release_note="note", image="image:1")
+
+    def test_wait_for_status_timeout(self, saagie_api_mock):
+        app = Apps(saagie_api_mock)
+
+        with patch.object(app, "get_statuses") as get_statuses, patch("time.sleep") as sleep:
+            get_statuses.side_effect = lambda app_ids: {
+                app_id: self.app_status(app_id, "STARTING") if app_id == "app_1" else None for app_id in app_ids
+            }
+
+            results = app.wait_for_status(["app_1", "app_2"], timeout=60, min_interval=5, max_interval=20)
+
+        assert results == {
+            "app_1": {"status": "STARTING", "outcome": "timeout", "elapsed": 75},
+            "app_2": {"status": None, "outcome": "not_found", "elapsed": 0},
+        }
+        assert [call.args[0] for call in sleep.call_args_list] == [5, 10, 20, 20, 20]
+
     def test_stats_app_gql(self):
         query = gql(GQL_STATS_APP)
         self.client.validate(query)
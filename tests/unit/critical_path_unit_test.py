@@ -0,0 +1,75 @@
+import pytest
+
+from saagieapi.pipelines.critical_path import compute_critical_path, job_durations_from_instances
+
+
+def job_node(node_id, next_nodes=()):
+    return {"id": node_id, "job": {"id": f"job_{node_id}", "name": f"Job {node_id}"}, "nextNodes": list(next_nodes)}
+
+
+JOB_NODES = [
+    job_node("a", ["b", "c"]),
+    job_node("b", ["d"]),
+    job_node("c", ["d"]),
+    job_node("d", ["cond"]),
+    job_node("e"),
+    job_node("f"),
+]
+CONDITION_NODES = [
+    {
+        "id": "cond",
+        "condition": {"toString": "status == 'SUCCEEDED'"},
+        "nextNodesSuccess": ["e"],
+        "nextNodesFailure": ["f"],
+    }
+]
+DURATIONS = {"job_a": 100, "job_b": 50, "job_c": 200, "job_d": 10, "job_e": 30, "job_f": 1000}
+
+
+class TestCriticalPath:
+    def test_compute_critical_path(self):
+        result = compute_critical_path(JOB_NODES, CONDITION_NODES, DURATIONS)
+
+        assert result["makespan"] == 340
+        assert result["total_work"] == 390
+        assert [node["node_id"] for node in result["critical_path"]] == ["a", "c", "d", "cond", "e"]
+        assert result["critical_path"][1]["start"] == 100
+        assert result["nodes"]["b"]["slack"] == 150
+        assert result["nodes"]["b"]["latest_start"] == 250
+        assert "f" not in result["nodes"]
+        assert [(c["node_id"], c["gain"]) for c in result["speed_up_candidates"]] == [
+            ("c", 150),
+            ("a", 100),
+            ("e", 30),
+            ("d", 10),
+        ]
+        assert not result["missing_durations"]
+
+    def test_compute_critical_path_failure_branch(self):
+        result = compute_critical_path(JOB_NODES, CONDITION_NODES, {"job_a": 10}, condition_branch="both")
+
+        assert result["makespan"] == 10
+        assert set(result["nodes"]) == {"a", "b", "c", "d", "cond", "e", "f"}
+        assert result["missing_durations"] == ["job_b", "job_c", "job_d", "job_e", "job_f"]
+
+    def test_compute_critical_path_invalid(self):
+        with pytest.raises(ValueError):
+            compute_critical_path([job_node("a", ["b"]), job_node("b", ["a"])], None, {})
+        with pytest.raises(ValueError):
+            compute_critical_path(JOB_NODES, CONDITION_NODES, DURATIONS, condition_branch="always")
+
+    def test_job_durations_from_instances(self):
+        jobs = [
+            {
+                "id": "job_1",
+                "instances": [
+                    {"status": "SUCCEEDED", "startTime": "2022-04-19T10:00:00Z", "endTime": "2022-04-19T10:01:00Z"},
+                    {"status": "SUCCEEDED", "startTime": "2022-04-19T11:00:00Z", "endTime": "2022-04-19T11:03:00Z"},
+                    {"status": "FAILED", "startTime": "2022-04-19T12:00:00Z", "endTime": "2022-04-19T13:00:00Z"},
+                ],
+            },
+            {"id": "job_2", "instances": [{"status": "RUNNING", "startTime": "2022-04-19T10:00:00Z"}]},
+        ]
+
+        assert job_durations_from_instances(jobs) == {"job_1": pytest.approx(120)}
+        assert job_durations_from_instances(jobs, statuses=("FAILED",)) == {"job_1": pytest.approx(3600)}
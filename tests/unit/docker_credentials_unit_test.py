@@ -227,3 +227,63 @@ class TestDockerCredentials:
             docker.delete_for_username(project_id=project_id, username=username)
 
         saagie_api_mock.client.execute.assert_called_with(query=expected_query, variable_values=params)
+
+
+def _list_credentials(project_id, **_):
+    if project_id == "broken":
+        raise RuntimeError("Forbidden")
+    credentials = {
+        "p1": [
+            {"id": "c1", "registry": None, "username": "robot"},
+            {"id": "c2", "registry": "registry.example.com", "username": "robot"},
+        ],
+        "p2": [{"id": "c3", "registry": "registry.example.com", "username": "robot"}],
+        "p3": [],
+    }
+    return {"allDockerCredentials": credentials[project_id]}
+
+
+def _upgrade(_project_id, credential_id, *_):
+    if credential_id == "c3":
+        raise RuntimeError("Invalid password")
+    return {"updateDockerCredentials": {"id": credential_id}}
+
+
+class TestDockerCredentialsRotation:
+    @pytest.fixture
+    def saagie_api_mock(self):
+        saagie_api_mock = Mock()
+        saagie_api_mock.projects.list.return_value = {"projects": [{"id": "p1"}, {"id": "p2"}, {"id": "p3"}]}
+        return saagie_api_mock
+
+    def test_rotate(self, saagie_api_mock):
+        docker = DockerCredentials(saagie_api_mock)
+
+        with patch.object(docker, "list_for_project") as list_for_project, patch.object(docker, "upgrade") as upgrade:
+            list_for_project.side_effect = _list_credentials
+            upgrade.side_effect = _upgrade
+            report = docker.rotate("robot", "registry.example.com", "new_password", max_workers=2)
+
+        assert report == {
+            "username": "robot",
+            "registry": "registry.example.com",
+            "dry_run": False,
+            "updated": ["p1"],
+            "not_found": ["p3"],
+            "errors": {"p2": "Invalid password"},
+        }
+        upgrade.assert_any_call("p1", "c2", "new_password", "registry.example.com", "robot")
+        assert list_for_project.call_count == 3
+
+    def test_rotate_dry_run(self, saagie_api_mock):
+        docker = DockerCredentials(saagie_api_mock)
+
+        with patch.object(docker, "list_for_project") as list_for_project, patch.object(docker, "upgrade") as upgrade:
+            list_for_project.side_effect = _list_credentials
+            report = docker.rotate("robot", None, "new_password", projects=["p1", "p2", "broken"], dry_run=True)
+
+        assert report["updated"] == ["p1"]
+        assert report["not_found"] == ["p2"]
+        assert report["errors"] == {"broken": "Forbidden"}
+        upgrade.assert_not_called()
+        saagie_api_mock.projects.list.assert_not_called()
@@ -1,4 +1,5 @@
 # pylint: disable=attribute-defined-outside-init
+import json
 import os
 import sys
 from unittest.mock import MagicMock, Mock, patch
@@ -6,7 +7,8 @@ from unittest.mock import MagicMock, Mock, patch
 import pytest
 from gql import gql
 
-from saagieapi.env_vars.env_vars import EnvVars, check_scope
+from saagieapi.env_vars import EffectiveEnvResolver
+from saagieapi.env_vars.env_vars import EnvVars, build_env_vars_by_entity_query, check_scope, read_exported_env_vars
 from saagieapi.env_vars.gql_queries import *
 
 from .saagie_api_unit_test import create_gql_client
@@ -880,3 +882,347 @@ class TestEnvVars:
         assert isinstance(arg1, Exception)
         assert str(arg1) == "Error while creating the variable"
         assert arg2 == project_id
+
+    @staticmethod
+    def existing_project_vars():
+        return [
+            {
+                "id": "id_host",
+                "name": "HOST",
+                "scope": "PROJECT",
+                "value": "old.host",
+                "description": "",
+                "isPassword": False,
+            },
+            {
+                "id": "id_port",
+                "name": "PORT",
+                "scope": "PROJECT",
+                "value": "5432",
+                "description": "",
+                "isPassword": False,
+            },
+            {"id": "id_old", "name": "OLD", "scope": "PROJECT", "value": "x", "description": "", "isPassword": False},
+        ]
+
+    def test_sync_dry_run(self, saagie_api_mock):
+        instance = EnvVars(saagie_api_mock)
+
+        with patch.object(instance, "list", return_value=self.existing_project_vars()) as list_env:
+            report = instance.sync(
+                "PROJECT", {"HOST": "new.host", "PORT": "5432", "USER": "admin"}, project_id="project_id", dry_run=True
+            )
+
+        list_env.assert_called_once_with("PROJECT", "project_id", None, None, scope_only=True, pprint_result=False)
+        assert report["added"] == ["USER"]
+        assert report["updated"] == ["HOST"]
+        assert report["unchanged"] == ["PORT"]
+        assert report["deleted"] == []
+        assert report["method"] == "bulk"
+        saagie_api_mock.client.execute.assert_not_called()
+
+    def test_sync_bulk(self, saagie_api_mock):
+        instance = EnvVars(saagie_api_mock)
+        saagie_api_mock.client.execute.return_value = {"replaceEnvironmentVariablesByRawForScope": []}
+
+        with patch.object(instance, "list", return_value=self.existing_project_vars()):
+            report = instance.sync("PROJECT", {"HOST": "new.host", "PORT": "5432"}, project_id="project_id")
+
+        assert report["method"] == "bulk"
+        assert not report["errors"]
+        saagie_api_mock.client.execute.assert_called_once()
+        kwargs = saagie_api_mock.client.execute.call_args.kwargs
+        assert kwargs["query"] == gql(GQL_CREATE_PIPELINE_ENV_VAR)
+        # without prune, the variables missing from desired are kept in the raw replacement
+        assert kwargs["variable_values"] == {
+            "entityId": "project_id",
+            "scope": "PROJECT",
+            "rawEnvironmentVariables": "OLD=x\nHOST=new.host\nPORT=5432\n",
+        }
+
+    def test_sync_mixed(self, saagie_api_mock):
+        instance = EnvVars(saagie_api_mock)
+        saagie_api_mock.client.execute.side_effect = lambda query, **kwargs: (
+            {"replaceEnvironmentVariablesByRawForScope": []}
+            if query == gql(GQL_CREATE_PIPELINE_ENV_VAR)
+            else {"saveEnvironmentVariable": {"id": "id"}}
+        )
+        existing = self.existing_project_vars() + [
+            {"id": "id_pwd", "name": "PWD", "scope": "PROJECT", "value": None, "description": "", "isPassword": True}
+        ]
+
+        with patch.object(instance, "list", return_value=existing):
+            report = instance.sync(
+                "PROJECT",
+                {"HOST": "new.host", "PORT": "5432", "TOKEN": {"value": "secret", "is_password": True}},
+                project_id="project_id",
+                prune=True,
+                max_workers=2,
+            )
+
+        assert report["method"] == "mixed"
+        assert (report["added"], report["updated"], report["deleted"]) == (["TOKEN"], ["HOST"], ["OLD", "PWD"])
+        assert not report["errors"]
+        calls = {
+            call.kwargs["query"]: call.kwargs["variable_values"]
+            for call in saagie_api_mock.client.execute.call_args_list
+        }
+        # the raw mutation updates HOST and deletes OLD, but neither creates nor deletes passwords
+        assert calls[gql(GQL_CREATE_PIPELINE_ENV_VAR)]["rawEnvironmentVariables"] == "HOST=new.host\nPORT=5432\n"
+        assert calls[gql(GQL_CREATE_ENV_VAR)] == {
+            "envVar": {"name": "TOKEN", "value": "secret", "description": "", "isPassword": True, "scope": "PROJECT"},
+            "entityId": "project_id",
+        }
+        assert calls[gql(GQL_DELETE_ENV_VAR)] == {"id": "id_pwd"}
+        assert gql(GQL_UPDATE_ENV_VAR) not in calls
+
+    def test_sync_mutations(self, saagie_api_mock):
+        instance = EnvVars(saagie_api_mock)
+        saagie_api_mock.client.execute.return_value = {"saveEnvironmentVariable": {"id": "id"}}
+        existing = self.existing_project_vars()
+        existing[1]["description"] = "Port of the database"
+
+        with patch.object(instance, "list", return_value=existing):
+            report = instance.sync(
+                "PROJECT", {"HOST": "new.host", "PORT": "5432", "USER": "admin"}, project_id="project_id", prune=True
+            )
+
+        # the raw mutation would drop the description of PORT
+        assert report["method"] == "mutations"
+        assert (report["added"], report["updated"], report["deleted"]) == (["USER"], ["HOST"], ["OLD"])
+        calls = {
+            call.kwargs["query"]: call.kwargs["variable_values"]
+            for call in saagie_api_mock.client.execute.call_args_list
+        }
+        assert gql(GQL_CREATE_PIPELINE_ENV_VAR) not in calls
+        assert calls[gql(GQL_UPDATE_ENV_VAR)]["envVar"]["id"] == "id_host"
+        assert calls[gql(GQL_UPDATE_ENV_VAR)]["envVar"]["value"] == "new.host"
+        assert saagie_api_mock.client.execute.call_count == 3
+
+    def test_sync_global_uses_mutations_and_reports_errors(self, saagie_api_mock):
+        instance = EnvVars(saagie_api_mock)
+        saagie_api_mock.client.execute.side_effect = Exception("error")
+        existing = [
+            {"id": "id_pwd", "name": "PWD", "scope": "GLOBAL", "value": None, "description": "", "isPassword": True}
+        ]
+
+        with patch.object(instance, "list", return_value=existing), patch("logging.error"):
+            report = instance.sync("GLOBAL", {"PWD": "secret", "NEW": "value"})
+
+        assert report["method"] == "mutations"
+        assert report["updated"] == ["PWD"]
+        assert set(report["errors"]) == {"PWD", "NEW"}
+        update_call = next(
+            call
+            for call in saagie_api_mock.client.execute.call_args_list
+            if call.kwargs["query"] == gql(GQL_UPDATE_ENV_VAR)
+        )
+        assert update_call.kwargs["variable_values"] == {
+            "envVar": {
+                "id": "id_pwd",
+                "name": "PWD",
+                "scope": "GLOBAL",
+                "description": "",
+                "isPassword": True,
+                "value": "secret",
+            }
+        }
+
+    def test_sync_nothing_to_change(self, saagie_api_mock):
+        instance = EnvVars(saagie_api_mock)
+
+        with patch.object(instance, "list", return_value=self.existing_project_vars()):
+            report = instance.sync("PROJECT", {"PORT": {"value": "5432", "description": ""}}, project_id="project_id")
+
+        assert report["method"] is None
+        assert report["unchanged"] == ["PORT"]
+        saagie_api_mock.client.execute.assert_not_called()
+
+    def test_sync_bulk_not_possible(self, saagie_api_mock):
+        instance = EnvVars(saagie_api_mock)
+
+        with patch.object(instance, "list", return_value=self.existing_project_vars()), pytest.raises(ValueError):
+            instance.sync(
+                "PROJECT", {"HOST": {"value": "h", "description": "host"}}, project_id="project_id", use_bulk=True
+            )
+
+    @pytest.mark.parametrize("scope", ["PROJECT", "PIPELINE", "APP"])
+    def test_build_env_vars_by_entity_query_gql(self, scope):
+        query = build_env_vars_by_entity_query(scope, 3)
+        self.client.validate(gql(query))
+
+    def test_list_by_entity(self, saagie_api_mock):
+        instance = EnvVars(saagie_api_mock)
+        saagie_api_mock.client.execute.side_effect = [
+            {
+                "entity0": [
+                    {"id": "1", "name": "A", "scope": "GLOBAL"},
+                    {"id": "2", "name": "B", "scope": "PROJECT"},
+                ],
+                "entity1": None,
+            },
+            {"entity0": []},
+        ]
+
+        result = instance.list_by_entity("PROJECT", ["project_1", "project_2", "project_1", "project_3"], chunk_size=2)
+
+        assert result == {
+            "project_1": [{"id": "2", "name": "B", "scope": "PROJECT"}],
+            "project_2": None,
+            "project_3": [],
+        }
+        first_call = saagie_api_mock.client.execute.call_args_list[0].kwargs
+        assert first_call["variable_values"] == {"id0": "project_1", "id1": "project_2"}
+
+    def test_list_by_entity_invalid_scope(self, saagie_api_mock):
+        with pytest.raises(ValueError):
+            EnvVars(saagie_api_mock).list_by_entity("GLOBAL", ["id"])
+
+    def test_export_single_file(self, saagie_api_mock, tmp_path):
+        instance = EnvVars(saagie_api_mock)
+        env_vars = [env_var("A", "PROJECT", "1"), env_var("B", "PROJECT", None, True)]
+
+        with patch.object(instance, "list", return_value=env_vars):
+            result = instance.export("project_id", tmp_path / "env_vars", project_only=True, single_file=True)
+
+        assert result is True
+        assert [path.name for path in (tmp_path / "env_vars").iterdir()] == ["env_vars.json"]
+        assert read_exported_env_vars(tmp_path / "env_vars") == env_vars
+
+    def test_read_exported_env_vars_per_file(self, tmp_path):
+        for name in ["B", "A"]:
+            (tmp_path / name).mkdir()
+            (tmp_path / name / "variable.json").write_text(f'{{"name": "{name}"}}', encoding="utf-8")
+
+        assert read_exported_env_vars(tmp_path) == [{"name": "A"}, {"name": "B"}]
+        assert not read_exported_env_vars(tmp_path / "missing")
+
+    def test_import_from_file(self, saagie_api_mock, tmp_path):
+        instance = EnvVars(saagie_api_mock)
+        json_file = tmp_path / "env_vars.json"
+        json_file.write_text(
+            json.dumps(
+                [
+                    env_var("HOST", "GLOBAL", "db"),
+                    env_var("A", "PROJECT", "1"),
+                    {**env_var("B", "PROJECT", None, True), "description": None},
+                ]
+            ),
+            encoding="utf-8",
+        )
+
+        with patch.object(instance, "sync") as sync:
+            sync.return_value = {"errors": {}}
+            result = instance.import_from_file(json_file, project_id="project_id", scopes=["PROJECT"], max_workers=2)
+
+        assert result is True
+        sync.assert_called_once_with(
+            "PROJECT",
+            {
+                "A": {"value": "1", "description": "", "is_password": False},
+                "B": {"value": None, "description": "", "is_password": True},
+            },
+            "project_id",
+            None,
+            None,
+            max_workers=2,
+        )
+
+    def test_import_from_file_error(self, saagie_api_mock, tmp_path):
+        instance = EnvVars(saagie_api_mock)
+        json_file = tmp_path / "env_vars.json"
+        json_file.write_text(json.dumps([env_var("A", "PROJECT", "1")]), encoding="utf-8")
+
+        with patch.object(instance, "sync") as sync, patch("logging.error"):
+            sync.return_value = {"errors": {"A": "error"}}
+            assert instance.import_from_file(json_file, project_id="project_id") is False
+            assert instance.import_from_file(tmp_path / "missing.json", project_id="project_id") is False
+
+
+def env_var(name, scope, value, is_password=False):
+    return {
+        "id": f"{scope}_{name}",
+        "name": name,
+        "scope": scope,
+        "value": value,
+        "description": "",
+        "isPassword": is_password,
+    }
+
+
+class TestEffectiveEnvResolver:
+    @pytest.fixture
+    def saagie_api_mock(self):
+        saagie_api = Mock()
+        saagie_api.env_vars.list.return_value = [
+            env_var("DB_HOST", "GLOBAL", "db"),
+            env_var("TOKEN", "GLOBAL", None, True),
+        ]
+        saagie_api.projects.list.return_value = {
+            "projects": [{"id": "project_1", "name": "Project A"}, {"id": "project_2", "name": "Project B"}]
+        }
+        saagie_api.pipelines.list_for_project_minimal.side_effect = lambda project_id: {
+            "project": {"pipelines": [{"id": f"pipeline_{project_id}", "name": "Pipeline"}]}
+        }
+        saagie_api.apps.list_for_project_minimal.side_effect = lambda project_id: {
+            "project": {"apps": [{"id": "app_1", "name": "Jupyter"}] if project_id == "project_1" else []}
+        }
+        layers = {
+            "project_1": [env_var("DB_HOST", "PROJECT", "db-a")],
+            "project_2": [],
+            "pipeline_project_1": [env_var("DB_HOST", "PIPELINE", "db")],
+            "pipeline_project_2": [],
+            "app_1": None,
+        }
+        saagie_api.env_vars.list_by_entity.side_effect = lambda scope, ids, chunk_size: {
+            entity_id: layers[entity_id] for entity_id in ids
+        }
+        return saagie_api
+
+    def test_load(self, saagie_api_mock):
+        resolver = EffectiveEnvResolver(saagie_api_mock, max_workers=2)
+
+        errors = resolver.load()
+
+        assert errors == {"app_1": "App not found"}
+        saagie_api_mock.env_vars.list.assert_called_once_with("GLOBAL", scope_only=True, pprint_result=False)
+        assert saagie_api_mock.env_vars.list_by_entity.call_count == 3
+        assert resolver.entities[("app", "app_1")] == {"name": "Jupyter", "project_id": "project_1"}
+
+    def test_effective(self, saagie_api_mock):
+        resolver = EffectiveEnvResolver(saagie_api_mock)
+        resolver.load()
+
+        effective = resolver.effective("pipeline", "pipeline_project_1")
+
+        assert effective["DB_HOST"]["value"] == "db"
+        assert effective["DB_HOST"]["scope"] == "PIPELINE"
+        assert effective["DB_HOST"]["overrides"] == ["PROJECT", "GLOBAL"]
+        assert effective["TOKEN"]["scope"] == "GLOBAL"
+        assert resolver.effective("project", "project_2")["DB_HOST"]["scope"] == "GLOBAL"
+        assert resolver.resolve("app", "app_1", "DB_HOST")["value"] == "db-a"
+        assert resolver.resolve("app", "app_1", "MISSING") is None
+        with pytest.raises(ValueError):
+            resolver.effective("pipeline", "unknown")
+
+    def test_find(self, saagie_api_mock):
+        resolver = EffectiveEnvResolver(saagie_api_mock)
+        resolver.load()
+
+        found = resolver.find("DB_HOST", "db")
+
+        assert [(row["entity_type"], row["entity_id"], row["scope"]) for row in found] == [
+            ("pipeline", "pipeline_project_1", "PIPELINE"),
+            ("project", "project_2", "GLOBAL"),
+            ("pipeline", "pipeline_project_2", "GLOBAL"),
+        ]
+        assert len(resolver.find("TOKEN", entity_types=["app"])) == 1
+        assert not resolver.find("TOKEN", "secret")
+
+    def test_load_given_projects(self, saagie_api_mock):
+        resolver = EffectiveEnvResolver(saagie_api_mock)
+
+        resolver.load(["project_2"])
+
+        saagie_api_mock.projects.list.assert_not_called()
+        assert set(resolver.entities) == {("project", "project_2"), ("pipeline", "pipeline_project_2")}
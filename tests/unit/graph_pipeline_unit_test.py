@@ -0,0 +1,195 @@
+import uuid
+
+import pytest
+
+from saagieapi.pipelines.graph_analysis import analyze_graph
+from saagieapi.pipelines.graph_pipeline import (
+    ConditionExpressionNode,
+    ConditionNode,
+    ConditionStatusNode,
+    GraphPipeline,
+    JobNode,
+)
+
+JOB_ID = "5d1999f5-fa70-47d9-9f41-55ad48333629"
+
+
+class TestGraphPipeline:
+    @staticmethod
+    def test_to_pipeline_graph_input():
+        job_node1 = JobNode(JOB_ID)
+        job_node2 = JobNode(JOB_ID)
+        job_node3 = JobNode(JOB_ID)
+        condition_node = ConditionStatusNode()
+        condition_node.put_at_least_one_success()
+        condition_node.add_success_node(job_node2)
+        condition_node.add_failure_node(job_node3)
+        job_node1.add_next_node(condition_node)
+        graph_pipeline = GraphPipeline()
+        graph_pipeline.add_root_node(job_node1)
+
+        graph_pipeline.to_pipeline_graph_input()
+
+        assert graph_pipeline.list_job_nodes == [
+            {"id": str(job_node1.uid), "nextNodes": [str(condition_node.uid)], "job": {"id": JOB_ID}},
+            {"id": str(job_node2.uid), "nextNodes": [], "job": {"id": JOB_ID}},
+            {"id": str(job_node3.uid), "nextNodes": [], "job": {"id": JOB_ID}},
+        ]
+        assert graph_pipeline.list_conditions_nodes == [
+            {
+                "id": str(condition_node.uid),
+                "nextNodesSuccess": [str(job_node2.uid)],
+                "nextNodesFailure": [str(job_node3.uid)],
+                "condition": {"status": {"value": "AtLeastOneSuccess"}},
+            }
+        ]
+
+    @staticmethod
+    def test_shared_nodes_are_serialized_once():
+        root_1, root_2, shared, last = JobNode(JOB_ID), JobNode(JOB_ID), JobNode(JOB_ID), JobNode(JOB_ID)
+        condition_node = ConditionExpressionNode()
+        condition_node.set_expression("1 + 1 == 2")
+        root_1.add_next_node(shared)
+        root_2.add_next_node(shared)
+        shared.add_next_node(condition_node)
+        condition_node.add_success_node(last)
+        condition_node.add_failure_node(last)
+        graph_pipeline = GraphPipeline()
+        graph_pipeline.add_root_node(root_1)
+        graph_pipeline.add_root_node(root_2)
+
+        graph_pipeline.to_pipeline_graph_input()
+        graph_pipeline.to_pipeline_graph_input()
+
+        assert [node["id"] for node in graph_pipeline.list_job_nodes] == [
+            str(node.uid) for node in (root_1, shared, last, root_2)
+        ]
+        assert len(graph_pipeline.list_conditions_nodes) == 1
+        assert graph_pipeline.list_conditions_nodes[0]["condition"] == {"custom": {"expression": "1 + 1 == 2"}}
+
+    @staticmethod
+    def test_long_chain():
+        nodes = [JobNode(JOB_ID) for _ in range(20000)]
+        for node, next_node in zip(nodes, nodes[1:]):
+            node.add_next_node(next_node)
+        graph_pipeline = GraphPipeline()
+        graph_pipeline.add_root_node(nodes[0])
+
+        graph_pipeline.to_pipeline_graph_input()
+
+        assert len(graph_pipeline.list_job_nodes) == 20000
+        assert graph_pipeline.list_job_nodes[-1] == {"id": nodes[-1].uid_str, "nextNodes": [], "job": {"id": JOB_ID}}
+
+    @staticmethod
+    def test_nodes_slots():
+        node = JobNode(JOB_ID)
+        node.uid = uuid.UUID("00000000-0000-0000-0000-000000000001")
+
+        assert node.uid_str == "00000000-0000-0000-0000-000000000001"
+        with pytest.raises(AttributeError):
+            node.other_attribute = 1
+
+
+class TestGraphAnalysis:
+    @staticmethod
+    def test_analyze_valid_graph():
+        root = JobNode("job_1")
+        condition_node = ConditionStatusNode()
+        condition_node.put_all_success()
+        branch_1, branch_2, last = JobNode("job_2"), JobNode("job_3"), JobNode("job_4")
+        root.add_next_node(condition_node)
+        condition_node.add_success_node(branch_1)
+        condition_node.add_success_node(branch_2)
+        condition_node.add_failure_node(last)
+        branch_1.add_next_node(last)
+        branch_2.add_next_node(last)
+        graph_pipeline = GraphPipeline()
+        graph_pipeline.add_root_node(root)
+
+        analysis = graph_pipeline.analyze(known_job_ids=["job_1", "job_2", "job_3", "job_4"])
+
+        assert analysis["valid"]
+        assert not analysis["errors"]
+        assert analysis["roots"] == [root.uid_str]
+        assert analysis["leaves"] == [last.uid_str]
+        assert analysis["topological_order"] == [
+            root.uid_str,
+            condition_node.uid_str,
+            branch_1.uid_str,
+            branch_2.uid_str,
+            last.uid_str,
+        ]
+        assert analysis["depth"][last.uid_str] == 3
+        assert analysis["max_depth"] == 4
+        assert analysis["max_width"] == 2
+
+    @staticmethod
+    def test_analyze_invalid_graph():
+        job_nodes = [
+            {"id": "a", "nextNodes": ["b"], "job": {"id": "job_1"}},
+            {"id": "b", "nextNodes": ["c", "missing"], "job": {"id": "job_2"}},
+            {"id": "c", "nextNodes": ["b"], "job": {"id": "unknown_job"}},
+            {"id": "d", "nextNodes": ["e"], "job": {"id": "job_1"}},
+            {"id": "e", "nextNodes": ["d"], "job": {"id": "job_1"}},
+            {"id": "a", "nextNodes": [], "job": {"id": "job_1"}},
+        ]
+        condition_nodes = [
+            {"id": "f", "nextNodesSuccess": [], "nextNodesFailure": [], "condition": {"status": {"value": ""}}},
+        ]
+
+        analysis = analyze_graph(job_nodes, condition_nodes, known_job_ids={"job_1", "job_2"})
+
+        assert not analysis["valid"]
+        assert analysis["duplicated_ids"] == ["a"]
+        assert analysis["dangling_references"] == [{"node": "b", "next": "missing"}]
+        assert set(analysis["cycle"]) in ({"b", "c"}, {"d", "e"})
+        assert analysis["unreachable_nodes"] == ["d", "e"]
+        assert analysis["conditions_without_branches"] == ["f"]
+        assert analysis["conditions_without_value"] == ["f"]
+        assert analysis["unknown_job_ids"] == ["unknown_job"]
+        assert analysis["topological_order"] == ["a", "f"]
+        assert len(analysis["errors"]) == 8
+
+    @staticmethod
+    def test_analyze_cycle_order():
+        job_nodes = [
+            {"id": "a", "nextNodes": ["b"], "job": {"id": "job"}},
+            {"id": "b", "nextNodes": ["c"], "job": {"id": "job"}},
+            {"id": "c", "nextNodes": ["d"], "job": {"id": "job"}},
+            {"id": "d", "nextNodes": ["b"], "job": {"id": "job"}},
+        ]
+
+        analysis = analyze_graph(job_nodes)
+
+        cycle = analysis["cycle"]
+        assert sorted(cycle) == ["b", "c", "d"]
+        for node_id, next_id in zip(cycle, cycle[1:] + cycle[:1]):
+            assert next_id in next(node["nextNodes"] for node in job_nodes if node["id"] == node_id)
+        assert not analysis["unreachable_nodes"]
+
+    @staticmethod
+    def test_analyze_unknown_node_type():
+        root = JobNode(JOB_ID)
+        root.add_next_node(ConditionNode())
+        graph_pipeline = GraphPipeline()
+        graph_pipeline.add_root_node(root)
+
+        analysis = graph_pipeline.analyze()
+
+        assert analysis["dangling_references"] == [{"node": root.uid_str, "next": root.next_nodes[0].uid_str}]
+
+    @staticmethod
+    def test_analyze_large_fan_out():
+        root, last = JobNode(JOB_ID), JobNode(JOB_ID)
+        for _ in range(10000):
+            node = JobNode(JOB_ID)
+            root.add_next_node(node)
+            node.add_next_node(last)
+        graph_pipeline = GraphPipeline()
+        graph_pipeline.add_root_node(root)
+
+        analysis = graph_pipeline.analyze()
+
+        assert analysis["valid"]
+        assert analysis["max_width"] == 10000
+        assert analysis["max_depth"] == 3
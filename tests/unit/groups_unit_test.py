@@ -0,0 +1,65 @@
+import json
+from unittest.mock import Mock, patch
+
+import pytest
+
+from saagieapi.groups import Groups
+
+
+def get_permission_mock(name, verify_ssl):
+    if name != "group_1":
+        raise ValueError("error")
+    return {"name": name, "realmAuthorization": {}}
+
+
+class TestGroups:
+    @pytest.fixture
+    def saagie_api_mock(self):
+        saagie_api_mock = Mock()
+        saagie_api_mock.url_saagie = "https://saagie-workspace.prod.saagie.io/"
+        saagie_api_mock.verify_ssl = True
+        return saagie_api_mock
+
+    def test_export(self, saagie_api_mock, tmp_path):
+        instance = Groups(saagie_api_mock)
+        groups = [{"name": "group_1", "protected": False}, {"name": "group_2", "protected": False}]
+
+        with patch.object(instance, "list", return_value=groups), patch.object(
+            instance, "get_users"
+        ) as get_users, patch.object(instance, "get_permission") as get_permission, patch(
+            "saagieapi.groups.groups.write_error"
+        ) as write_error:
+            get_users.side_effect = lambda name, verify_ssl: {"name": name, "users": ["user"], "protected": False}
+            get_permission.side_effect = get_permission_mock
+            result = instance.export(str(tmp_path), error_folder="errors", max_workers=2)
+
+        assert result is False
+        write_error.assert_called_once_with("errors", "groups", str(["group_2"]))
+        assert json.loads((tmp_path / "groups" / "perm_group_1.json").read_text(encoding="utf-8"))["name"] == "group_1"
+        # a group is written only when both its users and its permissions were fetched
+        assert not (tmp_path / "groups" / "user_group_2.json").exists()
+
+    def test_import_from_json(self, saagie_api_mock, tmp_path):
+        instance = Groups(saagie_api_mock)
+        groups = [
+            {"name": "administrators", "protected": True},
+            {"name": "existing", "protected": False},
+            {"name": "group_1", "protected": False},
+        ]
+        (tmp_path / "groups.json").write_text(json.dumps(groups), encoding="utf-8")
+        (tmp_path / "groups").mkdir()
+        (tmp_path / "groups" / "user_group_1.json").write_text('{"users": ["user_1"]}', encoding="utf-8")
+        (tmp_path / "groups" / "perm_group_1.json").write_text('{"realmAuthorization": {}}', encoding="utf-8")
+
+        with patch.object(instance, "list") as list_groups, patch.object(instance, "create") as create, patch.object(
+            instance, "edit_permission"
+        ) as edit_permission:
+            list_groups.return_value = [{"name": "administrators"}, {"name": "existing"}]
+            result = instance.import_from_json(tmp_path, max_workers=2)
+
+        assert result is True
+        create.assert_called_once_with(group_name="group_1", users=["user_1"], verify_ssl=True)
+        edit_permission.assert_called_once_with(
+            group_name="group_1", authorizations=[], realm_authorization={}, verify_ssl=True
+        )
+        saagie_api_mock.request_client.send.assert_not_called()
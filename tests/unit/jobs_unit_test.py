@@ -9,6 +9,7 @@ from gql import gql
 
 from saagieapi.jobs import Jobs
 from saagieapi.jobs.gql_queries import *
+from saagieapi.utils.artifact_cache import ArtifactHashCache, compute_file_hash
 
 from .saagie_api_unit_test import create_gql_client
 
@@ -25,6 +26,29 @@ class MockResponse:
         _ = chunk_size
         return self.json_data
 
+    @property
+    def headers(self):
+        return {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+class MockDownloadResponse(MockResponse):
+    def __init__(self, chunks, status_code, headers=None):
+        super().__init__(chunks, status_code)
+        self._headers = headers or {}
+
+    @property
+    def headers(self):
+        return self._headers
+
+    def close(self):
+        pass
+
 
 class TestJobs:
     @pytest.fixture
@@ -98,6 +122,51 @@ class TestJobs:
             query=expected_query, variable_values=params, pprint_result=None
         )
 
+    def test_get_job_instances_page_gql(self):
+        self.client.validate(gql(GQL_GET_JOB_INSTANCES_PAGE))
+
+    def test_iter_instances_fetches_pages_lazily(self, saagie_api_mock):
+        instance = Jobs(saagie_api_mock)
+        job_id = "860b8dc8-e634-4c98-b2e7-f9ec32ab4771"
+        pages = [
+            {"job": {"instances": [{"id": "i4", "status": "FAILED"}, {"id": "i3", "status": "SUCCEEDED"}]}},
+            {"job": {"instances": [{"id": "i2", "status": "SUCCEEDED"}, {"id": "i1", "status": "FAILED"}]}},
+            {"job": {"instances": []}},
+        ]
+        saagie_api_mock.client.execute.side_effect = pages
+
+        iterator = instance.iter_instances(job_id, page_size=2)
+        assert next(iterator)["id"] == "i4"
+        assert saagie_api_mock.client.execute.call_count == 1
+
+        assert [i["id"] for i in iterator] == ["i3", "i2", "i1"]
+        assert saagie_api_mock.client.execute.call_count == 3
+        saagie_api_mock.client.execute.assert_called_with(
+            query=gql(GQL_GET_JOB_INSTANCES_PAGE),
+            variable_values={"jobId": job_id, "limit": 2, "skip": 4},
+            pprint_result=False,
+        )
+
+    def test_iter_instances_since_and_status(self, saagie_api_mock):
+        instance = Jobs(saagie_api_mock)
+        saagie_api_mock.client.execute.return_value = {
+            "job": {
+                "instances": [
+                    {"id": "i4", "status": "FAILED", "startTime": "2022-04-20T10:00:00.000Z"},
+                    {"id": "i3", "status": "SUCCEEDED", "startTime": "2022-04-19T12:00:00.000Z"},
+                    {"id": "i2", "status": "KILLED", "startTime": "2022-04-19T08:00:00.000Z"},
+                    {"id": "i1", "status": "FAILED", "startTime": "2022-04-18T08:00:00.000Z"},
+                ]
+            }
+        }
+
+        instances = list(
+            instance.iter_instances("job_id", page_size=4, since="2022-04-19T00:00:00Z", status=["FAILED", "KILLED"])
+        )
+
+        assert [i["id"] for i in instances] == ["i4", "i2"]
+        assert saagie_api_mock.client.execute.call_count == 1
+
     def test_get_id_job_exists(self, saagie_api_mock):
         instance = Jobs(saagie_api_mock)
 
@@ -688,6 +757,124 @@ class TestJobs:
 
         assert job_result == return_value
 
+    @staticmethod
+    def _job_info_for_dedup(command_line="python {file} arg1 arg2"):
+        return {
+            "job": {
+                "id": "60f46dce-c869-40c3-a2e5-1d7765a806db",
+                "technology": {"id": "0db6d0a7-ad4b-45cd-8082-913a192daa25"},
+                "versions": [
+                    {
+                        "number": 3,
+                        "runtimeVersion": "3.10",
+                        "commandLine": command_line,
+                        "packageInfo": {
+                            "name": "test.py",
+                            "downloadUrl": "/projects/api/platform/6/job/60f46dce/version/3/artifact/test.py",
+                        },
+                        "dockerInfo": None,
+                        "extraTechnology": None,
+                        "sourceUrl": None,
+                    }
+                ],
+            }
+        }
+
+    def test_upgrade_job_skip_unchanged_with_cache(self, saagie_api_mock, tmp_path):
+        saagie_api_mock.get_runtimes.return_value = {"technology": {"contexts": [{"id": "3.10", "available": True}]}}
+        instance = Jobs(saagie_api_mock)
+        job_id = "60f46dce-c869-40c3-a2e5-1d7765a806db"
+        artifact = tmp_path / "test.py"
+        artifact.write_text("print('hello')", encoding="utf-8")
+        cache_file = tmp_path / "cache.json"
+        ArtifactHashCache(cache_file).set(job_id, 3, *compute_file_hash(artifact))
+
+        with patch.object(instance, "get_info") as get_info, patch.object(
+            instance, "_Jobs__launch_request"
+        ) as launch_request:
+            get_info.return_value = self._job_info_for_dedup()
+            job_result = instance.upgrade(
+                job_id=job_id, file=str(artifact), skip_if_unchanged=True, hash_cache=str(cache_file)
+            )
+
+        launch_request.assert_not_called()
+        saagie_api_mock.request_client.send.assert_not_called()
+        assert job_result == {"data": {"addJobVersion": {"number": 3}}, "upgradeSkipped": True}
+
+    def test_upgrade_job_skip_unchanged_reuse_artifact(self, saagie_api_mock, tmp_path):
+        saagie_api_mock.get_runtimes.return_value = {"technology": {"contexts": [{"id": "3.10", "available": True}]}}
+        instance = Jobs(saagie_api_mock)
+        job_id = "60f46dce-c869-40c3-a2e5-1d7765a806db"
+        artifact = tmp_path / "test.py"
+        artifact.write_text("print('hello')", encoding="utf-8")
+        cache_file = tmp_path / "cache.json"
+        ArtifactHashCache(cache_file).set(job_id, 3, *compute_file_hash(artifact))
+
+        return_value = {"data": {"addJobVersion": {"number": 4, "__typename": "JobVersion"}}}
+        with patch.object(instance, "get_info") as get_info, patch.object(
+            instance, "_Jobs__launch_request"
+        ) as launch_request:
+            get_info.return_value = self._job_info_for_dedup()
+            launch_request.return_value = return_value
+            job_result = instance.upgrade(
+                job_id=job_id,
+                file=str(artifact),
+                command_line="python {file} new_arg",
+                skip_if_unchanged=True,
+                hash_cache=str(cache_file),
+            )
+
+        file_sent, _, params_sent = launch_request.call_args.args
+        assert file_sent is None
+        assert params_sent["usePreviousArtifact"] is True
+        assert job_result["upgradeSkipped"] is False
+        # the reused artifact is cached for the new version, so the next upgrade does not download it
+        assert ArtifactHashCache(cache_file).get(job_id, 4)["sha256"] == compute_file_hash(artifact)[0]
+
+    def test_upgrade_job_skip_unchanged_changed_artifact(self, saagie_api_mock, tmp_path):
+        saagie_api_mock.get_runtimes.return_value = {"technology": {"contexts": [{"id": "3.10", "available": True}]}}
+        saagie_api_mock.url_saagie = "https://saagie-workspace.prod.saagie.io/"
+        saagie_api_mock.request_client.send.return_value = MockResponse([b"print('old')"], 200)
+        instance = Jobs(saagie_api_mock)
+        job_id = "60f46dce-c869-40c3-a2e5-1d7765a806db"
+        artifact = tmp_path / "test.py"
+        artifact.write_text("print('new')", encoding="utf-8")
+        cache_file = tmp_path / "cache.json"
+
+        return_value = {"data": {"addJobVersion": {"number": 4, "__typename": "JobVersion"}}}
+        with patch.object(instance, "get_info") as get_info, patch.object(
+            instance, "_Jobs__launch_request"
+        ) as launch_request:
+            get_info.return_value = self._job_info_for_dedup()
+            launch_request.return_value = return_value
+            job_result = instance.upgrade(
+                job_id=job_id, file=str(artifact), skip_if_unchanged=True, hash_cache=str(cache_file)
+            )
+
+        file_sent, _, _ = launch_request.call_args.args
+        assert file_sent == str(artifact)
+        assert job_result["upgradeSkipped"] is False
+        assert ArtifactHashCache(cache_file).get(job_id, 4)["sha256"] == compute_file_hash(artifact)[0]
+
+    def test_upgrade_job_skip_unchanged_remote_identical(self, saagie_api_mock, tmp_path):
+        saagie_api_mock.get_runtimes.return_value = {"technology": {"contexts": [{"id": "3.10", "available": True}]}}
+        saagie_api_mock.url_saagie = "https://saagie-workspace.prod.saagie.io/"
+        saagie_api_mock.request_client.send.return_value = MockResponse([b"print(", b"'hello')"], 200)
+        instance = Jobs(saagie_api_mock)
+        artifact = tmp_path / "test.py"
+        artifact.write_text("print('hello')", encoding="utf-8")
+
+        with patch.object(instance, "get_info") as get_info, patch.object(
+            instance, "_Jobs__launch_request"
+        ) as launch_request:
+            get_info.return_value = self._job_info_for_dedup()
+            job_result = instance.upgrade(
+                job_id="60f46dce-c869-40c3-a2e5-1d7765a806db", file=str(artifact), skip_if_unchanged=True
+            )
+
+        launch_request.assert_not_called()
+        assert job_result["upgradeSkipped"] is True
+
     def test_upgrade_by_name(self, saagie_api_mock):
         instance = Jobs(saagie_api_mock)
 
@@ -771,6 +958,156 @@ class TestJobs:
 
         assert job_result == return_value
 
+    @staticmethod
+    def _jobs_for_plan():
+        return {
+            "jobs": [
+                {
+                    "id": "job-1",
+                    "name": "job1",
+                    "description": "desc",
+                    "alerting": {"emails": ["a@saagie.io"], "loginEmails": [], "statusList": ["FAILED"]},
+                    "isScheduled": True,
+                    "cronScheduling": "0 0 * * *",
+                    "scheduleTimezone": "UTC",
+                    "resources": {"cpu": {"request": 0.5, "limit": 1.0}, "memory": {"request": 1.0, "limit": None}},
+                    "versions": [
+                        {
+                            "number": 2,
+                            "runtimeVersion": "3.10",
+                            "commandLine": "python {file}",
+                            "packageInfo": {"name": "test.py", "downloadUrl": "/artifact/test.py"},
+                            "dockerInfo": None,
+                            "extraTechnology": None,
+                            "sourceUrl": None,
+                        }
+                    ],
+                }
+            ]
+        }
+
+    def test_plan_jobs(self, saagie_api_mock, tmp_path):
+        instance = Jobs(saagie_api_mock)
+        artifact = tmp_path / "test.py"
+        artifact.write_text("print('hello')", encoding="utf-8")
+        cache_file = tmp_path / "cache.json"
+        ArtifactHashCache(cache_file).set("job-1", 2, *compute_file_hash(artifact))
+
+        specs = [
+            {
+                "job_name": "job1",
+                "file": str(artifact),
+                "description": "desc",
+                "cron_scheduling": "0 0 * * *",
+                "resources": {"cpu": {"request": 0.5, "limit": 1.0}, "memory": {"request": 1.0}},
+                "emails": ["a@saagie.io"],
+                "command_line": "python {file}",
+            },
+            {"job_name": "job2", "file": str(artifact)},
+        ]
+
+        with patch.object(instance, "list_for_project") as list_for_project:
+            list_for_project.return_value = self._jobs_for_plan()
+            plan = instance.plan(specs, "project_id", hash_cache=str(cache_file))
+            list_for_project.assert_called_once()
+
+        assert plan[0]["action"] == "unchanged"
+        assert plan[0]["mutations"] == []
+        assert plan[0]["artifact"] == "unchanged"
+        assert plan[1]["action"] == "create"
+        assert plan[1]["mutations"] == ["createJob"]
+
+    def test_plan_jobs_changes(self, saagie_api_mock):
+        instance = Jobs(saagie_api_mock)
+        specs = {"job_name": "job1", "command_line": "python {file} arg", "is_scheduled": False, "emails": []}
+
+        with patch.object(instance, "list_for_project") as list_for_project:
+            list_for_project.return_value = self._jobs_for_plan()
+            plan = instance.plan(specs, "project_id")
+
+        assert plan[0]["action"] == "update"
+        assert plan[0]["mutations"] == ["addJobVersion", "editJob"]
+        assert set(plan[0]["changes"]) == {"commandLine", "schedule", "alerting"}
+
+    def test_plan_jobs_duplicated_names(self, saagie_api_mock):
+        instance = Jobs(saagie_api_mock)
+        with pytest.raises(ValueError):
+            instance.plan([{"job_name": "job1"}, {"job_name": "job1"}], "project_id")
+
+    def test_apply_jobs(self, saagie_api_mock):
+        instance = Jobs(saagie_api_mock)
+        specs = [
+            {"job_name": "job1", "description": "new desc"},
+            {"job_name": "job2", "category": "Extraction"},
+        ]
+        saagie_api_mock.client.execute.return_value = {"editJob": {"id": "job-1"}}
+
+        with patch.object(instance, "list_for_project") as list_for_project, patch.object(
+            instance, "create"
+        ) as create, patch.object(instance, "_Jobs__launch_request") as launch_request:
+            list_for_project.return_value = self._jobs_for_plan()
+            create.return_value = {"data": {"createJob": {"id": "job-2", "versions": [{"number": 1}]}}}
+            result = instance.apply(specs, "project_id")
+            list_for_project.assert_called_once()
+
+        launch_request.assert_not_called()
+        create.assert_called_once_with(project_id="project_id", job_name="job2", category="Extraction")
+        edit_params = saagie_api_mock.client.execute.call_args.kwargs["variable_values"]
+        assert edit_params["description"] == "new desc"
+        assert edit_params["cronScheduling"] == "0 0 * * *"
+        assert edit_params["alerting"] == {"emails": ["a@saagie.io"], "statusList": ["FAILED"]}
+        assert result[0]["result"] == {"editJob": {"id": "job-1"}}
+        assert result[1]["result"] == {"createJob": {"id": "job-2", "versions": [{"number": 1}]}}
+
+    def test_apply_jobs_create_schedule_and_cache(self, saagie_api_mock, tmp_path):
+        instance = Jobs(saagie_api_mock)
+        artifact = tmp_path / "test.py"
+        artifact.write_text("print('hello')", encoding="utf-8")
+        cache_file = tmp_path / "cache.json"
+        specs = [
+            {"job_name": "job2", "file": str(artifact), "cron_scheduling": "0 0 * * *", "is_scheduled": False},
+            {"job_name": "job3", "cron_scheduling": "0 1 * * *"},
+        ]
+
+        with patch.object(instance, "list_for_project") as list_for_project, patch.object(
+            instance, "create"
+        ) as create, patch("saagieapi.jobs.jobs.compute_file_hash", wraps=compute_file_hash) as file_hash:
+            list_for_project.return_value = self._jobs_for_plan()
+            create.return_value = {"data": {"createJob": {"id": "job-2", "versions": [{"number": 1}]}}}
+            result = instance.apply(specs, "project_id", hash_cache=str(cache_file))
+
+        assert create.call_args_list[0].kwargs == {
+            "project_id": "project_id",
+            "job_name": "job2",
+            "file": str(artifact),
+        }
+        assert create.call_args_list[1].kwargs == {
+            "project_id": "project_id",
+            "job_name": "job3",
+            "cron_scheduling": "0 1 * * *",
+            "schedule_timezone": "UTC",
+        }
+        file_hash.assert_called_once_with(str(artifact))
+        assert result[0]["artifact_hash"] == dict(zip(("sha256", "size"), compute_file_hash(artifact)))
+        assert ArtifactHashCache(cache_file).get("job-2", 1)["sha256"] == result[0]["artifact_hash"]["sha256"]
+
+    def test_apply_jobs_upgrade_without_upload(self, saagie_api_mock):
+        instance = Jobs(saagie_api_mock)
+
+        with patch.object(instance, "list_for_project") as list_for_project, patch.object(
+            instance, "_Jobs__launch_request"
+        ) as launch_request:
+            list_for_project.return_value = self._jobs_for_plan()
+            launch_request.return_value = {"data": {"addJobVersion": {"number": 3}}}
+            result = instance.apply({"job_name": "job1", "runtime_version": "3.9"}, "project_id")
+
+        file_sent, _, params_sent = launch_request.call_args.args
+        assert file_sent is None
+        assert params_sent["usePreviousArtifact"] is True
+        assert params_sent["runtimeVersion"] == "3.9"
+        saagie_api_mock.client.execute.assert_not_called()
+        assert result[0]["result"] == {"addJobVersion": {"number": 3}}
+
     def test_rollback_job_gql(self):
         self.client.validate(gql(GQL_ROLLBACK_JOB_VERSION))
 
@@ -1120,6 +1457,68 @@ class TestJobs:
 
         assert job_result is True
 
+    @staticmethod
+    def _job_info_for_download(job_id, numbers):
+        return {
+            "job": {
+                "id": job_id,
+                "versions": [
+                    {"number": number, "packageInfo": {"name": "test.py", "downloadUrl": f"/{job_id}/{number}/test.py"}}
+                    for number in numbers
+                ],
+            }
+        }
+
+    def test_download_versions(self, saagie_api_mock, tmp_path):
+        saagie_api_mock.url_saagie = "https://saagie-workspace.prod.saagie.io/"
+        instance = Jobs(saagie_api_mock)
+
+        def get_info(job_id, **kwargs):
+            _ = kwargs
+            return self._job_info_for_download(job_id, [1, 2])
+
+        with patch.object(instance, "get_info", side_effect=get_info), patch("requests.get") as mock_get:
+            mock_get.side_effect = lambda url, **kwargs: MockDownloadResponse(
+                [b"print(", b"'hello')"], 200, {"Content-Length": "14"}
+            )
+            result = instance.download_versions(["job-1", "job-2"], tmp_path, max_workers=4)
+
+        assert result == {"job-1": True, "job-2": True}
+        assert mock_get.call_count == 4
+        for job_id in ("job-1", "job-2"):
+            for number in (1, 2):
+                assert (tmp_path / job_id / "version" / str(number) / "test.py").read_bytes() == b"print('hello')"
+
+    def test_download_versions_size_mismatch(self, saagie_api_mock, tmp_path):
+        saagie_api_mock.url_saagie = "https://saagie-workspace.prod.saagie.io/"
+        instance = Jobs(saagie_api_mock)
+
+        with patch.object(instance, "get_info") as get_info, patch("requests.get") as mock_get:
+            get_info.return_value = self._job_info_for_download("job-1", [1])
+            mock_get.return_value = MockDownloadResponse([b"print("], 200, {"Content-Length": "14"})
+            result = instance.download_versions(["job-1"], tmp_path, error_folder=str(tmp_path / "error"))
+
+        assert result == {"job-1": False}
+        assert not (tmp_path / "job-1" / "version" / "1" / "test.py").exists()
+        assert (tmp_path / "error" / "jobs" / "jobs_error.txt").exists()
+
+    def test_download_versions_resume(self, saagie_api_mock, tmp_path):
+        saagie_api_mock.url_saagie = "https://saagie-workspace.prod.saagie.io/"
+        instance = Jobs(saagie_api_mock)
+        version_folder = tmp_path / "job-1" / "version" / "1"
+        version_folder.mkdir(parents=True)
+        (version_folder / "test.py.part").write_bytes(b"print(")
+
+        with patch.object(instance, "get_info") as get_info, patch("requests.get") as mock_get:
+            get_info.return_value = self._job_info_for_download("job-1", [1])
+            mock_get.return_value = MockDownloadResponse([b"'hello')"], 206, {"Content-Range": "bytes 6-13/14"})
+            result = instance.download_versions(["job-1"], tmp_path)
+
+        assert result == {"job-1": True}
+        assert mock_get.call_args.kwargs["headers"] == {"Range": "bytes=6-"}
+        assert (version_folder / "test.py").read_bytes() == b"print('hello')"
+        assert not (version_folder / "test.py.part").exists()
+
     def test_import_from_json_succes_without_version_package(self, saagie_api_mock, tmp_path):
         instance = Jobs(saagie_api_mock)
 
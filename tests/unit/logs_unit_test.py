@@ -0,0 +1,182 @@
+import json
+from unittest.mock import Mock, patch
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from saagieapi.logs import LogReader, LogStore
+from saagieapi.utils.concurrency import iter_concurrently
+
+
+class FakeLogProxy:
+    """Serve the log lines of one instance like the log-proxy, lines being appendable between requests"""
+
+    def __init__(self, count):
+        self.lines = [{"index": index, "stream": "STDOUT", "value": f"line {index}"} for index in range(count)]
+        self.urls = []
+
+    def append(self, count):
+        start = len(self.lines)
+        self.lines += [
+            {"index": index, "stream": "STDERR", "value": f"line {index}"} for index in range(start, start + count)
+        ]
+
+    def send(self, method, url, raise_for_status):
+        assert method == "GET" and raise_for_status
+        self.urls.append(url)
+        query = parse_qs(urlparse(url).query)
+        skip, limit = int(query["skip"][0]), int(query["limit"][0])
+        response = Mock()
+        response.json.return_value = {"logs": self.lines[skip : skip + limit], "limit": limit, "total": len(self.lines)}
+        return response
+
+
+class TestLogReader:
+    def setup_method(self):
+        self.proxy = FakeLogProxy(25)
+        self.saagie_api = Mock(url_saagie="https://saagie-workspace.prod.saagie.io/", realm="saagie", platform="1")
+        self.saagie_api.request_client.send = self.proxy.send
+
+    def test_iter_lines(self):
+        reader = LogReader(self.saagie_api, page_size=10, max_workers=3)
+
+        lines = list(reader.iter_lines("job_instance", "project_id", "instance_id", streams=["STDOUT"], skip=3))
+
+        assert [line["index"] for line in lines] == list(range(3, 25))
+        assert self.proxy.urls[0] == (
+            "https://saagie-workspace.prod.saagie.io/log-proxy/api/logs/saagie/platform/1/project/project_id"
+            "/job_instance/instance_id?limit=1&skip=0&streams=STDOUT"
+        )
+        assert len(self.proxy.urls) == 4
+
+    def test_iter_lines_follow(self):
+        reader = LogReader(self.saagie_api, page_size=10)
+        finished = iter([False, False, True, True])
+
+        def sleep(_):
+            if len(self.proxy.lines) == 25:
+                self.proxy.append(12)
+
+        with patch("time.sleep", side_effect=sleep) as time_sleep:
+            lines = list(
+                reader.iter_lines(
+                    "app_execution", "project_id", "instance_id", follow=True, stop_when=lambda: next(finished)
+                )
+            )
+
+        assert [line["index"] for line in lines] == list(range(37))
+        assert time_sleep.call_count == 2
+
+    def test_iter_lines_follow_timeout(self):
+        reader = LogReader(self.saagie_api, page_size=10)
+
+        with patch("time.sleep") as time_sleep:
+            lines = list(reader.iter_lines("app_execution", "project_id", "instance_id", follow=True, timeout=10))
+
+        assert len(lines) == 25
+        assert time_sleep.call_count == 2
+
+    def test_write_to_file(self, tmp_path):
+        reader = LogReader(self.saagie_api, page_size=7, max_workers=2)
+
+        assert reader.write_to_file("condition_instance", "project_id", "instance_id", tmp_path / "logs.txt") == 25
+        assert (
+            reader.write_to_file(
+                "condition_instance", "project_id", "instance_id", tmp_path / "logs.jsonl", with_metadata=True
+            )
+            == 25
+        )
+
+        assert (tmp_path / "logs.txt").read_text(encoding="utf-8").splitlines()[24] == "line 24"
+        assert json.loads((tmp_path / "logs.jsonl").read_text(encoding="utf-8").splitlines()[0])["stream"] == "STDOUT"
+
+    def test_invalid_parameters(self):
+        with pytest.raises(ValueError):
+            LogReader(self.saagie_api, page_size=0)
+        with pytest.raises(ValueError):
+            LogReader(self.saagie_api).count("pipeline_instance", "project_id", "instance_id")
+
+
+def test_iter_concurrently():
+    assert list(iter_concurrently(lambda item: item * 2, iter(range(10)), max_workers=3)) == list(range(0, 20, 2))
+    assert list(iter_concurrently(str, [1, 2], max_workers=1)) == ["1", "2"]
+    with pytest.raises(ZeroDivisionError):
+        list(iter_concurrently(lambda item: 1 / item, [1, 0, 2], max_workers=2))
+
+
+STORE_BACKENDS = [True, False]
+
+
+class TestLogStore:
+    @staticmethod
+    def lines(values, stream="STDOUT", start=0):
+        return [
+            {
+                "index": start + index,
+                "stream": stream,
+                "time": f"2024-04-0{start + index + 1}T10:00:00.123456789Z",
+                "value": value,
+            }
+            for index, value in enumerate(values)
+        ]
+
+    @pytest.mark.parametrize("use_fts", STORE_BACKENDS)
+    def test_search(self, use_fts):
+        store = LogStore(use_fts=use_fts)
+        store.add_lines("job_instance", "project_1", "instance_1", self.lines(["starting job", "java heap error"]))
+        store.add_lines("app_execution", "project_2", "instance_2", self.lines(["heap dump"], stream="STDERR"))
+
+        assert len(store) == 3
+        assert [line["value"] for line in store.search("heap")] == ["heap dump", "java heap error"]
+        assert [line["instance_id"] for line in store.search("heap", stream="STDERR")] == ["instance_2"]
+        assert not store.search("heap", since="2024-04-03T00:00:00Z")
+        assert not store.search("heap", project_id="project_3")
+        result = store.search("heap", instance_id="instance_1")[0]
+        assert result == {
+            "project_id": "project_1",
+            "entity_type": "job_instance",
+            "entity_id": None,
+            "instance_id": "instance_1",
+            "line_index": 1,
+            "stream": "STDOUT",
+            "time": "2024-04-02T10:00:00.123456+00:00",
+            "value": "java heap error",
+        }
+
+    def test_add_lines_twice(self):
+        store = LogStore()
+        lines = self.lines(["a", "b"])
+
+        assert store.add_lines("job_instance", "project_1", "instance_1", lines) == 2
+        assert store.add_lines("job_instance", "project_1", "instance_1", lines) == 0
+        with pytest.raises(ValueError):
+            store.add_lines("pipeline_instance", "project_1", "instance_1", lines)
+
+    def test_ingest_incremental(self):
+        proxy = FakeLogProxy(5)
+        saagie_api = Mock(url_saagie="https://saagie/", realm="saagie", platform="1")
+        saagie_api.request_client.send = proxy.send
+        reader = LogReader(saagie_api, page_size=2)
+        store = LogStore()
+
+        assert store.ingest(reader, "job_instance", "project_1", "instance_1", entity_id="job_1", batch_size=2) == 5
+        proxy.append(3)
+        proxy.urls.clear()
+        assert store.ingest(reader, "job_instance", "project_1", "instance_1") == 3
+
+        assert "skip=5" in proxy.urls[1]
+        assert len(store) == 8
+        assert store.search("line", stream="STDERR")[0]["line_index"] == 5
+
+    @pytest.mark.parametrize("use_fts", STORE_BACKENDS)
+    def test_purge(self, use_fts):
+        store = LogStore(use_fts=use_fts)
+        store.add_lines("job_instance", "project_1", "instance_1", self.lines(["old error", "new error", "other"]))
+        store.add_lines("job_instance", "project_1", "instance_2", self.lines(["recent error"]))
+
+        assert store.purge(before="2024-04-02T00:00:00Z") == 2
+        assert [line["value"] for line in store.search("error")] == ["new error"]
+        assert store.purge(instance_id="instance_1") == 2
+        assert store.purge(older_than_days=1) == 0
+        assert len(store) == 0
+        assert not store.search("error")
@@ -0,0 +1,163 @@
+from unittest.mock import Mock
+
+import pytest
+from gql import gql
+
+from saagieapi.mirror import InventoryMirror
+from saagieapi.mirror.gql_queries import *
+from saagieapi.mirror.inventory_mirror import build_details_query
+
+from .saagie_api_unit_test import create_gql_client
+
+
+def _summary(job_version=1, with_job2=True):
+    jobs = [
+        {
+            "id": "j1",
+            "name": "daily ingestion",
+            "alias": "daily_ingestion",
+            "category": "Extraction",
+            "creationDate": "2024-01-01T00:00:00Z",
+            "isScheduled": True,
+            "cronScheduling": "0 2 * * *",
+            "scheduleTimezone": "UTC",
+            "scheduleStatus": "OK",
+            "isStreaming": False,
+            "technology": {"id": "python"},
+            "versions": [{"number": job_version, "creationDate": f"2024-01-0{job_version}T00:00:00Z"}],
+        }
+    ]
+    if with_job2:
+        jobs.append(
+            {
+                "id": "j2",
+                "name": "report_100%",
+                "alias": None,
+                "isScheduled": False,
+                "technology": {"id": "r"},
+                "versions": [{"number": 1, "creationDate": "2024-01-01T00:00:00Z"}],
+            }
+        )
+    return {
+        "jobs": jobs,
+        "project": {
+            "pipelines": [
+                {
+                    "id": "p1",
+                    "name": "nightly",
+                    "isScheduled": True,
+                    "cronScheduling": "0 1 * * *",
+                    "versions": [{"number": 1, "creationDate": "2024-01-01T00:00:00Z"}],
+                }
+            ],
+            "apps": [{"id": "a1", "name": "notebook", "currentVersion": {"number": 1, "creationDate": "2024-01-01"}}],
+        },
+    }
+
+
+def _details(variables):
+    details = {
+        "j1": {"id": "j1", "versions": [{"number": 2, "runtimeVersion": "3.10", "commandLine": "python main.py"}]},
+        "j2": {"id": "j2", "versions": [{"number": 1, "runtimeVersion": "4.0", "commandLine": "Rscript main.R"}]},
+        "p1": {"id": "p1", "versions": [{"number": 1, "graph": {"jobNodes": [{"job": {"id": "j1"}}]}}]},
+        "a1": {
+            "id": "a1",
+            "currentVersion": {"number": 1, "runtimeContextId": "v1", "dockerInfo": {"image": "jupyter"}},
+        },
+    }
+    return {f"entity{index}": details.get(variables[f"id{index}"]) for index in range(len(variables))}
+
+
+class TestInventoryMirror:
+    @pytest.fixture
+    def saagie_api_mock(self):
+        saagie_api_mock = Mock()
+        saagie_api_mock.projects.list.return_value = {"projects": [{"id": "project", "name": "Project A"}]}
+        saagie_api_mock.summary = _summary()
+
+        def execute(variable_values, **_):
+            if "projectId" in variable_values:
+                return saagie_api_mock.summary
+            return _details(variable_values)
+
+        saagie_api_mock.client.execute.side_effect = execute
+        saagie_api_mock.env_vars.list.return_value = [
+            {"name": "HOST", "scope": "GLOBAL", "value": "db", "isPassword": False}
+        ]
+        saagie_api_mock.env_vars.list_by_entity.side_effect = lambda scope, ids, _: {
+            entity_id: [{"name": "HOST", "scope": scope, "value": entity_id, "isPassword": False}] for entity_id in ids
+        }
+        return saagie_api_mock
+
+    def test_mirror_gql(self):
+        client = create_gql_client()
+        client.validate(gql(GQL_MIRROR_PROJECT_SUMMARY))
+        for kind in ("jobs", "pipelines", "apps"):
+            client.validate(gql(build_details_query(kind, 2)))
+
+    def test_refresh(self, saagie_api_mock):
+        mirror = InventoryMirror()
+
+        report = mirror.refresh(saagie_api_mock, max_workers=2)
+
+        assert report == {
+            "projects": 1,
+            "fetched": {"jobs": 2, "pipelines": 1, "apps": 1},
+            "unchanged": {"jobs": 0, "pipelines": 0, "apps": 0},
+            "removed": {"projects": 0, "jobs": 0, "pipelines": 0, "apps": 0},
+            "env_vars": 4,
+            "errors": {},
+        }
+        assert [job["id"] for job in mirror.search_jobs("INGEST")] == ["j1"]
+        assert [job["id"] for job in mirror.search_jobs("100%")] == ["j2"]
+        assert mirror.search_jobs("_100")[0]["project_name"] == "Project A"
+        assert mirror.search_jobs("1%") == []
+        assert [job["id"] for job in mirror.jobs_by_technology("python", "3.10")] == ["j1"]
+        assert [(row["entity_type"], row["id"]) for row in mirror.cron_schedules()] == [
+            ("jobs", "j1"),
+            ("pipelines", "p1"),
+        ]
+        assert [pipeline["id"] for pipeline in mirror.pipelines_for_job("j1")] == ["p1"]
+        assert mirror.query("SELECT docker_image FROM apps") == [{"docker_image": "jupyter"}]
+        assert [row["entity_type"] for row in mirror.find_env_vars("HOST", "p1")] == ["pipelines"]
+
+    def test_refresh_incremental(self, saagie_api_mock):
+        mirror = InventoryMirror()
+        mirror.refresh(saagie_api_mock)
+        saagie_api_mock.client.execute.reset_mock()
+
+        report = mirror.refresh(saagie_api_mock, env_vars=False)
+
+        assert report["fetched"] == {"jobs": 0, "pipelines": 0, "apps": 0}
+        assert report["unchanged"] == {"jobs": 2, "pipelines": 1, "apps": 1}
+        assert saagie_api_mock.client.execute.call_count == 1
+
+        saagie_api_mock.summary = _summary(job_version=2, with_job2=False)
+        report = mirror.refresh(saagie_api_mock, env_vars=False)
+
+        assert report["fetched"] == {"jobs": 1, "pipelines": 0, "apps": 0}
+        assert report["removed"]["jobs"] == 1
+        assert mirror.query("SELECT id, version_number FROM jobs") == [{"id": "j1", "version_number": 2}]
+
+    def test_refresh_removed_project(self, saagie_api_mock, tmp_path):
+        path = tmp_path / "inventory.db"
+        mirror = InventoryMirror(path)
+        mirror.refresh(saagie_api_mock)
+        mirror.close()
+        saagie_api_mock.projects.list.return_value = {"projects": []}
+
+        mirror = InventoryMirror(path)
+        report = mirror.refresh(saagie_api_mock)
+
+        assert report["removed"]["projects"] == 1
+        assert mirror.query("SELECT COUNT(*) AS count FROM jobs") == [{"count": 0}]
+        assert mirror.query("SELECT entity_type FROM env_vars") == [{"entity_type": "global"}]
+
+    def test_refresh_errors(self, saagie_api_mock):
+        mirror = InventoryMirror()
+        saagie_api_mock.client.execute.side_effect = RuntimeError("Forbidden")
+
+        report = mirror.refresh(saagie_api_mock, project_ids=["project"], env_vars=False)
+
+        assert report["projects"] == 0
+        assert report["errors"] == {"project": "Forbidden"}
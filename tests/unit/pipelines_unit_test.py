@@ -9,6 +9,7 @@ from gql import gql
 from saagieapi.pipelines import Pipelines
 from saagieapi.pipelines.gql_queries import *
 from saagieapi.pipelines.graph_pipeline import ConditionStatusNode, GraphPipeline, JobNode
+from saagieapi.pipelines.pipelines import build_progress_query
 
 from .saagie_api_unit_test import create_gql_client
 
@@ -231,6 +232,33 @@ class TestPipelines:
             query=expected_query, variable_values={"id": pipeline_instance_id}, pprint_result=None
         )
 
+    def test_get_pipeline_instances_page_gql(self):
+        query = gql(GQL_GET_PIPELINE_INSTANCES_PAGE)
+        self.client.validate(query)
+
+    def test_iter_instances(self, saagie_api_mock):
+        pipeline = Pipelines(saagie_api_mock)
+        pipeline_id = "860b8dc8-e634-4c98-b2e7-f9ec32ab4771"
+        saagie_api_mock.client.execute.side_effect = [
+            {"graphPipeline": {"instances": [{"id": "i3", "status": "FAILED"}, {"id": "i2", "status": "SUCCEEDED"}]}},
+            {"graphPipeline": {"instances": [{"id": "i1", "status": "FAILED"}]}},
+        ]
+
+        instances = list(pipeline.iter_instances(pipeline_id, page_size=2, status="FAILED"))
+
+        assert [i["id"] for i in instances] == ["i3", "i1"]
+        saagie_api_mock.client.execute.assert_called_with(
+            query=gql(GQL_GET_PIPELINE_INSTANCES_PAGE),
+            variable_values={"id": pipeline_id, "limit": 2, "skip": 2},
+            pprint_result=False,
+        )
+
+    def test_iter_instances_unknown_pipeline(self, saagie_api_mock):
+        pipeline = Pipelines(saagie_api_mock)
+        saagie_api_mock.client.execute.return_value = {"graphPipeline": None}
+
+        assert not list(pipeline.iter_instances("pipeline_id"))
+
     def test_create_graph_pipeline_gql(self):
         query = gql(GQL_CREATE_GRAPH_PIPELINE)
         self.client.validate(query)
@@ -283,6 +311,110 @@ class TestPipelines:
 
         saagie_api_mock.client.execute.assert_called_with(query=expected_query, variable_values=params)
 
+    def test_validate_graph(self, saagie_api_mock):
+        pipeline = Pipelines(saagie_api_mock)
+        saagie_api_mock.jobs.list_for_project_minimal.return_value = {"jobs": [{"id": "job_1", "name": "job 1"}]}
+        job_node1 = JobNode("job_1")
+        job_node2 = JobNode("job_2")
+        job_node1.add_next_node(job_node2)
+        graph_pipeline = GraphPipeline()
+        graph_pipeline.add_root_node(job_node1)
+
+        analysis = pipeline.validate_graph(graph_pipeline, project_id="project_id")
+
+        assert not analysis["valid"]
+        assert analysis["unknown_job_ids"] == ["job_2"]
+        saagie_api_mock.jobs.list_for_project_minimal.assert_called_once_with("project_id")
+
+    @staticmethod
+    def pipeline_with_graph(pipeline_id, job_ids):
+        job_nodes = [
+            {
+                "id": f"node_{job_id}",
+                "job": {"id": job_id, "name": job_id},
+                "nextNodes": [f"node_{next_id}"] if next_id else [],
+            }
+            for job_id, next_id in zip(job_ids, job_ids[1:] + [None])
+        ]
+        return {
+            "id": pipeline_id,
+            "name": pipeline_id,
+            "versions": [{"isCurrent": True, "graph": {"jobNodes": job_nodes, "conditionNodes": []}}],
+        }
+
+    @staticmethod
+    def job_with_duration(job_id, seconds):
+        return {
+            "id": job_id,
+            "instances": [
+                {"status": "SUCCEEDED", "startTime": "2022-04-19T10:00:00Z", "endTime": f"2022-04-19T10:00:{seconds}Z"}
+            ],
+        }
+
+    def test_critical_path(self, saagie_api_mock):
+        pipeline = Pipelines(saagie_api_mock)
+        saagie_api_mock.jobs.get_info.side_effect = lambda job_id, **kwargs: {
+            "job": self.job_with_duration(job_id, {"job_1": 10, "job_2": 20}[job_id])
+        }
+        with patch.object(pipeline, "get_info") as get_info:
+            get_info.return_value = {"graphPipeline": self.pipeline_with_graph("pipeline_1", ["job_1", "job_2"])}
+
+            result = pipeline.critical_path("pipeline_1", instances_limit=10)
+
+        assert result["pipeline_name"] == "pipeline_1"
+        assert result["makespan"] == pytest.approx(30)
+        assert [node["job_id"] for node in result["critical_path"]] == ["job_1", "job_2"]
+        saagie_api_mock.jobs.get_info.assert_called_with(
+            "job_2", instances_limit=10, versions_only_current=True, pprint_result=False
+        )
+
+    def test_critical_path_report(self, saagie_api_mock):
+        pipeline = Pipelines(saagie_api_mock)
+        saagie_api_mock.jobs.list_for_project.return_value = {
+            "jobs": [self.job_with_duration("job_1", 10), self.job_with_duration("job_2", 20)]
+        }
+        invalid = self.pipeline_with_graph("pipeline_3", ["job_1"])
+        invalid["versions"][0]["graph"]["jobNodes"][0]["nextNodes"] = ["node_unknown"]
+        with patch.object(pipeline, "list_for_project") as list_for_project:
+            list_for_project.return_value = {
+                "project": {
+                    "pipelines": [
+                        self.pipeline_with_graph("pipeline_1", ["job_1"]),
+                        self.pipeline_with_graph("pipeline_2", ["job_1", "job_2"]),
+                        invalid,
+                    ]
+                }
+            }
+
+            report = pipeline.critical_path_report("project_id")
+
+        assert [row["pipeline_id"] for row in report] == ["pipeline_2", "pipeline_1", "pipeline_3"]
+        assert report[0]["critical_path"] == ["job_1", "job_2"]
+        assert report[0]["speed_up_candidates"][0] == {
+            "job_id": "job_2",
+            "job_name": "job_2",
+            "gain": pytest.approx(20),
+        }
+        assert "error" in report[2]
+        saagie_api_mock.jobs.list_for_project.assert_called_once_with(
+            "project_id", instances_limit=100, versions_only_current=True, pprint_result=False
+        )
+
+    def test_create_graph_pipeline_invalid(self, saagie_api_mock):
+        pipeline = Pipelines(saagie_api_mock)
+        saagie_api_mock.jobs.list_for_project_minimal.return_value = {"jobs": [{"id": "job_1", "name": "job 1"}]}
+        condition_status_node = ConditionStatusNode()
+        job_node1 = JobNode("job_1")
+        job_node1.add_next_node(condition_status_node)
+        graph_pipeline = GraphPipeline()
+        graph_pipeline.add_root_node(job_node1)
+
+        with pytest.raises(ValueError):
+            pipeline.create_graph(
+                project_id="project_id", graph_pipeline=graph_pipeline, name="name", alias="alias", validate=True
+            )
+        saagie_api_mock.client.execute.assert_not_called()
+
     def test_create_graph_pipeline_with_scheduling_and_alerting(self, saagie_api_mock):
         project_id = "860b8dc8-e634-4c98-b2e7-f9ec32ab4771"
         name = "Amazing Pipeline"
@@ -883,6 +1015,112 @@ class TestPipelines:
             p_inst.side_effect = inst
             pipeline.run_with_callback(pipeline_id=pipeline_id, freq=1, timeout=2)
 
+    def test_stream_instances_gql(self):
+        query = build_progress_query(2)
+        assert GQL_PIPELINE_INSTANCE_PROGRESS_FRAGMENT in query
+        self.client.validate(gql(query))
+
+    @staticmethod
+    def progress(status, jobs=(), conditions=()):
+        return {
+            "id": "instance_1",
+            "status": status,
+            "startTime": "2022-04-19T10:00:00Z",
+            "endTime": None,
+            "jobsInstance": [
+                {"id": f"job_instance_{node}", "jobId": f"job_{node}", "jobNodeId": node, "status": job_status}
+                for node, job_status in jobs
+            ],
+            "conditionsInstance": [
+                {"conditionNodeId": node, "isSuccess": is_success} for node, is_success in conditions
+            ],
+        }
+
+    def test_stream_instance(self, saagie_api_mock):
+        pipeline = Pipelines(saagie_api_mock)
+        saagie_api_mock.client.execute.side_effect = [
+            {"instance0": self.progress("RUNNING", [("a", "RUNNING")])},
+            {"instance0": self.progress("RUNNING", [("a", "RUNNING")])},
+            {"instance0": self.progress("RUNNING", [("a", "SUCCEEDED")], [("cond", None)])},
+            {"instance0": self.progress("SUCCEEDED", [("a", "SUCCEEDED"), ("b", "SUCCEEDED")], [("cond", True)])},
+        ]
+
+        with patch("time.sleep") as sleep:
+            events = list(pipeline.stream_instance("instance_1", min_interval=1, max_interval=10))
+
+        assert [(event["type"], event.get("node_id")) for event in events] == [
+            ("status_changed", None),
+            ("node_started", "a"),
+            ("node_finished", "a"),
+            ("node_started", "b"),
+            ("node_finished", "b"),
+            ("condition_evaluated", "cond"),
+            ("instance_finished", None),
+        ]
+        assert [call.args[0] for call in sleep.call_args_list] == [1, 2, 1]
+
+    def test_stream_instances(self, saagie_api_mock):
+        pipeline = Pipelines(saagie_api_mock)
+        finished = self.progress("FAILED")
+        saagie_api_mock.client.execute.side_effect = [
+            {"instance0": self.progress("RUNNING"), "instance1": None},
+            {"instance0": finished},
+        ]
+
+        with patch("time.sleep"):
+            events = list(pipeline.stream_instances(["instance_1", "unknown"]))
+
+        assert [event["type"] for event in events] == ["status_changed", "not_found", "instance_finished"]
+        assert saagie_api_mock.client.execute.call_args_list[0].kwargs["variable_values"] == {
+            "id0": "instance_1",
+            "id1": "unknown",
+        }
+        assert saagie_api_mock.client.execute.call_args.kwargs["variable_values"] == {"id0": "instance_1"}
+
+    def test_stream_instance_skipped_node(self, saagie_api_mock):
+        pipeline = Pipelines(saagie_api_mock)
+        saagie_api_mock.client.execute.side_effect = [
+            {"instance0": self.progress("RUNNING", [("a", "RUNNING")])},
+            {"instance0": self.progress("RUNNING", [("a", "FAILED"), ("b", "SKIPPED")], [("cond", False)])},
+            {"instance0": self.progress("FAILED", [("a", "FAILED"), ("b", "SKIPPED")], [("cond", False)])},
+        ]
+
+        with patch("time.sleep"):
+            events = list(pipeline.stream_instance("instance_1"))
+
+        assert [(event["type"], event.get("node_id"), event.get("status")) for event in events] == [
+            ("status_changed", None, "RUNNING"),
+            ("node_started", "a", "RUNNING"),
+            ("node_finished", "a", "FAILED"),
+            ("node_started", "b", "SKIPPED"),
+            ("node_finished", "b", "SKIPPED"),
+            ("condition_evaluated", "cond", None),
+            ("instance_finished", None, "FAILED"),
+        ]
+
+    def test_stream_instance_error(self, saagie_api_mock):
+        pipeline = Pipelines(saagie_api_mock)
+        saagie_api_mock.client.execute.side_effect = [
+            {"instance0": self.progress("RUNNING")},
+            {"instance0": self.progress("ERROR")},
+        ]
+
+        with patch("time.sleep"):
+            events = list(pipeline.stream_instance("instance_1"))
+
+        assert [(event["type"], event.get("status")) for event in events] == [
+            ("status_changed", "RUNNING"),
+            ("instance_finished", "ERROR"),
+        ]
+        assert saagie_api_mock.client.execute.call_count == 2
+
+    def test_stream_instance_timeout(self, saagie_api_mock):
+        pipeline = Pipelines(saagie_api_mock)
+        saagie_api_mock.client.execute.return_value = {"instance0": self.progress("RUNNING")}
+
+        with patch("time.sleep"), pytest.raises(TimeoutError):
+            list(pipeline.stream_instance("instance_1", timeout=5))
+
     def test_stop_pipeline_instance_gql(self):
         query = gql(GQL_STOP_PIPELINE_INSTANCE)
         self.client.validate(query)
@@ -1312,6 +1550,78 @@ class TestPipelines:
 
         assert result is False
 
+    def test_export_env_vars_single_file(self, saagie_api_mock, tmp_path):
+        env_vars = [
+            {"name": "A", "scope": "PIPELINE", "value": "1", "description": "", "isPassword": False},
+            {"name": "B", "scope": "PROJECT", "value": "2", "description": "", "isPassword": False},
+        ]
+        saagie_api_mock.env_vars.list.return_value = env_vars
+        pipeline = Pipelines(saagie_api_mock)
+
+        with patch.object(pipeline, "get_info") as get_info:
+            get_info.return_value = {"graphPipeline": {"id": "pipeline_id", "name": "Pipeline A"}}
+            res = pipeline.export("pipeline_id", tmp_path, env_var_scope="PROJECT", env_vars_single_file=True)
+
+        assert res is True
+        env_vars_folder = tmp_path / "pipeline_id" / "env_vars"
+        assert [path.name for path in env_vars_folder.iterdir()] == ["env_vars.json"]
+        assert json.loads((env_vars_folder / "env_vars.json").read_text(encoding="utf-8")) == env_vars
+
+    def test_import_many(self, saagie_api_mock, tmp_path):
+        saagie_api_mock.jobs.list_for_project_minimal.return_value = {
+            "jobs": [
+                {"id": "9d488144-a9d0-4183-8422-a343a8efd4ed", "name": "test_job_python", "alias": "test_job_python"},
+            ]
+        }
+        saagie_api_mock.env_vars.bulk_create_for_pipeline.return_value = {
+            "replaceEnvironmentVariablesByRawForScope": [{"name": "PLAIN"}]
+        }
+        saagie_api_mock.env_vars.create.return_value = {"saveEnvironmentVariable": {"id": "env_var_id"}}
+        pipeline = Pipelines(saagie_api_mock)
+
+        origin_path = (
+            Path(__file__).parent.parent
+            / "integration"
+            / "resources"
+            / "import"
+            / "project"
+            / "pipelines"
+            / "with-existing-jobs"
+            / "pipeline.json"
+        )
+        with origin_path.open("r", encoding="utf-8") as file:
+            pipeline_info = json.load(file)
+        valid_file = tmp_path / "valid" / "pipeline.json"
+        invalid_file = tmp_path / "invalid" / "pipeline.json"
+        for json_file, job_name in [(valid_file, "test_job_python"), (invalid_file, "unknown_job")]:
+            for version in pipeline_info["versions"]:
+                for job_node in version["graph"]["jobNodes"]:
+                    job_node["job"]["name"] = job_name
+            json_file.parent.mkdir()
+            json_file.write_text(json.dumps(pipeline_info), encoding="utf-8")
+        for name, is_password in [("PLAIN", False), ("SECRET", True)]:
+            env_var_file = tmp_path / "valid" / "env_vars" / name / "variable.json"
+            env_var_file.parent.mkdir(parents=True)
+            env_var_file.write_text(
+                json.dumps(
+                    {"scope": "PIPELINE", "name": name, "value": "value", "description": "", "isPassword": is_password}
+                ),
+                encoding="utf-8",
+            )
+
+        with patch.object(pipeline, "create_graph") as create:
+            create.return_value = {"createGraphPipeline": {"id": "ca79c5c8-2e57-4a35-bcfc-5065f0ee901c"}}
+            result = pipeline.import_many([invalid_file, valid_file, tmp_path / "missing.json"], project_id="project")
+
+        assert result == {"imported": [str(valid_file)], "failed": [str(invalid_file), str(tmp_path / "missing.json")]}
+        create.assert_called_once()
+        saagie_api_mock.jobs.list_for_project_minimal.assert_called_once_with("project")
+        saagie_api_mock.env_vars.bulk_create_for_pipeline.assert_called_once_with(
+            "ca79c5c8-2e57-4a35-bcfc-5065f0ee901c", {"PLAIN": "value"}
+        )
+        saagie_api_mock.env_vars.create.assert_called_once()
+        assert saagie_api_mock.env_vars.create.call_args.kwargs["name"] == "SECRET"
+
     def test_count_deletable_instances_by_status_gql(self):
         query = gql(GQL_COUNT_DELETABLE_PIPELINE_INSTANCE_BY_STATUS)
         self.client.validate(query)
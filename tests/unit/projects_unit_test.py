@@ -6,7 +6,7 @@ from unittest.mock import MagicMock, Mock, patch
 import pytest
 from gql import gql
 
-from saagieapi.projects import Projects
+from saagieapi.projects import Projects, ProjectSnapshot
 from saagieapi.projects.gql_queries import *
 
 from .saagie_api_unit_test import create_gql_client
@@ -521,7 +521,7 @@ class TestProjects:
 
     def test_import_project_success(self, saagie_api_mock, tmp_path):
         saagie_api_mock.jobs.import_from_json.return_value = True
-        saagie_api_mock.pipelines.import_from_json.return_value = True
+        saagie_api_mock.pipelines.import_many.return_value = {"imported": ["pipeline.json"], "failed": []}
         saagie_api_mock.apps.import_from_json.return_value = True
         saagie_api_mock.env_vars.import_from_json.return_value = True
         project = Projects(saagie_api_mock)
@@ -632,7 +632,7 @@ class TestProjects:
 
     def test_import_project_error_importing_subelements(self, saagie_api_mock, tmp_path):
         saagie_api_mock.jobs.import_from_json.return_value = False
-        saagie_api_mock.pipelines.import_from_json.return_value = False
+        saagie_api_mock.pipelines.import_many.return_value = {"imported": [], "failed": ["pipeline/pipeline.json"]}
         saagie_api_mock.apps.import_from_json.return_value = False
         saagie_api_mock.env_vars.import_from_json.return_value = False
         project = Projects(saagie_api_mock)
@@ -762,3 +762,97 @@ class TestProjects:
             status = project.get_status_with_callback(project_id=project_id, freq=1, timeout=2)
 
         assert status == "READY"
+
+
+def _snapshot_api_mock():
+    saagie_api_mock = Mock()
+    saagie_api_mock.jobs.list_for_project.return_value = {
+        "jobs": [
+            {
+                "id": "j1",
+                "name": "extract",
+                "technology": {"id": "python"},
+                "versions": [{"runtimeVersion": "3.10", "isCurrent": True}],
+            },
+            {"id": "j2", "name": "load", "technology": {"id": "python"}, "versions": []},
+        ]
+    }
+    saagie_api_mock.pipelines.list_for_project.return_value = {
+        "project": {
+            "pipelines": [
+                {
+                    "id": "p1",
+                    "name": "nightly",
+                    "versions": [
+                        {
+                            "isCurrent": True,
+                            "graph": {
+                                "jobNodes": [{"id": "n1", "job": {"id": "j1"}}, {"id": "n2", "job": {"id": "j2"}}]
+                            },
+                        }
+                    ],
+                }
+            ]
+        }
+    }
+    saagie_api_mock.apps.list_for_project.return_value = {
+        "project": {"apps": [{"id": "a1", "name": "notebook", "currentVersion": {"runtimeContextId": "v1"}}]}
+    }
+    saagie_api_mock.storages.list_for_project.return_value = {
+        "project": {
+            "volumes": [
+                {"id": "s1", "name": "data", "size": "64 MB", "linkedApp": {"id": "a1"}},
+                {"id": "s2", "name": "old", "size": "128 MB", "linkedApp": None},
+            ]
+        }
+    }
+    saagie_api_mock.docker_credentials.list_for_project.side_effect = RuntimeError("Forbidden")
+    saagie_api_mock.env_vars.list.return_value = [
+        {"id": "e1", "name": "HOST", "scope": "GLOBAL", "value": "global", "isPassword": False},
+        {"id": "e2", "name": "HOST", "scope": "PROJECT", "value": "project", "isPassword": False},
+        {"id": "e3", "name": "PORT", "scope": "PROJECT", "value": "80", "isPassword": False},
+    ]
+
+    def list_by_entity(scope, entity_ids, _chunk_size):
+        if scope == "PIPELINE":
+            return {"p1": [{"id": "e4", "name": "HOST", "scope": "PIPELINE", "value": "pipeline", "isPassword": False}]}
+        return {entity_id: [] for entity_id in entity_ids}
+
+    saagie_api_mock.env_vars.list_by_entity.side_effect = list_by_entity
+    return saagie_api_mock
+
+
+class TestProjectSnapshot:
+    def test_snapshot(self):
+        snapshot = Projects(_snapshot_api_mock()).snapshot("project", max_workers=2)
+
+        job = snapshot.get("j1")
+        assert job.runtime_version == "3.10"
+        assert [pipeline.name for pipeline in job.pipelines] == ["nightly"]
+        assert [job.id for job in snapshot.find("pipelines", "nightly")[0].jobs] == ["j1", "j2"]
+        app = snapshot.find("apps", "notebook")[0]
+        assert [storage.id for storage in app.storages] == ["s1"]
+        assert snapshot.storages["s2"].app is None
+        assert snapshot.docker_credentials == {}
+        assert snapshot.errors == {"docker_credentials": "Forbidden"}
+        assert len(snapshot.find("env_vars", "HOST")) == 3
+        pipeline = snapshot.get("p1")
+        assert [var.value for var in pipeline.env_vars] == ["pipeline"]
+        effective = snapshot.effective_env_vars(pipeline)
+        assert {name: var.value for name, var in effective.items()} == {"HOST": "pipeline", "PORT": "80"}
+        assert snapshot.effective_env_vars(app)["HOST"].value == "project"
+        with pytest.raises(ValueError):
+            snapshot.find("users", "john.doe")
+
+    def test_snapshot_save_and_load(self, tmp_path):
+        snapshot = ProjectSnapshot.load(_snapshot_api_mock(), "project")
+        path = tmp_path / "snapshot.json"
+
+        snapshot.save(path)
+        loaded = ProjectSnapshot.load_file(path)
+
+        assert loaded.to_dict() == snapshot.to_dict()
+        assert loaded.get("j2").pipelines[0].id == "p1"
+        assert loaded.get("e4").owner is loaded.get("p1")
+        with pytest.raises(ValueError):
+            ProjectSnapshot.from_dict({**snapshot.to_dict(), "format_version": 99})
@@ -1,4 +1,5 @@
 # pylint: disable=attribute-defined-outside-init,protected-access,redefined-builtin
+import json
 from pathlib import Path
 from unittest.mock import MagicMock, Mock, patch
 
@@ -6,6 +7,7 @@ import pytest
 from gql import gql
 
 from saagieapi.repositories import Repositories
+from saagieapi.repositories.catalog_diff import diff_catalogs, file_hash, find_runtime_usages
 from saagieapi.repositories.gql_queries import *
 
 from .saagie_api_unit_test import create_gql_client
@@ -310,3 +312,180 @@ class TestProjects:
 
         with pytest.raises(ValueError):
             repository._Repositories__launch_request(file=None, url=None, payload_str="request", params={})
+
+
+def _technology(technology_id, contexts, available=True, app=False):
+    return {
+        "id": technology_id,
+        "technologyId": technology_id.lower(),
+        "label": technology_id,
+        "available": available,
+        "appContexts"
+        if app
+        else "contexts": [
+            {"id": context_id, "label": context_id, "available": context_available, "deprecationDate": deprecation}
+            for context_id, context_available, deprecation in contexts
+        ],
+    }
+
+
+CATALOG_BEFORE = [
+    _technology("PYTHON", [("3.8", True, None), ("3.9", True, None), ("3.10", True, None)]),
+    _technology("R", [("4.0", True, None)]),
+    _technology("JUPYTER", [("v1", True, None)], app=True),
+]
+CATALOG_AFTER = [
+    _technology("PYTHON", [("3.9", True, "2024-06-30T00:00:00Z"), ("3.10", False, None), ("3.12", True, None)]),
+    _technology("JUPYTER", [("v1", True, None)], available=False, app=True),
+    _technology("BASH", [("debian", True, None)]),
+]
+
+
+def _list_jobs(project_id, **_):
+    if project_id == "broken":
+        raise RuntimeError("Forbidden")
+    return {
+        "jobs": [
+            {
+                "id": "j1",
+                "name": "ingest",
+                "technology": {"id": "PYTHON"},
+                "versions": [{"runtimeVersion": "3.9", "isCurrent": True}],
+            },
+            {
+                "id": "j2",
+                "name": "report",
+                "technology": {"id": "PYTHON"},
+                "versions": [{"runtimeVersion": "3.12", "isCurrent": True}],
+            },
+            {
+                "id": "j3",
+                "name": "stats",
+                "technology": {"id": "R"},
+                "versions": [{"runtimeVersion": "4.0", "isCurrent": True}],
+            },
+        ]
+    }
+
+
+def _list_apps(_project_id, **_):
+    return {
+        "project": {
+            "apps": [
+                {
+                    "id": "a1",
+                    "name": "notebook",
+                    "technology": {"id": "JUPYTER"},
+                    "currentVersion": {"runtimeContextId": "v1"},
+                }
+            ]
+        }
+    }
+
+
+class TestRepositoriesSynchronization:
+    @pytest.fixture
+    def saagie_api_mock(self):
+        saagie_api_mock = Mock()
+        saagie_api_mock.projects.list.return_value = {"projects": [{"id": "p1"}, {"id": "broken"}]}
+        saagie_api_mock.jobs.list_for_project.side_effect = _list_jobs
+        saagie_api_mock.apps.list_for_project.side_effect = _list_apps
+        return saagie_api_mock
+
+    def test_diff_catalogs(self):
+        diff = diff_catalogs(CATALOG_BEFORE, CATALOG_AFTER)
+
+        assert [technology["technology_id"] for technology in diff["technologies"]["added"]] == ["BASH"]
+        assert [technology["technology_id"] for technology in diff["technologies"]["removed"]] == ["R"]
+        assert [technology["technology_id"] for technology in diff["technologies"]["unavailable"]] == ["JUPYTER"]
+        contexts = {
+            key: [(context["technology_id"], context["context_id"]) for context in value]
+            for key, value in diff["contexts"].items()
+        }
+        assert contexts == {
+            "added": [("PYTHON", "3.12"), ("BASH", "debian")],
+            "removed": [("PYTHON", "3.8"), ("R", "4.0")],
+            "deprecated": [("PYTHON", "3.9")],
+            "unavailable": [("PYTHON", "3.10")],
+        }
+
+    def test_find_runtime_usages(self, saagie_api_mock):
+        usages, errors = find_runtime_usages(saagie_api_mock, [("PYTHON", "3.9"), ("JUPYTER", "v1")], max_workers=2)
+
+        assert [(usage["entity_type"], usage["entity_id"]) for usage in usages] == [("app", "a1"), ("job", "j1")]
+        assert errors == {"broken": "Forbidden"}
+        assert find_runtime_usages(saagie_api_mock, []) == ([], {})
+
+    def test_file_hash(self, tmp_path):
+        file = tmp_path / "technologies.zip"
+        file.write_bytes(b"test")
+
+        assert file_hash(file) == "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08"
+
+    def test_synchronize_with_report(self, saagie_api_mock, tmp_path):
+        repository = Repositories(saagie_api_mock)
+        file = tmp_path / "technologies.zip"
+        file.write_bytes(b"test")
+        state_file = tmp_path / "state.json"
+
+        with patch.object(repository, "get_info") as get_info, patch.object(repository, "synchronize") as synchronize:
+            get_info.side_effect = [
+                {"repository": {"technologies": CATALOG_BEFORE}},
+                {"repository": {"technologies": CATALOG_AFTER}},
+            ]
+            synchronize.return_value = {"synchronizeRepository": {"count": 3}}
+            report = repository.synchronize_with_report(
+                "repo", file=str(file), state_file=str(state_file), project_ids=["p1"]
+            )
+
+            synchronize.assert_called_once_with("repo", str(file))
+            assert not report["skipped"]
+            assert [(usage["entity_id"], usage["context_id"]) for usage in report["usages"]] == [
+                ("j1", "3.9"),
+                ("j3", "4.0"),
+            ]
+            assert not report["errors"]
+            assert json.loads(state_file.read_text(encoding="utf-8")) == {"repo": report["file_hash"]}
+
+            report = Repositories(saagie_api_mock).synchronize_with_report(
+                "repo", file=str(file), state_file=str(state_file)
+            )
+
+            assert report["skipped"]
+            assert synchronize.call_count == 1
+            assert get_info.call_count == 2
+
+    def test_synchronize_with_report_failure(self, saagie_api_mock, tmp_path):
+        repository = Repositories(saagie_api_mock)
+        file = tmp_path / "technologies.zip"
+        file.write_bytes(b"test")
+        state_file = tmp_path / "state.json"
+
+        with patch.object(repository, "get_info") as get_info, patch.object(
+            repository, "synchronize"
+        ) as synchronize, patch("logging.error"):
+            get_info.return_value = {"repository": {"technologies": CATALOG_BEFORE}}
+            synchronize.return_value = {
+                "synchronizeRepository": {"count": 3, "report": {"id": "r1", "failure": "Invalid metadata.yaml"}}
+            }
+            report = repository.synchronize_with_report(
+                "repo", file=str(file), state_file=str(state_file), scan_usages=False
+            )
+            repository.synchronize_with_report("repo", file=str(file), state_file=str(state_file), scan_usages=False)
+
+        assert report["failure"] == "Invalid metadata.yaml"
+        assert not report["skipped"]
+        assert synchronize.call_count == 2
+        assert not state_file.exists()
+
+    def test_synchronize_with_report_url(self, saagie_api_mock):
+        repository = Repositories(saagie_api_mock)
+
+        with patch.object(repository, "get_info") as get_info, patch.object(repository, "synchronize") as synchronize:
+            get_info.return_value = {"repository": {"technologies": CATALOG_BEFORE}}
+            report = repository.synchronize_with_report("repo", scan_usages=False)
+            repository.synchronize_with_report("repo", scan_usages=False)
+
+        assert synchronize.call_count == 2
+        assert report["diff"]["contexts"]["removed"] == []
+        saagie_api_mock.jobs.list_for_project.assert_not_called()
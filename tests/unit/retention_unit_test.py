@@ -0,0 +1,154 @@
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, Mock
+
+import pytest
+
+from saagieapi.retention import RetentionEngine, RetentionPolicy
+
+NOW = datetime(2023, 6, 30, tzinfo=timezone.utc)
+
+
+class TestRetentionPolicy:
+    def test_versions_to_delete(self):
+        policy = RetentionPolicy(keep_last_versions=2)
+        versions = [
+            {"number": 1, "isCurrent": True},
+            {"number": 2, "isCurrent": False},
+            {"number": 3, "isCurrent": False, "deletableState": {"deletable": False}},
+            {"number": 4, "isCurrent": False},
+            {"number": 5, "isCurrent": False},
+        ]
+
+        assert policy.versions_to_delete(versions) == [2]
+        assert not RetentionPolicy().versions_to_delete(versions)
+
+    def test_matches(self):
+        policy = RetentionPolicy(instances_selector="FAILED", entity_types=["job"], name_pattern="tmp_*")
+
+        assert policy.matches("job", "tmp_extract")
+        assert not policy.matches("job", "extract")
+        assert not policy.matches("pipeline", "tmp_extract")
+
+    def test_date_before(self):
+        assert RetentionPolicy(instances_older_than_days=30).date_before(NOW) == "2023-05-31T00:00:00+0000"
+        assert RetentionPolicy().date_before(NOW) is None
+
+    @pytest.mark.parametrize(
+        "params",
+        [
+            {"keep_last_versions": 0},
+            {"instances_older_than_days": -1},
+            {"instances_selector": "RUNNING"},
+            {"entity_types": ["app"]},
+        ],
+    )
+    def test_invalid_policy(self, params):
+        with pytest.raises(ValueError):
+            RetentionPolicy(**params)
+
+
+class TestRetentionEngine:
+    @pytest.fixture
+    def saagie_api_mock(self):
+        saagie_api_mock = Mock()
+        saagie_api_mock.jobs.list_for_project = MagicMock(
+            return_value={
+                "jobs": [
+                    {
+                        "id": "job_1",
+                        "name": "job 1",
+                        "versions": [
+                            {"number": 3, "isCurrent": True},
+                            {"number": 2, "isCurrent": False},
+                            {"number": 1, "isCurrent": False},
+                        ],
+                    },
+                    {"id": "job_2", "name": "tmp_job", "versions": [{"number": 1, "isCurrent": True}]},
+                ]
+            }
+        )
+        saagie_api_mock.pipelines.list_for_project = MagicMock(
+            return_value={"project": {"pipelines": [{"id": "pipeline_1", "name": "pipeline 1", "versions": []}]}}
+        )
+        saagie_api_mock.jobs.count_deletable_instances_by_date = MagicMock(return_value={"countJobInstancesByDate": 10})
+        saagie_api_mock.jobs.count_deletable_instances_by_status = MagicMock(
+            return_value={
+                "countJobInstancesBySelector": [{"selector": "ALL", "count": 7}, {"selector": "FAILED", "count": 4}]
+            }
+        )
+        saagie_api_mock.jobs.iter_instances = MagicMock(
+            side_effect=lambda *args, **kwargs: iter([{"id": "success_1", "startTime": "2023-05-01T10:00:00.000Z"}])
+        )
+        saagie_api_mock.pipelines.count_deletable_instances_by_date = MagicMock(
+            return_value={"countDeletablePipelineInstancesByDate": 0}
+        )
+        saagie_api_mock.jobs.delete_instances_by_date = MagicMock(return_value={"deleteJobInstancesByDate": 9})
+        saagie_api_mock.jobs.delete_instances_by_selector = MagicMock(return_value={"deleteJobInstancesBySelector": 4})
+        saagie_api_mock.jobs.delete_versions = MagicMock(
+            return_value={"deleteJobVersions": [{"number": 1, "success": True}]}
+        )
+        return saagie_api_mock
+
+    @staticmethod
+    def policies():
+        return [
+            RetentionPolicy(instances_selector="FAILED", entity_types=["job"], name_pattern="tmp_*"),
+            RetentionPolicy(keep_last_versions=2, instances_older_than_days=30),
+        ]
+
+    def test_plan(self, saagie_api_mock):
+        engine = RetentionEngine(saagie_api_mock, max_workers=2)
+
+        actions = engine.plan("project_1", self.policies(), now=NOW)
+
+        by_key = {(a["entity_id"], a["action"]): a for a in actions}
+        assert set(by_key) == {
+            ("job_1", "delete_instances_by_date"),
+            ("job_1", "delete_versions"),
+            ("job_2", "delete_instances_by_selector"),
+            ("pipeline_1", "delete_instances_by_date"),
+        }
+        by_date = by_key[("job_1", "delete_instances_by_date")]
+        assert by_date["count"] == 9
+        assert by_date["params"] == {
+            "job_id": "job_1",
+            "date_before": "2023-05-31T00:00:00+0000",
+            "exclude_instances_id": ["success_1"],
+        }
+        assert by_key[("job_1", "delete_versions")]["params"] == {"job_id": "job_1", "versions": [1]}
+        assert by_key[("job_2", "delete_instances_by_selector")]["count"] == 4
+        assert by_key[("pipeline_1", "delete_instances_by_date")]["count"] == 0
+        saagie_api_mock.pipelines.iter_instances.assert_not_called()
+        saagie_api_mock.jobs.delete_instances_by_date.assert_not_called()
+
+    def test_run_dry_run(self, saagie_api_mock):
+        engine = RetentionEngine(saagie_api_mock)
+
+        report = engine.run(["project_1"], self.policies(), now=NOW)
+
+        assert report["dry_run"]
+        assert report["summary"] == {"entities": 3, "actions": 3, "instances": 13, "versions": 1, "errors": 0}
+        saagie_api_mock.jobs.delete_versions.assert_not_called()
+
+    def test_run(self, saagie_api_mock):
+        saagie_api_mock.jobs.delete_instances_by_selector.side_effect = RuntimeError("error")
+        engine = RetentionEngine(saagie_api_mock, max_workers=4, calls_per_second=1000)
+
+        report = engine.run(["project_1"], self.policies(), dry_run=False, now=NOW)
+
+        assert report["summary"] == {"entities": 3, "actions": 2, "instances": 9, "versions": 1, "errors": 1}
+        saagie_api_mock.jobs.delete_instances_by_date.assert_called_once_with(
+            job_id="job_1", date_before="2023-05-31T00:00:00+0000", exclude_instances_id=["success_1"]
+        )
+        saagie_api_mock.jobs.delete_versions.assert_called_once_with(job_id="job_1", versions=[1])
+        saagie_api_mock.pipelines.delete_instances_by_date.assert_not_called()
+
+    def test_plan_error(self, saagie_api_mock):
+        saagie_api_mock.pipelines.count_deletable_instances_by_date.side_effect = RuntimeError("error")
+        engine = RetentionEngine(saagie_api_mock)
+
+        actions = engine.plan(["project_1"], RetentionPolicy(instances_older_than_days=1), now=NOW)
+
+        errors = [action for action in actions if action.get("error")]
+        assert len(errors) == 1
+        assert errors[0]["entity_id"] == "pipeline_1"
@@ -1,5 +1,6 @@
-# pylint: disable=attribute-defined-outside-init
+# pylint: disable=attribute-defined-outside-init,protected-access
 import os
+import threading
 
 import pytest
 from gql import Client, gql
@@ -13,6 +14,7 @@ from saagieapi.gql_queries import (
     GQL_GET_PLATFORM_INFO,
     GQL_GET_REPOSITORIES_INFO,
 )
+from saagieapi.utils.gql_client import GqlClient
 
 
 def create_gql_client(file_name: str = "schema.graphqls"):
@@ -139,3 +141,20 @@ class TestGQLTemplate:
     def test_check_custom_expression(self):
         query = gql(GQL_CHECK_CUSTOM_EXPRESSION)
         self.client.validate(query)
+
+
+class TestGqlClient:
+    @staticmethod
+    def test_get_client_per_thread():
+        gql_client = GqlClient(api_endpoint="https://localhost/graphql", auth=None, timeout=10)
+        gql_client.client.schema = create_gql_client().schema
+        thread_clients = []
+
+        thread = threading.Thread(target=lambda: thread_clients.append(gql_client._get_client()))
+        thread.start()
+        thread.join()
+
+        assert gql_client._get_client() is gql_client.client
+        assert thread_clients[0] is not gql_client.client
+        assert thread_clients[0].transport is not gql_client.client.transport
+        assert thread_clients[0].schema is gql_client.client.schema
@@ -4,8 +4,9 @@ from unittest.mock import MagicMock, Mock, patch
 import pytest
 from gql import gql
 
-from saagieapi.storages import Storages
+from saagieapi.storages import StorageIndex, Storages
 from saagieapi.storages.gql_queries import *
+from saagieapi.storages.storage_index import parse_size
 
 from .saagie_api_unit_test import create_gql_client
 
@@ -261,3 +262,137 @@ class TestStorages:
         storage.duplicate(storage_id=storage_id)
 
         saagie_api_mock.client.execute.assert_called_with(query=expected_query, variable_values=params)
+
+
+def _storage(storage_id, project_id, size, app_id=None, mounted=False):
+    linked_app = None
+    if app_id:
+        volumes = [{"path": "/data", "volume": {"id": storage_id}}] if mounted else []
+        linked_app = {
+            "id": app_id,
+            "name": f"app {app_id}",
+            "currentVersion": {"number": 1, "volumesWithPath": volumes},
+        }
+    return {
+        "id": storage_id,
+        "name": f"storage {storage_id}",
+        "projectId": project_id,
+        "size": size,
+        "linkedApp": linked_app,
+    }
+
+
+def _list_for_project(project_id, **_):
+    if project_id == "broken":
+        raise RuntimeError("Forbidden")
+    storages = {
+        "p1": [_storage("s1", "p1", "128 MB", "a1", mounted=True), _storage("s2", "p1", "64 MB")],
+        "p2": [_storage("s3", "p2", "1 GB", "a1"), _storage("s4", "p2", "512 MB")],
+    }
+    return {"project": {"volumes": storages[project_id]}}
+
+
+class TestStorageIndex:
+    @pytest.fixture
+    def saagie_api_mock(self):
+        saagie_api_mock = Mock()
+        saagie_api_mock.projects.list.return_value = {
+            "projects": [{"id": "p1", "name": "Project 1"}, {"id": "p2", "name": "Project 2"}]
+        }
+        saagie_api_mock.storages.list_for_project.side_effect = _list_for_project
+        saagie_api_mock.client.execute = MagicMock()
+        return saagie_api_mock
+
+    def test_parse_size(self):
+        assert parse_size("128 MB") == 128 * 1024**2
+        assert parse_size("1.5GB") == 1536 * 1024**2
+        assert parse_size(None) == 0
+        assert parse_size("1024") == 1024
+        assert parse_size(2048) == 2048
+        with pytest.raises(ValueError):
+            parse_size("big")
+
+    def test_unparsable_size(self):
+        index = StorageIndex(
+            [
+                {"id": "s1", "projectId": "p1", "size": "1 KB"},
+                {"id": "s2", "projectId": "p1", "size": "big"},
+            ]
+        )
+
+        assert index.total_size() == 1024
+        assert index.summary()[0]["total_size"] == 1024
+        assert list(index.errors) == ["s2"]
+        index.remove("s2")
+        assert not index.errors
+
+    def test_load(self, saagie_api_mock):
+        index = StorageIndex.load(saagie_api_mock, max_workers=2)
+
+        assert len(index) == 4
+        assert [storage["id"] for storage in index.for_app("a1")] == ["s1", "s3"]
+        assert [storage["id"] for storage in index.orphans()] == ["s2", "s4"]
+        assert index.total_size() == (128 + 64 + 1024 + 512) * 1024**2
+        assert index.total_size("p2", orphans_only=True) == 512 * 1024**2
+        assert index.summary()[0] == {
+            "project_id": "p2",
+            "project_name": "Project 2",
+            "storage_count": 2,
+            "total_size": 1536 * 1024**2,
+            "orphan_count": 1,
+            "orphan_size": 512 * 1024**2,
+        }
+        assert not index.errors
+
+    def test_load_error(self, saagie_api_mock):
+        index = StorageIndex.load(saagie_api_mock, project_ids=["p1", "broken"])
+
+        assert len(index) == 2
+        assert index.errors == {"broken": "Forbidden"}
+        saagie_api_mock.projects.list.assert_not_called()
+
+    def test_delete_many(self, saagie_api_mock):
+        storage = Storages(saagie_api_mock)
+        index = StorageIndex.load(saagie_api_mock)
+
+        report = storage.delete_many(["s1", "s2", "s4", "unknown"], index=index)
+
+        assert report == {
+            "deleted": ["s2", "s4"],
+            "skipped": {"s1": "Used by the app [app a1]", "unknown": "Storage not found"},
+            "errors": {},
+        }
+        saagie_api_mock.client.execute.assert_called_with(query=gql(GQL_DELETE_STORAGE), variable_values={"id": "s4"})
+        assert saagie_api_mock.client.execute.call_count == 2
+        assert "s2" not in index
+        assert index.orphans() == []
+
+    def test_delete_many_dry_run(self, saagie_api_mock):
+        storage = Storages(saagie_api_mock)
+
+        report = storage.delete_many(["s2", "s3"], dry_run=True)
+
+        assert report["deleted"] == ["s2", "s3"]
+        saagie_api_mock.storages.list_for_project.assert_called()
+        saagie_api_mock.client.execute.assert_not_called()
+
+    def test_unlink_many(self, saagie_api_mock):
+        storage = Storages(saagie_api_mock)
+        index = StorageIndex.load(saagie_api_mock)
+        saagie_api_mock.client.execute.side_effect = [RuntimeError("Locked")]
+
+        report = storage.unlink_many(["s1", "s2", "s3"], index=index, max_workers=1)
+
+        assert report == {
+            "unlinked": [],
+            "skipped": {"s1": "Used by the app [app a1]", "s2": "Not linked to an app"},
+            "errors": {"s3": "Locked"},
+        }
+        saagie_api_mock.client.execute.side_effect = None
+
+        report = storage.unlink_many(["s3"], index=index)
+
+        assert report["unlinked"] == ["s3"]
+        saagie_api_mock.client.execute.assert_called_with(query=gql(GQL_UNLINK_STORAGE), variable_values={"id": "s3"})
+        assert [storage["id"] for storage in index.for_app("a1")] == ["s1"]
+        assert index.get("s3")["linkedApp"] is None
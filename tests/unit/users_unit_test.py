@@ -0,0 +1,76 @@
+import json
+from unittest.mock import Mock, patch
+
+import pytest
+
+from saagieapi.users import Users
+
+
+def create_mock(user_name, **kwargs):
+    if user_name != "user_1":
+        raise ValueError("error")
+    return True
+
+
+class TestUsers:
+    @pytest.fixture
+    def saagie_api_mock(self):
+        saagie_api_mock = Mock()
+        saagie_api_mock.url_saagie = "https://saagie-workspace.prod.saagie.io/"
+        saagie_api_mock.verify_ssl = True
+        return saagie_api_mock
+
+    @staticmethod
+    def write_users(tmp_path, logins):
+        json_file = tmp_path / "users.json"
+        json_file.write_text(
+            json.dumps(
+                [
+                    {
+                        "login": login,
+                        "roles": ["ROLE_READER"],
+                        "platforms": [],
+                        "groups": [],
+                        "protected": login == "admin",
+                    }
+                    for login in logins
+                ]
+            ),
+            encoding="utf-8",
+        )
+        return json_file
+
+    def test_import_from_json(self, saagie_api_mock, tmp_path):
+        instance = Users(saagie_api_mock)
+        json_file = self.write_users(tmp_path, ["admin", "user_1", "existing", "user_2"])
+
+        with patch.object(instance, "list") as list_users, patch.object(instance, "create") as create:
+            list_users.return_value = [{"login": "admin"}, {"login": "existing"}]
+            result = instance.import_from_json(json_file, temp_pwd="Pwd123!", max_workers=2)
+
+        assert result is True
+        list_users.assert_called_once_with(verify_ssl=True)
+        assert sorted(call.kwargs["user_name"] for call in create.call_args_list) == ["user_1", "user_2"]
+        saagie_api_mock.request_client.send.assert_not_called()
+
+    def test_import_from_json_failed(self, saagie_api_mock, tmp_path):
+        instance = Users(saagie_api_mock)
+        json_file = self.write_users(tmp_path, ["user_3", "user_1", "user_2"])
+
+        with patch.object(instance, "list", return_value=[]), patch.object(instance, "create") as create, patch(
+            "saagieapi.users.users.write_error"
+        ) as write_error:
+            create.side_effect = create_mock
+            result = instance.import_from_json(json_file, temp_pwd="Pwd123!", error_folder="errors", max_workers=3)
+
+        assert result is False
+        write_error.assert_called_once_with("errors", "users", str(["user_3", "user_2"]))
+
+    def test_import_from_json_list_error(self, saagie_api_mock, tmp_path):
+        instance = Users(saagie_api_mock)
+        json_file = self.write_users(tmp_path, ["user_1"])
+
+        with patch.object(instance, "list", side_effect=Exception("error")), patch.object(instance, "create") as create:
+            assert instance.import_from_json(json_file, temp_pwd="Pwd123!") is False
+
+        create.assert_not_called()